@@ -0,0 +1,95 @@
+"""
+Load test of the JSON API: req/s and latency percentiles of list and show endpoints,
+next to the startup cost of one CLI process per operation
+Uses BENCH_DATABASE_URL, otherwise a temporary SQLite file
+python -m benchmarks.bench_api [requests per endpoint] [client threads]
+"""
+import http.client
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker, scoped_session
+
+from benchmarks.common import seed
+from src.infrastructures.database.models import Base
+from src.infrastructures.security.security import JWTTokenManager
+from src.presentation.api.server import create_app, make_api_server
+
+ROWS = 5_000
+ENDPOINTS = {
+    "GET /contrats/{id}": lambda: f"/contrats/{random.randint(1, ROWS)}",
+    "GET /clients/{id}": lambda: f"/clients/{random.randint(1, ROWS)}",
+    "GET /events/{id}": lambda: f"/events/{random.randint(1, ROWS)}",
+    "GET /contrats?filter=mine": lambda: "/contrats?filter=mine",
+    "GET /events?limit=50": lambda: "/events?limit=50",
+}
+
+
+def _percentile(latencies: list, p: float) -> float:
+    return latencies[min(int(len(latencies) * p), len(latencies) - 1)] * 1000
+
+
+def _load(port: int, token: str, path, requests: int, threads: int) -> tuple:
+    """Sends `requests` GET from `threads` clients, returns (req/s, p50 ms, p99 ms)"""
+    def get(_) -> float:
+        start = time.perf_counter()
+        connection = http.client.HTTPConnection("127.0.0.1", port)
+        connection.request("GET", path(), headers={"Authorization": f"Bearer {token}"})
+        response = connection.getresponse()
+        response.read()
+        connection.close()
+        assert response.status == 200, response.status
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        latencies = sorted(executor.map(get, range(requests)))
+    elapsed = time.perf_counter() - start
+    return requests / elapsed, _percentile(latencies, 0.5), _percentile(latencies, 0.99)
+
+
+def _cli_startup(runs: int = 3) -> float:
+    """Seconds to start one CLI process, paid by every operation of an integration shelling out"""
+    start = time.perf_counter()
+    for _ in range(runs):
+        subprocess.run([sys.executable, "main.py", "--help"], capture_output=True, check=True)
+    return (time.perf_counter() - start) / runs
+
+
+def main(requests: int = 2_000, threads: int = 8):
+    os.environ.setdefault("JWT_EXPIRATION_HOURS", "1")
+    os.environ.setdefault("JWT_ALGORITHM", "HS256")
+    os.environ.setdefault("JWT_SECRET_KEY", "bench")
+    with tempfile.TemporaryDirectory() as directory:
+        database_url = os.environ.get("BENCH_DATABASE_URL") or f"sqlite:///{os.path.join(directory, 'bench.db')}"
+        engine = create_engine(database_url, pool_size=threads, max_overflow=0)
+        Base.metadata.drop_all(engine)
+        Base.metadata.create_all(engine)
+        with sessionmaker(bind=engine)() as session:
+            seed(session, ROWS)
+
+        sessions = scoped_session(sessionmaker(bind=engine))
+        server = make_api_server("127.0.0.1", 0, create_app(sessions))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        token = JWTTokenManager().create_token(1)
+
+        print(f"{requests} requêtes par endpoint, {threads} clients")
+        for label, path in ENDPOINTS.items():
+            rate, p50, p99 = _load(server.server_address[1], token, path, requests, threads)
+            print(f"{label:<28} {rate:>8.0f} req/s  p50 {p50:>7.1f} ms  p99 {p99:>7.1f} ms")
+        print(f"{'CLI, un processus par appel':<28} {1 / _cli_startup():>8.1f} op/s  (démarrage seul)")
+
+        server.shutdown()
+        server.server_close()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
@@ -0,0 +1,58 @@
+"""
+Benchmark - write cost of the audit log per contrat update:
+no audit, one INSERT + commit per change, entries buffered and written by the commit of their update
+python -m benchmarks.bench_audit_overhead [updates]
+"""
+import sys
+import time
+
+from benchmarks.common import make_session, seed
+from src.domain.entities.enums import Role
+from src.domain.entities.value_objects import Money
+from src.domain.policies.user_policy import RequestPolicy
+from src.infrastructures.repositories.SQLAchemy_repository import SQLAlchemyContratRepository, \
+    SQLAlchemyClientRepository, SQLAlchemyAuditRepository
+from src.use_cases.contrat_use_cases import UpdateContratUseCase, UpdateContratRequest
+
+
+class SynchronousAuditRepository(SQLAlchemyAuditRepository):
+    """Writes each change in its own transaction, as an audit INSERT + commit added to every save would"""
+
+    def record(self, entries):
+        super().record(entries)
+        self.flush()
+
+
+def _run(label: str, session, audit_repository, contrat_ids, baseline: float = None) -> float:
+    use_case = UpdateContratUseCase(
+        SQLAlchemyContratRepository(session), SQLAlchemyClientRepository(session), audit_repository
+    )
+    authorization = RequestPolicy(
+        user={"user_current_id": 1, "user_current_role": Role.ADMIN},
+        ressource="CONTRAT",
+        action="update",
+    )
+    start = time.perf_counter()
+    for contrat_id in contrat_ids:
+        response = use_case.execute(UpdateContratRequest(contrat_id, Money(2000), authorization))
+        assert response.success, response.msg
+    per_update = (time.perf_counter() - start) / len(contrat_ids) * 1_000_000
+    overhead = "" if baseline is None else f"  surcoût {per_update - baseline:>+8.1f} µs"
+    print(f"{label:<30} {per_update:>8.1f} µs/modification{overhead}")
+    return per_update
+
+
+def main(updates: int = 2_000):
+    session = make_session()
+    # contrats with an id multiple of 3 are unsigned, the only ones that can be updated
+    seed(session, updates * 9)
+    unsigned = list(range(3, updates * 9 + 1, 3))
+    print(f"{updates} modifications de contrat")
+
+    baseline = _run("sans audit", session, None, unsigned[:updates])
+    _run("audit synchrone", session, SynchronousAuditRepository(session), unsigned[updates:updates * 2], baseline)
+    _run("audit en lot", session, SQLAlchemyAuditRepository(session), unsigned[updates * 2:updates * 3], baseline)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2_000)
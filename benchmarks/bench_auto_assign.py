@@ -0,0 +1,66 @@
+"""
+Benchmark - automatic support assignment (bulk load, heap + interval scheduling, batched UPDATE)
+python -m benchmarks.bench_auto_assign [unassigned events] [support users] [window in hours]
+"""
+import random
+import sys
+from datetime import datetime, timedelta
+
+from sqlalchemy import update, bindparam
+
+from benchmarks.common import make_session, seed, measure
+from src.domain.entities.enums import Role
+from src.domain.services.support_scheduler import plan_assignments
+from src.infrastructures.database.models import EventModel
+from src.infrastructures.repositories.SQLAchemy_repository import SQLAlchemyEventRepository, \
+    SQLAlchemyUserRepository
+
+
+def main(events: int = 10_000, supports: int = 200, hours: int = 24 * 28):
+    session = make_session()
+    # seed: one event in four has no support, users alternate commercial / support
+    seed(session, events * 4, users=supports * 2)
+
+    # spread events randomly over the window so that support schedules conflict
+    rng = random.Random(42)
+    start = datetime.now() + timedelta(days=1)
+    table = EventModel.__table__
+    periods = []
+    for event_id in range(1, events * 4 + 1):
+        begin = start + timedelta(minutes=rng.randrange(hours * 60))
+        periods.append({"b_id": event_id, "b_start": begin, "b_end": begin + timedelta(hours=rng.randint(2, 8))})
+    session.execute(
+        update(table).where(table.c.id == bindparam("b_id"))
+        .values(start_date=bindparam("b_start"), end_date=bindparam("b_end")),
+        periods
+    )
+    session.commit()
+    print(f"{events} évènements sans support, {supports} supports, fenêtre {hours} h")
+
+    event_repo = SQLAlchemyEventRepository(session)
+    user_repo = SQLAlchemyUserRepository(session)
+
+    with measure("load"):
+        unassigned = event_repo.find_all_rows({"support_contact": False, "date_from": datetime.now()})
+        support_users = user_repo.find_all({"role": Role.SUPPORT})
+        busy = event_repo.find_all_rows({
+            "support_contact": True,
+            "date_from": min(event.start_date for event in unassigned),
+            "date_to": max(event.end_date for event in unassigned),
+        })
+
+    with measure("plan"):
+        planned, left = plan_assignments(
+            ((event.id, event.start_date, event.end_date) for event in unassigned),
+            (support.id for support in support_users),
+            ((event.support_contact_id, event.start_date, event.end_date) for event in busy),
+        )
+
+    with measure("batched update"):
+        applied = event_repo.assign_supports(planned)
+
+    print(f"{len(applied)} assignés, {len(left)} sans support disponible")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:4]))
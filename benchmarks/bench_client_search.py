@@ -0,0 +1,44 @@
+"""
+Benchmark - client search latency (pg_trgm on PostgreSQL, in-process trigram index otherwise)
+python -m benchmarks.bench_client_search [rows] [queries]
+"""
+import random
+import sys
+import time
+
+from benchmarks.common import make_session, seed, measure
+from src.infrastructures.repositories.SQLAchemy_repository import SQLAlchemyClientRepository
+
+
+def _typo(word: str, rng: random.Random) -> str:
+    """Swap two neighbouring characters"""
+    i = rng.randrange(len(word) - 1)
+    return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+
+
+def main(rows: int = 100_000, queries: int = 500):
+    session = make_session()
+    seed(session, rows)
+    repo = SQLAlchemyClientRepository(session)
+    rng = random.Random(42)
+    print(f"{rows} clients, {queries} recherches")
+
+    with measure("first search (index build)"):
+        repo.search("client 1", limit=20, offset=0)
+
+    timings = []
+    for _ in range(queries):
+        query = _typo(f"company {rng.randint(1, rows)}", rng)
+        start = time.perf_counter()
+        repo.search(query, limit=20, offset=0)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    timings.sort()
+    print(f"p50 {timings[len(timings) // 2]:.1f} ms, p99 {timings[int(len(timings) * 0.99)]:.1f} ms")
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 100_000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 500,
+    )
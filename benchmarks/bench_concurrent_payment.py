@@ -0,0 +1,99 @@
+"""
+Benchmark - concurrent payments on one contrat, read-modify-write vs conditional UPDATE
+Uses BENCH_DATABASE_URL, otherwise a temporary SQLite file (shared by the worker processes)
+python -m benchmarks.bench_concurrent_payment [processes] [payments per process]
+"""
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+from benchmarks.common import seed
+from src.domain.entities.exceptions import ConcurrentModificationError
+from src.domain.entities.value_objects import Money
+from src.infrastructures.database.models import Base
+from src.infrastructures.repositories.SQLAchemy_repository import SQLAlchemyContratRepository
+
+CONTRAT_ID = 1
+PAYMENT_CENTS = 1
+
+
+def _engine(database_url: str):
+    connect_args = {"timeout": 60} if database_url.startswith("sqlite") else {}
+    return create_engine(database_url, poolclass=NullPool, connect_args=connect_args)
+
+
+def _read_modify_write(repo: SQLAlchemyContratRepository) -> bool:
+    """Previous RecordPaymentContratUseCase path: read, subtract in Python, write the row back"""
+    contrat = repo.find_by_id(CONTRAT_ID)
+    contrat.record_payment(Money.from_cents(PAYMENT_CENTS))
+    repo.save(contrat)
+    return True
+
+
+def _conditional_update(repo: SQLAlchemyContratRepository) -> bool:
+    return repo.record_payment(CONTRAT_ID, PAYMENT_CENTS) is not None
+
+
+def _worker(database_url: str, mode: str, payments: int) -> tuple[int, int]:
+    """Records payments with its own connection, returns (applied, failed)"""
+    pay = _conditional_update if mode == "conditional" else _read_modify_write
+    engine = _engine(database_url)
+    applied = failed = 0
+    with sessionmaker(bind=engine)() as session:
+        repo = SQLAlchemyContratRepository(session)
+        for _ in range(payments):
+            try:
+                applied += pay(repo)
+            except (OperationalError, ConcurrentModificationError):
+                session.rollback()
+                failed += 1
+    engine.dispose()
+    return applied, failed
+
+
+def _run(database_url: str, mode: str, processes: int, payments: int) -> None:
+    engine = _engine(database_url)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    with sessionmaker(bind=engine)() as session:
+        seed(session, 1, users=1)
+        repo = SQLAlchemyContratRepository(session)
+        contrat = repo.find_by_id(CONTRAT_ID)
+        contrat.balance_due = Money.from_cents(processes * payments * PAYMENT_CENTS)
+        repo.save(contrat)
+        balance = contrat.balance_due.cents
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        results = list(executor.map(_worker, *zip(*[(database_url, mode, payments)] * processes)))
+    elapsed = time.perf_counter() - start
+
+    applied = sum(result[0] for result in results)
+    failed = sum(result[1] for result in results)
+    with sessionmaker(bind=engine)() as session:
+        final = SQLAlchemyContratRepository(session).find_by_id(CONTRAT_ID).balance_due.cents
+    # applied payments whose decrement was overwritten by another process
+    lost = (final - (balance - applied * PAYMENT_CENTS)) // PAYMENT_CENTS
+    print(f"{mode:<20} {applied / elapsed:>10.0f} paiements/s  appliqués {applied:>6}  "
+          f"échecs {failed:>5}  perdus {lost:>6}")
+    engine.dispose()
+
+
+def main(processes: int = 8, payments: int = 200):
+    database_url = os.environ.get("BENCH_DATABASE_URL")
+    with tempfile.TemporaryDirectory() as directory:
+        database_url = database_url or f"sqlite:///{os.path.join(directory, 'bench.db')}"
+        print(f"{processes} processus x {payments} paiements sur un contrat")
+        _run(database_url, "read-modify-write", processes, payments)
+        _run(database_url, "conditional", processes, payments)
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
@@ -0,0 +1,57 @@
+"""
+Benchmark - wall time of one `python main.py ...` command, in-process vs forwarded to `daemon start`
+Uses DATABASE_URL, otherwise a temporary SQLite file; runs with the current login state
+(logged out, commands stop at the login check after the engine and user lookup)
+python -m benchmarks.bench_daemon [runs] [command ...]
+"""
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from sqlalchemy import create_engine
+
+from src.infrastructures.database.models import Base
+
+
+def _time(argv: list, runs: int, env: dict) -> list:
+    durations = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(argv, env=env, capture_output=True)
+        durations.append((time.perf_counter() - start) * 1000)
+    return durations
+
+
+def _print(label: str, durations: list) -> None:
+    print(f"{label:<32} médiane {statistics.median(durations):>8.1f} ms  min {min(durations):>8.1f} ms")
+
+
+def main(runs: int = 20, command: list = None):
+    command = command or ["client", "list"]
+    with tempfile.TemporaryDirectory() as directory:
+        env = dict(os.environ, DAEMON_SOCKET=os.path.join(directory, "daemon.sock"))
+        if not env.get("DATABASE_URL"):
+            env["DATABASE_URL"] = f"sqlite:///{os.path.join(directory, 'bench.db')}"
+            Base.metadata.create_all(create_engine(env["DATABASE_URL"]))
+        env.setdefault("JWT_EXPIRATION_HOURS", "1")
+        env.setdefault("JWT_ALGORITHM", "HS256")
+        env.setdefault("JWT_SECRET_KEY", "bench")
+        cli = [sys.executable, "main.py", *command]
+        print(f"{runs} x main.py {' '.join(command)}")
+
+        _print("interpréteur seul (-c pass)", _time([sys.executable, "-c", "pass"], runs, env))
+        _print("sans démon", _time(cli, runs, dict(env, DAEMON_DISABLED="1")))
+
+        subprocess.run([sys.executable, "main.py", "daemon", "start"], env=env, check=True, capture_output=True)
+        try:
+            _time(cli, 1, env)
+            _print("avec démon", _time(cli, runs, env))
+        finally:
+            subprocess.run([sys.executable, "main.py", "daemon", "stop"], env=env, capture_output=True)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20, sys.argv[2:])
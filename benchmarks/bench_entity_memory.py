@@ -0,0 +1,73 @@
+"""
+Benchmark - bytes per entity, slotted dataclasses vs equivalent __dict__ dataclasses
+python -m benchmarks.bench_entity_memory [count]
+"""
+import sys
+import tracemalloc
+from dataclasses import fields, make_dataclass, field, MISSING
+from datetime import datetime
+from decimal import Decimal
+
+from src.domain.entities.entities import User, Client, Contrat, Event
+from src.domain.entities.enums import Role, ContractStatus
+from src.domain.entities.value_objects import Email, Telephone, Money
+
+
+def _unslotted(cls):
+    """Rebuild `cls` as a plain dataclass with a per-instance __dict__ (previous layout)"""
+    spec = []
+    for f in fields(cls):
+        if f.default_factory is not MISSING:
+            spec.append((f.name, f.type, field(default_factory=f.default_factory)))
+        elif f.default is not MISSING:
+            spec.append((f.name, f.type, field(default=f.default)))
+        else:
+            spec.append((f.name, f.type))
+    return make_dataclass(cls.__name__, spec, frozen=cls.__dataclass_params__.frozen)
+
+
+def _bytes_per_entity(build, count: int) -> float:
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    items = [build(i) for i in range(count)]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    total = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    del items
+    return total / count
+
+
+def _builders(user, client, contrat, event, email, telephone, money):
+    now = datetime(2026, 1, 1)
+    amount = Decimal("1000")
+    return {
+        "User": lambda i: user(
+            id=i, fullname="user", email=email("user@bench.fr"), password="x", role=Role.SUPPORT,
+            created_at=now, updated_at=now,
+        ),
+        "Client": lambda i: client(
+            id=i, fullname="client", email=email("client@bench.fr"), telephone=telephone("0645789845"),
+            company_name="company", commercial_contact_id=1, created_at=now, updated_at=now,
+        ),
+        "Contrat": lambda i: contrat(
+            id=i, client_id=i, commercial_contact_id=1, contrat_amount=money(amount), balance_due=money(amount),
+            status=ContractStatus.SIGNED, created_at=now, updated_at=now,
+        ),
+        "Event": lambda i: event(
+            id=i, name="event", contrat_id=i, client_id=i, support_contact_id=None, start_date=now,
+            end_date=now, location="Nantes", attendees=50, notes="", created_at=now, updated_at=now,
+        ),
+    }
+
+
+def main(count: int = 100_000):
+    old = _builders(*(_unslotted(cls) for cls in (User, Client, Contrat, Event, Email, Telephone, Money)))
+    new = _builders(User, Client, Contrat, Event, Email.trusted, Telephone.trusted, Money)
+
+    print(f"{'entité':<10} {'__dict__':>12} {'__slots__':>12}")
+    for name in new:
+        print(f"{name:<10} {_bytes_per_entity(old[name], count):>10.0f} o {_bytes_per_entity(new[name], count):>10.0f} o")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
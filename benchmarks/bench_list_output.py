@@ -0,0 +1,32 @@
+"""
+Benchmark - `event list` rendered as a rich table vs streamed as ndjson / csv with `--output`
+Output goes to /dev/null, measures rendering time and peak memory (tracemalloc slows the table down a lot)
+python -m benchmarks.bench_list_output [rows]
+"""
+import contextlib
+import os
+import sys
+
+from benchmarks.common import make_session, seed, measure
+from src.domain.entities.enums import Role
+from src.presentation.cli.cli_main import app
+
+
+def main(rows: int = 20_000):
+    session = make_session()
+    seed(session, rows)
+    print(f"{rows} lignes")
+    current_user = {"user_current_id": 1, "user_current_role": Role.ADMIN}
+
+    with open(os.devnull, "w") as devnull:
+        for output in ["table", "json", "ndjson", "csv"]:
+            session.expunge_all()
+            with measure(f"event list --output {output}"), contextlib.redirect_stdout(devnull):
+                app(
+                    args=["--output", output, "event", "list"], prog_name="main.py", standalone_mode=False,
+                    obj={"session": session, "current_user": current_user},
+                )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20_000)
@@ -0,0 +1,36 @@
+"""
+Benchmark - full ORM hydration (find_all) vs column projection (find_all_rows)
+python -m benchmarks.bench_list_projection [rows]
+"""
+import sys
+
+from benchmarks.common import make_session, seed, measure
+from src.infrastructures.repositories.SQLAchemy_repository import SQLAlchemyClientRepository, \
+    SQLAlchemyContratRepository, SQLAlchemyEventRepository
+
+
+def main(rows: int = 100_000):
+    session = make_session()
+    seed(session, rows)
+    print(f"{rows} lignes")
+
+    for name, repo in [
+        ("client", SQLAlchemyClientRepository(session)),
+        ("contrat", SQLAlchemyContratRepository(session)),
+        ("event", SQLAlchemyEventRepository(session)),
+    ]:
+        session.expunge_all()
+        with measure(f"{name} find_all"):
+            result = repo.find_all({})
+        assert len(result) == rows
+        del result
+
+        session.expunge_all()
+        with measure(f"{name} find_all_rows"):
+            result = repo.find_all_rows({})
+        assert len(result) == rows
+        del result
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,76 @@
+"""
+Benchmark - outbox throughput with 1, 2 and 4 worker processes draining the same outbox
+Checks each message is handled exactly once
+Uses BENCH_DATABASE_URL, otherwise a temporary SQLite file (shared by the worker processes)
+python -m benchmarks.bench_outbox_worker [messages] [batch size]
+"""
+import os
+import sys
+import tempfile
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+from src.infrastructures.database.models import Base
+from src.infrastructures.outbox.worker import OutboxWorker
+from src.infrastructures.repositories.SQLAchemy_repository import SQLAlchemyOutboxRepository
+
+TOPIC = "bench.noop"
+
+
+def _engine(database_url: str):
+    connect_args = {"timeout": 60} if database_url.startswith("sqlite") else {}
+    return create_engine(database_url, poolclass=NullPool, connect_args=connect_args)
+
+
+def _worker(database_url: str, batch_size: int) -> list[int]:
+    """Drains the outbox with its own connection, returns the handled message numbers"""
+    engine = _engine(database_url)
+    handled = []
+    with sessionmaker(bind=engine)() as session:
+        worker = OutboxWorker(
+            SQLAlchemyOutboxRepository(session), {TOPIC: lambda payload: handled.append(payload["n"])}, batch_size
+        )
+        worker.run(stop_when_empty=True)
+    engine.dispose()
+    return handled
+
+
+def _run(database_url: str, processes: int, messages: int, batch_size: int) -> None:
+    engine = _engine(database_url)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    with sessionmaker(bind=engine)() as session:
+        repository = SQLAlchemyOutboxRepository(session)
+        for n in range(messages):
+            repository.publish(TOPIC, {"n": n})
+        session.commit()
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        results = list(executor.map(_worker, *zip(*[(database_url, batch_size)] * processes)))
+    elapsed = time.perf_counter() - start
+
+    counts = Counter(n for handled in results for n in handled)
+    duplicated = sum(1 for count in counts.values() if count > 1)
+    missing = messages - len(counts)
+    print(f"{processes} worker(s) {messages / elapsed:>10.0f} messages/s  "
+          f"doublons {duplicated:>5}  manquants {missing:>5}")
+    engine.dispose()
+
+
+def main(messages: int = 20_000, batch_size: int = 100):
+    database_url = os.environ.get("BENCH_DATABASE_URL")
+    with tempfile.TemporaryDirectory() as directory:
+        database_url = database_url or f"sqlite:///{os.path.join(directory, 'bench.db')}"
+        print(f"{messages} messages, lots de {batch_size}")
+        for processes in (1, 2, 4):
+            _run(database_url, processes, messages, batch_size)
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
@@ -0,0 +1,61 @@
+"""
+Benchmark - Contrat.record_payment with integer-cents Money vs the previous Decimal Money
+python -m benchmarks.bench_record_payment [operations]
+"""
+import sys
+import time
+from dataclasses import dataclass
+from decimal import Decimal
+
+from src.domain.entities.entities import Contrat
+from src.domain.entities.enums import ContractStatus
+from src.domain.entities.value_objects import Money, sum_money, subtract_money
+
+
+@dataclass(frozen=True)
+class DecimalMoney:
+    """Previous Money implementation, kept here as the reference"""
+    amount: Decimal
+
+    def __post_init__(self):
+        object.__setattr__(self, "amount", Decimal(str(self.amount)))
+
+    def __sub__(self, other):
+        result = self.amount - other.amount
+        if result < 0:
+            raise ValueError("Le montant ne peut pas être négatif")
+        return DecimalMoney(result)
+
+    def __lt__(self, other):
+        return self.amount < other.amount
+
+
+def _run(label: str, money, operations: int) -> None:
+    contrat = Contrat(
+        id=1, client_id=1, commercial_contact_id=1,
+        contrat_amount=money(operations * 2), balance_due=money(operations * 2),
+        status=ContractStatus.SIGNED,
+    )
+    payment = money("1.99")
+    start = time.perf_counter()
+    for _ in range(operations):
+        contrat.record_payment(payment)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<30} {elapsed:>8.2f} s {operations / elapsed:>12,.0f} op/s")
+
+
+def main(operations: int = 1_000_000):
+    _run("record_payment Decimal", DecimalMoney, operations)
+    _run("record_payment cents", Money, operations)
+
+    balances = [Money(1000)] * operations
+    payments = [Money("1.99")] * operations
+    start = time.perf_counter()
+    subtract_money(balances, payments)
+    sum_money(payments)
+    elapsed = time.perf_counter() - start
+    print(f"{'subtract_money + sum_money':<30} {elapsed:>8.2f} s {operations / elapsed:>12,.0f} op/s")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
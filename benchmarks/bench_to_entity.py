@@ -0,0 +1,79 @@
+"""
+Benchmark - _to_entity throughput, validating constructors vs trusted hydration
+python -m benchmarks.bench_to_entity [rows]
+"""
+import sys
+import time
+from datetime import datetime
+from decimal import Decimal
+from types import SimpleNamespace
+
+from src.domain.entities.entities import Client, Contrat
+from src.domain.entities.enums import ContractStatus
+from src.domain.entities.value_objects import Email, Telephone, Money
+from src.infrastructures.repositories.SQLAchemy_repository import SQLAlchemyClientRepository, \
+    SQLAlchemyContratRepository
+
+
+def _client_validated(model) -> Client:
+    """Previous hydration path: every value object is validated again"""
+    return Client(
+        id=model.id,
+        fullname=model.fullname,
+        email=Email(model.email),
+        telephone=Telephone(model.telephone),
+        company_name=model.company_name,
+        commercial_contact_id=model.commercial_contact_id,
+        created_at=model.created_at,
+        updated_at=model.updated_at
+    )
+
+
+def _contrat_validated(model) -> Contrat:
+    """Previous hydration path: every value object is validated again"""
+    return Contrat(
+        id=model.id,
+        client_id=model.client_id,
+        commercial_contact_id=model.commercial_contact_id,
+        contrat_amount=Money(Decimal(model.contrat_amount_cents) / 100),
+        balance_due=Money(Decimal(model.balance_due_cents) / 100),
+        status=model.status,
+        created_at=model.created_at,
+        updated_at=model.updated_at
+    )
+
+
+def _run(label: str, convert, models) -> None:
+    start = time.perf_counter()
+    for model in models:
+        convert(model)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<30} {elapsed:>8.2f} s {len(models) / elapsed:>12,.0f} lignes/s")
+
+
+def main(rows: int = 1_000_000):
+    now = datetime.now()
+    clients = [
+        SimpleNamespace(
+            id=i, fullname=f"client {i}", email=f"client{i}@bench.fr", telephone="0645789845",
+            company_name="company", commercial_contact_id=1, created_at=now, updated_at=now,
+        )
+        for i in range(rows)
+    ]
+    _run("client validé", _client_validated, clients)
+    _run("client trusted", SQLAlchemyClientRepository._to_entity, clients)
+    del clients
+
+    contrats = [
+        SimpleNamespace(
+            id=i, client_id=i, commercial_contact_id=1, contrat_amount_cents=(1000 + i % 500) * 100,
+            balance_due_cents=(i % 500) * 100, status=ContractStatus.SIGNED, created_at=now, updated_at=now,
+        )
+        for i in range(rows)
+    ]
+    _run("contrat validé", _contrat_validated, contrats)
+    _run("contrat trusted", SQLAlchemyContratRepository._to_entity, contrats)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,79 @@
+"""
+Shared helpers for benchmarks
+Uses DATABASE_URL if BENCH_DATABASE_URL is not set, otherwise an in-memory SQLite database
+"""
+import os
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker, Session
+
+from src.domain.entities.enums import Role, ContractStatus
+from src.infrastructures.database.models import Base, UserModel, ClientModel, ContratModel, EventModel
+
+
+def make_session() -> Session:
+    """Create tables on the benchmark database and return a session"""
+    database_url = os.environ.get("BENCH_DATABASE_URL", "sqlite://")
+    engine = create_engine(database_url)
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine)()
+
+
+def seed(session: Session, rows: int, users: int = 10, batch: int = 10_000) -> None:
+    """Insert `users` commercials and `rows` clients, contrats and events"""
+    now = datetime.now()
+    session.execute(insert(UserModel), [
+        {
+            "id": i, "fullname": f"user {i}", "email": f"user{i}@bench.fr", "password": "x",
+            "role": Role.COMMERCIAL if i % 2 else Role.SUPPORT, "created_at": now, "updated_at": now,
+        }
+        for i in range(1, users + 1)
+    ])
+    for start in range(1, rows + 1, batch):
+        ids = range(start, min(start + batch, rows + 1))
+        session.execute(insert(ClientModel), [
+            {
+                "id": i, "fullname": f"client {i}", "email": f"client{i}@bench.fr",
+                "telephone": "0645789845", "company_name": f"company {i}",
+                "commercial_contact_id": i % users + 1, "created_at": now, "updated_at": now,
+            }
+            for i in ids
+        ])
+        session.execute(insert(ContratModel), [
+            {
+                "id": i, "client_id": i, "commercial_contact_id": i % users + 1,
+                "contrat_amount_cents": (1000 + i % 500) * 100, "balance_due_cents": (i % 500) * 100,
+                "status": ContractStatus.SIGNED if i % 3 else ContractStatus.UNSIGNED,
+                "created_at": now, "updated_at": now,
+            }
+            for i in ids
+        ])
+        session.execute(insert(EventModel), [
+            {
+                "id": i, "name": f"event {i}", "contrat_id": i, "client_id": i,
+                "support_contact_id": None if i % 4 == 0 else i % users + 1,
+                "start_date": now + timedelta(hours=i), "end_date": now + timedelta(hours=i + 4),
+                "location": "2 rue des test, Nantes", "attendees": 50, "notes": "x" * 200,
+                "created_at": now, "updated_at": now,
+            }
+            for i in ids
+        ])
+    session.commit()
+
+
+@contextmanager
+def measure(label: str):
+    """Print wall time and peak traced memory of the wrapped block"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"{label:<40} {elapsed * 1000:>10.1f} ms {peak / 1024 / 1024:>10.1f} MiB")
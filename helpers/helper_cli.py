@@ -1,12 +1,26 @@
-import sentry_sdk
+import click
+from rich import box
 from rich.console import Console
 from rich.panel import Panel
+from rich.table import Table
+
+from src.infrastructures.sentry.sentry import report_message
+from src.presentation.cli.output import OutputFormat
 
 console = Console()
+err_console = Console(stderr=True)
+_errors_displayed = 0
+
+
+def errors_displayed() -> int:
+    """ Number of errors displayed by the process, batch uses it to tell which commands failed """
+    return _errors_displayed
 
 
 def error_display(title, message):
     """ Display error message """
+    global _errors_displayed
+    _errors_displayed += 1
     content = f" {message} "
     panel = Panel(
         content,
@@ -15,5 +29,34 @@ def error_display(title, message):
         expand=False,
         padding=1,
     )
-    sentry_sdk.capture_message(message, level="info")
-    console.print(panel)
+    report_message(message, level="info")
+    _error_console().print(panel)
+
+
+def _error_console() -> Console:
+    """ stderr when stdout carries the json, ndjson or csv output of the command """
+    ctx = click.get_current_context(silent=True)
+    output = ctx.obj.get("output", OutputFormat.TABLE) if ctx is not None and isinstance(ctx.obj, dict) else None
+    return console if output in (None, OutputFormat.TABLE) else err_console
+
+
+def bulk_results_display(title, results):
+    """ Display per id results of a bulk command """
+    table = Table(
+        title=f"[bold magenta] {title}[/bold magenta]",
+        box=box.ROUNDED,
+        show_header=True,
+        header_style="bold cyan",
+        border_style="white"
+    )
+    table.add_column("ID", style="dim", width=6, justify="right")
+    table.add_column("Résultat", width=8)
+    table.add_column("Message")
+
+    for result in results:
+        status = "[green]OK[/green]" if result.success else "[red]Échec[/red]"
+        table.add_row(str(result.id), status, result.msg or "")
+
+    succeeded = sum(1 for result in results if result.success)
+    console.print(table)
+    console.print(f"\n[bold]{succeeded}/{len(results)} réussi(s)[/bold]")
@@ -1,3 +1,4 @@
+import csv
 from pathlib import Path
 
 from src.infrastructures.database.session import get_session
@@ -14,6 +15,48 @@ def normalize(value):
     return value if value not in ('', 0) else None
 
 
+def parse_ids(value: str) -> list[int]:
+    """
+    Parse a comma separated list of ids
+    :param value: "1,2,3"
+    :return: list of ids
+    """
+    try:
+        return [int(item) for item in value.split(",") if item.strip()]
+    except ValueError:
+        raise ValueError(f"Liste d'ID invalide: {value}")
+
+
+def read_ids(path: Path) -> list[int]:
+    """
+    Read ids from a file, one id per line
+    :param path: file path
+    :return: list of ids
+    """
+    with path.open() as file:
+        return parse_ids(",".join(line.strip() for line in file))
+
+
+def read_payments(path: Path) -> dict[int, str]:
+    """
+    Read payments from a csv file with a header contrat_id,amount
+    :param path: file path
+    :return: {contrat id: amount}
+    """
+    payments = {}
+    with path.open(newline="") as file:
+        for line, row in enumerate(csv.DictReader(file), start=2):
+            try:
+                contrat_id = int(row["contrat_id"])
+                amount = row["amount"].strip()
+            except (KeyError, TypeError, ValueError, AttributeError):
+                raise ValueError(f"Ligne {line} invalide, colonnes attendues: contrat_id,amount")
+            if contrat_id in payments:
+                raise ValueError(f"Ligne {line}: contrat #{contrat_id} en double")
+            payments[contrat_id] = amount
+    return payments
+
+
 def get_current_user():
     """
     Get current user via jwt token
@@ -1,16 +1,28 @@
-import dotenv
+import sys
 
-dotenv.load_dotenv()
+from src.presentation.daemon.client import forward
 
-from src.infrastructures.sentry.sentry import init_sentry
 
-from src.presentation.cli.cli_main import app
+def run():
+    """Run the command in this process"""
+    import dotenv
 
+    dotenv.load_dotenv()
+
+    from src.infrastructures.sentry.sentry import init_sentry
+    from src.presentation.cli.cli_main import app
 
-def main():
     init_sentry()
     app()
 
 
+def main():
+    # a running daemon (`daemon start`) executes the command without loading the CLI here
+    exit_code = forward(sys.argv[1:])
+    if exit_code is not None:
+        sys.exit(exit_code)
+    run()
+
+
 if __name__ == '__main__':
     main()
@@ -0,0 +1,28 @@
+from dotenv import load_dotenv
+from rich.console import Console
+
+from src.infrastructures.database.migrations import run_migrations
+from src.infrastructures.database.session import get_engine
+
+console = Console()
+
+
+def migrate():
+    """Apply pending schema migrations on an existing database"""
+    try:
+        applied = run_migrations(get_engine())
+    except Exception as e:
+        console.print(f"[red] Erreur lors de la migration: {str(e)}[/red]")
+        return False
+
+    if not applied:
+        console.print("[green]* Base de données déjà à jour[/green]")
+    for name in applied:
+        console.print(f"[green]* Migration {name} appliquée[/green]")
+    return True
+
+
+if __name__ == "__main__":
+    load_dotenv()
+    if not migrate():
+        raise SystemExit(1)
@@ -11,7 +11,7 @@ from src.domain.entities.value_objects import Email, Telephone, Money
 #                       Entité métier                                #
 ######################################################################
 
-@dataclass
+@dataclass(slots=True)
 class User:
     id: Optional[int]
     fullname: str
@@ -21,6 +21,8 @@ class User:
 
     created_at: datetime = field(default_factory=datetime.now)
     updated_at: datetime = field(default_factory=datetime.now)
+    # version of the stored row this entity was read from, None until saved
+    version: Optional[int] = None
 
     def is_commercial(self) -> bool:
         return self.role is Role.COMMERCIAL
@@ -41,7 +43,7 @@ class User:
             self.email = email
         self.updated_at = datetime.now()
 
-@dataclass
+@dataclass(slots=True)
 class Client:
     id: Optional[int]
     fullname: str
@@ -52,6 +54,7 @@ class Client:
 
     created_at: datetime = field(default_factory=datetime.now)
     updated_at: datetime = field(default_factory=datetime.now)
+    version: Optional[int] = None
 
     def update_info(self, fullname: Optional[str], email: Optional[Email],
                     telephone: Optional[Telephone], company_name: Optional[str]):
@@ -66,7 +69,7 @@ class Client:
         self.updated_at = datetime.now()
 
 
-@dataclass
+@dataclass(slots=True)
 class Contrat:
     id: Optional[int]
     client_id: int
@@ -77,6 +80,7 @@ class Contrat:
 
     created_at: datetime = field(default_factory=datetime.now)
     updated_at: datetime = field(default_factory=datetime.now)
+    version: Optional[int] = None
 
     def sign(self):
         """Sign the contrat"""
@@ -96,7 +100,7 @@ class Contrat:
         self.balance_due = self.balance_due - payment
 
     def is_fully_paid(self) -> bool:
-        return self.balance_due.amount == 0
+        return self.balance_due.cents == 0
 
     def update_info(self, amount: Optional[Money]) -> None:
         if amount is not None:
@@ -107,7 +111,7 @@ class Contrat:
     def __str__(self):
         return f"Contrat #{self.id} - {self.status} ({self.contrat_amount})"
 
-@dataclass
+@dataclass(slots=True)
 class Event:
     id: Optional[int]
     name: str
@@ -122,6 +126,7 @@ class Event:
 
     created_at: datetime = field(default_factory=datetime.now)
     updated_at: datetime = field(default_factory=datetime.now)
+    version: Optional[int] = None
 
 
     def assign_support(self, user: User):
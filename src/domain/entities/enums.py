@@ -15,3 +15,17 @@ class Role(Enum):
 class ContractStatus(Enum):
     SIGNED = "SIGNED"
     UNSIGNED = "UNSIGNED"
+
+
+class AuditedEntity(Enum):
+    CLIENT = "client"
+    CONTRAT = "contrat"
+    EVENT = "event"
+
+
+class JobStatus(Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
@@ -20,3 +20,11 @@ class InvalidPhoneError(Exception):
 
 class InvalidEmailError(Exception):
     pass
+
+
+class DuplicateRequestError(Exception):
+    pass
+
+
+class ConcurrentModificationError(Exception):
+    pass
@@ -0,0 +1,149 @@
+from datetime import date, datetime
+from typing import NamedTuple, Optional
+
+from src.domain.entities.enums import ContractStatus, AuditedEntity, JobStatus
+from src.domain.entities.value_objects import Money
+
+
+######################################################################
+#                       Modèle de lecture                            #
+######################################################################
+
+class ClientRow(NamedTuple):
+    """Lightweight client projection used by list views"""
+    id: int
+    fullname: str
+    email: str
+    telephone: str
+    company_name: str
+    commercial_contact_id: int
+
+
+class ContratRow(NamedTuple):
+    """Lightweight contrat projection used by list views"""
+    id: int
+    client_id: int
+    commercial_contact_id: int
+    contrat_amount: Money
+    balance_due: Money
+    status: ContractStatus
+
+
+class EventRow(NamedTuple):
+    """Lightweight event projection used by list views"""
+    id: int
+    name: str
+    contrat_id: int
+    client_id: int
+    support_contact_id: Optional[int]
+    start_date: datetime
+    end_date: datetime
+    location: str
+    attendees: int
+
+
+class CommercialReportRow(NamedTuple):
+    """Contrat totals aggregated per commercial contact"""
+    commercial_contact_id: int
+    fullname: Optional[str]
+    contrat_count: int
+    signed_count: int
+    total_amount: Money
+    balance_due: Money
+
+
+class ClientReportRow(NamedTuple):
+    """Contrat totals aggregated per client"""
+    client_id: int
+    fullname: Optional[str]
+    company_name: Optional[str]
+    contrat_count: int
+    total_amount: Money
+    balance_due: Money
+
+
+class StatusReportRow(NamedTuple):
+    """Contrat totals aggregated per signature status"""
+    status: ContractStatus
+    contrat_count: int
+    total_amount: Money
+    balance_due: Money
+
+
+class PaymentRow(NamedTuple):
+    """One payment of the payments ledger"""
+    id: int
+    contrat_id: int
+    amount: Money
+    paid_at: datetime
+
+
+class PaymentReceipt(NamedTuple):
+    """Outcome of a payment recorded with an idempotency key, returned again on retry"""
+    idempotency_key: str
+    contrat_id: int
+    amount: Money
+    balance_due: Money
+    paid_at: datetime
+
+
+class CashInRow(NamedTuple):
+    """Payments received during one month"""
+    month: date
+    payment_count: int
+    amount: Money
+
+
+class SupportSummaryRow(NamedTuple):
+    """Upcoming event count per support contact"""
+    support_contact_id: int
+    fullname: Optional[str]
+    upcoming_event_count: int
+
+
+class SummaryDiff(NamedTuple):
+    """Difference between a stored summary row and the value rebuilt from source tables"""
+    table: str
+    key: str
+    expected: tuple
+    actual: tuple
+
+
+class BulkResult(NamedTuple):
+    """Outcome of a bulk command for one id"""
+    id: int
+    success: bool
+    msg: Optional[str] = None
+
+
+class AuditEntry(NamedTuple):
+    """One change of a client, contrat or event: who made it and the [old, new] value of each changed field"""
+    entity: AuditedEntity
+    entity_id: int
+    action: str
+    actor_id: Optional[int]
+    changes: dict
+    created_at: datetime
+
+
+class OutboxMessage(NamedTuple):
+    """Side effect claimed by a worker, `attempts` includes the current one"""
+    id: int
+    topic: str
+    payload: dict
+    attempts: int
+
+
+class Job(NamedTuple):
+    """Long-running command run in the background, `total` is unknown until the job has counted its rows"""
+    id: int
+    kind: str
+    params: dict
+    status: JobStatus
+    progress: int
+    total: Optional[int]
+    result_path: Optional[str]
+    error: Optional[str]
+    created_by: int
+    created_at: datetime
+    finished_at: Optional[datetime]
@@ -1,56 +1,92 @@
 import re
 from dataclasses import dataclass
-from decimal import Decimal
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Iterable, List, Sequence
 
 from src.domain.entities.exceptions import InvalidPhoneError, InvalidEmailError, InvalidAmountError
 
+TELEPHONE_PATTERN = re.compile(r'^(?:\+33|0)[1-9](?:[\s\-]?\d{2}){4}$')
+EMAIL_PATTERN = re.compile(r'^[a-zA-Z0-9._%+-]+@([a-zA-Z-]+\.)+[a-zA-Z]{2,}$')
+
 
 ######################################################################
 #                       Objet métier                                 #
 ######################################################################
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True, init=False)
 class Money:
-    amount: Decimal
+    """Object representing an amount, stored as an integer number of cents"""
+    cents: int
 
-    def __post_init__(self):
+    def __init__(self, amount):
         try:
-            amount = Decimal(str(self.amount))
+            amount = Decimal(str(amount))
+            cents = int((amount * 100).to_integral_value(ROUND_HALF_UP))
         except Exception:
             raise InvalidAmountError("Montant invalide")
 
-        if amount < Decimal("0"):
+        if cents < 0:
             raise InvalidAmountError("Le montant ne peut pas être négatif")
 
-        object.__setattr__(self, "amount", amount)
+        object.__setattr__(self, "cents", cents)
+
+    @classmethod
+    def from_cents(cls, cents: int) -> "Money":
+        """Build Money from stored cents, without validation (repository hydration and arithmetic only)"""
+        money = object.__new__(cls)
+        object.__setattr__(money, "cents", cents)
+        return money
+
+    @property
+    def amount(self) -> Decimal:
+        return Decimal(self.cents).scaleb(-2)
 
     def __str__(self):
-        return f"{self.amount:.2f}"
+        return f"{self.cents // 100}.{self.cents % 100:02d}"
 
     def __add__(self, other):
         if not isinstance(other, Money):
             raise TypeError("Opération valide qu'entre Money")
-        return Money(self.amount + other.amount)
+        return Money.from_cents(self.cents + other.cents)
 
     def __sub__(self, other):
         if not isinstance(other, Money):
             raise TypeError("Opération valide qu'entre Money")
-        result = self.amount - other.amount
+        result = self.cents - other.cents
         if result < 0:
             raise InvalidAmountError("Le montant ne peut pas être négatif")
-        return Money(result)
+        return Money.from_cents(result)
 
     def __lt__(self, other):
         if not isinstance(other, Money):
             raise TypeError("Comparaison impossible")
-        return self.amount < other.amount
+        return self.cents < other.cents
 
     def __le__(self, other):
         if not isinstance(other, Money):
             raise TypeError("Comparaison impossible")
-        return self.amount <= other.amount
+        return self.cents <= other.cents
+
+
+def sum_money(amounts: Iterable[Money]) -> Money:
+    """Sum many amounts in a single pass over their cents"""
+    return Money.from_cents(sum(money.cents for money in amounts))
 
-@dataclass(frozen=True)
+
+def subtract_money(balances: Sequence[Money], payments: Sequence[Money]) -> List[Money]:
+    """
+    Subtract payments from balances pairwise, for bulk payment processing
+    :raise InvalidAmountError: if any payment is larger than its balance
+    """
+    if len(balances) != len(payments):
+        raise ValueError("balances et payments doivent avoir la même taille")
+    results = [balance.cents - payment.cents for balance, payment in zip(balances, payments)]
+    if results and min(results) < 0:
+        raise InvalidAmountError("Le montant ne peut pas être négatif")
+    return [Money.from_cents(cents) for cents in results]
+
+
+@dataclass(frozen=True, slots=True)
 class Telephone:
     """Object representing a telephone number"""
     number: str
@@ -59,6 +95,13 @@ class Telephone:
         if not self.is_valid(self.number):
             raise InvalidPhoneError(f"Télephone invalide: {self.number}")
 
+    @classmethod
+    def trusted(cls, number: str) -> "Telephone":
+        """Build Telephone from a stored number, without validation (repository hydration only)"""
+        telephone = object.__new__(cls)
+        object.__setattr__(telephone, "number", number)
+        return telephone
+
     def __str__(self) -> str:
         return self.number
 
@@ -67,12 +110,10 @@ class Telephone:
         """Validate telephone format"""
         if not telephone:
             return False
-        pattern = r'^(?:\+33|0)[1-9](?:[\s\-]?\d{2}){4}$'
-
-        return bool(re.match(pattern, telephone))
+        return bool(TELEPHONE_PATTERN.match(telephone))
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Email:
     """Object representing an email address"""
     address: str
@@ -81,6 +122,13 @@ class Email:
         if not self._is_valid(self.address):
             raise InvalidEmailError(f"E-mail invalide: {self.address}")
 
+    @classmethod
+    def trusted(cls, address: str) -> "Email":
+        """Build Email from a stored address, without validation (repository hydration only)"""
+        email = object.__new__(cls)
+        object.__setattr__(email, "address", address)
+        return email
+
     def __str__(self) -> str:
         return self.address
 
@@ -89,5 +137,4 @@ class Email:
         """Validate email format"""
         if not email:
             return False
-        pattern = r'^[a-zA-Z0-9._%+-]+@([a-zA-Z-]+\.)+[a-zA-Z]{2,}$'
-        return bool(re.match(pattern, email))
\ No newline at end of file
+        return bool(EMAIL_PATTERN.match(email))
\ No newline at end of file
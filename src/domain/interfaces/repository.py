@@ -1,6 +1,10 @@
-from typing import Protocol, List, Optional
+from datetime import date, datetime
+from typing import Protocol, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
 
 from src.domain.entities.entities import Client, User, Contrat, Event
+from src.domain.entities.enums import AuditedEntity
+from src.domain.entities.read_models import ClientRow, ContratRow, EventRow, CommercialReportRow, ClientReportRow, \
+    StatusReportRow, SupportSummaryRow, SummaryDiff, PaymentRow, CashInRow, PaymentReceipt, AuditEntry, OutboxMessage, Job
 
 
 class ClientRepository(Protocol):
@@ -9,9 +13,13 @@ class ClientRepository(Protocol):
     - save : Save a client
     - find_by_id : Find a client by id
     - find_all : Find all clients
+    - find_all_rows : Find all clients as lightweight rows
+    - iter_all_rows : Iterate over the rows of find_all_rows as they are fetched
+    - search : Fuzzy search of clients, best matches first
     - delete : Delete a client
+    Writes call `before_commit` with their result in their transaction, just before committing
     """
-    def save(self, client: Client) -> Client: ...
+    def save(self, client: Client, before_commit: Optional[Callable[[Client], None]] = None) -> Client: ...
 
     def exist(self, client_id) -> bool: ...
 
@@ -19,7 +27,13 @@ class ClientRepository(Protocol):
 
     def find_all(self, criteres: dict) -> List[Client]: ...
 
-    def delete(self, client_id: int) -> None: ...
+    def find_all_rows(self, criteres: dict) -> List[ClientRow]: ...
+
+    def iter_all_rows(self, criteres: dict) -> Iterator[ClientRow]: ...
+
+    def search(self, query: str, limit: int, offset: int) -> List[ClientRow]: ...
+
+    def delete(self, client_id: int, before_commit: Optional[Callable[[], None]] = None) -> None: ...
 
 
 class UserRepository(Protocol):
@@ -51,12 +65,22 @@ class ContratRepository(Protocol):
     - save : Save a contrat
     - find_by_id : Find a contrat
     - find_all : Find all contrats
+    - find_all_rows : Find all contrats as lightweight rows
+    - iter_all_rows : Iterate over the rows of find_all_rows as they are fetched
     - find_by_commercial_contact : Find a contrat for commercial contact
     - find_by_client_id : Find a contrat for client id
     - find_unsigned : Find a contrat for unsigned
+    - sign_many : Sign many contrats at once
+    - find_payment_receipt : Find the outcome of a payment recorded with an idempotency key
+    - record_payment : Record a payment on a signed contrat atomically, None if the balance due is too low
+    - record_payments : Record payments on many signed contrats at once
     - delete : Delete a contrat
+    - report_by_commercial : Aggregate contrat totals per commercial contact
+    - report_by_client : Aggregate contrat totals per client
+    - report_by_status : Aggregate contrat totals per status
+    Writes call `before_commit` with their result in their transaction, just before committing
     """
-    def save(self, contrat) -> Contrat: ...
+    def save(self, contrat, before_commit: Optional[Callable[[Contrat], None]] = None) -> Contrat: ...
 
     def exist(self, contrat_id: int) -> bool: ...
 
@@ -64,7 +88,46 @@ class ContratRepository(Protocol):
 
     def find_all(self, criteres) -> List[Contrat]: ...
 
-    def delete(self, contrat_id: int) -> None: ...
+    def find_all_rows(self, criteres) -> List[ContratRow]: ...
+
+    def iter_all_rows(self, criteres) -> Iterator[ContratRow]: ...
+
+    def sign_many(self, contrat_ids: List[int],
+                  before_commit: Optional[Callable[[List[int]], None]] = None) -> List[int]: ...
+
+    def find_payment_receipt(self, idempotency_key: str) -> Optional[PaymentReceipt]: ...
+
+    def record_payment(self, contrat_id: int, payment_cents: int, idempotency_key: Optional[str] = None,
+                       before_commit: Optional[Callable[[Contrat], None]] = None) -> Optional[Contrat]: ...
+
+    def record_payments(self, payments: dict[int, int],
+                        before_commit: Optional[Callable[[List[int]], None]] = None) -> List[int]: ...
+
+    def delete(self, contrat_id: int, before_commit: Optional[Callable[[], None]] = None) -> None: ...
+
+    def report_by_commercial(self) -> List[CommercialReportRow]: ...
+
+    def report_by_client(self) -> List[ClientReportRow]: ...
+
+    def report_by_status(self) -> List[StatusReportRow]: ...
+
+
+class PaymentRepository(Protocol):
+    """
+    Payment ledger interface, payments are appended by ContratRepository.record_payment(s)
+    - find_by_contrat : Find the payments of a contrat
+    - cash_in_by_month : Aggregate payments received per month
+    - check_balances : Compare stored balances due with the ledger
+    - rebuild_balances : Recompute balances due from the ledger
+    """
+    def find_by_contrat(self, contrat_id: int) -> List[PaymentRow]: ...
+
+    def cash_in_by_month(self, date_from: datetime, date_to: datetime,
+                         contrat_id: Optional[int] = None) -> List[CashInRow]: ...
+
+    def check_balances(self) -> List[SummaryDiff]: ...
+
+    def rebuild_balances(self, workers: int = 4) -> List[SummaryDiff]: ...
 
 
 class EventRepository(Protocol):
@@ -73,12 +136,16 @@ class EventRepository(Protocol):
     - save : Save an event
     - find_by_id : Find an event
     - find_all : Find all events
+    - find_all_rows : Find all events as lightweight rows
+    - iter_all_rows : Iterate over the rows of find_all_rows as they are fetched
     - find_by_contrat : Find an event for contrat
     - find_by_support_contact : Find an event for support contact
     - find_by_client: Find an event for client
+    - assign_supports : Assign support contacts to many events at once
     - delete : Delete an event
+    Writes call `before_commit` with their result in their transaction, just before committing
     """
-    def save(self, event) -> Event: ...
+    def save(self, event, before_commit: Optional[Callable[[Event], None]] = None) -> Event: ...
 
     def exist(self, event_id) -> bool: ...
 
@@ -86,4 +153,108 @@ class EventRepository(Protocol):
 
     def find_all(self, criteres) -> List[Event]: ...
 
-    def delete(self, event_id: int) -> None: ...
+    def find_all_rows(self, criteres) -> List[EventRow]: ...
+
+    def iter_all_rows(self, criteres) -> Iterator[EventRow]: ...
+
+    def assign_supports(self, assignments: dict[int, int],
+                        before_commit: Optional[Callable[[dict[int, int]], None]] = None) -> dict[int, int]: ...
+
+    def delete(self, event_id: int, before_commit: Optional[Callable[[], None]] = None) -> None: ...
+
+
+class DashboardRepository(Protocol):
+    """
+    Dashboard interface
+    - commercial_summaries : Read stored contrat totals per commercial
+    - support_summaries : Read stored upcoming event count per support
+    - check : Compare stored summaries with the source tables
+    - rebuild : Recompute stored summaries from the source tables
+    """
+    def commercial_summaries(self) -> List[CommercialReportRow]: ...
+
+    def support_summaries(self, from_day: date) -> List[SupportSummaryRow]: ...
+
+    def check(self) -> List[SummaryDiff]: ...
+
+    def rebuild(self) -> None: ...
+
+
+class AuditRepository(Protocol):
+    """
+    Audit log interface, append only
+    - record : Buffer entries, written with the next commit of the session: call it from `before_commit`
+    - flush : Write the buffered entries now
+    - find_by_entity : Find the entries of a client, contrat or event, latest first
+    - last_id : Id of the latest entry
+    - find_changed : Find the ids of the entities changed after an entry
+    """
+    def record(self, entries: List[AuditEntry]) -> None: ...
+
+    def flush(self) -> int: ...
+
+    def find_by_entity(self, entity: AuditedEntity, entity_id: int, limit: int = 50) -> List[AuditEntry]: ...
+
+    def last_id(self) -> int: ...
+
+    def find_changed(self, after_id: int) -> Tuple[int, Dict[AuditedEntity, Set[int]]]: ...
+
+
+class LabelRepository(Protocol):
+    """
+    Label interface, short descriptions shown next to the ids of clients, contrats, events and users
+    - find_labels : Find the labels of an entity, all of them or of some ids
+    - users_version : Number of users and latest update, changes when a user is created, updated or deleted
+    """
+    def find_labels(self, entity: str, ids: Optional[Iterable[int]] = None) -> Dict[int, str]: ...
+
+    def users_version(self) -> Tuple[int, Optional[datetime]]: ...
+
+
+class OutboxRepository(Protocol):
+    """
+    Outbox interface, side effects run by workers
+    - publish : Buffer a message, written with the next commit of the session
+    - claim : Lease available messages to the calling worker, skipping the ones leased by other workers
+    - complete : Mark messages as processed
+    - retry : Release failed messages until their next attempt
+    """
+    def publish(self, topic: str, payload: dict, available_at: Optional[datetime] = None) -> None: ...
+
+    def claim(self, limit: int) -> List[OutboxMessage]: ...
+
+    def complete(self, message_ids: List[int]) -> None: ...
+
+    def retry(self, failures: dict[int, tuple[datetime, str]]) -> None: ...
+
+
+class JobRepository(Protocol):
+    """
+    Background job interface
+    - create : Save a pending job
+    - find_by_id : Find a job by id
+    - find_all : Find the latest jobs, of one user or of everyone
+    - find_pending : Ids of the jobs waiting for a worker, oldest first
+    - start : Mark a pending job as running, False if another worker started it or it was cancelled
+    - report_progress : Save the progress of a running job, False if it was cancelled
+    - finish : Mark a job as done with the path of its result
+    - fail : Mark a job as failed with its error
+    - cancel : Cancel a pending or running job, False if it is already over
+    """
+    def create(self, kind: str, params: dict, created_by: int) -> Job: ...
+
+    def find_by_id(self, job_id: int) -> Optional[Job]: ...
+
+    def find_all(self, created_by: Optional[int] = None, limit: int = 20) -> List[Job]: ...
+
+    def find_pending(self) -> List[int]: ...
+
+    def start(self, job_id: int) -> bool: ...
+
+    def report_progress(self, job_id: int, progress: int, total: int) -> bool: ...
+
+    def finish(self, job_id: int, result_path: str) -> None: ...
+
+    def fail(self, job_id: int, error: str) -> None: ...
+
+    def cancel(self, job_id: int) -> bool: ...
@@ -1,6 +1,7 @@
 import json
 import os
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import Any
 
 
@@ -24,16 +25,8 @@ class UserPolicy:
         self.request = request
 
     def get_permission(self) -> dict:
-        """ Get json file permission """
-        dir_path = os.path.dirname(__file__)
-        path = os.path.join(dir_path, 'permission.json')
-
-        try:
-            with open(path) as json_file:
-                permission = json.load(json_file)
-                return permission
-        except FileNotFoundError:
-            raise FileNotFoundError('Fichier de permission non trouvé')
+        """ Get json file permission, read once per process """
+        return _load_permission(os.path.join(os.path.dirname(__file__), 'permission.json'))
 
     def is_allowed(self) -> bool:
         """
@@ -68,3 +61,13 @@ class UserPolicy:
             if expected != condition:
                 return False
         return True
+
+
+@lru_cache(maxsize=None)
+def _load_permission(path: str) -> dict:
+    """Permission rules by role, ressource and action, shared by every policy: never modify the returned dict"""
+    try:
+        with open(path) as json_file:
+            return json.load(json_file)
+    except FileNotFoundError:
+        raise FileNotFoundError('Fichier de permission non trouvé')
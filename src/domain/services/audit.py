@@ -0,0 +1,84 @@
+from dataclasses import fields
+from datetime import date, datetime
+from enum import Enum
+from typing import Any, Callable, Dict, List, Optional
+
+from src.domain.entities.enums import AuditedEntity
+from src.domain.entities.read_models import AuditEntry
+from src.domain.entities.value_objects import Money, Email, Telephone
+from src.domain.interfaces.repository import AuditRepository
+from src.domain.policies.user_policy import RequestPolicy
+
+# bookkeeping fields, changed by every write
+NOT_AUDITED = {"id", "created_at", "updated_at", "version"}
+
+
+def _plain(value: Any) -> Any:
+    """JSON compatible value"""
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (Money, Email, Telephone)):
+        return str(value)
+    return value
+
+
+def audit_fields(entity) -> Dict[str, Any]:
+    """
+    Snapshot of the audited fields of an entity, to take before it is modified
+    :param entity: Client, Contrat or Event
+    :return: JSON compatible value by field name
+    """
+    return {f.name: _plain(getattr(entity, f.name)) for f in fields(entity) if f.name not in NOT_AUDITED}
+
+
+def field_changes(before: Optional[Dict[str, Any]], after: Optional[Dict[str, Any]]) -> Dict[str, list]:
+    """
+    Fields whose value differs between two snapshots
+    :param before: snapshot before the change, None for a creation
+    :param after: snapshot after the change, None for a deletion
+    :return: [old, new] by field name
+    """
+    before, after = before or {}, after or {}
+    return {
+        name: [before.get(name), after.get(name)]
+        for name in {**before, **after}
+        if before.get(name) != after.get(name)
+    }
+
+
+def audit_entry(authorization: RequestPolicy, entity: AuditedEntity, entity_id: int, action: str,
+                before: Optional[Dict[str, Any]] = None, after: Optional[Dict[str, Any]] = None) -> AuditEntry:
+    """
+    Change record of a write made by a use case, the actor is the current user of the request
+    :param authorization: policy of the request, holds the current user
+    :param entity: type of the changed entity
+    :param entity_id: id of the changed entity
+    :param action: command that made the change
+    :param before: snapshot before the change
+    :param after: snapshot after the change
+    :return: AuditEntry
+    """
+    return AuditEntry(
+        entity=entity,
+        entity_id=entity_id,
+        action=action,
+        actor_id=authorization.user.get("user_current_id"),
+        changes=field_changes(before, after),
+        created_at=datetime.now(),
+    )
+
+
+def record_with(audit_repository: Optional[AuditRepository],
+                build: Callable[..., List[AuditEntry]]) -> Optional[Callable[..., None]]:
+    """
+    `before_commit` hook of a repository write: records the entries built from the result of the write,
+    committed in the same transaction as the write
+    :param audit_repository: audit log of the use case, no hook without one
+    :param build: entries from the result of the write (no argument for a delete)
+    :return: hook to pass as `before_commit`, None without audit repository
+    """
+    if audit_repository is None:
+        return None
+    return lambda *result: audit_repository.record(build(*result))
@@ -0,0 +1,73 @@
+import heapq
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from typing import Dict, Iterable, List, Tuple
+
+
+class SupportSchedule:
+    """
+    Busy periods of one support user, kept sorted and disjoint
+    - is_free : True if a period does not overlap any busy period
+    - add : Add a busy period, merged with the periods it overlaps
+    """
+    __slots__ = ("starts", "ends")
+
+    def __init__(self):
+        self.starts: List[datetime] = []
+        self.ends: List[datetime] = []
+
+    def is_free(self, start: datetime, end: datetime) -> bool:
+        # periods are disjoint, so the last one starting before `end` has the latest end of them
+        i = bisect_left(self.starts, end)
+        return i == 0 or self.ends[i - 1] <= start
+
+    def add(self, start: datetime, end: datetime) -> None:
+        first = bisect_left(self.ends, start)
+        last = bisect_right(self.starts, end)
+        if first < last:
+            start = min(start, self.starts[first])
+            end = max(end, self.ends[last - 1])
+        self.starts[first:last] = [start]
+        self.ends[first:last] = [end]
+
+
+def plan_assignments(
+        events: Iterable[Tuple[int, datetime, datetime]],
+        support_ids: Iterable[int],
+        busy: Iterable[Tuple[int, datetime, datetime]],
+) -> Tuple[Dict[int, int], List[int]]:
+    """
+    Assign each event to the least loaded support user who is free during the event
+    :param events: (event id, start, end) of events to assign
+    :param support_ids: support users available
+    :param busy: (support id, start, end) of events already assigned
+    :return: {event id: support id}, ids of events no support user is free for
+    """
+    schedules = {support_id: SupportSchedule() for support_id in support_ids}
+    loads = dict.fromkeys(schedules, 0)
+    for support_id, start, end in busy:
+        if support_id in schedules:
+            schedules[support_id].add(start, end)
+            loads[support_id] += 1
+
+    heap = [(load, support_id) for support_id, load in loads.items()]
+    heapq.heapify(heap)
+
+    assignments, unassigned = {}, []
+    for event_id, start, end in sorted(events, key=lambda event: (event[1], event[0])):
+        busy_supports = []
+        while heap:
+            load, support_id = heapq.heappop(heap)
+            if schedules[support_id].is_free(start, end):
+                schedules[support_id].add(start, end)
+                assignments[event_id] = support_id
+                heapq.heappush(heap, (load + 1, support_id))
+                break
+            busy_supports.append((load, support_id))
+        else:
+            unassigned.append(event_id)
+
+        for entry in busy_supports:
+            heapq.heappush(heap, entry)
+
+    return assignments, unassigned
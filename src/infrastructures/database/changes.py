@@ -0,0 +1,142 @@
+"""
+Changes committed by any process, for the in-process caches of the long-running processes (shell, API, daemon)
+- PostgreSQL: the repositories NOTIFY crm_changes in their transaction, a thread LISTENs on its own connection
+- other dialects (SQLite): no NOTIFY, a thread polls the audit log and the users version
+"""
+import select
+import threading
+from typing import Callable, Dict, Iterable, Optional, Set
+
+from sqlalchemy import Engine
+from sqlalchemy.orm import Session
+
+from src.infrastructures.repositories.SQLAchemy_repository import CHANGES_CHANNEL, SQLAlchemyAuditRepository, \
+    SQLAlchemyLabelRepository
+
+# entity -> ids changed, None when any of its ids may have changed
+Changes = Dict[str, Optional[Set[int]]]
+
+LISTEN = "listen"
+POLL = "poll"
+NOTIFIED_ENTITIES = ("client", "contrat", "event", "user")
+# seconds between two polls, and longest wait of the LISTEN thread before checking it is stopped
+POLL_SECONDS = 2.0
+# seconds before reconnecting after a lost connection
+RETRY_SECONDS = 5.0
+START_TIMEOUT_SECONDS = 10.0
+
+
+def parse_payloads(payloads: Iterable[str]) -> Changes:
+    """"client:12", "contrat:*"... -> changes, anything but an id means any id of the entity"""
+    changes: Changes = {}
+    for payload in payloads:
+        entity, _, entity_id = payload.partition(":")
+        merge_changes(changes, {entity: {int(entity_id)} if entity_id.isdigit() else None})
+    return changes
+
+
+def merge_changes(changes: Changes, other: Changes) -> Changes:
+    """Adds `other` to `changes`, None (any id) absorbs the ids"""
+    for entity, ids in other.items():
+        if ids is None or (entity in changes and changes[entity] is None):
+            changes[entity] = None
+        else:
+            changes.setdefault(entity, set()).update(ids)
+    return changes
+
+
+class ChangeListener:
+    """
+    Background thread calling `on_changes` with the changes committed since its previous call,
+    `on_changes` runs in this thread: it must not use the sessions of the other threads
+    After a lost connection, notifications may have been missed: every entity is reported as changed
+    """
+
+    def __init__(self, engine: Engine, on_changes: Callable[[Changes], None], poll_seconds: float = POLL_SECONDS):
+        self.engine = engine
+        self.on_changes = on_changes
+        self.poll_seconds = poll_seconds
+        self.mode = LISTEN if engine.dialect.name == "postgresql" else POLL
+        self._stopped = threading.Event()
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="change-listener", daemon=True)
+
+    def start(self) -> "ChangeListener":
+        """Returns once listening (or the first poll position is read): no later commit is missed"""
+        self._thread.start()
+        self._ready.wait(START_TIMEOUT_SECONDS)
+        return self
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._thread.join()
+
+    def __enter__(self) -> "ChangeListener":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def _run(self) -> None:
+        missed = False
+        while not self._stopped.is_set():
+            try:
+                if self.mode == LISTEN:
+                    self._listen(missed)
+                else:
+                    self._poll(missed)
+            except Exception:
+                missed = True
+                # start() must not wait for the database to come back
+                self._ready.set()
+                self._stopped.wait(RETRY_SECONDS)
+
+    def _started(self, missed: bool) -> None:
+        self._ready.set()
+        if missed:
+            self.on_changes({entity: None for entity in NOTIFIED_ENTITIES})
+
+    def _listen(self, missed: bool) -> None:
+        # detached: a connection in LISTEN and autocommit mode must never go back to the pool
+        connection = self.engine.raw_connection()
+        connection.detach()
+        try:
+            dbapi_connection = connection.dbapi_connection
+            dbapi_connection.autocommit = True
+            with dbapi_connection.cursor() as cursor:
+                cursor.execute(f"LISTEN {CHANGES_CHANNEL}")
+            self._started(missed)
+
+            while not self._stopped.is_set():
+                if not select.select([dbapi_connection], [], [], self.poll_seconds)[0]:
+                    continue
+                dbapi_connection.poll()
+                payloads = [notify.payload for notify in dbapi_connection.notifies]
+                dbapi_connection.notifies.clear()
+                if payloads:
+                    self.on_changes(parse_payloads(payloads))
+        finally:
+            connection.close()
+
+    def _poll(self, missed: bool) -> None:
+        session = Session(bind=self.engine)
+        audit, labels = SQLAlchemyAuditRepository(session), SQLAlchemyLabelRepository(session)
+        try:
+            after_id, users_version = audit.last_id(), labels.users_version()
+            session.close()
+            self._started(missed)
+
+            while not self._stopped.wait(self.poll_seconds):
+                after_id, changed = audit.find_changed(after_id)
+                changes: Changes = {entity.value: ids for entity, ids in changed.items()}
+                # users are not in the audit log
+                version = labels.users_version()
+                if version != users_version:
+                    users_version = version
+                    changes["user"] = None
+                # no read transaction left open between two polls
+                session.close()
+                if changes:
+                    self.on_changes(changes)
+        finally:
+            session.close()
@@ -0,0 +1,212 @@
+from typing import Callable, List, Tuple
+
+from sqlalchemy import Engine, inspect, text
+from sqlalchemy.orm import Session
+
+from src.infrastructures.database.models import CommercialSummaryModel, SupportEventSummaryModel, EventModel, \
+    PaymentModel, PaymentRequestModel, AuditModel, OutboxModel, JobModel, CLIENT_SEARCH_TEXT, EVENT_PERIOD_INDEX, \
+    EVENT_SUPPORT_OVERLAP_CONSTRAINT
+from src.infrastructures.repositories.SQLAchemy_repository import SQLAlchemyDashboardRepository
+
+
+def _columns(engine: Engine, table: str) -> set:
+    """Names of the columns of a table"""
+    return {column["name"] for column in inspect(engine).get_columns(table)}
+
+
+def migrate_money_to_cents(engine: Engine) -> bool:
+    """
+    Convert legacy contrat amounts (whole euros, INTEGER) to BIGINT cents columns
+    :return: True if the migration was applied, False if already up to date
+    """
+    if "contrat_amount" not in _columns(engine, "contrats"):
+        return False
+
+    with engine.begin() as conn:
+        conn.execute(text("ALTER TABLE contrats ADD COLUMN contrat_amount_cents BIGINT"))
+        conn.execute(text("ALTER TABLE contrats ADD COLUMN balance_due_cents BIGINT"))
+        conn.execute(text(
+            "UPDATE contrats SET contrat_amount_cents = contrat_amount * 100, "
+            "balance_due_cents = balance_due * 100"
+        ))
+        if engine.dialect.name == "postgresql":
+            conn.execute(text("ALTER TABLE contrats ALTER COLUMN contrat_amount_cents SET NOT NULL"))
+            conn.execute(text("ALTER TABLE contrats ALTER COLUMN balance_due_cents SET NOT NULL"))
+        conn.execute(text("ALTER TABLE contrats DROP COLUMN contrat_amount"))
+        conn.execute(text("ALTER TABLE contrats DROP COLUMN balance_due"))
+    return True
+
+
+def create_dashboard_summaries(engine: Engine) -> bool:
+    """
+    Create dashboard summary tables and fill them from existing contrats and events
+    :return: True if the migration was applied, False if already up to date
+    """
+    if inspect(engine).has_table(CommercialSummaryModel.__tablename__):
+        return False
+
+    CommercialSummaryModel.__table__.create(engine)
+    SupportEventSummaryModel.__table__.create(engine, checkfirst=True)
+    with Session(engine) as session:
+        SQLAlchemyDashboardRepository(session).rebuild()
+    return True
+
+
+def create_client_search_index(engine: Engine) -> bool:
+    """
+    Create the pg_trgm GIN index used by client search (PostgreSQL only)
+    :return: True if the migration was applied, False if already up to date
+    """
+    if engine.dialect.name != "postgresql":
+        return False
+    if "ix_clients_search_trgm" in {index["name"] for index in inspect(engine).get_indexes("clients")}:
+        return False
+
+    with engine.begin() as conn:
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        conn.execute(text(
+            f"CREATE INDEX ix_clients_search_trgm ON clients USING gin ({CLIENT_SEARCH_TEXT} gin_trgm_ops)"
+        ))
+    return True
+
+
+def create_event_period_indexes(engine: Engine) -> bool:
+    """
+    Create the event period indexes: B-tree on start/end dates, plus a tsrange GiST index on PostgreSQL
+    :return: True if the migration was applied, False if already up to date
+    """
+    existing = {index["name"] for index in inspect(engine).get_indexes("events")}
+    if "ix_events_start_date_id" in existing:
+        return False
+
+    for index in EventModel.__table__.indexes:
+        if index.name in ("ix_events_start_date_id", "ix_events_end_date"):
+            index.create(engine, checkfirst=True)
+    if engine.dialect.name == "postgresql":
+        with engine.begin() as conn:
+            conn.execute(text(EVENT_PERIOD_INDEX))
+    return True
+
+
+def create_support_overlap_constraint(engine: Engine) -> bool:
+    """
+    Prevent overlapping events for a support contact:
+    exclusion constraint on PostgreSQL, index used by the repository check elsewhere
+    Fails if overlapping assignments already exist, they must be fixed first
+    :return: True if the migration was applied, False if already up to date
+    """
+    existing = {index["name"] for index in inspect(engine).get_indexes("events")}
+    if "ix_events_support_start" in existing:
+        return False
+
+    with engine.begin() as conn:
+        conn.execute(text("CREATE INDEX ix_events_support_start ON events (support_contact_id, start_date)"))
+        if engine.dialect.name == "postgresql":
+            conn.execute(text("CREATE EXTENSION IF NOT EXISTS btree_gist"))
+            conn.execute(text(EVENT_SUPPORT_OVERLAP_CONSTRAINT))
+    return True
+
+
+def create_payments_ledger(engine: Engine) -> bool:
+    """
+    Create the payments ledger, with one opening payment per contrat for the amount already paid
+    so that balances due can be rebuilt from the ledger
+    :return: True if the migration was applied, False if already up to date
+    """
+    if inspect(engine).has_table(PaymentModel.__tablename__):
+        return False
+
+    PaymentModel.__table__.create(engine)
+    with engine.begin() as conn:
+        conn.execute(text(
+            "INSERT INTO payments (contrat_id, amount_cents, paid_at) "
+            "SELECT id, contrat_amount_cents - balance_due_cents, updated_at FROM contrats "
+            "WHERE contrat_amount_cents > balance_due_cents"
+        ))
+    return True
+
+
+def create_payment_requests(engine: Engine) -> bool:
+    """
+    Create the payment idempotency keys table
+    :return: True if the migration was applied, False if already up to date
+    """
+    if inspect(engine).has_table(PaymentRequestModel.__tablename__):
+        return False
+
+    PaymentRequestModel.__table__.create(engine)
+    return True
+
+
+def add_version_columns(engine: Engine) -> bool:
+    """
+    Add the optimistic concurrency version column to users, clients, contrats and events
+    :return: True if the migration was applied, False if already up to date
+    """
+    tables = [table for table in ("users", "clients", "contrats", "events") if "version" not in _columns(engine, table)]
+    if not tables:
+        return False
+
+    with engine.begin() as conn:
+        for table in tables:
+            conn.execute(text(f"ALTER TABLE {table} ADD COLUMN version INTEGER NOT NULL DEFAULT 1"))
+    return True
+
+
+def create_audit_log(engine: Engine) -> bool:
+    """
+    Create the audit log table
+    :return: True if the migration was applied, False if already up to date
+    """
+    if inspect(engine).has_table(AuditModel.__tablename__):
+        return False
+
+    AuditModel.__table__.create(engine)
+    return True
+
+
+def create_outbox(engine: Engine) -> bool:
+    """
+    Create the outbox table drained by `worker run`
+    :return: True if the migration was applied, False if already up to date
+    """
+    if inspect(engine).has_table(OutboxModel.__tablename__):
+        return False
+
+    OutboxModel.__table__.create(engine)
+    return True
+
+
+def create_jobs(engine: Engine) -> bool:
+    """
+    Create the jobs table of `job submit`
+    :return: True if the migration was applied, False if already up to date
+    """
+    if inspect(engine).has_table(JobModel.__tablename__):
+        return False
+
+    JobModel.__table__.create(engine)
+    return True
+
+
+MIGRATIONS: List[Tuple[str, Callable[[Engine], bool]]] = [
+    ("money_to_cents", migrate_money_to_cents),
+    ("dashboard_summaries", create_dashboard_summaries),
+    ("client_search_index", create_client_search_index),
+    ("event_period_indexes", create_event_period_indexes),
+    ("support_overlap_constraint", create_support_overlap_constraint),
+    ("payments_ledger", create_payments_ledger),
+    ("payment_requests", create_payment_requests),
+    ("version_columns", add_version_columns),
+    ("audit_log", create_audit_log),
+    ("outbox", create_outbox),
+    ("jobs", create_jobs),
+]
+
+
+def run_migrations(engine: Engine) -> List[str]:
+    """
+    Apply every pending migration, in order
+    :return: names of the migrations applied
+    """
+    return [name for name, migration in MIGRATIONS if migration(engine)]
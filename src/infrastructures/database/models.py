@@ -1,10 +1,11 @@
-from datetime import datetime
+from datetime import datetime, date
 from typing import List
 
-from sqlalchemy import Column, Integer, String, DateTime, Enum, ForeignKey
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, Date, Enum, ForeignKey, DDL, Index, JSON, event, \
+    text
 from sqlalchemy.orm import relationship, DeclarativeBase, Mapped, mapped_column
 
-from src.domain.entities.enums import Role, ContractStatus
+from src.domain.entities.enums import Role, ContractStatus, AuditedEntity, JobStatus
 
 
 class Base(DeclarativeBase): ...
@@ -26,6 +27,10 @@ class UserModel(Base):
     contrats: Mapped[List["ContratModel"]] = relationship(back_populates="commercial_contact")
     events: Mapped[List["EventModel"]] = relationship(back_populates="support_contact")
 
+    # incremented on every update, an update of an outdated row raises StaleDataError
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=1)
+    __mapper_args__ = {"version_id_col": version}
+
 
     def __repr__(self) -> str:
         return f"<User(id={self.id}, email='{self.email}', role='{self.role}')>"
@@ -50,10 +55,28 @@ class ClientModel(Base):
     contrats: Mapped[List["ContratModel"]] = relationship(back_populates="client")
     events: Mapped[List["EventModel"]] = relationship(back_populates="client")
 
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=1)
+    __mapper_args__ = {"version_id_col": version}
+
     def __repr__(self) -> str:
         return f"<Client(id={self.id}, fullname='{self.fullname}')>"
 
 
+# Text searched by `client search`, the query must use this exact expression for the index to apply
+CLIENT_SEARCH_TEXT = "lower(fullname || ' ' || company_name || ' ' || email)"
+
+event.listen(
+    ClientModel.__table__, "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql")
+)
+event.listen(
+    ClientModel.__table__, "after_create",
+    DDL(
+        f"CREATE INDEX IF NOT EXISTS ix_clients_search_trgm ON clients USING gin ({CLIENT_SEARCH_TEXT} gin_trgm_ops)"
+    ).execute_if(dialect="postgresql")
+)
+
+
 class ContratModel(Base):
     """Model SQLAlchemy Contrat"""
     __tablename__ = "contrats"
@@ -66,8 +89,8 @@ class ContratModel(Base):
     commercial_contact_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
     commercial_contact: Mapped[UserModel] = relationship(back_populates="contrats")
 
-    contrat_amount: Mapped[int]= mapped_column(Integer, nullable=False)
-    balance_due: Mapped[int]= mapped_column(Integer, nullable=False)
+    contrat_amount_cents: Mapped[int]= mapped_column(BigInteger, nullable=False)
+    balance_due_cents: Mapped[int]= mapped_column(BigInteger, nullable=False)
     status: Mapped[ContractStatus] = mapped_column(Enum(ContractStatus), nullable=False)
 
     created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
@@ -75,10 +98,48 @@ class ContratModel(Base):
 
     events: Mapped[List["EventModel"]] = relationship(back_populates="contrat")
 
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=1)
+    __mapper_args__ = {"version_id_col": version}
+
     def __repr__(self) -> str:
         return f"<Contrat(id={self.id}, client={self.client}, commercial_contact={self.commercial_contact})>"
 
 
+class PaymentModel(Base):
+    """Model SQLAlchemy Payment - append only ledger, the contrat balance due is maintained from it"""
+    __tablename__ = "payments"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+
+    contrat_id: Mapped[int] = mapped_column(ForeignKey("contrats.id"), nullable=False)
+    amount_cents: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    paid_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+
+    __table_args__ = (
+        Index("ix_payments_contrat_paid_at", "contrat_id", "paid_at"),
+        Index("ix_payments_paid_at", "paid_at"),
+    )
+
+    def __repr__(self) -> str:
+        return f"<Payment(id={self.id}, contrat_id={self.contrat_id}, amount_cents={self.amount_cents})>"
+
+
+class PaymentRequestModel(Base):
+    """Model SQLAlchemy Payment request - idempotency key of a payment and its outcome"""
+    __tablename__ = "payment_requests"
+
+    idempotency_key: Mapped[str] = mapped_column(String(255), primary_key=True)
+
+    contrat_id: Mapped[int] = mapped_column(ForeignKey("contrats.id"), nullable=False)
+    payment_id: Mapped[int] = mapped_column(ForeignKey("payments.id"), nullable=False)
+    amount_cents: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    balance_due_cents: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<PaymentRequest(idempotency_key='{self.idempotency_key}', payment_id={self.payment_id})>"
+
+
 class EventModel(Base):
     """Model SQLAlchemy Event"""
     __tablename__ = "events"
@@ -105,5 +166,141 @@ class EventModel(Base):
     created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
     updated_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
 
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=1)
+    __mapper_args__ = {"version_id_col": version}
+
+    __table_args__ = (
+        Index("ix_events_start_date_id", "start_date", "id"),
+        Index("ix_events_end_date", "end_date"),
+        Index("ix_events_support_start", "support_contact_id", "start_date"),
+    )
+
     def __repr__(self) -> str:
         return f"<Event(id={self.id}, name={self.name})>"
+
+
+# Period of an event, the overlap query must use this exact expression for the GiST index to apply
+EVENT_PERIOD_INDEX = "CREATE INDEX IF NOT EXISTS ix_events_period ON events USING gist (tsrange(start_date, end_date))"
+
+event.listen(
+    EventModel.__table__, "after_create",
+    DDL(EVENT_PERIOD_INDEX).execute_if(dialect="postgresql")
+)
+
+# A support contact can not be booked on two overlapping events (btree_gist provides `=` on integers)
+EVENT_SUPPORT_OVERLAP = "ex_events_support_overlap"
+EVENT_SUPPORT_OVERLAP_CONSTRAINT = (
+    f"ALTER TABLE events ADD CONSTRAINT {EVENT_SUPPORT_OVERLAP} "
+    "EXCLUDE USING gist (support_contact_id WITH =, tsrange(start_date, end_date) WITH &&)"
+)
+
+event.listen(
+    EventModel.__table__, "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS btree_gist").execute_if(dialect="postgresql")
+)
+event.listen(
+    EventModel.__table__, "after_create",
+    DDL(EVENT_SUPPORT_OVERLAP_CONSTRAINT).execute_if(dialect="postgresql")
+)
+
+
+class CommercialSummaryModel(Base):
+    """Model SQLAlchemy - contrat totals per commercial, maintained on every contrat write"""
+    __tablename__ = "commercial_summaries"
+
+    commercial_contact_id: Mapped[int] = mapped_column(primary_key=True)
+    contrat_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    signed_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    total_amount_cents: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    balance_due_cents: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+
+    def __repr__(self) -> str:
+        return f"<CommercialSummary(commercial_contact_id={self.commercial_contact_id})>"
+
+
+class SupportEventSummaryModel(Base):
+    """Model SQLAlchemy - event count per support and start day, maintained on every event write"""
+    __tablename__ = "support_event_summaries"
+
+    support_contact_id: Mapped[int] = mapped_column(primary_key=True)
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    event_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    def __repr__(self) -> str:
+        return f"<SupportEventSummary(support_contact_id={self.support_contact_id}, day={self.day})>"
+
+
+class AuditModel(Base):
+    """Model SQLAlchemy Audit - append only log of the changes made to clients, contrats and events"""
+    __tablename__ = "audit_log"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+
+    entity: Mapped[AuditedEntity] = mapped_column(Enum(AuditedEntity), nullable=False)
+    entity_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    action: Mapped[str] = mapped_column(String(20), nullable=False)
+    # no foreign key, the history is kept when the user or the entity is deleted
+    actor_id: Mapped[int] = mapped_column(Integer, nullable=True)
+    changes: Mapped[dict] = mapped_column(JSON, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+
+    __table_args__ = (
+        Index("ix_audit_log_entity", "entity", "entity_id", "id"),
+    )
+
+    def __repr__(self) -> str:
+        return f"<Audit(id={self.id}, entity={self.entity}, entity_id={self.entity_id}, action='{self.action}')>"
+
+
+class OutboxModel(Base):
+    """Model SQLAlchemy Outbox - side effects to run, written with the changes that cause them and drained by workers"""
+    __tablename__ = "outbox"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+
+    topic: Mapped[str] = mapped_column(String(50), nullable=False)
+    payload: Mapped[dict] = mapped_column(JSON, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    # not claimed before this date: delayed message, retry backoff or lease of the worker processing it
+    available_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    last_error: Mapped[str] = mapped_column(String, nullable=True)
+    processed_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index(
+            "ix_outbox_pending", "available_at", "id",
+            postgresql_where=text("processed_at IS NULL"), sqlite_where=text("processed_at IS NULL"),
+        ),
+    )
+
+    def __repr__(self) -> str:
+        return f"<Outbox(id={self.id}, topic='{self.topic}', attempts={self.attempts})>"
+
+
+class JobModel(Base):
+    """Model SQLAlchemy Job - long-running commands submitted with `job submit` and run by a process pool"""
+    __tablename__ = "jobs"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+
+    kind: Mapped[str] = mapped_column(String(50), nullable=False)
+    params: Mapped[dict] = mapped_column(JSON, nullable=False)
+    status: Mapped[JobStatus] = mapped_column(Enum(JobStatus), nullable=False, default=JobStatus.PENDING)
+    progress: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    total: Mapped[int] = mapped_column(Integer, nullable=True)
+    result_path: Mapped[str] = mapped_column(String(500), nullable=True)
+    error: Mapped[str] = mapped_column(String, nullable=True)
+    # no foreign key, like the audit log: deleting a user keeps the jobs it submitted
+    created_by: Mapped[int] = mapped_column(Integer, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    started_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
+    finished_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index("ix_jobs_status", "status", "id"),
+        Index("ix_jobs_created_by", "created_by", "id"),
+    )
+
+    def __repr__(self) -> str:
+        return f"<Job(id={self.id}, kind='{self.kind}', status={self.status})>"
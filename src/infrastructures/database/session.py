@@ -1,10 +1,12 @@
 import os
+from contextlib import contextmanager
+from typing import Iterator, Optional
 
 import psycopg2
 from dotenv import load_dotenv
 from psycopg2 import sql
-from sqlalchemy import create_engine
-from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy import create_engine, Engine
+from sqlalchemy.orm import Session, sessionmaker, scoped_session
 
 from src.infrastructures.database.models import Base
 
@@ -12,6 +14,7 @@ load_dotenv()
 
 _engine = None
 _SessionLocal = None
+_ScopedSession = None
 
 
 def init_engine():
@@ -94,6 +97,44 @@ def get_session() -> Session:
     return _SessionLocal()
 
 
+def get_scoped_session() -> scoped_session:
+    """
+    Get the thread-local session registry, its sessions share the connection pool of the engine
+    Used by servers handling requests in threads, call `remove()` at the end of each request
+    :return: scoped_session
+    """
+    global _ScopedSession
+
+    if _ScopedSession is None:
+        init_engine()
+        _ScopedSession = scoped_session(_SessionLocal)
+    return _ScopedSession
+
+
+@contextmanager
+def get_atomic_session(engine: Optional[Engine] = None) -> Iterator[Session]:
+    """
+    Get a session whose commits are savepoints of one transaction, committed when the block ends
+    and rolled back if it raises: the commits of the repositories are kept or undone all together
+    :param engine: engine of DATABASE_URL by default
+    :return: Session
+    """
+    with (engine or get_engine()).connect() as connection:
+        transaction = connection.begin()
+        if connection.dialect.name == "sqlite":
+            # pysqlite only begins before a write, the first savepoint would be committed on its own
+            connection.exec_driver_sql("BEGIN")
+        session = Session(bind=connection, join_transaction_mode="create_savepoint")
+        try:
+            yield session
+        except BaseException:
+            session.close()
+            transaction.rollback()
+            raise
+        session.close()
+        transaction.commit()
+
+
 def init_db():
     """
     Initialize the table database
@@ -0,0 +1,87 @@
+from enum import Enum
+from typing import Callable, Dict, List, NamedTuple
+
+from sqlalchemy.orm import Session
+
+from src.domain.entities.read_models import Job
+from src.domain.policies.user_policy import RequestPolicy
+from src.infrastructures.repositories.SQLAchemy_repository import SQLAlchemyClientRepository, \
+    SQLAlchemyContratRepository, SQLAlchemyEventRepository
+from src.use_cases.client_use_cases import ListClientUseCase, ListClientRequest, ClientFilter
+from src.use_cases.contrat_use_cases import ListContratUseCase, ListContratRequest, ContratFilter
+from src.use_cases.event_use_cases import ListEventUseCase, ListEventRequest, EventFilter
+from src.use_cases.report_use_cases import GetReportUseCase, GetReportRequest, ReportType
+
+EXPORT = "export"
+REPORT = "report"
+
+
+class ExportTarget(Enum):
+    CLIENTS = "clients"
+    CONTRATS = "contrats"
+    EVENTS = "events"
+
+
+EXPORT_FILTERS = {
+    ExportTarget.CLIENTS: ClientFilter,
+    ExportTarget.CONTRATS: ContratFilter,
+    ExportTarget.EVENTS: EventFilter,
+}
+
+
+class JobError(Exception):
+    """The command run by a job returned an error, its message is shown by `job status`"""
+
+
+def export_rows(session: Session, params: dict, user: dict) -> List[NamedTuple]:
+    """Rows of `client list`, `contrat list` or `event list`"""
+    target = ExportTarget(params["target"])
+    list_filter = EXPORT_FILTERS[target](params["filter"]) if params.get("filter") else None
+    user_id = user["user_current_id"]
+
+    match target:
+        case ExportTarget.CLIENTS:
+            response = ListClientUseCase(SQLAlchemyClientRepository(session)).execute(
+                ListClientRequest(user_id=user_id, list_filter=list_filter)
+            )
+            rows = response.clients
+        case ExportTarget.CONTRATS:
+            response = ListContratUseCase(SQLAlchemyContratRepository(session)).execute(
+                ListContratRequest(commercial_contact_id=user_id, list_filter=list_filter)
+            )
+            rows = response.contrats
+        case _:
+            response = ListEventUseCase(SQLAlchemyEventRepository(session)).execute(
+                ListEventRequest(support_contact_id=user_id, list_filter=list_filter)
+            )
+            rows = response.events
+
+    if not response.success:
+        raise JobError(response.msg)
+    return rows
+
+
+def report_rows(session: Session, params: dict, user: dict) -> List[NamedTuple]:
+    """Rows of `report commercial`, `report client` or `report status`"""
+    report_type = ReportType(params["report_type"])
+    response = GetReportUseCase(SQLAlchemyContratRepository(session)).execute(
+        GetReportRequest(
+            report_type=report_type,
+            authorization=RequestPolicy(user=user, ressource="REPORT", action=report_type.value),
+        )
+    )
+    if not response.success:
+        raise JobError(response.msg)
+    return response.rows
+
+
+# job kind -> rows of its result, computed on behalf of the user who submitted the job
+JOB_KINDS: Dict[str, Callable[[Session, dict, dict], List[NamedTuple]]] = {
+    EXPORT: export_rows,
+    REPORT: report_rows,
+}
+
+
+def job_filename(job: Job) -> str:
+    """job-12-export-contrats-signed.csv"""
+    return "-".join(["job", str(job.id), job.kind, *(str(value) for value in job.params.values() if value)]) + ".csv"
@@ -0,0 +1,129 @@
+"""
+Runs the pending jobs in a process pool, each process with its own engine
+python -m src.infrastructures.jobs.runner [workers]
+"""
+import csv
+import os
+import subprocess
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from enum import Enum
+from pathlib import Path
+from typing import Callable, List, NamedTuple, Optional
+
+from dotenv import load_dotenv
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
+
+from src.domain.entities.enums import JobStatus
+from src.infrastructures.jobs.kinds import JOB_KINDS, JobError, job_filename
+from src.infrastructures.repositories.SQLAchemy_repository import SQLAlchemyJobRepository, SQLAlchemyUserRepository
+
+PROJECT_ROOT = Path(__file__).resolve().parents[3]
+JOBS_DIR = Path(os.environ.get("JOBS_DIR", PROJECT_ROOT / "jobs"))
+DEFAULT_WORKERS = 2
+# rows written between two progress reports, a cancelled job stops at the next one
+PROGRESS_EVERY = 1000
+
+
+class JobCancelled(Exception):
+    """The job was cancelled while running"""
+
+
+def _csv_value(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat(sep=" ")
+    return str(value)
+
+
+def write_csv(path: Path, rows: List[NamedTuple], report_progress: Callable[[int], bool]) -> None:
+    """
+    Writes rows with a header line, reporting progress every PROGRESS_EVERY rows
+    :param report_progress: called with the rows written so far, returns False to stop
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(rows[0]._fields)
+        for start in range(0, len(rows), PROGRESS_EVERY):
+            if not report_progress(start):
+                raise JobCancelled()
+            writer.writerows([_csv_value(value) for value in row] for row in rows[start:start + PROGRESS_EVERY])
+
+
+def run_job(database_url: str, job_id: int, results_dir: Path = JOBS_DIR) -> Optional[JobStatus]:
+    """
+    Runs one job in the calling process, with a new engine: connections are never shared with the parent process
+    :return: final status, None if the job was not pending anymore
+    """
+    engine = create_engine(database_url, poolclass=NullPool)
+    try:
+        with Session(engine) as session:
+            return _run(session, job_id, results_dir)
+    finally:
+        engine.dispose()
+
+
+def _run(session: Session, job_id: int, results_dir: Path) -> Optional[JobStatus]:
+    jobs = SQLAlchemyJobRepository(session)
+    if not jobs.start(job_id):
+        return None
+
+    job = jobs.find_by_id(job_id)
+    path = results_dir / job_filename(job)
+    try:
+        user = SQLAlchemyUserRepository(session).find_by_id(job.created_by)
+        if user is None:
+            raise JobError("L'utilisateur qui a lancé la tâche n'existe plus")
+        rows = JOB_KINDS[job.kind](session, job.params, {"user_current_id": user.id, "user_current_role": user.role})
+        write_csv(path, rows, lambda done: jobs.report_progress(job_id, done, len(rows)))
+    except JobCancelled:
+        path.unlink(missing_ok=True)
+    except Exception as e:
+        session.rollback()
+        path.unlink(missing_ok=True)
+        jobs.fail(job_id, str(e) if isinstance(e, JobError) else repr(e))
+    else:
+        jobs.finish(job_id, str(path))
+    return jobs.find_by_id(job_id).status
+
+
+def drain(workers: int = DEFAULT_WORKERS, database_url: Optional[str] = None, results_dir: Path = JOBS_DIR) -> int:
+    """
+    Runs the pending jobs, `workers` at a time, until none is left
+    Several runners can drain at once, `start` lets only one of them run each job
+    :return: number of jobs run by this runner
+    """
+    database_url = database_url or os.environ["DATABASE_URL"]
+    engine = create_engine(database_url, poolclass=NullPool)
+    run = 0
+    with Session(engine) as session, ProcessPoolExecutor(max_workers=workers) as executor:
+        jobs = SQLAlchemyJobRepository(session)
+        while job_ids := jobs.find_pending():
+            statuses = executor.map(run_job, [database_url] * len(job_ids), job_ids, [results_dir] * len(job_ids))
+            run += sum(status is not None for status in statuses)
+    engine.dispose()
+    return run
+
+
+def spawn_runner(workers: int = DEFAULT_WORKERS) -> None:
+    """Starts `drain` in a detached process, so that jobs keep running when the terminal is closed"""
+    subprocess.Popen(
+        [sys.executable, "-m", __name__, str(workers)],
+        cwd=PROJECT_ROOT,
+        start_new_session=True,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+
+if __name__ == "__main__":
+    load_dotenv()
+    drain(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_WORKERS)
@@ -0,0 +1,44 @@
+from datetime import datetime, timedelta
+from typing import Dict
+
+import sentry_sdk
+from sqlalchemy.orm import Session
+
+from src.infrastructures.outbox.topics import SENTRY_MESSAGE, EVENT_WITHOUT_SUPPORT, EVENT_SUPPORT_REMINDER_DAYS
+from src.infrastructures.outbox.worker import Handler
+from src.infrastructures.repositories.SQLAchemy_repository import SQLAlchemyEventRepository
+
+
+def send_sentry_message(payload: dict) -> None:
+    sentry_sdk.capture_message(payload["message"], level=payload["level"])
+
+
+def event_support_reminder(session: Session) -> Handler:
+    """
+    Warns that an event still has no support contact, EVENT_SUPPORT_REMINDER_DAYS before its start
+    The event is read again: the reminder is dropped if a support was assigned or the event moved since
+    """
+    repository = SQLAlchemyEventRepository(session)
+
+    def handle(payload: dict) -> None:
+        event = repository.find_by_id(payload["event_id"])
+        now = datetime.now()
+        if event is None or event.support_contact_id is not None or event.start_date <= now:
+            return
+        if event.start_date - timedelta(days=EVENT_SUPPORT_REMINDER_DAYS) > now:
+            return
+        sentry_sdk.capture_message(
+            f"L'évènement #{event.id} {event.name} n'a pas de contact support, "
+            f"début le {event.start_date:%d/%m/%Y %H:%M}",
+            level="warning",
+        )
+
+    return handle
+
+
+def default_handlers(session: Session) -> Dict[str, Handler]:
+    """Handler of each outbox topic"""
+    return {
+        SENTRY_MESSAGE: send_sentry_message,
+        EVENT_WITHOUT_SUPPORT: event_support_reminder(session),
+    }
@@ -0,0 +1,8 @@
+# Outbox topics, shared by the publishers and the worker handlers
+
+# payload: {"message": str, "level": str}
+SENTRY_MESSAGE = "sentry.message"
+# payload: {"event_id": int}, available EVENT_SUPPORT_REMINDER_DAYS before the start of the event
+EVENT_WITHOUT_SUPPORT = "event.without_support"
+
+EVENT_SUPPORT_REMINDER_DAYS = 7
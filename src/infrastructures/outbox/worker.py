@@ -0,0 +1,73 @@
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Tuple
+
+from src.domain.interfaces.repository import OutboxRepository
+
+Handler = Callable[[dict], None]
+
+RETRY_BASE_SECONDS = 5
+RETRY_MAX_SECONDS = 3600
+
+
+def retry_delay(attempts: int) -> timedelta:
+    """Exponential backoff after a failed attempt: 5 s, 10 s, 20 s ... up to one hour"""
+    return timedelta(seconds=min(RETRY_BASE_SECONDS * 2 ** (attempts - 1), RETRY_MAX_SECONDS))
+
+
+class OutboxWorker:
+    """
+    Drains the outbox in batches: claims available messages, runs the handler of their topic,
+    completes the processed ones and releases the failed ones until their next attempt
+    Several workers can run at once, each message is claimed by one of them
+    """
+
+    def __init__(self, repository: OutboxRepository, handlers: Dict[str, Handler], batch_size: int = 100):
+        self.repository = repository
+        self.handlers = handlers
+        self.batch_size = batch_size
+        self.stopped = False
+
+    def run_once(self) -> Tuple[int, int]:
+        """
+        Processes one batch
+        :return: number of processed and failed messages
+        """
+        messages = self.repository.claim(self.batch_size)
+        processed, failures = [], {}
+        for message in messages:
+            try:
+                handler = self.handlers.get(message.topic)
+                if handler is None:
+                    raise LookupError(f"Aucun traitement pour le sujet {message.topic}")
+                handler(message.payload)
+            except Exception as e:
+                failures[message.id] = (datetime.now() + retry_delay(message.attempts), repr(e))
+            else:
+                processed.append(message.id)
+
+        self.repository.complete(processed)
+        self.repository.retry(failures)
+        return len(processed), len(failures)
+
+    def run(self, poll_interval: float = 1.0, stop_when_empty: bool = False) -> Tuple[int, int]:
+        """
+        Processes batches until stopped, waiting `poll_interval` seconds when the outbox is empty
+        :param poll_interval: seconds between two claims of an empty outbox
+        :param stop_when_empty: return as soon as no message is available
+        :return: number of processed and failed messages
+        """
+        processed = failed = 0
+        while not self.stopped:
+            done, errors = self.run_once()
+            processed += done
+            failed += errors
+            if done + errors < self.batch_size:
+                if stop_when_empty:
+                    break
+                time.sleep(poll_interval)
+        return processed, failed
+
+    def stop(self) -> None:
+        """Stops `run` after the current batch"""
+        self.stopped = True
@@ -1,13 +1,32 @@
-from typing import List, Optional
-
-from sqlalchemy import select, exists
-from sqlalchemy.orm import Session
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from weakref import WeakKeyDictionary
+
+from sqlalchemy import select, exists, func, case, update, insert, delete, Date, literal, literal_column, tuple_, \
+    bindparam, event, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy.orm.exc import StaleDataError
 
 from src.domain.entities.entities import Client, User, Contrat, Event
-from src.domain.entities.enums import Role, ContractStatus
+from src.domain.entities.enums import Role, ContractStatus, AuditedEntity, JobStatus
+from src.domain.entities.exceptions import BusinessRuleViolation, DuplicateRequestError, ConcurrentModificationError
+from src.domain.entities.read_models import ClientRow, ContratRow, EventRow, CommercialReportRow, ClientReportRow, \
+    StatusReportRow, SupportSummaryRow, SummaryDiff, PaymentRow, CashInRow, PaymentReceipt, AuditEntry, OutboxMessage, \
+    Job
 from src.domain.entities.value_objects import Email, Telephone, Money
-from src.infrastructures.database.models import ClientModel, UserModel, ContratModel, EventModel
+from src.infrastructures.database.models import ClientModel, UserModel, ContratModel, EventModel, \
+    CommercialSummaryModel, SupportEventSummaryModel, PaymentModel, PaymentRequestModel, AuditModel, OutboxModel, \
+    JobModel, CLIENT_SEARCH_TEXT, EVENT_SUPPORT_OVERLAP
+from src.infrastructures.outbox.topics import EVENT_WITHOUT_SUPPORT, EVENT_SUPPORT_REMINDER_DAYS
+from src.infrastructures.search.trigram import TrigramIndex
 
+# rows fetched per round trip by the iter_all_rows methods
+STREAM_BATCH_SIZE = 1000
 
 ###########################################################################################
 #                       CLIENT
@@ -18,8 +37,11 @@ class SQLAlchemyClientRepository:
     def __init__(self, session: Session):
         self.session = session
 
-    def save(self, client: Client) -> Client:
-        """Creates a new client or modifie a client, and saves it to the database"""
+    def save(self, client: Client, before_commit: Optional[Callable[[Client], None]] = None) -> Client:
+        """
+        Creates a new client or modifie a client, and saves it to the database
+        :param before_commit: called with the saved client before the commit, in the same transaction
+        """
         if client.id is None:
 
             db_client = ClientModel(
@@ -34,7 +56,7 @@ class SQLAlchemyClientRepository:
             self.session.add(db_client)
 
         else:
-            db_client = self.session.get(ClientModel, client.id)
+            db_client = _get_for_update(self.session, ClientModel, client)
 
             db_client.fullname = client.fullname
             db_client.email = str(client.email)
@@ -42,7 +64,12 @@ class SQLAlchemyClientRepository:
             db_client.company_name = client.company_name
             db_client.updated_at = client.updated_at
 
-        self.session.commit()
+        with _stale_data_as_conflict(self.session):
+            if before_commit is not None:
+                self.session.flush()
+                before_commit(self._to_entity(db_client))
+            self.session.commit()
+        _client_indexes.pop(self.session.get_bind(), None)
         return self._to_entity(db_client)
 
     def exist(self, client_id: int) -> bool:
@@ -60,24 +87,89 @@ class SQLAlchemyClientRepository:
 
     def find_all(self, criteres: dict) -> List[Client]:
         """Finds all clients in the database"""
-        stmt = select(ClientModel)
+        stmt = self._apply_criteres(select(ClientModel), criteres)
+
+        result = self.session.execute(stmt)
+        db_clients = result.scalars().all()
+
+        return [self._to_entity(db_client) for db_client in db_clients]
 
+    def find_all_rows(self, criteres: dict) -> List[ClientRow]:
+        """Finds all clients, selecting only the columns displayed in lists"""
+        stmt = self._apply_criteres(self._select_rows(), criteres)
+        return [ClientRow._make(row) for row in self.session.execute(stmt)]
+
+    def iter_all_rows(self, criteres: dict) -> Iterator[ClientRow]:
+        """Same rows as find_all_rows, fetched STREAM_BATCH_SIZE at a time while they are consumed"""
+        stmt = self._apply_criteres(self._select_rows(), criteres).execution_options(yield_per=STREAM_BATCH_SIZE)
+        for row in self.session.execute(stmt):
+            yield ClientRow._make(row)
+
+    def search(self, query: str, limit: int, offset: int) -> List[ClientRow]:
+        """
+        Fuzzy search on fullname, company name and email, best matches first
+        Uses the pg_trgm index on PostgreSQL, an in-process trigram index otherwise
+        """
+        if self.session.get_bind().dialect.name == "postgresql":
+            search_text = literal_column(CLIENT_SEARCH_TEXT)
+            query = query.lower()
+            stmt = (
+                self._select_rows()
+                .where(literal(query).op("<%")(search_text))
+                .order_by(func.word_similarity(query, search_text).desc(), ClientModel.id)
+                .limit(limit)
+                .offset(offset)
+            )
+            return [ClientRow._make(row) for row in self.session.execute(stmt)]
+
+        matches = _client_index(self.session).search(query, limit=offset + limit)
+        ids = [client_id for client_id, _ in matches[offset:]]
+        rows = {
+            row.id: ClientRow._make(row)
+            for row in self.session.execute(self._select_rows().where(ClientModel.id.in_(ids)))
+        }
+        return [rows[client_id] for client_id in ids if client_id in rows]
+
+    @staticmethod
+    def _select_rows():
+        """Select of the columns displayed in lists"""
+        return select(
+            ClientModel.id,
+            ClientModel.fullname,
+            ClientModel.email,
+            ClientModel.telephone,
+            ClientModel.company_name,
+            ClientModel.commercial_contact_id,
+        )
+
+    @staticmethod
+    def _apply_criteres(stmt, criteres: dict):
+        """
+        Applies list criteres to a select statement
+        - after : id of the last client of the previous page
+        - limit : page size, pages are ordered by id
+        """
         commercial_contact_id = criteres.get("commercial_contact_id")
         if commercial_contact_id is not None:
             stmt = stmt.where(
                 ClientModel.commercial_contact_id == commercial_contact_id
             )
 
-        result = self.session.execute(stmt)
-        db_clients = result.scalars().all()
+        if criteres.get("after"):
+            stmt = stmt.where(ClientModel.id > criteres["after"])
 
-        return [self._to_entity(db_client) for db_client in db_clients]
+        if criteres.get("limit"):
+            stmt = stmt.order_by(ClientModel.id).limit(criteres["limit"])
+        return stmt
 
-    def delete(self, client_id: int) -> None:
-        """Deletes a client from the database"""
+    def delete(self, client_id: int, before_commit: Optional[Callable[[], None]] = None) -> None:
+        """Deletes a client from the database, `before_commit` is called in the same transaction"""
         find_client = self.session.get(ClientModel, client_id)
         self.session.delete(find_client)
+        if before_commit is not None:
+            before_commit()
         self.session.commit()
+        _client_indexes.pop(self.session.get_bind(), None)
 
     @staticmethod
     def _to_entity(model: ClientModel) -> Client:
@@ -85,15 +177,36 @@ class SQLAlchemyClientRepository:
         return Client(
             id=model.id,
             fullname=model.fullname,
-            email=Email(model.email),
-            telephone=Telephone(model.telephone),
+            email=Email.trusted(model.email),
+            telephone=Telephone.trusted(model.telephone),
             company_name=model.company_name,
             commercial_contact_id=model.commercial_contact_id,
             created_at=model.created_at,
-            updated_at=model.updated_at
+            updated_at=model.updated_at,
+            version=model.version,
         )
 
 
+# in-process trigram index per engine, dropped whenever a client is saved or deleted
+_client_indexes: WeakKeyDictionary = WeakKeyDictionary()
+
+
+def _client_index(session: Session) -> TrigramIndex:
+    """Trigram index of clients, built on first search"""
+    bind = session.get_bind()
+    index = _client_indexes.get(bind)
+    if index is None:
+        documents = session.execute(
+            select(ClientModel.id, ClientModel.fullname, ClientModel.company_name, ClientModel.email)
+        )
+        index = TrigramIndex(
+            (client_id, f"{fullname} {company_name} {email}")
+            for client_id, fullname, company_name, email in documents
+        )
+        _client_indexes[bind] = index
+    return index
+
+
 ###########################################################################################
 #                       USER
 ###########################################################################################
@@ -118,7 +231,7 @@ class SQLAlchemyUserRepository:
             self.session.add(db_user)
 
         else:
-            db_user = self.session.get(UserModel, user.id)
+            db_user = _get_for_update(self.session, UserModel, user)
 
             db_user.fullname = user.fullname
             db_user.email = str(user.email)
@@ -126,7 +239,8 @@ class SQLAlchemyUserRepository:
             db_user.role = user.role
             db_user.updated_at = user.updated_at
 
-        self.session.commit()
+        with _stale_data_as_conflict(self.session):
+            self.session.commit()
         return self._to_entity(db_user)
 
     def exist(self, user_id: int) -> bool:
@@ -175,11 +289,12 @@ class SQLAlchemyUserRepository:
         return User(
             id=model.id,
             fullname=model.fullname,
-            email=Email(model.email),
+            email=Email.trusted(model.email),
             password=model.password,
             role=Role(model.role),
             created_at=model.created_at,
-            updated_at=model.updated_at
+            updated_at=model.updated_at,
+            version=model.version,
         )
 
 
@@ -192,32 +307,42 @@ class SQLAlchemyContratRepository:
     def __init__(self, session: Session):
         self.session = session
 
-    def save(self, contrat: Contrat) -> Contrat:
-        """Creates a new contrat or modified a contrat, and saves it to the database"""
+    def save(self, contrat: Contrat, before_commit: Optional[Callable[[Contrat], None]] = None) -> Contrat:
+        """
+        Creates a new contrat or modified a contrat, and saves it to the database
+        :param before_commit: called with the saved contrat before the commit, in the same transaction
+        """
         if contrat.id is None:
 
             db_contrat = ContratModel(
                 client_id=contrat.client_id,
                 commercial_contact_id=contrat.commercial_contact_id,
-                contrat_amount=int(contrat.contrat_amount.amount),
-                balance_due=int(contrat.balance_due.amount),
+                contrat_amount_cents=contrat.contrat_amount.cents,
+                balance_due_cents=contrat.balance_due.cents,
                 status=contrat.status,
                 created_at=contrat.created_at,
                 updated_at=contrat.updated_at
             )
             self.session.add(db_contrat)
+            old_summary = None
 
         else:
-            db_contrat = self.session.get(ContratModel, contrat.id)
+            db_contrat = _get_for_update(self.session, ContratModel, contrat)
+            old_summary = _contrat_summary(db_contrat)
 
             db_contrat.client_id = contrat.client_id
             db_contrat.commercial_contact_id = contrat.commercial_contact_id
-            db_contrat.contrat_amount = int(contrat.contrat_amount.amount)
-            db_contrat.balance_due = int(contrat.balance_due.amount)
+            db_contrat.contrat_amount_cents = contrat.contrat_amount.cents
+            db_contrat.balance_due_cents = contrat.balance_due.cents
             db_contrat.status = contrat.status
             db_contrat.updated_at = contrat.updated_at
 
-        self.session.commit()
+        _update_commercial_summaries(self.session, old_summary, _contrat_summary(db_contrat))
+        with _stale_data_as_conflict(self.session):
+            if before_commit is not None:
+                self.session.flush()
+                before_commit(self._to_entity(db_contrat))
+            self.session.commit()
         return self._to_entity(db_contrat)
 
     def exist(self, contrat_id: int) -> bool:
@@ -235,7 +360,51 @@ class SQLAlchemyContratRepository:
 
     def find_all(self, criteres) -> List[Contrat]:
         """Finds all contrats in the database"""
-        stmt = select(ContratModel)
+        stmt = self._apply_criteres(select(ContratModel), criteres)
+
+        result = self.session.execute(stmt)
+        db_contrats = result.scalars().all()
+
+        return [self._to_entity(db_contrat) for db_contrat in db_contrats]
+
+    def find_all_rows(self, criteres) -> List[ContratRow]:
+        """Finds all contrats, selecting only the columns displayed in lists"""
+        stmt = self._apply_criteres(self._select_rows(), criteres)
+        return [self._to_row(*row) for row in self.session.execute(stmt)]
+
+    def iter_all_rows(self, criteres) -> Iterator[ContratRow]:
+        """Same rows as find_all_rows, fetched STREAM_BATCH_SIZE at a time while they are consumed"""
+        stmt = self._apply_criteres(self._select_rows(), criteres).execution_options(yield_per=STREAM_BATCH_SIZE)
+        for row in self.session.execute(stmt):
+            yield self._to_row(*row)
+
+    @staticmethod
+    def _select_rows():
+        """Select of the columns displayed in lists"""
+        return select(
+            ContratModel.id,
+            ContratModel.client_id,
+            ContratModel.commercial_contact_id,
+            ContratModel.contrat_amount_cents,
+            ContratModel.balance_due_cents,
+            ContratModel.status,
+        )
+
+    @staticmethod
+    def _to_row(id, client_id, commercial_contact_id, contrat_amount_cents, balance_due_cents, status) -> ContratRow:
+        return ContratRow(id, client_id, commercial_contact_id,
+                          Money.from_cents(contrat_amount_cents), Money.from_cents(balance_due_cents), status)
+
+    @staticmethod
+    def _apply_criteres(stmt, criteres):
+        """
+        Applies list criteres to a select statement
+        - after : id of the last contrat of the previous page
+        - limit : page size, pages are ordered by id
+        """
+        if criteres.get("ids") is not None:
+            stmt = stmt.where(ContratModel.id.in_(criteres["ids"]))
+
         if criteres.get("commercial_contact_id"):
             stmt = stmt.where(ContratModel.commercial_contact_id == criteres["commercial_contact_id"])
 
@@ -246,22 +415,229 @@ class SQLAlchemyContratRepository:
             stmt = stmt.where(ContratModel.status == ContractStatus.UNSIGNED)
 
         if criteres.get("fully_paid") is True:
-            stmt = stmt.where(ContratModel.balance_due == 0)
+            stmt = stmt.where(ContratModel.balance_due_cents == 0)
 
         if criteres.get("fully_paid") is False:
-            stmt = stmt.where(ContratModel.balance_due != 0)
+            stmt = stmt.where(ContratModel.balance_due_cents != 0)
+
+        if criteres.get("after"):
+            stmt = stmt.where(ContratModel.id > criteres["after"])
+
+        if criteres.get("limit"):
+            stmt = stmt.order_by(ContratModel.id).limit(criteres["limit"])
+        return stmt
+
+    def sign_many(self, contrat_ids: List[int],
+                  before_commit: Optional[Callable[[List[int]], None]] = None) -> List[int]:
+        """
+        Signs unsigned contrats with one UPDATE per batch
+        :param before_commit: called with the ids signed before the commit, in the same transaction
+        :return: ids of the contrats signed
+        """
+        signed = []
+        for batch in _batches(contrat_ids):
+            rows = self.session.execute(
+                update(ContratModel)
+                .where(ContratModel.id.in_(batch), ContratModel.status == ContractStatus.UNSIGNED)
+                .values(status=ContractStatus.SIGNED, updated_at=datetime.now(), version=ContratModel.version + 1)
+                .returning(ContratModel.id, ContratModel.commercial_contact_id)
+                .execution_options(synchronize_session=False)
+            ).all()
+            _add_commercial_deltas(self.session, Counter(commercial_id for _, commercial_id in rows), "signed_count")
+            signed.extend(contrat_id for contrat_id, _ in rows)
+        _notify_changes(self.session, "contrat", signed)
+        if before_commit is not None:
+            before_commit(signed)
+        self.session.commit()
+        return signed
 
-        result = self.session.execute(stmt)
-        db_contrats = result.scalars().all()
+    def find_payment_receipt(self, idempotency_key: str) -> Optional[PaymentReceipt]:
+        """Finds the outcome of the payment recorded with this idempotency key"""
+        db_request = self.session.get(PaymentRequestModel, idempotency_key)
+        if db_request is None:
+            return None
+        return PaymentReceipt(
+            db_request.idempotency_key,
+            db_request.contrat_id,
+            Money.from_cents(db_request.amount_cents),
+            Money.from_cents(db_request.balance_due_cents),
+            db_request.created_at,
+        )
 
-        return [self._to_entity(db_contrat) for db_contrat in db_contrats]
+    def record_payment(self, contrat_id: int, payment_cents: int, idempotency_key: Optional[str] = None,
+                       before_commit: Optional[Callable[[Contrat], None]] = None) -> Optional[Contrat]:
+        """
+        Records a payment with one conditional UPDATE, the balance is checked and decremented
+        by the database so concurrent payments can neither be lost nor overdraw the contrat,
+        the payment is appended to the ledger in the same transaction
+        :param contrat_id: contrat id
+        :param payment_cents: payment in cents
+        :param idempotency_key: stored with the payment, a second payment with the same key is rolled back
+        :param before_commit: called with the contrat paid before the commit, in the same transaction
+        :return: the contrat paid, None if it does not exist, is not signed or its balance due is lower than the payment
+        :raises DuplicateRequestError: a payment was already recorded with this idempotency key
+        """
+        paid_at = datetime.now()
+        db_contrat = self.session.execute(
+            update(ContratModel)
+            .where(
+                ContratModel.id == contrat_id,
+                ContratModel.status == ContractStatus.SIGNED,
+                ContratModel.balance_due_cents >= payment_cents,
+            )
+            .values(
+                balance_due_cents=ContratModel.balance_due_cents - payment_cents,
+                updated_at=paid_at,
+                version=ContratModel.version + 1,
+            )
+            .returning(ContratModel)
+            .execution_options(synchronize_session=False)
+        ).scalar_one_or_none()
+        if db_contrat is None:
+            self.session.rollback()
+            return None
+        payment_id = self.session.execute(
+            insert(PaymentModel)
+            .values(contrat_id=contrat_id, amount_cents=payment_cents, paid_at=paid_at)
+            .returning(PaymentModel.id)
+        ).scalar_one()
+        if idempotency_key is not None:
+            # a concurrent retry with the same key waits on the contrat row, then fails on the primary key
+            try:
+                self.session.execute(insert(PaymentRequestModel).values(
+                    idempotency_key=idempotency_key, contrat_id=contrat_id, payment_id=payment_id,
+                    amount_cents=payment_cents, balance_due_cents=db_contrat.balance_due_cents, created_at=paid_at,
+                ))
+            except IntegrityError:
+                self.session.rollback()
+                raise DuplicateRequestError(idempotency_key)
+        _add_commercial_deltas(
+            self.session, Counter({db_contrat.commercial_contact_id: -payment_cents}), "balance_due_cents"
+        )
+        _notify_changes(self.session, "contrat", [contrat_id])
+        paid_contrat = self._to_entity(db_contrat)
+        if before_commit is not None:
+            before_commit(paid_contrat)
+        self.session.commit()
+        return paid_contrat
+
+    def record_payments(self, payments: dict[int, int],
+                        before_commit: Optional[Callable[[List[int]], None]] = None) -> List[int]:
+        """
+        Records payments on signed contrats with one UPDATE per batch and appends them to the ledger,
+        a payment larger than the balance due is not applied
+        :param payments: {contrat id: payment in cents}
+        :param before_commit: called with the ids paid before the commit, in the same transaction
+        :return: ids of the contrats paid
+        """
+        paid = []
+        paid_at = datetime.now()
+        for batch in _batches(list(payments)):
+            amount = case({contrat_id: payments[contrat_id] for contrat_id in batch}, value=ContratModel.id)
+            rows = self.session.execute(
+                update(ContratModel)
+                .where(
+                    ContratModel.id.in_(batch),
+                    ContratModel.status == ContractStatus.SIGNED,
+                    ContratModel.balance_due_cents >= amount,
+                )
+                .values(
+                    balance_due_cents=ContratModel.balance_due_cents - amount,
+                    updated_at=paid_at,
+                    version=ContratModel.version + 1,
+                )
+                .returning(ContratModel.id, ContratModel.commercial_contact_id)
+                .execution_options(synchronize_session=False)
+            ).all()
+            if rows:
+                self.session.execute(insert(PaymentModel), [
+                    {"contrat_id": contrat_id, "amount_cents": payments[contrat_id], "paid_at": paid_at}
+                    for contrat_id, _ in rows
+                ])
+            deltas = Counter()
+            for contrat_id, commercial_id in rows:
+                deltas[commercial_id] -= payments[contrat_id]
+            _add_commercial_deltas(self.session, deltas, "balance_due_cents")
+            paid.extend(contrat_id for contrat_id, _ in rows)
+        _notify_changes(self.session, "contrat", paid)
+        if before_commit is not None:
+            before_commit(paid)
+        self.session.commit()
+        return paid
 
-    def delete(self, contrat_id: int) -> None:
-        """Deletes a contrat"""
+    def delete(self, contrat_id: int, before_commit: Optional[Callable[[], None]] = None) -> None:
+        """
+        Deletes a contrat, with its payments and their idempotency keys
+        :param before_commit: called before the commit, in the same transaction
+        """
         find_contrat = self.session.get(ContratModel, contrat_id)
+        _update_commercial_summaries(self.session, _contrat_summary(find_contrat), None)
+        self.session.execute(delete(PaymentRequestModel).where(PaymentRequestModel.contrat_id == contrat_id))
+        self.session.execute(delete(PaymentModel).where(PaymentModel.contrat_id == contrat_id))
         self.session.delete(find_contrat)
+        if before_commit is not None:
+            before_commit()
         self.session.commit()
 
+    def report_by_commercial(self) -> List[CommercialReportRow]:
+        """Aggregates contrat count, signed count, amount and balance per commercial, in SQL"""
+        stmt = (
+            select(
+                UserModel.id,
+                UserModel.fullname,
+                func.count(ContratModel.id),
+                func.coalesce(func.sum(case((ContratModel.status == ContractStatus.SIGNED, 1), else_=0)), 0),
+                func.coalesce(func.sum(ContratModel.contrat_amount_cents), 0),
+                func.coalesce(func.sum(ContratModel.balance_due_cents), 0),
+            )
+            .join(ContratModel, ContratModel.commercial_contact_id == UserModel.id)
+            .group_by(UserModel.id, UserModel.fullname)
+            .order_by(UserModel.id)
+        )
+        return [
+            CommercialReportRow(id, fullname, count, int(signed), Money.from_cents(int(amount)),
+                                Money.from_cents(int(balance)))
+            for id, fullname, count, signed, amount, balance in self.session.execute(stmt)
+        ]
+
+    def report_by_client(self) -> List[ClientReportRow]:
+        """Aggregates contrat count, amount and balance per client, in SQL"""
+        stmt = (
+            select(
+                ClientModel.id,
+                ClientModel.fullname,
+                ClientModel.company_name,
+                func.count(ContratModel.id),
+                func.coalesce(func.sum(ContratModel.contrat_amount_cents), 0),
+                func.coalesce(func.sum(ContratModel.balance_due_cents), 0),
+            )
+            .join(ContratModel, ContratModel.client_id == ClientModel.id)
+            .group_by(ClientModel.id, ClientModel.fullname, ClientModel.company_name)
+            .order_by(ClientModel.id)
+        )
+        return [
+            ClientReportRow(id, fullname, company_name, count, Money.from_cents(int(amount)),
+                            Money.from_cents(int(balance)))
+            for id, fullname, company_name, count, amount, balance in self.session.execute(stmt)
+        ]
+
+    def report_by_status(self) -> List[StatusReportRow]:
+        """Aggregates contrat count, amount and balance per status, in SQL"""
+        stmt = (
+            select(
+                ContratModel.status,
+                func.count(ContratModel.id),
+                func.coalesce(func.sum(ContratModel.contrat_amount_cents), 0),
+                func.coalesce(func.sum(ContratModel.balance_due_cents), 0),
+            )
+            .group_by(ContratModel.status)
+            .order_by(ContratModel.status)
+        )
+        return [
+            StatusReportRow(status, count, Money.from_cents(int(amount)), Money.from_cents(int(balance)))
+            for status, count, amount, balance in self.session.execute(stmt)
+        ]
+
     @staticmethod
     def _to_entity(model: ContratModel) -> Contrat:
         """Converts a model Contrat to a domain Contrat"""
@@ -269,25 +645,178 @@ class SQLAlchemyContratRepository:
             id=model.id,
             client_id=model.client_id,
             commercial_contact_id=model.commercial_contact_id,
-            contrat_amount=Money(model.contrat_amount),
-            balance_due=Money(model.balance_due),
+            contrat_amount=Money.from_cents(model.contrat_amount_cents),
+            balance_due=Money.from_cents(model.balance_due_cents),
             status=model.status,
             created_at=model.created_at,
-            updated_at=model.updated_at
+            updated_at=model.updated_at,
+            version=model.version,
+        )
+
+
+###########################################################################################
+#                       PAYMENT
+###########################################################################################
+LEDGER_RANGE_SIZE = 10_000
+
+
+class SQLAlchemyPaymentRepository:
+    """SQL Alchemy Payment repository, payments are appended by the contrat repository"""
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def find_by_contrat(self, contrat_id: int) -> List[PaymentRow]:
+        """Finds the payments of a contrat, oldest first"""
+        stmt = (
+            select(PaymentModel.id, PaymentModel.contrat_id, PaymentModel.amount_cents, PaymentModel.paid_at)
+            .where(PaymentModel.contrat_id == contrat_id)
+            .order_by(PaymentModel.paid_at, PaymentModel.id)
+        )
+        return [
+            PaymentRow(id, contrat_id, Money.from_cents(amount), paid_at)
+            for id, contrat_id, amount, paid_at in self.session.execute(stmt)
+        ]
+
+    def cash_in_by_month(self, date_from: datetime, date_to: datetime,
+                         contrat_id: Optional[int] = None) -> List[CashInRow]:
+        """
+        Aggregates payments received per month, in SQL
+        :param date_from: first instant included
+        :param date_to: first instant excluded
+        :param contrat_id: only the payments of this contrat
+        :return: one row per month with payments, oldest first
+        """
+        if self.session.get_bind().dialect.name == "postgresql":
+            month = func.date_trunc("month", PaymentModel.paid_at)
+        else:
+            month = func.strftime("%Y-%m-01", PaymentModel.paid_at)
+
+        stmt = (
+            select(month, func.count(PaymentModel.id), func.sum(PaymentModel.amount_cents))
+            .where(PaymentModel.paid_at >= date_from, PaymentModel.paid_at < date_to)
+            .group_by(month)
+            .order_by(month)
+        )
+        if contrat_id is not None:
+            stmt = stmt.where(PaymentModel.contrat_id == contrat_id)
+
+        return [
+            CashInRow(
+                month.date() if isinstance(month, datetime) else date.fromisoformat(month),
+                count,
+                Money.from_cents(int(amount)),
+            )
+            for month, count, amount in self.session.execute(stmt)
+        ]
+
+    @staticmethod
+    def _balances(session: Session, low: Optional[int] = None, high: Optional[int] = None):
+        """(contrat id, commercial id, stored balance, balance rebuilt from the ledger) of contrats in [low, high)"""
+        paid = (
+            select(PaymentModel.contrat_id, func.sum(PaymentModel.amount_cents).label("amount_cents"))
+            .group_by(PaymentModel.contrat_id)
+        )
+        if low is not None:
+            paid = paid.where(PaymentModel.contrat_id >= low, PaymentModel.contrat_id < high)
+        paid = paid.subquery()
+
+        stmt = (
+            select(
+                ContratModel.id,
+                ContratModel.commercial_contact_id,
+                ContratModel.balance_due_cents,
+                ContratModel.contrat_amount_cents - func.coalesce(paid.c.amount_cents, 0),
+            )
+            .outerjoin(paid, paid.c.contrat_id == ContratModel.id)
+            .order_by(ContratModel.id)
+        )
+        if low is not None:
+            stmt = stmt.where(ContratModel.id >= low, ContratModel.id < high)
+        return session.execute(stmt).all()
+
+    def check_balances(self) -> List[SummaryDiff]:
+        """Compares stored balances due with the balances rebuilt from the ledger"""
+        return [
+            SummaryDiff(ContratModel.__tablename__, str(contrat_id), (int(expected),), (balance,))
+            for contrat_id, _, balance, expected in self._balances(self.session)
+            if balance != expected
+        ]
+
+    @classmethod
+    def _rebuild_range(cls, session: Session, low: int, high: int) -> List[SummaryDiff]:
+        """Rebuilds the balances of contrats in [low, high) and their commercial summaries, in one transaction"""
+        # payments update the contrat row before appending to the ledger: once the rows are locked,
+        # the ledger can not change under the rebuild
+        session.execute(
+            select(ContratModel.id).where(ContratModel.id >= low, ContratModel.id < high).with_for_update()
         )
+        diffs, rows, deltas = [], [], Counter()
+        for contrat_id, commercial_id, balance, expected in cls._balances(session, low, high):
+            expected = int(expected)
+            if balance != expected:
+                diffs.append(SummaryDiff(ContratModel.__tablename__, str(contrat_id), (expected,), (balance,)))
+                rows.append({"b_id": contrat_id, "b_balance": expected})
+                deltas[commercial_id] += expected - balance
+
+        if rows:
+            table = ContratModel.__table__
+            session.execute(
+                update(table)
+                .where(table.c.id == bindparam("b_id"))
+                .values(balance_due_cents=bindparam("b_balance"), version=table.c.version + 1),
+                rows
+            )
+            _add_commercial_deltas(session, deltas, "balance_due_cents")
+            _notify_changes(session, "contrat", [row["b_id"] for row in rows])
+        session.commit()
+        return diffs
+
+    def rebuild_balances(self, workers: int = 4) -> List[SummaryDiff]:
+        """
+        Recomputes every balance due from the ledger, contrat id ranges are rebuilt in parallel
+        :param workers: ranges rebuilt at the same time, each with its own connection (one on SQLite)
+        :return: balances corrected
+        """
+        low, high = self.session.execute(select(func.min(ContratModel.id), func.max(ContratModel.id))).one()
+        self.session.commit()
+        if low is None:
+            return []
+        ranges = [
+            (start, min(start + LEDGER_RANGE_SIZE, high + 1))
+            for start in range(low, high + 1, LEDGER_RANGE_SIZE)
+        ]
+
+        bind = self.session.get_bind()
+        if workers <= 1 or len(ranges) == 1 or bind.dialect.name == "sqlite":
+            # SQLite has a single writer, and an in-memory database is private to its connection
+            return [diff for start, end in ranges for diff in self._rebuild_range(self.session, start, end)]
+
+        def rebuild(bounds: tuple) -> List[SummaryDiff]:
+            with Session(bind) as session:
+                return self._rebuild_range(session, *bounds)
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return [diff for diffs in executor.map(rebuild, ranges) for diff in diffs]
 
 
 ###########################################################################################
 #                       EVENT
 ###########################################################################################
+SUPPORT_OVERLAP_MESSAGE = "Le contact support a déjà un évènement sur ce créneau"
+
+
 class SQLAlchemyEventRepository:
     """SQL Alchemy Event repository """
 
     def __init__(self, session: Session):
         self.session = session
 
-    def save(self, event: Event) -> Event:
-        """Creates a new event or modified a event, and saves it to the database"""
+    def save(self, event: Event, before_commit: Optional[Callable[[Event], None]] = None) -> Event:
+        """
+        Creates a new event or modified a event, and saves it to the database
+        :param before_commit: called with the saved event before the commit, in the same transaction
+        """
         if event.id is None:
 
             db_event = EventModel(
@@ -304,9 +833,13 @@ class SQLAlchemyEventRepository:
                 updated_at=event.updated_at
             )
             self.session.add(db_event)
+            old_summary = None
+            old_reminder = None
 
         else:
-            db_event = self.session.get(EventModel, event.id)
+            db_event = _get_for_update(self.session, EventModel, event)
+            old_summary = _event_summary(db_event)
+            old_reminder = _support_reminder(db_event)
 
             db_event.name = event.name
             db_event.contrat_id = event.contrat_id
@@ -319,9 +852,73 @@ class SQLAlchemyEventRepository:
             db_event.notes = event.notes
             db_event.updated_at = event.updated_at
 
-        self.session.commit()
+        if db_event.support_contact_id is not None and self._support_is_busy(db_event):
+            self.session.rollback()
+            raise BusinessRuleViolation(SUPPORT_OVERLAP_MESSAGE)
+
+        with self._support_overlap_violation(), _stale_data_as_conflict(self.session):
+            _update_support_summaries(self.session, old_summary, _event_summary(db_event))
+            reminder = _support_reminder(db_event)
+            if reminder is not None and reminder != old_reminder:
+                self.session.flush()
+                self.session.execute(insert(OutboxModel), [
+                    _outbox_row(EVENT_WITHOUT_SUPPORT, {"event_id": db_event.id}, reminder)
+                ])
+            if before_commit is not None:
+                self.session.flush()
+                before_commit(self._to_entity(db_event))
+            self.session.commit()
         return self._to_entity(db_event)
 
+    def _support_is_busy(self, db_event: EventModel) -> bool:
+        """
+        Checks if the support contact has another event overlapping this one
+        PostgreSQL relies on the exclusion constraint, elsewhere an ix_events_support_start range query
+        """
+        if self.session.get_bind().dialect.name == "postgresql":
+            return False
+
+        conditions = [
+            EventModel.support_contact_id == db_event.support_contact_id,
+            EventModel.start_date < db_event.end_date,
+            EventModel.end_date > db_event.start_date,
+        ]
+        if db_event.id is not None:
+            conditions.append(EventModel.id != db_event.id)
+        with self.session.no_autoflush:
+            return self.session.execute(select(exists().where(*conditions))).scalar()
+
+    def _supports_overlap(self, event_ids: List[int]) -> bool:
+        """
+        Checks if any of these events, once assigned, overlaps another event of its support contact
+        PostgreSQL relies on the exclusion constraint, elsewhere the ix_events_support_start range query
+        of _support_is_busy per event: run after the UPDATE, the write lock is held so no concurrent
+        assignment can slip in between
+        """
+        if self.session.get_bind().dialect.name == "postgresql":
+            return False
+
+        other = aliased(EventModel)
+        stmt = select(exists().where(
+            EventModel.id.in_(event_ids),
+            other.support_contact_id == EventModel.support_contact_id,
+            other.start_date < EventModel.end_date,
+            other.end_date > EventModel.start_date,
+            other.id != EventModel.id,
+        ))
+        return self.session.execute(stmt).scalar()
+
+    @contextmanager
+    def _support_overlap_violation(self):
+        """Turns a support overlap constraint violation into a BusinessRuleViolation"""
+        try:
+            yield
+        except IntegrityError as e:
+            self.session.rollback()
+            if getattr(getattr(e.orig, "diag", None), "constraint_name", None) == EVENT_SUPPORT_OVERLAP:
+                raise BusinessRuleViolation(SUPPORT_OVERLAP_MESSAGE) from e
+            raise
+
     def exist(self, event_id: int) -> bool:
         """Checks if a client exists in the database"""
         stmt = select(exists().where(EventModel.id == event_id))
@@ -337,22 +934,137 @@ class SQLAlchemyEventRepository:
 
     def find_all(self, criteres) -> List[Event]:
         """Finds all events in the database"""
-        stmt = select(EventModel)
+        stmt = self._apply_criteres(select(EventModel), criteres)
+
+        result = self.session.execute(stmt)
+        db_events = result.scalars().all()
+
+        return [self._to_entity(db_event) for db_event in db_events]
+
+    def find_all_rows(self, criteres) -> List[EventRow]:
+        """Finds all events, selecting only the columns displayed in lists"""
+        stmt = self._apply_criteres(self._select_rows(), criteres)
+        return [EventRow._make(row) for row in self.session.execute(stmt)]
+
+    def iter_all_rows(self, criteres) -> Iterator[EventRow]:
+        """Same rows as find_all_rows, fetched STREAM_BATCH_SIZE at a time while they are consumed"""
+        stmt = self._apply_criteres(self._select_rows(), criteres).execution_options(yield_per=STREAM_BATCH_SIZE)
+        for row in self.session.execute(stmt):
+            yield EventRow._make(row)
+
+    @staticmethod
+    def _select_rows():
+        """Select of the columns displayed in lists"""
+        return select(
+            EventModel.id,
+            EventModel.name,
+            EventModel.contrat_id,
+            EventModel.client_id,
+            EventModel.support_contact_id,
+            EventModel.start_date,
+            EventModel.end_date,
+            EventModel.location,
+            EventModel.attendees,
+        )
+
+    def _apply_criteres(self, stmt, criteres):
+        """
+        Applies list criteres to a select statement, ordered by start date
+        - date_from / date_to : events overlapping the period [date_from, date_to)
+        - after : (start_date, id) of the last event of the previous page
+        - limit : page size
+        - ids : restrict to these events
+        """
+        if criteres.get("ids") is not None:
+            stmt = stmt.where(EventModel.id.in_(criteres["ids"]))
+
         if criteres.get("support_contact_id"):
             stmt = stmt.where(EventModel.support_contact_id == criteres["support_contact_id"])
 
         if criteres.get("support_contact") is False:
             stmt = stmt.where(EventModel.support_contact_id == None)
 
-        result = self.session.execute(stmt)
-        db_events = result.scalars().all()
-
-        return [self._to_entity(db_event) for db_event in db_events]
+        if criteres.get("support_contact") is True:
+            stmt = stmt.where(EventModel.support_contact_id != None)
 
-    def delete(self, event_id: int) -> None:
-        """Deletes an event"""
+        date_from, date_to = criteres.get("date_from"), criteres.get("date_to")
+        if self.session.get_bind().dialect.name == "postgresql":
+            # tsrange bounds left to NULL are unbounded, uses the ix_events_period GiST index
+            if date_from is not None or date_to is not None:
+                stmt = stmt.where(
+                    func.tsrange(EventModel.start_date, EventModel.end_date).op("&&")(func.tsrange(date_from, date_to))
+                )
+        else:
+            if date_from is not None:
+                stmt = stmt.where(EventModel.end_date > date_from)
+            if date_to is not None:
+                stmt = stmt.where(EventModel.start_date < date_to)
+
+        if criteres.get("after"):
+            stmt = stmt.where(tuple_(EventModel.start_date, EventModel.id) > tuple_(*criteres["after"]))
+
+        stmt = stmt.order_by(EventModel.start_date, EventModel.id)
+        if criteres.get("limit"):
+            stmt = stmt.limit(criteres["limit"])
+
+        return stmt
+
+    def assign_supports(self, assignments: dict[int, int],
+                        before_commit: Optional[Callable[[dict[int, int]], None]] = None) -> dict[int, int]:
+        """
+        Assigns support contacts to events in one batched UPDATE
+        Events assigned in the meantime are left untouched
+        :param assignments: {event id: support id}
+        :param before_commit: called with the assignments written before the commit, in the same transaction
+        :return: assignments actually written
+        :raises BusinessRuleViolation: an assignment overlaps another event of the same support contact
+        """
+        if not assignments:
+            return {}
+
+        still_unassigned = self.session.execute(
+            select(EventModel.id, EventModel.start_date)
+            .where(EventModel.id.in_(list(assignments)), EventModel.support_contact_id == None)
+            .with_for_update()
+        ).all()
+        applied = {event_id: assignments[event_id] for event_id, _ in still_unassigned}
+        if not applied:
+            return {}
+
+        table = EventModel.__table__
+        now = datetime.now()
+        with self._support_overlap_violation():
+            self.session.execute(
+                update(table)
+                .where(table.c.id == bindparam("event_id"))
+                .values(support_contact_id=bindparam("support_id"), updated_at=now, version=table.c.version + 1),
+                [{"event_id": event_id, "support_id": support_id} for event_id, support_id in applied.items()]
+            )
+            if self._supports_overlap(list(applied)):
+                self.session.rollback()
+                raise BusinessRuleViolation(SUPPORT_OVERLAP_MESSAGE)
+
+            per_day = Counter((applied[event_id], start_date.date()) for event_id, start_date in still_unassigned)
+            _increment_many(
+                self.session, SupportEventSummaryModel, ["support_contact_id", "day"],
+                [
+                    {"support_contact_id": support_contact_id, "day": day, "event_count": count}
+                    for (support_contact_id, day), count in per_day.items()
+                ]
+            )
+            _notify_changes(self.session, "event", applied)
+            if before_commit is not None:
+                before_commit(applied)
+            self.session.commit()
+        return applied
+
+    def delete(self, event_id: int, before_commit: Optional[Callable[[], None]] = None) -> None:
+        """Deletes an event, `before_commit` is called in the same transaction"""
         find_event = self.session.get(EventModel, event_id)
+        _update_support_summaries(self.session, _event_summary(find_event), None)
         self.session.delete(find_event)
+        if before_commit is not None:
+            before_commit()
         self.session.commit()
 
     @staticmethod
@@ -370,5 +1082,623 @@ class SQLAlchemyEventRepository:
             attendees=model.attendees,
             notes=model.notes,
             created_at=model.created_at,
-            updated_at=model.updated_at
+            updated_at=model.updated_at,
+            version=model.version,
+        )
+
+
+###########################################################################################
+#                       DASHBOARD
+###########################################################################################
+def _increment(session: Session, model, keys: dict, deltas: dict) -> None:
+    """Adds deltas to a summary row, creating it if needed"""
+    _increment_many(session, model, list(keys), [{**keys, **deltas}])
+
+
+def _increment_many(session: Session, model, key_columns: List[str], rows: List[dict]) -> None:
+    """Adds deltas to many summary rows, in one batched upsert when the dialect supports it"""
+    table = model.__table__
+    delta_columns = [column for column in rows[0] if column not in key_columns]
+    dialect = session.get_bind().dialect.name
+
+    if dialect in ("postgresql", "sqlite"):
+        dialect_insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        stmt = dialect_insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=key_columns,
+            set_={column: table.c[column] + stmt.excluded[column] for column in delta_columns}
+        )
+        session.execute(stmt, rows)
+        return
+
+    for row in rows:
+        result = session.execute(
+            update(table)
+            .where(*[table.c[column] == row[column] for column in key_columns])
+            .values({column: table.c[column] + row[column] for column in delta_columns})
+        )
+        if result.rowcount == 0:
+            session.execute(insert(table).values(**row))
+
+
+def _get_for_update(session: Session, model, entity):
+    """
+    Loads the row of an entity about to be saved, checking the entity was read from its current version;
+    the version column then guards the UPDATE against writes committed in the meantime
+    :raises ConcurrentModificationError: the row was updated or deleted since the entity was read
+    """
+    db_row = session.get(model, entity.id)
+    if db_row is None or (entity.version is not None and entity.version != db_row.version):
+        session.rollback()
+        raise ConcurrentModificationError(f"{model.__tablename__} #{entity.id}")
+    return db_row
+
+
+@contextmanager
+def _stale_data_as_conflict(session: Session):
+    """Turns an UPDATE matching no row at the expected version into a ConcurrentModificationError"""
+    try:
+        yield
+    except StaleDataError as e:
+        session.rollback()
+        raise ConcurrentModificationError(str(e)) from e
+
+
+BULK_BATCH_SIZE = 1000
+
+
+def _batches(ids: List[int]) -> List[List[int]]:
+    """Splits ids in batches of BULK_BATCH_SIZE"""
+    return [ids[start:start + BULK_BATCH_SIZE] for start in range(0, len(ids), BULK_BATCH_SIZE)]
+
+
+def _add_commercial_deltas(session: Session, deltas: Counter, column: str) -> None:
+    """Adds per commercial deltas of one column to commercial_summaries, rows locked in commercial id order"""
+    rows = [
+        {"commercial_contact_id": commercial_id, "contrat_count": 0, "signed_count": 0,
+         "total_amount_cents": 0, "balance_due_cents": 0, column: delta}
+        for commercial_id, delta in sorted(deltas.items()) if delta
+    ]
+    if rows:
+        _increment_many(session, CommercialSummaryModel, ["commercial_contact_id"], rows)
+
+
+def _contrat_summary(model: ContratModel) -> tuple:
+    """Contribution of one contrat to commercial_summaries"""
+    return (
+        model.commercial_contact_id,
+        1 if model.status == ContractStatus.SIGNED else 0,
+        model.contrat_amount_cents,
+        model.balance_due_cents,
+    )
+
+
+def _update_commercial_summaries(session: Session, old: Optional[tuple], new: Optional[tuple]) -> None:
+    """Moves a contrat contribution from old to new in commercial_summaries"""
+    deltas: dict[int, list] = {}
+    for contribution, sign in ((old, -1), (new, 1)):
+        if contribution is None:
+            continue
+        commercial_contact_id, signed, amount, balance = contribution
+        delta = deltas.setdefault(commercial_contact_id, [0, 0, 0, 0])
+        for index, value in enumerate((1, signed, amount, balance)):
+            delta[index] += sign * value
+
+    for commercial_contact_id, (count, signed, amount, balance) in deltas.items():
+        if count or signed or amount or balance:
+            _increment(
+                session, CommercialSummaryModel,
+                {"commercial_contact_id": commercial_contact_id},
+                {"contrat_count": count, "signed_count": signed,
+                 "total_amount_cents": amount, "balance_due_cents": balance},
+            )
+
+
+def _support_reminder(model: EventModel) -> Optional[datetime]:
+    """Date of the reminder of an event without support contact, None if it has one"""
+    if model.support_contact_id is not None:
+        return None
+    return model.start_date - timedelta(days=EVENT_SUPPORT_REMINDER_DAYS)
+
+
+def _event_summary(model: EventModel) -> Optional[tuple]:
+    """Contribution of one event to support_event_summaries"""
+    if model.support_contact_id is None:
+        return None
+    return model.support_contact_id, model.start_date.date()
+
+
+def _update_support_summaries(session: Session, old: Optional[tuple], new: Optional[tuple]) -> None:
+    """Moves an event contribution from old to new in support_event_summaries"""
+    if old == new:
+        return
+    for contribution, sign in ((old, -1), (new, 1)):
+        if contribution is None:
+            continue
+        support_contact_id, day = contribution
+        _increment(
+            session, SupportEventSummaryModel,
+            {"support_contact_id": support_contact_id, "day": day},
+            {"event_count": sign},
+        )
+
+
+class SQLAlchemyDashboardRepository:
+    """SQL Alchemy Dashboard repository, reads summary tables maintained by the contrat and event repositories"""
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def commercial_summaries(self) -> List[CommercialReportRow]:
+        """Reads contrat totals per commercial from commercial_summaries"""
+        stmt = (
+            select(
+                CommercialSummaryModel.commercial_contact_id,
+                UserModel.fullname,
+                CommercialSummaryModel.contrat_count,
+                CommercialSummaryModel.signed_count,
+                CommercialSummaryModel.total_amount_cents,
+                CommercialSummaryModel.balance_due_cents,
+            )
+            .outerjoin(UserModel, UserModel.id == CommercialSummaryModel.commercial_contact_id)
+            .where(CommercialSummaryModel.contrat_count > 0)
+            .order_by(CommercialSummaryModel.commercial_contact_id)
+        )
+        return [
+            CommercialReportRow(id, fullname, count, signed, Money.from_cents(amount), Money.from_cents(balance))
+            for id, fullname, count, signed, amount, balance in self.session.execute(stmt)
+        ]
+
+    def support_summaries(self, from_day: date) -> List[SupportSummaryRow]:
+        """Reads upcoming event count per support from support_event_summaries"""
+        stmt = (
+            select(
+                SupportEventSummaryModel.support_contact_id,
+                UserModel.fullname,
+                func.sum(SupportEventSummaryModel.event_count),
+            )
+            .outerjoin(UserModel, UserModel.id == SupportEventSummaryModel.support_contact_id)
+            .where(SupportEventSummaryModel.day >= from_day)
+            .group_by(SupportEventSummaryModel.support_contact_id, UserModel.fullname)
+            .having(func.sum(SupportEventSummaryModel.event_count) > 0)
+            .order_by(SupportEventSummaryModel.support_contact_id)
+        )
+        return [
+            SupportSummaryRow(id, fullname, int(count))
+            for id, fullname, count in self.session.execute(stmt)
+        ]
+
+    def _expected_commercial(self) -> dict:
+        """Commercial summaries recomputed from contrats"""
+        stmt = (
+            select(
+                ContratModel.commercial_contact_id,
+                func.count(ContratModel.id),
+                func.sum(case((ContratModel.status == ContractStatus.SIGNED, 1), else_=0)),
+                func.sum(ContratModel.contrat_amount_cents),
+                func.sum(ContratModel.balance_due_cents),
+            )
+            .group_by(ContratModel.commercial_contact_id)
+        )
+        return {
+            id: (count, int(signed), int(amount), int(balance))
+            for id, count, signed, amount, balance in self.session.execute(stmt)
+        }
+
+    def _expected_support(self) -> dict:
+        """Support event summaries recomputed from events"""
+        day = func.date(EventModel.start_date, type_=Date)
+        stmt = (
+            select(EventModel.support_contact_id, day, func.count(EventModel.id))
+            .where(EventModel.support_contact_id != None)
+            .group_by(EventModel.support_contact_id, day)
+        )
+        return {(id, event_day): (count,) for id, event_day, count in self.session.execute(stmt)}
+
+    def check(self) -> List[SummaryDiff]:
+        """Compares stored summaries with the values rebuilt from contrats and events"""
+        diffs = []
+
+        actual = {
+            row.commercial_contact_id: (
+                row.contrat_count, row.signed_count, row.total_amount_cents, row.balance_due_cents
+            )
+            for row in self.session.execute(select(CommercialSummaryModel)).scalars()
+        }
+        expected = self._expected_commercial()
+        for key in sorted(expected.keys() | actual.keys()):
+            expected_row = expected.get(key, (0, 0, 0, 0))
+            actual_row = actual.get(key, (0, 0, 0, 0))
+            if expected_row != actual_row:
+                diffs.append(SummaryDiff(CommercialSummaryModel.__tablename__, str(key), expected_row, actual_row))
+
+        actual = {
+            (row.support_contact_id, row.day): (row.event_count,)
+            for row in self.session.execute(select(SupportEventSummaryModel)).scalars()
+        }
+        expected = self._expected_support()
+        for key in sorted(expected.keys() | actual.keys()):
+            expected_row = expected.get(key, (0,))
+            actual_row = actual.get(key, (0,))
+            if expected_row != actual_row:
+                diffs.append(SummaryDiff(
+                    SupportEventSummaryModel.__tablename__, f"{key[0]}:{key[1]}", expected_row, actual_row
+                ))
+
+        return diffs
+
+    def rebuild(self) -> None:
+        """
+        Recomputes every summary row from contrats and events, in one transaction
+        Summary writes of concurrent transactions wait for its commit: a delta is either committed before
+        the rebuild reads the source tables, so counted there, or applied on top of the rebuilt rows
+        """
+        if self.session.get_bind().dialect.name == "postgresql":
+            # EXCLUSIVE mode lets the dashboard read the summaries, waits for the transactions writing them
+            self.session.execute(text(
+                f"LOCK TABLE {CommercialSummaryModel.__tablename__}, {SupportEventSummaryModel.__tablename__} "
+                "IN EXCLUSIVE MODE"
+            ))
+        # deleting first takes the write lock of the other dialects (SQLite: the database) before computing
+        self.session.execute(delete(CommercialSummaryModel))
+        self.session.execute(delete(SupportEventSummaryModel))
+        commercial = self._expected_commercial()
+        support = self._expected_support()
+
+        if commercial:
+            self.session.execute(insert(CommercialSummaryModel), [
+                {"commercial_contact_id": id, "contrat_count": count, "signed_count": signed,
+                 "total_amount_cents": amount, "balance_due_cents": balance}
+                for id, (count, signed, amount, balance) in commercial.items()
+            ])
+        if support:
+            self.session.execute(insert(SupportEventSummaryModel), [
+                {"support_contact_id": id, "day": day, "event_count": count}
+                for (id, day), (count,) in support.items()
+            ])
+        self.session.commit()
+
+
+###########################################################################################
+#                       AUDIT
+###########################################################################################
+class SQLAlchemyAuditRepository:
+    """
+    SQL Alchemy Audit repository
+    Entries are buffered on the session and written with one executemany INSERT by the next commit:
+    use cases record them from the `before_commit` hook of the write they describe, so both are committed
+    or rolled back together
+    """
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def record(self, entries: List[AuditEntry]) -> None:
+        """Buffers entries until the next commit of the session"""
+        _buffer_inserts(self.session, AuditModel, [entry._asdict() for entry in entries])
+
+    def flush(self) -> int:
+        """Writes the buffered entries now, returns their number"""
+        count = len(self.session.info.get(PENDING_INSERTS, {}).get(AuditModel, ()))
+        if count:
+            self.session.commit()
+        return count
+
+    def find_by_entity(self, entity: AuditedEntity, entity_id: int, limit: int = 50) -> List[AuditEntry]:
+        """Entries of a client, contrat or event, latest first"""
+        stmt = (
+            select(
+                AuditModel.entity, AuditModel.entity_id, AuditModel.action, AuditModel.actor_id,
+                AuditModel.changes, AuditModel.created_at,
+            )
+            .where(AuditModel.entity == entity, AuditModel.entity_id == entity_id)
+            .order_by(AuditModel.id.desc())
+            .limit(limit)
+        )
+        return [AuditEntry(*row) for row in self.session.execute(stmt)]
+
+    def last_id(self) -> int:
+        """Id of the latest entry, 0 for an empty log"""
+        return self.session.execute(select(func.coalesce(func.max(AuditModel.id), 0))).scalar()
+
+    def find_changed(self, after_id: int) -> Tuple[int, Dict[AuditedEntity, Set[int]]]:
+        """
+        Ids of the clients, contrats and events created, updated or deleted after an entry
+        :return: id of the latest entry, ids changed per entity
+        """
+        stmt = select(AuditModel.id, AuditModel.entity, AuditModel.entity_id).where(AuditModel.id > after_id)
+        changed = {}
+        for entry_id, entity, entity_id in self.session.execute(stmt):
+            changed.setdefault(entity, set()).add(entity_id)
+            after_id = max(after_id, entry_id)
+        return after_id, changed
+
+
+###########################################################################################
+#                       LABEL
+###########################################################################################
+class SQLAlchemyLabelRepository:
+    """SQL Alchemy Label repository, one projection query per entity, never hydrates models"""
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def find_labels(self, entity: str, ids: Optional[Iterable[int]] = None) -> Dict[int, str]:
+        """Labels of "client", "contrat", "event" or "user", all of them or of the given ids"""
+        match entity:
+            case "client":
+                model = ClientModel
+                stmt = select(ClientModel.id, ClientModel.fullname, ClientModel.company_name)
+                label = lambda fullname, company_name: f"{fullname} ({company_name})"
+            case "contrat":
+                model = ContratModel
+                stmt = select(
+                    ContratModel.id, ClientModel.fullname, ContratModel.contrat_amount_cents, ContratModel.status
+                ).join(ClientModel, ContratModel.client_id == ClientModel.id)
+                label = lambda fullname, cents, status: f"{fullname} - {Money.from_cents(cents)} - {status.value}"
+            case "event":
+                model = EventModel
+                stmt = select(EventModel.id, EventModel.name, EventModel.start_date)
+                label = lambda name, start_date: f"{name} ({start_date.strftime('%d/%m/%Y')})"
+            case "user":
+                model = UserModel
+                stmt = select(UserModel.id, UserModel.fullname, UserModel.role)
+                label = lambda fullname, role: f"{fullname} ({role.value})"
+            case _:
+                raise ValueError(f"Entité inconnue: {entity}")
+
+        if ids is None:
+            return {row[0]: label(*row[1:]) for row in self.session.execute(stmt)}
+        ids = list(ids)
+        labels = {}
+        for start in range(0, len(ids), BULK_BATCH_SIZE):
+            chunk = stmt.where(model.id.in_(ids[start:start + BULK_BATCH_SIZE]))
+            labels.update({row[0]: label(*row[1:]) for row in self.session.execute(chunk)})
+        return labels
+
+    def users_version(self) -> Tuple[int, Optional[datetime]]:
+        """Number of users and latest update, users are not in the audit log"""
+        return tuple(self.session.execute(select(func.count(UserModel.id), func.max(UserModel.updated_at))).one())
+
+
+###########################################################################################
+#                       OUTBOX
+###########################################################################################
+# a claimed message not completed or released within this delay (worker stopped) is claimed again
+OUTBOX_LEASE_SECONDS = 60
+# messages failing this many times are kept in the outbox but no longer claimed
+OUTBOX_MAX_ATTEMPTS = 8
+
+
+class SQLAlchemyOutboxRepository:
+    """
+    SQL Alchemy Outbox repository
+    Messages are published in the transaction of the changes that cause them,
+    then claimed by workers with a lease so that several workers can drain the outbox
+    """
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def publish(self, topic: str, payload: dict, available_at: Optional[datetime] = None) -> None:
+        """Buffers a message until the next commit of the session"""
+        _buffer_inserts(self.session, OutboxModel, [_outbox_row(topic, payload, available_at)])
+
+    def claim(self, limit: int, lease_seconds: int = OUTBOX_LEASE_SECONDS) -> List[OutboxMessage]:
+        """
+        Leases up to `limit` available messages, oldest first
+        SKIP LOCKED lets concurrent workers claim other messages instead of waiting (PostgreSQL),
+        SQLite serializes the UPDATE instead
+        """
+        now = datetime.now()
+        available = (
+            select(OutboxModel.id)
+            .where(
+                OutboxModel.processed_at == None,
+                OutboxModel.available_at <= now,
+                OutboxModel.attempts < OUTBOX_MAX_ATTEMPTS,
+            )
+            .order_by(OutboxModel.available_at, OutboxModel.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        rows = self.session.execute(
+            update(OutboxModel)
+            .where(OutboxModel.id.in_(available.scalar_subquery()))
+            .values(attempts=OutboxModel.attempts + 1, available_at=now + timedelta(seconds=lease_seconds))
+            .returning(OutboxModel.id, OutboxModel.topic, OutboxModel.payload, OutboxModel.attempts)
+            .execution_options(synchronize_session=False)
+        ).all()
+        self.session.commit()
+        return sorted(OutboxMessage(*row) for row in rows)
+
+    def complete(self, message_ids: List[int]) -> None:
+        """Marks messages as processed"""
+        if not message_ids:
+            return
+        self.session.execute(
+            update(OutboxModel)
+            .where(OutboxModel.id.in_(message_ids))
+            .values(processed_at=datetime.now(), last_error=None)
+            .execution_options(synchronize_session=False)
+        )
+        self.session.commit()
+
+    def retry(self, failures: dict[int, tuple[datetime, str]]) -> None:
+        """Releases failed messages until their next attempt, keeping the error"""
+        if not failures:
+            return
+        table = OutboxModel.__table__
+        self.session.execute(
+            update(table)
+            .where(table.c.id == bindparam("b_id"))
+            .values(available_at=bindparam("b_available_at"), last_error=bindparam("b_error")),
+            [
+                {"b_id": message_id, "b_available_at": available_at, "b_error": error[:1000]}
+                for message_id, (available_at, error) in failures.items()
+            ]
+        )
+        self.session.commit()
+
+
+def _outbox_row(topic: str, payload: dict, available_at: Optional[datetime] = None) -> dict:
+    now = datetime.now()
+    return {"topic": topic, "payload": payload, "created_at": now, "available_at": available_at or now, "attempts": 0}
+
+
+###########################################################################################
+#                       JOB
+###########################################################################################
+JOB_COLUMNS = (
+    JobModel.id, JobModel.kind, JobModel.params, JobModel.status, JobModel.progress, JobModel.total,
+    JobModel.result_path, JobModel.error, JobModel.created_by, JobModel.created_at, JobModel.finished_at,
+)
+
+
+class SQLAlchemyJobRepository:
+    """
+    SQL Alchemy Job repository
+    State changes are conditional UPDATEs on the status, committed at once,
+    so that the CLI sees the progress of the worker processes and a cancel is never overwritten
+    """
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def create(self, kind: str, params: dict, created_by: int) -> Job:
+        """Saves a pending job"""
+        db_job = JobModel(
+            kind=kind, params=params, status=JobStatus.PENDING, progress=0,
+            created_by=created_by, created_at=datetime.now(),
         )
+        self.session.add(db_job)
+        self.session.commit()
+        return self.find_by_id(db_job.id)
+
+    def find_by_id(self, job_id: int) -> Optional[Job]:
+        row = self.session.execute(select(*JOB_COLUMNS).where(JobModel.id == job_id)).one_or_none()
+        return None if row is None else Job(*row)
+
+    def find_all(self, created_by: Optional[int] = None, limit: int = 20) -> List[Job]:
+        """Latest jobs first"""
+        stmt = select(*JOB_COLUMNS).order_by(JobModel.id.desc()).limit(limit)
+        if created_by is not None:
+            stmt = stmt.where(JobModel.created_by == created_by)
+        return [Job(*row) for row in self.session.execute(stmt)]
+
+    def find_pending(self) -> List[int]:
+        job_ids = self.session.scalars(
+            select(JobModel.id).where(JobModel.status == JobStatus.PENDING).order_by(JobModel.id)
+        ).all()
+        self.session.commit()
+        return list(job_ids)
+
+    def start(self, job_id: int) -> bool:
+        return self._transition(job_id, (JobStatus.PENDING,), status=JobStatus.RUNNING, started_at=datetime.now())
+
+    def report_progress(self, job_id: int, progress: int, total: int) -> bool:
+        return self._transition(job_id, (JobStatus.RUNNING,), progress=progress, total=total)
+
+    def finish(self, job_id: int, result_path: str) -> None:
+        self._transition(
+            job_id, (JobStatus.RUNNING,),
+            status=JobStatus.DONE, progress=func.coalesce(JobModel.total, JobModel.progress), result_path=result_path, finished_at=datetime.now(),
+        )
+
+    def fail(self, job_id: int, error: str) -> None:
+        self._transition(
+            job_id, (JobStatus.PENDING, JobStatus.RUNNING),
+            status=JobStatus.FAILED, error=error[:1000], finished_at=datetime.now(),
+        )
+
+    def cancel(self, job_id: int) -> bool:
+        return self._transition(
+            job_id, (JobStatus.PENDING, JobStatus.RUNNING), status=JobStatus.CANCELLED, finished_at=datetime.now()
+        )
+
+    def _transition(self, job_id: int, statuses: tuple, **values) -> bool:
+        """Updates the job only if its status is one of `statuses`, returns whether it was updated"""
+        result = self.session.execute(
+            update(JobModel)
+            .where(JobModel.id == job_id, JobModel.status.in_(statuses))
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+        self.session.commit()
+        return result.rowcount == 1
+
+
+###########################################################################################
+#                       CHANGE NOTIFICATIONS
+###########################################################################################
+# PostgreSQL channel of the committed changes, payload "<entity>:<id>", or "<entity>:*" when many ids changed
+CHANGES_CHANNEL = "crm_changes"
+ALL_IDS = "*"
+# above this many ids of an entity in one flush or bulk UPDATE, a single "<entity>:*" is sent
+NOTIFY_MAX_IDS = 100
+NOTIFIED_MODELS = {ClientModel: "client", ContratModel: "contrat", EventModel: "event", UserModel: "user"}
+
+
+def _notify_changes(session: Session, entity: str, ids: Iterable[int]) -> None:
+    """
+    NOTIFY the ids written in the transaction of the session: PostgreSQL delivers them to the listeners
+    on commit only and drops them on rollback
+    Other dialects have no NOTIFY, their listeners poll the audit log instead
+    """
+    if session.get_bind().dialect.name != "postgresql":
+        return
+    ids = set(ids)
+    if not ids:
+        return
+    if len(ids) > NOTIFY_MAX_IDS:
+        payloads = [f"{entity}:{ALL_IDS}"]
+    else:
+        payloads = [f"{entity}:{entity_id}" for entity_id in sorted(ids)]
+    # connection(), not execute(): no autoflush, this also runs inside a flush
+    session.connection().execute(
+        text("SELECT pg_notify(:channel, payload) FROM unnest(CAST(:payloads AS text[])) AS payload"),
+        {"channel": CHANGES_CHANNEL, "payloads": payloads},
+    )
+
+
+@event.listens_for(Session, "after_flush")
+def _notify_flushed_changes(session: Session, flush_context) -> None:
+    """Clients, contrats, events and users created, updated or deleted by the ORM, bulk UPDATEs notify themselves"""
+    if session.get_bind().dialect.name != "postgresql":
+        return
+    changed = {}
+    for instance in session.new | session.deleted:
+        entity = NOTIFIED_MODELS.get(type(instance))
+        if entity is not None:
+            changed.setdefault(entity, set()).add(instance.id)
+    for instance in session.dirty:
+        entity = NOTIFIED_MODELS.get(type(instance))
+        if entity is not None and session.is_modified(instance):
+            changed.setdefault(entity, set()).add(instance.id)
+    for entity, ids in changed.items():
+        _notify_changes(session, entity, ids)
+
+
+###########################################################################################
+#                       PENDING INSERTS
+###########################################################################################
+# session.info key: rows waiting to be inserted by the next commit per model
+PENDING_INSERTS = "pending_inserts"
+
+
+def _buffer_inserts(session: Session, model, rows: List[dict]) -> None:
+    """Buffers rows until the next commit of the session, which inserts them in its transaction"""
+    session.info.setdefault(PENDING_INSERTS, {}).setdefault(model, []).extend(rows)
+
+
+@event.listens_for(Session, "before_commit")
+def _write_pending_inserts(session: Session) -> None:
+    for model, rows in session.info.pop(PENDING_INSERTS, {}).items():
+        if rows:
+            session.execute(insert(model), rows)
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_pending_inserts(session: Session) -> None:
+    # the rows describe writes of the transaction rolled back, they must not be written by a later commit
+    session.info.pop(PENDING_INSERTS, None)
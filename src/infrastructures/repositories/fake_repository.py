@@ -1,6 +1,28 @@
-from typing import List, Optional
+from datetime import date, datetime
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
 
 from src.domain.entities.entities import Client, User, Contrat, Event
+from src.domain.entities.enums import ContractStatus, AuditedEntity, JobStatus
+from src.domain.entities.exceptions import BusinessRuleViolation, DuplicateRequestError, ConcurrentModificationError
+from src.domain.entities.read_models import ClientRow, ContratRow, EventRow, CommercialReportRow, ClientReportRow, \
+    StatusReportRow, SupportSummaryRow, SummaryDiff, PaymentRow, CashInRow, PaymentReceipt, AuditEntry, \
+    OutboxMessage, Job
+from src.domain.entities.value_objects import sum_money, Money
+from src.infrastructures.search.trigram import TrigramIndex
+
+
+def _commit(result, before_commit: Optional[Callable] = None):
+    """Calls `before_commit` with the result of a successful write, as the SQL repositories do before committing"""
+    if before_commit is not None and result is not None:
+        before_commit(result)
+    return result
+
+
+def _bump_version(stored, entity=None) -> None:
+    """Checks the entity, if given, was read from the stored version, then increments it"""
+    if entity is not None and entity.version is not None and entity.version != stored.version:
+        raise ConcurrentModificationError(f"#{entity.id}")
+    stored.version = (stored.version or 0) + 1
 
 
 class FakeClientRepository:
@@ -9,24 +31,26 @@ class FakeClientRepository:
         self.clients: dict[int, Client] = {}
         self._id_counter = 1
 
-    def save(self, client: Client) -> Client:
+    def save(self, client: Client, before_commit: Optional[Callable[[Client], None]] = None) -> Client:
 
         if client.id is None:
             # nouveau client
             client.id = self._id_counter
+            client.version = 1
             self._id_counter += 1
             self.clients[client.id] = client
-            return client
+            return _commit(client, before_commit)
 
         if client.id in self.clients:
             # modification client
             data_client = self.clients.get(client.id)
             if data_client:
+                _bump_version(data_client, client)
                 data_client.fullname = client.fullname
                 data_client.email = client.email
                 data_client.telephone = client.telephone
                 data_client.company_name = client.company_name
-                return client
+                return _commit(client, before_commit)
 
     def find_by_id(self, client_id: int) -> Optional[Client]:
         return self.clients.get(client_id)
@@ -34,8 +58,29 @@ class FakeClientRepository:
     def find_all(self, criteres) -> List[Client]:
         return list(self.clients.values())
 
-    def delete(self, client_id: int) -> None:
+    def iter_all_rows(self, criteres) -> Iterator[ClientRow]:
+        return iter(self.find_all_rows(criteres))
+
+    def find_all_rows(self, criteres) -> List[ClientRow]:
+        rows = [
+            ClientRow(c.id, c.fullname, str(c.email), str(c.telephone),
+                      c.company_name, c.commercial_contact_id)
+            for c in sorted(self.clients.values(), key=lambda c: c.id)
+            if not criteres.get("after") or c.id > criteres["after"]
+        ]
+        return rows[:criteres["limit"]] if criteres.get("limit") else rows
+
+    def search(self, query: str, limit: int, offset: int) -> List[ClientRow]:
+        index = TrigramIndex(
+            (c.id, f"{c.fullname} {c.company_name} {c.email}") for c in self.clients.values()
+        )
+        rows = {row.id: row for row in self.find_all_rows({})}
+        return [rows[client_id] for client_id, _ in index.search(query, limit=offset + limit)][offset:]
+
+    def delete(self, client_id: int, before_commit: Optional[Callable[[], None]] = None) -> None:
         self.clients.pop(client_id, None)
+        if before_commit is not None:
+            before_commit()
 
     def exist(self, client_id: int) -> bool:
         if client_id in self.clients:
@@ -53,12 +98,14 @@ class FakeUserRepository:
     def save(self, user: User) -> User:
         if user.id is None:
             user.id = self._id_counter
+            user.version = 1
             self._id_counter += 1
             self.users[user.id] = user
             return user
 
         if user.id in self.users:
             data_user = self.users[user.id]
+            _bump_version(data_user, user)
             data_user.fullname = user.fullname
             data_user.email = user.email
             data_user.password = user.password
@@ -70,7 +117,8 @@ class FakeUserRepository:
         return self.users.get(user_id)
 
     def find_all(self, criteres) -> List[User]:
-        return list(self.users.values())
+        role = criteres.get("role")
+        return [user for user in self.users.values() if role is None or user.role == role]
 
     def find_by_email(self, email: str) -> Optional[User]:
         for user in self.users.values():
@@ -92,24 +140,28 @@ class FakeContratRepository:
     # Fake contrat repo for test
     def __init__(self):
         self.contrats: dict[int, Contrat] = {}
+        self.payments: List[PaymentRow] = []
+        self.receipts: dict[str, PaymentReceipt] = {}
         self._id_counter = 1
 
-    def save(self, contrat: Contrat) -> Contrat:
+    def save(self, contrat: Contrat, before_commit: Optional[Callable[[Contrat], None]] = None) -> Contrat:
         if contrat.id is None:
             contrat.id = self._id_counter
+            contrat.version = 1
             self._id_counter += 1
             self.contrats[contrat.id] = contrat
-            return contrat
+            return _commit(contrat, before_commit)
 
         if contrat.id in self.contrats:
             data_contrat = self.contrats[contrat.id]
+            _bump_version(data_contrat, contrat)
             data_contrat.client_id = contrat.client_id
             data_contrat.commercial_contact_id = contrat.commercial_contact_id
             data_contrat.contrat_amount = contrat.contrat_amount
             data_contrat.balance_due = contrat.balance_due
             data_contrat.status = contrat.status
             data_contrat.updated_at = contrat.updated_at
-            return data_contrat
+            return _commit(data_contrat, before_commit)
 
     def find_by_id(self, contrat_id: int) -> Optional[Contrat]:
         return self.contrats.get(contrat_id)
@@ -117,8 +169,104 @@ class FakeContratRepository:
     def find_all(self, criteres) -> List[Contrat]:
         return list(self.contrats.values())
 
-    def delete(self, contrat_id: int) -> None:
+    def iter_all_rows(self, criteres) -> Iterator[ContratRow]:
+        return iter(self.find_all_rows(criteres))
+
+    def find_all_rows(self, criteres) -> List[ContratRow]:
+        ids = criteres.get("ids")
+        rows = [
+            ContratRow(c.id, c.client_id, c.commercial_contact_id,
+                       c.contrat_amount, c.balance_due, c.status)
+            for c in sorted(self.contrats.values(), key=lambda c: c.id)
+            if (ids is None or c.id in ids)
+            and (not criteres.get("after") or c.id > criteres["after"])
+        ]
+        return rows[:criteres["limit"]] if criteres.get("limit") else rows
+
+    def sign_many(self, contrat_ids: List[int],
+                  before_commit: Optional[Callable[[List[int]], None]] = None) -> List[int]:
+        signed = []
+        for contrat_id in contrat_ids:
+            contrat = self.contrats.get(contrat_id)
+            if contrat and contrat.status == ContractStatus.UNSIGNED:
+                contrat.status = ContractStatus.SIGNED
+                _bump_version(contrat)
+                signed.append(contrat_id)
+        return _commit(signed, before_commit)
+
+    def find_payment_receipt(self, idempotency_key: str) -> Optional[PaymentReceipt]:
+        return self.receipts.get(idempotency_key)
+
+    def record_payment(self, contrat_id: int, payment_cents: int, idempotency_key: Optional[str] = None,
+                       before_commit: Optional[Callable[[Contrat], None]] = None) -> Optional[Contrat]:
+        contrat = self.contrats.get(contrat_id)
+        if not contrat or contrat.status != ContractStatus.SIGNED or contrat.balance_due.cents < payment_cents:
+            return None
+        if idempotency_key in self.receipts:
+            raise DuplicateRequestError(idempotency_key)
+        contrat.balance_due = Money.from_cents(contrat.balance_due.cents - payment_cents)
+        _bump_version(contrat)
+        self._append_payment(contrat_id, payment_cents)
+        if idempotency_key is not None:
+            self.receipts[idempotency_key] = PaymentReceipt(
+                idempotency_key, contrat_id, Money.from_cents(payment_cents), contrat.balance_due, datetime.now()
+            )
+        return _commit(contrat, before_commit)
+
+    def record_payments(self, payments: dict[int, int],
+                        before_commit: Optional[Callable[[List[int]], None]] = None) -> List[int]:
+        paid = []
+        for contrat_id, cents in payments.items():
+            contrat = self.contrats.get(contrat_id)
+            if contrat and contrat.status == ContractStatus.SIGNED and contrat.balance_due.cents >= cents:
+                contrat.balance_due = Money.from_cents(contrat.balance_due.cents - cents)
+                _bump_version(contrat)
+                self._append_payment(contrat_id, cents)
+                paid.append(contrat_id)
+        return _commit(paid, before_commit)
+
+    def _append_payment(self, contrat_id: int, cents: int) -> None:
+        self.payments.append(PaymentRow(len(self.payments) + 1, contrat_id, Money.from_cents(cents), datetime.now()))
+
+    def delete(self, contrat_id: int, before_commit: Optional[Callable[[], None]] = None) -> None:
         self.contrats.pop(contrat_id, None)
+        self.payments = [payment for payment in self.payments if payment.contrat_id != contrat_id]
+        if before_commit is not None:
+            before_commit()
+
+    def _group_by(self, key) -> dict[object, List[Contrat]]:
+        groups: dict[object, List[Contrat]] = {}
+        for contrat in self.contrats.values():
+            groups.setdefault(key(contrat), []).append(contrat)
+        return dict(sorted(groups.items(), key=lambda item: str(item[0])))
+
+    def report_by_commercial(self) -> List[CommercialReportRow]:
+        return [
+            CommercialReportRow(
+                commercial_id, None, len(contrats),
+                sum(1 for c in contrats if c.status == ContractStatus.SIGNED),
+                sum_money(c.contrat_amount for c in contrats), sum_money(c.balance_due for c in contrats)
+            )
+            for commercial_id, contrats in self._group_by(lambda c: c.commercial_contact_id).items()
+        ]
+
+    def report_by_client(self) -> List[ClientReportRow]:
+        return [
+            ClientReportRow(
+                client_id, None, None, len(contrats),
+                sum_money(c.contrat_amount for c in contrats), sum_money(c.balance_due for c in contrats)
+            )
+            for client_id, contrats in self._group_by(lambda c: c.client_id).items()
+        ]
+
+    def report_by_status(self) -> List[StatusReportRow]:
+        return [
+            StatusReportRow(
+                status, len(contrats),
+                sum_money(c.contrat_amount for c in contrats), sum_money(c.balance_due for c in contrats)
+            )
+            for status, contrats in self._group_by(lambda c: c.status).items()
+        ]
 
     def exist(self, contrat_id: int) -> bool:
         if contrat_id in self.contrats:
@@ -127,21 +275,73 @@ class FakeContratRepository:
             return False
 
 
+class FakePaymentRepository:
+    # Fake payment repo for test, reads the ledger of a fake contrat repo
+    def __init__(self, contrat_repository: FakeContratRepository):
+        self.contrat_repository = contrat_repository
+
+    def find_by_contrat(self, contrat_id: int) -> List[PaymentRow]:
+        return [payment for payment in self.contrat_repository.payments if payment.contrat_id == contrat_id]
+
+    def cash_in_by_month(self, date_from: datetime, date_to: datetime,
+                         contrat_id: Optional[int] = None) -> List[CashInRow]:
+        months: dict[date, List[PaymentRow]] = {}
+        for payment in self.contrat_repository.payments:
+            if date_from <= payment.paid_at < date_to and contrat_id in (None, payment.contrat_id):
+                months.setdefault(payment.paid_at.date().replace(day=1), []).append(payment)
+        return [
+            CashInRow(month, len(payments), sum_money(payment.amount for payment in payments))
+            for month, payments in sorted(months.items())
+        ]
+
+    def _expected_balances(self) -> dict[int, int]:
+        paid: dict[int, int] = {}
+        for payment in self.contrat_repository.payments:
+            paid[payment.contrat_id] = paid.get(payment.contrat_id, 0) + payment.amount.cents
+        return {
+            contrat.id: contrat.contrat_amount.cents - paid.get(contrat.id, 0)
+            for contrat in self.contrat_repository.contrats.values()
+        }
+
+    def check_balances(self) -> List[SummaryDiff]:
+        contrats = self.contrat_repository.contrats
+        return [
+            SummaryDiff("contrats", str(contrat_id), (expected,), (contrats[contrat_id].balance_due.cents,))
+            for contrat_id, expected in sorted(self._expected_balances().items())
+            if contrats[contrat_id].balance_due.cents != expected
+        ]
+
+    def rebuild_balances(self, workers: int = 4) -> List[SummaryDiff]:
+        diffs = self.check_balances()
+        for contrat_id, expected in self._expected_balances().items():
+            self.contrat_repository.contrats[contrat_id].balance_due = Money.from_cents(expected)
+        return diffs
+
+
 class FakeEventRepository:
     # Fake event repo for test
     def __init__(self):
         self.events: dict[int, Event] = {}
         self._id_counter = 1
 
-    def save(self, event: Event) -> Event:
+    def save(self, event: Event, before_commit: Optional[Callable[[Event], None]] = None) -> Event:
+        if event.support_contact_id is not None and any(
+                other.id != event.id and other.support_contact_id == event.support_contact_id
+                and other.start_date < event.end_date and other.end_date > event.start_date
+                for other in self.events.values()
+        ):
+            raise BusinessRuleViolation("Le contact support a déjà un évènement sur ce créneau")
+
         if event.id is None:
             event.id = self._id_counter
+            event.version = 1
             self._id_counter += 1
             self.events[event.id] = event
-            return event
+            return _commit(event, before_commit)
 
         if event.id in self.events:
             data_event = self.events[event.id]
+            _bump_version(data_event, event)
             data_event.name = event.name
             data_event.contrat_id = event.contrat_id
             data_event.client_id = event.client_id
@@ -152,7 +352,7 @@ class FakeEventRepository:
             data_event.attendees = event.attendees
             data_event.notes = event.notes
             data_event.updated_at = event.updated_at
-            return data_event
+            return _commit(data_event, before_commit)
 
     def find_by_id(self, event_id: int) -> Optional[Event]:
         return self.events.get(event_id)
@@ -160,11 +360,207 @@ class FakeEventRepository:
     def find_all(self, criteres) -> List[Event]:
         return list(self.events.values())
 
+    def iter_all_rows(self, criteres) -> Iterator[EventRow]:
+        return iter(self.find_all_rows(criteres))
+
+    def find_all_rows(self, criteres) -> List[EventRow]:
+        date_from, date_to = criteres.get("date_from"), criteres.get("date_to")
+        after = criteres.get("after")
+        rows = sorted(
+            (
+                EventRow(e.id, e.name, e.contrat_id, e.client_id, e.support_contact_id,
+                         e.start_date, e.end_date, e.location, e.attendees)
+                for e in self.events.values()
+                if (criteres.get("ids") is None or e.id in criteres["ids"])
+                and (not criteres.get("support_contact_id") or e.support_contact_id == criteres["support_contact_id"])
+                and (criteres.get("support_contact") is not False or e.support_contact_id is None)
+                and (criteres.get("support_contact") is not True or e.support_contact_id is not None)
+                and (date_from is None or e.end_date > date_from)
+                and (date_to is None or e.start_date < date_to)
+                and (after is None or (e.start_date, e.id) > after)
+            ),
+            key=lambda row: (row.start_date, row.id)
+        )
+        return rows[:criteres["limit"]] if criteres.get("limit") else rows
+
     def exist(self, event_id: int) -> bool:
         if event_id in self.events:
             return True
         else:
             return False
 
-    def delete(self, event_id: int) -> None:
+    def assign_supports(self, assignments: dict[int, int],
+                        before_commit: Optional[Callable[[dict[int, int]], None]] = None) -> dict[int, int]:
+        applied = {}
+        for event_id, support_id in assignments.items():
+            event = self.events.get(event_id)
+            if event and event.support_contact_id is None:
+                event.support_contact_id = support_id
+                _bump_version(event)
+                applied[event_id] = support_id
+        return _commit(applied, before_commit)
+
+    def delete(self, event_id: int, before_commit: Optional[Callable[[], None]] = None) -> None:
         self.events.pop(event_id, None)
+        if before_commit is not None:
+            before_commit()
+
+
+class FakeDashboardRepository:
+    # Fake dashboard repo for test, summaries computed from fake contrat & event repos
+    def __init__(self, contrat_repository: FakeContratRepository, event_repository: FakeEventRepository):
+        self.contrat_repository = contrat_repository
+        self.event_repository = event_repository
+        self.diffs: List[SummaryDiff] = []
+        self.rebuilt = False
+
+    def commercial_summaries(self) -> List[CommercialReportRow]:
+        return self.contrat_repository.report_by_commercial()
+
+    def support_summaries(self, from_day: date) -> List[SupportSummaryRow]:
+        counts: dict[int, int] = {}
+        for event in self.event_repository.events.values():
+            if event.support_contact_id is not None and event.start_date.date() >= from_day:
+                counts[event.support_contact_id] = counts.get(event.support_contact_id, 0) + 1
+        return [SupportSummaryRow(id, None, count) for id, count in sorted(counts.items())]
+
+    def check(self) -> List[SummaryDiff]:
+        return list(self.diffs)
+
+    def rebuild(self) -> None:
+        self.diffs = []
+        self.rebuilt = True
+
+
+class FakeAuditRepository:
+    # Fake audit repo for test, entries are written on record
+    def __init__(self):
+        self.entries: List[AuditEntry] = []
+
+    def record(self, entries: List[AuditEntry]) -> None:
+        self.entries.extend(entries)
+
+    def flush(self) -> int:
+        return 0
+
+    def find_by_entity(self, entity: AuditedEntity, entity_id: int, limit: int = 50) -> List[AuditEntry]:
+        found = [entry for entry in self.entries if entry.entity == entity and entry.entity_id == entity_id]
+        return found[::-1][:limit]
+
+    def last_id(self) -> int:
+        return len(self.entries)
+
+    def find_changed(self, after_id: int) -> Tuple[int, Dict[AuditedEntity, Set[int]]]:
+        changed = {}
+        for entry in self.entries[after_id:]:
+            changed.setdefault(entry.entity, set()).add(entry.entity_id)
+        return len(self.entries), changed
+
+
+class FakeLabelRepository:
+    # Fake label repo for test, labels per entity set by the test
+    def __init__(self):
+        self.labels: Dict[str, Dict[int, str]] = {"client": {}, "contrat": {}, "event": {}, "user": {}}
+        self.queries = 0
+
+    def find_labels(self, entity: str, ids: Optional[Iterable[int]] = None) -> Dict[int, str]:
+        self.queries += 1
+        labels = self.labels[entity]
+        if ids is None:
+            return dict(labels)
+        return {entity_id: labels[entity_id] for entity_id in ids if entity_id in labels}
+
+    def users_version(self) -> Tuple[int, Optional[datetime]]:
+        return len(self.labels["user"]), None
+
+
+class FakeOutboxRepository:
+    # Fake outbox repo for test, messages are written on publish
+    def __init__(self):
+        self.messages: dict[int, dict] = {}
+        self._id_counter = 1
+
+    def publish(self, topic: str, payload: dict, available_at: Optional[datetime] = None) -> None:
+        self.messages[self._id_counter] = {
+            "topic": topic, "payload": payload, "available_at": available_at or datetime.now(),
+            "attempts": 0, "last_error": None, "processed": False,
+        }
+        self._id_counter += 1
+
+    def claim(self, limit: int) -> List[OutboxMessage]:
+        now = datetime.now()
+        claimed = []
+        for message_id, message in self.messages.items():
+            if len(claimed) == limit:
+                break
+            if not message["processed"] and message["available_at"] <= now:
+                message["attempts"] += 1
+                message["available_at"] = datetime.max
+                claimed.append(OutboxMessage(message_id, message["topic"], message["payload"], message["attempts"]))
+        return claimed
+
+    def complete(self, message_ids: List[int]) -> None:
+        for message_id in message_ids:
+            self.messages[message_id]["processed"] = True
+
+    def retry(self, failures: dict[int, tuple[datetime, str]]) -> None:
+        for message_id, (available_at, error) in failures.items():
+            self.messages[message_id]["available_at"] = available_at
+            self.messages[message_id]["last_error"] = error
+
+
+class FakeJobRepository:
+    # Fake job repo for test
+    def __init__(self):
+        self.jobs: dict[int, Job] = {}
+        self._id_counter = 1
+
+    def create(self, kind: str, params: dict, created_by: int) -> Job:
+        job = Job(
+            id=self._id_counter, kind=kind, params=params, status=JobStatus.PENDING, progress=0, total=None,
+            result_path=None, error=None, created_by=created_by, created_at=datetime.now(), finished_at=None,
+        )
+        self.jobs[job.id] = job
+        self._id_counter += 1
+        return job
+
+    def find_by_id(self, job_id: int) -> Optional[Job]:
+        return self.jobs.get(job_id)
+
+    def find_all(self, created_by: Optional[int] = None, limit: int = 20) -> List[Job]:
+        jobs = [job for job in reversed(self.jobs.values()) if created_by is None or job.created_by == created_by]
+        return jobs[:limit]
+
+    def find_pending(self) -> List[int]:
+        return [job.id for job in self.jobs.values() if job.status == JobStatus.PENDING]
+
+    def start(self, job_id: int) -> bool:
+        return self._transition(job_id, (JobStatus.PENDING,), status=JobStatus.RUNNING)
+
+    def report_progress(self, job_id: int, progress: int, total: int) -> bool:
+        return self._transition(job_id, (JobStatus.RUNNING,), progress=progress, total=total)
+
+    def finish(self, job_id: int, result_path: str) -> None:
+        job = self.jobs[job_id]
+        self._transition(
+            job_id, (JobStatus.RUNNING,), status=JobStatus.DONE, progress=job.total or job.progress,
+            result_path=result_path, finished_at=datetime.now(),
+        )
+
+    def fail(self, job_id: int, error: str) -> None:
+        self._transition(
+            job_id, (JobStatus.PENDING, JobStatus.RUNNING), status=JobStatus.FAILED, error=error,
+            finished_at=datetime.now(),
+        )
+
+    def cancel(self, job_id: int) -> bool:
+        return self._transition(
+            job_id, (JobStatus.PENDING, JobStatus.RUNNING), status=JobStatus.CANCELLED, finished_at=datetime.now()
+        )
+
+    def _transition(self, job_id: int, statuses: tuple, **values) -> bool:
+        job = self.jobs.get(job_id)
+        if job is None or job.status not in statuses:
+            return False
+        self.jobs[job_id] = job._replace(**values)
+        return True
@@ -0,0 +1,69 @@
+import heapq
+import math
+import re
+from collections import Counter, defaultdict
+from typing import Iterable, List, Optional, Tuple
+
+_WORD = re.compile(r"[^\W_]+")
+
+
+def trigrams(text: str) -> set:
+    """
+    Trigrams of a text, computed like pg_trgm:
+    lower case, one word at a time, padded with two spaces before and one after
+    """
+    result = set()
+    for word in _WORD.findall(text.lower()):
+        padded = f"  {word} "
+        result.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return result
+
+
+class TrigramIndex:
+    """
+    In-process inverted trigram index, used for fuzzy search when the database has no pg_trgm
+    - search : ranked ids whose text shares enough trigrams with the query
+    """
+
+    def __init__(self, documents: Iterable[Tuple[int, str]]):
+        self.postings: dict[str, set] = defaultdict(set)
+        self.sizes: dict[int, int] = {}
+        for doc_id, text in documents:
+            grams = trigrams(text)
+            self.sizes[doc_id] = len(grams)
+            for gram in grams:
+                self.postings[gram].add(doc_id)
+
+    def search(self, query: str, limit: Optional[int] = None, threshold: float = 0.6) -> List[Tuple[int, float]]:
+        """
+        Find documents matching the query, tolerant to typos
+        :param query: text searched
+        :param limit: keep only the best `limit` documents
+        :param threshold: minimal share of the query trigrams found in a document (pg_trgm word similarity default)
+        :return: (id, score) sorted by score desc then id
+        """
+        query_grams = trigrams(query)
+        if not query_grams:
+            return []
+
+        # a document sharing `needed` trigrams appears in at least one of the rarest len - needed + 1 postings:
+        # candidates come from those, the common postings are only probed for them
+        needed = max(1, math.ceil(threshold * len(query_grams)))
+        postings = sorted((self.postings.get(gram, set()) for gram in query_grams), key=len)
+        rare, common = postings[:len(postings) - needed + 1], postings[len(postings) - needed + 1:]
+
+        hits = Counter()
+        for posting in rare:
+            hits.update(posting)
+
+        results = []
+        for doc_id, shared in hits.items():
+            shared += sum(1 for posting in common if doc_id in posting)
+            if shared >= needed:
+                # share of the query found, then Jaccard similarity to favour closer documents
+                jaccard = shared / (len(query_grams) + self.sizes[doc_id] - shared)
+                results.append((doc_id, shared / len(query_grams) + jaccard))
+        if limit is not None:
+            return heapq.nsmallest(limit, results, key=lambda item: (-item[1], item[0]))
+        results.sort(key=lambda item: (-item[1], item[0]))
+        return results
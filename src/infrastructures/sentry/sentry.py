@@ -2,6 +2,10 @@ import os
 
 import sentry_sdk
 
+from src.infrastructures.database.session import get_session
+from src.infrastructures.outbox.topics import SENTRY_MESSAGE
+from src.infrastructures.repositories.SQLAchemy_repository import SQLAlchemyOutboxRepository
+
 
 def init_sentry():
     """
@@ -12,3 +16,18 @@ def init_sentry():
         dsn=SENTRY_DSN,
         send_default_pii=True,
     )
+
+
+def report_message(message: str, level: str = "info") -> None:
+    """
+    Send a message to Sentry through the outbox, sent by `worker run` so the CLI does not wait for Sentry
+    Sent directly if the outbox can not be written
+    """
+    if not os.getenv("SENTRY_DSN"):
+        return
+    try:
+        with get_session() as session:
+            SQLAlchemyOutboxRepository(session).publish(SENTRY_MESSAGE, {"message": message, "level": level})
+            session.commit()
+    except Exception:
+        sentry_sdk.capture_message(message, level=level)
@@ -0,0 +1,197 @@
+"""
+WSGI application exposing the use cases as a JSON API, served by `api serve`
+Requests are authenticated with the JWT of `JWTTokenManager` sent as a bearer token,
+each request gets its own session from a thread-local registry sharing one connection pool
+"""
+import json
+import re
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs
+
+from sqlalchemy.orm import Session, scoped_session
+
+from src.infrastructures.database.changes import Changes
+from src.infrastructures.repositories.SQLAchemy_repository import SQLAlchemyUserRepository
+from src.infrastructures.security.security import JWTTokenManager
+from src.presentation.serializers import to_json
+
+HTTP_STATUS = {
+    200: "200 OK",
+    201: "201 Created",
+    400: "400 Bad Request",
+    401: "401 Unauthorized",
+    403: "403 Forbidden",
+    404: "404 Not Found",
+    405: "405 Method Not Allowed",
+    409: "409 Conflict",
+    422: "422 Unprocessable Entity",
+    500: "500 Internal Server Error",
+}
+# `error` of a use case response -> HTTP status, 400 otherwise
+ERROR_STATUS = {
+    "Erreur Authentification": 401,
+    "Permission": 403,
+    "Ressource": 404,
+    "Conflit": 409,
+    "Erreur Métier": 422,
+    "Erreur métier": 422,
+}
+# a role change is seen by the API after at most this delay, or as soon as the ChangeListener of `api serve` sees it
+USER_CACHE_SECONDS = 30
+
+
+class ApiError(Exception):
+    """Ends the request with an HTTP error, in the error/msg format of the use case responses"""
+
+    def __init__(self, status: int, error: str, msg: str):
+        super().__init__(msg)
+        self.status = status
+        self.error = error
+        self.msg = msg
+
+
+@dataclass
+class ApiRequest:
+    method: str
+    params: dict
+    query: dict
+    body: dict
+    headers: dict
+    session: Session
+    user: Optional[dict] = None
+
+
+Handler = Callable[[ApiRequest], Tuple[int, dict]]
+
+
+def result(response, *names: str) -> dict:
+    """
+    Body of a successful use case response, with the given fields of the response
+    Raises ApiError with the status of its error otherwise
+    """
+    if not response.success:
+        raise ApiError(ERROR_STATUS.get(response.error, 400), response.error, response.msg)
+    return {name: to_json(getattr(response, name)) for name in names}
+
+
+class Router:
+    """Routes declared with `@router.route("GET", "/contrats/{contrat_id}")`, path parameters are ints"""
+
+    def __init__(self):
+        self.routes: List[Tuple[str, re.Pattern, Handler, bool]] = []
+
+    def route(self, method: str, path: str, auth: bool = True):
+        pattern = re.compile("^" + re.sub(r"{(\w+)}", r"(?P<\1>\\d+)", path) + "$")
+
+        def decorator(handler: Handler) -> Handler:
+            self.routes.append((method, pattern, handler, auth))
+            return handler
+
+        return decorator
+
+    def match(self, method: str, path: str) -> Tuple[Handler, dict, bool]:
+        allowed = False
+        for route_method, pattern, handler, auth in self.routes:
+            found = pattern.match(path)
+            if found is None:
+                continue
+            if route_method == method:
+                return handler, {name: int(value) for name, value in found.groupdict().items()}, auth
+            allowed = True
+        if allowed:
+            raise ApiError(405, "Méthode", f"Méthode {method} non autorisée sur {path}")
+        raise ApiError(404, "Ressource", f"Aucune route {path}")
+
+
+class ApiApp:
+    """WSGI callable, one session per request, released to the pool when the response is built"""
+
+    def __init__(self, router: Router, sessions: scoped_session, token_manager: Optional[JWTTokenManager] = None):
+        self.router = router
+        self.sessions = sessions
+        self.token_manager = token_manager or JWTTokenManager()
+        self._users: Dict[int, Tuple[float, dict]] = {}
+
+    def invalidate(self, changes: Changes) -> None:
+        """Drops the cached users changed by any process, called from the ChangeListener thread"""
+        if "user" not in changes:
+            return
+        if changes["user"] is None:
+            self._users = {}
+            return
+        for user_id in changes["user"]:
+            self._users.pop(user_id, None)
+
+    def __call__(self, environ: dict, start_response) -> List[bytes]:
+        session = self.sessions()
+        try:
+            status, body = self._dispatch(environ, session)
+        except ApiError as e:
+            session.rollback()
+            status, body = e.status, {"error": e.error, "msg": e.msg}
+        except Exception:
+            session.rollback()
+            status, body = 500, {"error": "Serveur", "msg": "Erreur interne du serveur"}
+        finally:
+            self.sessions.remove()
+
+        payload = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        start_response(HTTP_STATUS[status], [
+            ("Content-Type", "application/json; charset=utf-8"),
+            ("Content-Length", str(len(payload))),
+        ])
+        return [payload]
+
+    def _dispatch(self, environ: dict, session: Session) -> Tuple[int, dict]:
+        handler, params, auth = self.router.match(environ["REQUEST_METHOD"], environ.get("PATH_INFO") or "/")
+        request = ApiRequest(
+            method=environ["REQUEST_METHOD"],
+            params=params,
+            query={name: values[-1] for name, values in parse_qs(environ.get("QUERY_STRING", "")).items()},
+            body=_read_body(environ),
+            headers={
+                name[5:].replace("_", "-").lower(): value
+                for name, value in environ.items() if name.startswith("HTTP_")
+            },
+            session=session,
+        )
+        if auth:
+            request.user = self._authenticate(request)
+        return handler(request)
+
+    def _authenticate(self, request: ApiRequest) -> dict:
+        """current_user dict of the CLI, from the bearer token"""
+        scheme, _, token = request.headers.get("authorization", "").partition(" ")
+        payload = self.token_manager.decode_token(token) if scheme.lower() == "bearer" and token else None
+        if payload is None:
+            raise ApiError(401, "Erreur Authentification", "Token absent, invalide ou expiré")
+
+        user_id = payload["user_id"]
+        cached = self._users.get(user_id)
+        if cached is not None and cached[0] > time.monotonic():
+            return cached[1]
+
+        user = SQLAlchemyUserRepository(request.session).find_by_id(user_id)
+        if user is None:
+            raise ApiError(401, "Erreur Authentification", "Utilisateur non trouvé")
+        current_user = {"user_current_id": user.id, "user_current_role": user.role}
+        self._users[user_id] = (time.monotonic() + USER_CACHE_SECONDS, current_user)
+        return current_user
+
+
+def _read_body(environ: dict) -> dict:
+    try:
+        length = int(environ.get("CONTENT_LENGTH") or 0)
+    except ValueError:
+        length = 0
+    if not length:
+        return {}
+    try:
+        body = json.loads(environ["wsgi.input"].read(length))
+    except (ValueError, UnicodeDecodeError):
+        raise ApiError(400, "Paramètre", "Le corps de la requête doit être du JSON")
+    if not isinstance(body, dict):
+        raise ApiError(400, "Paramètre", "Le corps de la requête doit être un objet JSON")
+    return body
@@ -0,0 +1,281 @@
+"""
+Endpoints of the JSON API, each one runs the use case of the matching CLI command
+"""
+from datetime import datetime
+from typing import Optional
+
+from src.domain.entities.enums import AuditedEntity
+from src.domain.policies.user_policy import RequestPolicy
+from src.infrastructures.repositories.SQLAchemy_repository import SQLAlchemyClientRepository, \
+    SQLAlchemyUserRepository, SQLAlchemyContratRepository, SQLAlchemyEventRepository, SQLAlchemyPaymentRepository, \
+    SQLAlchemyDashboardRepository, SQLAlchemyAuditRepository, SQLAlchemyJobRepository
+from src.infrastructures.security.security import BcryptPasswordHasher, JWTTokenManager
+from src.presentation.api.app import Router, ApiRequest, ApiError, result
+from src.use_cases.audit_use_cases import GetAuditLogUseCase, GetAuditLogRequest
+from src.use_cases.auth_use_cases import AuthenticateUseCase, AuthenticateRequest
+from src.use_cases.client_use_cases import ListClientUseCase, ListClientRequest, ClientFilter, SearchClientUseCase, \
+    SearchClientRequest, GetClientUseCase, GetClientRequest
+from src.use_cases.contrat_use_cases import ListContratUseCase, ListContratRequest, ContratFilter, \
+    GetContratUseCase, GetContratRequest, SignContratUseCase, SignContratRequest, RecordPaymentContratUseCase, \
+    RecordPaymentContratRequest
+from src.use_cases.dashboard_use_cases import GetDashboardUseCase, GetDashboardRequest
+from src.use_cases.event_use_cases import ListEventUseCase, ListEventRequest, EventFilter, GetEventUseCase, \
+    GetEventRequest, AssignSupportEventUseCase, AssignSupportEventRequest
+from src.use_cases.job_use_cases import GetJobUseCase, GetJobRequest
+from src.use_cases.report_use_cases import GetReportUseCase, GetReportRequest, ReportType, GetCashInReportUseCase, \
+    GetCashInReportRequest
+
+router = Router()
+
+
+def _policy(request: ApiRequest, ressource: str, action: str) -> RequestPolicy:
+    return RequestPolicy(user=request.user, ressource=ressource, action=action)
+
+
+def _choice(request: ApiRequest, name: str, choices):
+    """Optional enum query parameter"""
+    value = request.query.get(name)
+    if value is None:
+        return None
+    try:
+        return choices(value)
+    except ValueError:
+        allowed = ", ".join(choice.value for choice in choices)
+        raise ApiError(400, "Paramètre", f"{name} invalide, choix possibles: {allowed}")
+
+
+def _int(request: ApiRequest, name: str, default: Optional[int] = None, source: Optional[dict] = None):
+    """Optional int query (or body) parameter"""
+    value = (request.query if source is None else source).get(name, default)
+    if value is None:
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ApiError(400, "Paramètre", f"{name} doit être un entier")
+
+
+def _amount(request: ApiRequest, name: str) -> Optional[str]:
+    """Optional body amount in euros, a JSON number or a decimal string ("10.50") parsed by Money"""
+    value = request.body.get(name)
+    if value is None:
+        return None
+    if isinstance(value, bool) or not isinstance(value, (str, int, float)):
+        raise ApiError(400, "Paramètre", f"{name} doit être un montant")
+    return str(value)
+
+
+def _date(request: ApiRequest, name: str) -> Optional[datetime]:
+    """Optional ISO date query parameter"""
+    value = request.query.get(name)
+    if value is None:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise ApiError(400, "Paramètre", f"{name} doit être une date, ex: 2026-05-18")
+
+
+###########################################################################################
+#                       AUTH
+###########################################################################################
+@router.route("POST", "/auth/token", auth=False)
+def create_token(request: ApiRequest):
+    use_case = AuthenticateUseCase(
+        SQLAlchemyUserRepository(request.session), BcryptPasswordHasher(), JWTTokenManager()
+    )
+    response = use_case.execute(AuthenticateRequest(
+        email=str(request.body.get("email", "")),
+        password=str(request.body.get("password", "")),
+        store_token=False,
+    ))
+    return 201, result(response, "token")
+
+
+###########################################################################################
+#                       CLIENT
+###########################################################################################
+@router.route("GET", "/clients")
+def list_clients(request: ApiRequest):
+    response = ListClientUseCase(SQLAlchemyClientRepository(request.session)).execute(ListClientRequest(
+        user_id=request.user["user_current_id"],
+        list_filter=_choice(request, "filter", ClientFilter),
+    ))
+    return 200, result(response, "clients")
+
+
+@router.route("GET", "/clients/search")
+def search_clients(request: ApiRequest):
+    response = SearchClientUseCase(SQLAlchemyClientRepository(request.session)).execute(SearchClientRequest(
+        query=request.query.get("q", ""),
+        page=max(_int(request, "page", 1), 1),
+        page_size=min(max(_int(request, "page_size", 20), 1), 100),
+    ))
+    return 200, result(response, "clients")
+
+
+@router.route("GET", "/clients/{client_id}")
+def show_client(request: ApiRequest):
+    use_case = GetClientUseCase(SQLAlchemyClientRepository(request.session), SQLAlchemyUserRepository(request.session))
+    response = use_case.execute(GetClientRequest(client_id=request.params["client_id"]))
+    return 200, result(response, "client", "user")
+
+
+###########################################################################################
+#                       CONTRAT
+###########################################################################################
+@router.route("GET", "/contrats")
+def list_contrats(request: ApiRequest):
+    response = ListContratUseCase(SQLAlchemyContratRepository(request.session)).execute(ListContratRequest(
+        commercial_contact_id=request.user["user_current_id"],
+        list_filter=_choice(request, "filter", ContratFilter),
+    ))
+    return 200, result(response, "contrats")
+
+
+@router.route("GET", "/contrats/{contrat_id}")
+def show_contrat(request: ApiRequest):
+    use_case = GetContratUseCase(
+        SQLAlchemyContratRepository(request.session), SQLAlchemyClientRepository(request.session)
+    )
+    response = use_case.execute(GetContratRequest(contrat_id=request.params["contrat_id"]))
+    return 200, result(response, "contrat", "client")
+
+
+@router.route("POST", "/contrats/{contrat_id}/sign")
+def sign_contrat(request: ApiRequest):
+    use_case = SignContratUseCase(
+        SQLAlchemyContratRepository(request.session), SQLAlchemyAuditRepository(request.session)
+    )
+    response = use_case.execute(SignContratRequest(
+        contrat_id=request.params["contrat_id"],
+        authorization=_policy(request, "CONTRAT", "sign"),
+    ))
+    return 200, result(response, "contrat")
+
+
+@router.route("POST", "/contrats/{contrat_id}/payments")
+def pay_contrat(request: ApiRequest):
+    """A retry with the same Idempotency-Key header returns the first result instead of paying twice"""
+    amount = _amount(request, "amount")
+    if amount is None:
+        raise ApiError(400, "Paramètre", "amount est obligatoire")
+
+    use_case = RecordPaymentContratUseCase(
+        SQLAlchemyContratRepository(request.session), SQLAlchemyAuditRepository(request.session)
+    )
+    response = use_case.execute(RecordPaymentContratRequest(
+        contrat_id=request.params["contrat_id"],
+        payment=amount,
+        authorization=_policy(request, "CONTRAT", "pay"),
+        idempotency_key=request.headers.get("idempotency-key"),
+    ))
+    return (200 if response.replayed else 201), result(response, "contrat", "replayed")
+
+
+###########################################################################################
+#                       EVENT
+###########################################################################################
+@router.route("GET", "/events")
+def list_events(request: ApiRequest):
+    response = ListEventUseCase(SQLAlchemyEventRepository(request.session)).execute(ListEventRequest(
+        support_contact_id=request.user["user_current_id"],
+        list_filter=_choice(request, "filter", EventFilter),
+        date_from=_date(request, "from"),
+        date_to=_date(request, "to"),
+        after_id=_int(request, "after"),
+        limit=_int(request, "limit"),
+    ))
+    return 200, result(response, "events", "next_after_id")
+
+
+@router.route("GET", "/events/{event_id}")
+def show_event(request: ApiRequest):
+    use_case = GetEventUseCase(SQLAlchemyEventRepository(request.session), SQLAlchemyClientRepository(request.session))
+    response = use_case.execute(GetEventRequest(event_id=request.params["event_id"]))
+    return 200, result(response, "event", "client")
+
+
+@router.route("POST", "/events/{event_id}/assign")
+def assign_event(request: ApiRequest):
+    support_user_id = _int(request, "support_user_id", source=request.body)
+    if support_user_id is None:
+        raise ApiError(400, "Paramètre", "support_user_id est obligatoire")
+
+    use_case = AssignSupportEventUseCase(
+        SQLAlchemyEventRepository(request.session), SQLAlchemyUserRepository(request.session),
+        SQLAlchemyAuditRepository(request.session),
+    )
+    response = use_case.execute(AssignSupportEventRequest(
+        event_id=request.params["event_id"],
+        support_user_id=support_user_id,
+        authorization=_policy(request, "EVENT", "assign"),
+    ))
+    return 200, result(response)
+
+
+###########################################################################################
+#                       REPORT / DASHBOARD / AUDIT / JOB
+###########################################################################################
+@router.route("GET", "/reports/cash-in")
+def cash_in_report(request: ApiRequest):
+    date_from, date_to = _date(request, "from"), _date(request, "to")
+    if date_from is None or date_to is None:
+        raise ApiError(400, "Paramètre", "from et to sont obligatoires")
+
+    response = GetCashInReportUseCase(SQLAlchemyPaymentRepository(request.session)).execute(GetCashInReportRequest(
+        date_from=date_from,
+        date_to=date_to,
+        authorization=_policy(request, "REPORT", "cash-in"),
+        contrat_id=_int(request, "contrat"),
+    ))
+    return 200, result(response, "rows")
+
+
+def _report(report_type: ReportType):
+    def handler(request: ApiRequest):
+        response = GetReportUseCase(SQLAlchemyContratRepository(request.session)).execute(GetReportRequest(
+            report_type=report_type,
+            authorization=_policy(request, "REPORT", report_type.value),
+        ))
+        return 200, result(response, "rows")
+
+    return handler
+
+
+for _report_type in ReportType:
+    router.route("GET", f"/reports/{_report_type.value}")(_report(_report_type))
+
+
+@router.route("GET", "/dashboard")
+def dashboard(request: ApiRequest):
+    response = GetDashboardUseCase(SQLAlchemyDashboardRepository(request.session)).execute(GetDashboardRequest(
+        authorization=_policy(request, "DASHBOARD", "show"),
+    ))
+    return 200, result(response, "commercials", "supports")
+
+
+def _audit(entity: AuditedEntity):
+    def handler(request: ApiRequest):
+        response = GetAuditLogUseCase(SQLAlchemyAuditRepository(request.session)).execute(GetAuditLogRequest(
+            entity=entity,
+            entity_id=request.params["entity_id"],
+            authorization=_policy(request, "AUDIT", "show"),
+            limit=_int(request, "limit", 50),
+        ))
+        return 200, result(response, "entries")
+
+    return handler
+
+
+for _entity in AuditedEntity:
+    router.route("GET", f"/audit/{_entity.value}/{{entity_id}}")(_audit(_entity))
+
+
+@router.route("GET", "/jobs/{job_id}")
+def show_job(request: ApiRequest):
+    response = GetJobUseCase(SQLAlchemyJobRepository(request.session)).execute(GetJobRequest(
+        job_id=request.params["job_id"],
+        user=request.user,
+    ))
+    return 200, result(response, "job")
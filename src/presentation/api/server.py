@@ -0,0 +1,32 @@
+from socketserver import ThreadingMixIn
+from typing import Optional
+from wsgiref.simple_server import WSGIServer, WSGIRequestHandler, make_server
+
+from sqlalchemy.orm import scoped_session
+
+from src.infrastructures.database.session import get_scoped_session
+from src.presentation.api.app import ApiApp
+from src.presentation.api.endpoints import router
+
+
+class ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+    """One thread per connection, the connections to the database are bounded by the engine pool"""
+    daemon_threads = True
+
+
+class QuietRequestHandler(WSGIRequestHandler):
+    """No access log line per request"""
+
+    def log_message(self, format, *args):
+        pass
+
+
+def create_app(sessions: Optional[scoped_session] = None) -> ApiApp:
+    """API application on the sessions of DATABASE_URL, or on the given session registry"""
+    return ApiApp(router, sessions or get_scoped_session())
+
+
+def make_api_server(host: str, port: int, app: Optional[ApiApp] = None, access_log: bool = False) -> WSGIServer:
+    """HTTP server of the API, call `serve_forever()` to handle requests"""
+    handler = WSGIRequestHandler if access_log else QuietRequestHandler
+    return make_server(host, port, app or create_app(), server_class=ThreadingWSGIServer, handler_class=handler)
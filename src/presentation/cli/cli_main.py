@@ -5,12 +5,21 @@ from sentry_sdk import set_user
 from helpers.helper_cli import error_display
 from helpers.helpers import get_current_user
 from src.infrastructures.database.session import get_session
+from src.presentation.cli.commands.api_commands import api_app
+from src.presentation.cli.commands.audit_commands import audit_app
 from src.presentation.cli.commands.auth_commands import auth_app
+from src.presentation.cli.commands.batch_command import batch
 from src.presentation.cli.commands.client_commands import client_app
 from src.presentation.cli.commands.contrat_commands import contrat_app
+from src.presentation.cli.commands.daemon_commands import daemon_app
+from src.presentation.cli.commands.dashboard_commands import dashboard_app
 from src.presentation.cli.commands.event_commands import event_app
+from src.presentation.cli.commands.job_commands import job_app
+from src.presentation.cli.commands.report_commands import report_app
 from src.presentation.cli.commands.shell_command import shell_app
 from src.presentation.cli.commands.user_commands import user_app
+from src.presentation.cli.commands.worker_commands import worker_app
+from src.presentation.cli.output import OutputFormat
 
 app = typer.Typer()
 console = Console()
@@ -20,16 +29,32 @@ app.add_typer(user_app, name="user", help="Commandes liées aux utilisateurs")
 app.add_typer(client_app, name="client", help="Commandes liées aux clients")
 app.add_typer(contrat_app, name="contrat", help="Commandes liées aux contrats")
 app.add_typer(event_app, name="event", help="Commandes liées aux évènements")
+app.add_typer(report_app, name="report", help="Rapports chiffre d'affaires et reste à payer")
+app.add_typer(dashboard_app, name="dashboard", help="Tableau de bord")
+app.add_typer(audit_app, name="audit", help="Historique des modifications")
+app.add_typer(worker_app, name="worker", help="Traitement des messages en attente")
+app.add_typer(job_app, name="job", help="Commandes longues en arrière-plan")
+app.add_typer(api_app, name="api", help="API HTTP/JSON")
+app.add_typer(daemon_app, name="daemon", help="Démon qui garde la CLI chargée entre deux commandes")
 app.add_typer(shell_app, name="shell", help="Shell interactif")
+app.command(name="batch", help="Exécuter un fichier de commandes dans un seul processus")(batch)
+
 
 @app.callback()
-def main(ctx: typer.Context):
+def main(
+        ctx: typer.Context,
+        output: OutputFormat = typer.Option(
+            OutputFormat.TABLE, "--output", "-o",
+            help="Format des listes: table, ou json, ndjson, csv pour les scripts (erreurs sur stderr)",
+        ),
+):
     """
     Callback auth verification before command
-    Initialisation Context and add session(DB), current_user(dict)
+    Initialisation Context and add session(DB), current_user(dict), output(OutputFormat)
     """
 
     ctx.ensure_object(dict)
+    ctx.obj["output"] = output
     if "session" not in ctx.obj:
         ctx.obj["session"] = get_session()
 
@@ -38,7 +63,7 @@ def main(ctx: typer.Context):
 
     if ctx.obj["current_user"] is None:
 
-        if ctx.invoked_subcommand in ["auth", "shell"]:
+        if ctx.invoked_subcommand in ["auth", "shell", "api", "daemon"]:
             return
         if ctx.invoked_subcommand not in ["auth"]:
             error_display("Authentification", "Veuillez vous connecter via - auth login -")
@@ -0,0 +1,33 @@
+import typer
+from rich.console import Console
+
+from src.infrastructures.database.changes import ChangeListener
+from src.infrastructures.database.session import get_engine
+from src.presentation.api.server import create_app, make_api_server
+
+api_app = typer.Typer()
+console = Console()
+
+
+@api_app.command(help="Lancer l'API HTTP/JSON")
+def serve(
+        host: str = typer.Option("127.0.0.1", "--host", "-h", help="Adresse d'écoute"),
+        port: int = typer.Option(8000, "--port", "-p", help="Port d'écoute"),
+        access_log: bool = typer.Option(False, "--access-log", help="Afficher une ligne par requête"),
+):
+    """
+    Command for serving the use cases over HTTP, until Ctrl+C
+    Each request is authenticated with its bearer token, the API doesn't use the CLI login
+    :param host: listening address
+    :param port: listening port
+    :param access_log: log each request
+    :return: None
+    """
+    app = create_app()
+    # users changed by the CLI or another API process are dropped from the cache of this one
+    with make_api_server(host, port, app, access_log=access_log) as server, ChangeListener(get_engine(), app.invalidate):
+        console.print(f"[bold cyan]API démarrée[/bold cyan] sur http://{host}:{port}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            console.print("[bold]API arrêtée[/bold]")
@@ -0,0 +1,91 @@
+from typing import List
+
+import typer
+from rich import box
+from rich.console import Console
+from rich.table import Table
+
+from helpers.helper_cli import error_display
+from src.domain.entities.enums import AuditedEntity
+from src.domain.entities.read_models import AuditEntry
+from src.domain.policies.user_policy import RequestPolicy, UserPolicy
+from src.infrastructures.repositories.SQLAchemy_repository import SQLAlchemyAuditRepository
+from src.use_cases.audit_use_cases import GetAuditLogUseCase, GetAuditLogRequest
+
+audit_app = typer.Typer()
+console = Console()
+
+
+@audit_app.callback()
+def permission(ctx: typer.Context):
+    """Callback - verify user role """
+    ctx.obj["ressource"] = "AUDIT"
+
+    request = RequestPolicy(
+        user=ctx.obj["current_user"],
+        ressource=ctx.obj["ressource"],
+        action=ctx.invoked_subcommand,
+        context=None
+    )
+
+    policy = UserPolicy(request)
+    if not policy.is_allowed():
+        error_display("Permission", "Vous êtes pas authorisé à utiliser cette commande")
+        raise typer.Exit(1)
+
+
+@audit_app.command(help="Afficher l'historique des modifications d'un client, contrat ou évènement")
+def show(
+        ctx: typer.Context,
+        entity: AuditedEntity = typer.Option(..., "--entity", "-e", help="Type de l'élément modifié"),
+        entity_id: int = typer.Option(..., "--id", "-i", help="ID de l'élément modifié"),
+        limit: int = typer.Option(50, "--limit", "-l", help="Nombre de modifications affichées"),
+):
+    """
+    Command for the change history of a client, contrat or event, latest first
+    :param ctx: typer Context
+    :param entity: type of the changed entity
+    :param entity_id: id of the changed entity
+    :param limit: maximum number of entries
+    :return: None
+    """
+    policy = RequestPolicy(
+        user=ctx.obj["current_user"],
+        ressource=ctx.obj["ressource"],
+        action="show"
+    )
+    request = GetAuditLogRequest(entity=entity, entity_id=entity_id, authorization=policy, limit=limit)
+    use_case = GetAuditLogUseCase(SQLAlchemyAuditRepository(ctx.obj["session"]))
+    response = use_case.execute(request)
+
+    if response.success:
+        _display_audit_log(f"Historique {entity.value} #{entity_id}", response.entries)
+    else:
+        error_display(response.error, response.msg)
+
+
+def _display_audit_log(title: str, entries: List[AuditEntry]):
+    """
+    Display audit entries table
+    """
+    table = Table(
+        title=f"[bold magenta] {title}[/bold magenta]",
+        box=box.ROUNDED,
+        show_header=True,
+        header_style="bold cyan",
+        border_style="white",
+    )
+
+    table.add_column("Date", style="dim")
+    table.add_column("Action", style="bold")
+    table.add_column("User", justify="right")
+    table.add_column("Modifications")
+
+    for entry in entries:
+        table.add_row(
+            entry.created_at.strftime("%d/%m/%Y %H:%M:%S"),
+            entry.action,
+            "-" if entry.actor_id is None else str(entry.actor_id),
+            "\n".join(f"{name}: {old} → {new}" for name, (old, new) in entry.changes.items()),
+        )
+    console.print(table)
@@ -0,0 +1,173 @@
+"""
+`batch` runs a script of CLI commands in one process, with one logged-in user and one session
+"""
+import shlex
+import time
+from dataclasses import dataclass
+from typing import List
+
+import typer
+from rich import box
+from rich.console import Console
+from rich.table import Table
+from sqlalchemy.orm import Session
+
+from helpers.helper_cli import error_display, errors_displayed
+from src.infrastructures.database.session import get_atomic_session
+from src.presentation.daemon.client import subcommand
+
+console = Console()
+# commands needing their own process or the terminal, or changing the logged-in user
+EXCLUDED_COMMANDS = {"batch", "shell", "daemon", "api", "worker", "auth"}
+
+
+class BatchAborted(Exception):
+    """A command of an --atomic batch failed, the transaction is rolled back"""
+
+
+@dataclass
+class BatchLine:
+    number: int
+    argv: List[str]
+
+
+@dataclass
+class BatchResult:
+    line: BatchLine
+    success: bool
+    duration_ms: float
+
+
+def parse_script(text: str) -> List[BatchLine]:
+    """
+    One command per line, written as after `main.py`, blank lines and # comments are skipped
+    The whole script is checked before running any command
+    :raises ValueError: message with the number of the first invalid line
+    """
+    lines = []
+    for number, raw in enumerate(text.splitlines(), start=1):
+        try:
+            argv = shlex.split(raw, comments=True)
+        except ValueError as e:
+            raise ValueError(f"Ligne {number}: {e}")
+        if not argv:
+            continue
+        command = subcommand(argv)
+        if command in EXCLUDED_COMMANDS:
+            raise ValueError(f"Ligne {number}: la commande {command} n'est pas disponible dans un batch")
+        lines.append(BatchLine(number=number, argv=argv))
+    return lines
+
+
+def run_command(argv: List[str], session: Session, current_user: dict) -> bool:
+    """
+    Runs one command through the CLI app with the session and user of the batch
+    :return: False if the command exited with an error code or displayed an error
+    """
+    from src.presentation.cli.cli_main import app
+
+    errors = errors_displayed()
+    try:
+        app(args=argv, prog_name="main.py", obj={"session": session, "current_user": current_user})
+        code = 0
+    except SystemExit as e:
+        code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+    except Exception as e:
+        session.rollback()
+        error_display("Erreur", e)
+        code = 1
+    return code == 0 and errors_displayed() == errors
+
+
+def run_script(lines: List[BatchLine], session: Session, current_user: dict, stop_on_error: bool) -> List[BatchResult]:
+    """Runs the commands in order, with their duration"""
+    results = []
+    for line in lines:
+        console.rule(f"[bold]Ligne {line.number}[/bold] {shlex.join(line.argv)}", style="white")
+        start = time.perf_counter()
+        success = run_command(line.argv, session, current_user)
+        results.append(BatchResult(line=line, success=success, duration_ms=(time.perf_counter() - start) * 1000))
+        if not success:
+            # drops what the failed command left pending, the next command starts clean
+            session.rollback()
+            if stop_on_error:
+                break
+    return results
+
+
+def batch(
+        ctx: typer.Context,
+        script: typer.FileText = typer.Argument(..., help="Fichier de commandes, - pour l'entrée standard"),
+        atomic: bool = typer.Option(
+            False, "--atomic",
+            help="Tout ou rien: une seule transaction, annulée au premier échec",
+        ),
+        stop_on_error: bool = typer.Option(
+            False, "--stop-on-error",
+            help="S'arrêter au premier échec, chaque commande réussie reste enregistrée",
+        ),
+):
+    """
+    Command for running a script of commands, one per line, without starting a process per command
+    By default each command commits its changes, with --atomic they are all kept or all rolled back
+    :param ctx: typer Context
+    :param script: script file, - for stdin
+    :param atomic: one transaction for the whole script, stopped at the first failure
+    :param stop_on_error: stop at the first failure
+    :return: None
+    """
+    try:
+        lines = parse_script(script.read())
+    except ValueError as e:
+        error_display("Batch", e)
+        raise typer.Exit(1)
+
+    current_user = ctx.obj["current_user"]
+    start = time.perf_counter()
+    if atomic:
+        results = []
+        try:
+            with get_atomic_session() as session:
+                results = run_script(lines, session, current_user, stop_on_error=True)
+                if not all(result.success for result in results):
+                    raise BatchAborted()
+        except BatchAborted:
+            pass
+    else:
+        results = run_script(lines, ctx.obj["session"], current_user, stop_on_error)
+
+    _display_results(lines, results, atomic, (time.perf_counter() - start) * 1000)
+    if not all(result.success for result in results):
+        raise typer.Exit(1)
+
+
+def _display_results(lines: List[BatchLine], results: List[BatchResult], atomic: bool, total_ms: float):
+    """
+    Display per command results and durations
+    """
+    table = Table(
+        title="[bold magenta] Batch[/bold magenta]",
+        box=box.ROUNDED,
+        show_header=True,
+        header_style="bold cyan",
+        border_style="white"
+    )
+    table.add_column("Ligne", style="dim", justify="right")
+    table.add_column("Commande")
+    table.add_column("Résultat")
+    table.add_column("Durée", justify="right")
+
+    for result in results:
+        status = "[green]OK[/green]" if result.success else "[red]Échec[/red]"
+        table.add_row(str(result.line.number), shlex.join(result.line.argv), status, f"{result.duration_ms:.1f} ms")
+
+    succeeded = sum(1 for result in results if result.success)
+    console.print(table)
+    console.print(f"\n[bold]{succeeded}/{len(lines)} réussie(s) en {total_ms:.0f} ms[/bold]")
+    if len(results) < len(lines):
+        console.print(f"{len(lines) - len(results)} commande(s) non exécutée(s)")
+    if atomic:
+        if succeeded == len(lines):
+            console.print("[bold green]Transaction validée[/bold green]")
+        else:
+            console.print("[bold red]Transaction annulée, aucune modification enregistrée[/bold red]")
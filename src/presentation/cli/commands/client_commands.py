@@ -10,11 +10,15 @@ from rich.text import Text
 from helpers.helper_cli import error_display
 from helpers.helpers import normalize
 from src.domain.entities.entities import Client, User
+from src.domain.entities.read_models import ClientRow
 from src.domain.policies.user_policy import RequestPolicy, UserPolicy
-from src.infrastructures.repositories.SQLAchemy_repository import SQLAlchemyClientRepository, SQLAlchemyUserRepository
+from src.infrastructures.repositories.SQLAchemy_repository import SQLAlchemyClientRepository, \
+    SQLAlchemyUserRepository, SQLAlchemyAuditRepository
+from src.presentation.cli.output import OutputFormat, output_format, write_rows
+from src.presentation.cli.pager import KeysetPager, page_size
 from src.use_cases.client_use_cases import GetClientUseCase, GetClientRequest, CreateClientRequest, CreateClientUseCase, \
     ListClientUseCase, UpdateClientRequest, UpdateClientUseCase, DeleteClientUseCase, DeleteClientRequest, \
-    ListClientRequest, ClientFilter
+    ListClientRequest, ClientFilter, SearchClientUseCase, SearchClientRequest
 
 client_app = typer.Typer()
 console = Console()
@@ -26,7 +30,7 @@ def permission(ctx: typer.Context):
     ctx.obj["ressource"] = "CLIENT"
 
     action = ctx.invoked_subcommand
-    if action in ["list", "show"]:
+    if action in ["list", "show", "search"]:
         return
 
     request = RequestPolicy(
@@ -78,7 +82,7 @@ def create(
     # Use case
     client_repo = SQLAlchemyClientRepository(ctx.obj["session"])
     user_repo = SQLAlchemyUserRepository(ctx.obj["session"])
-    use_case = CreateClientUseCase(client_repo, user_repo)
+    use_case = CreateClientUseCase(client_repo, user_repo, SQLAlchemyAuditRepository(ctx.obj["session"]))
     response = use_case.execute(request)
 
     # Affichage selon response.success
@@ -100,7 +104,7 @@ def update(ctx: typer.Context, client_id: int):
     # init
     client_repo = SQLAlchemyClientRepository(ctx.obj["session"])
     user_repository = SQLAlchemyUserRepository(ctx.obj["session"])
-    use_case = UpdateClientUseCase(client_repo, user_repository)
+    use_case = UpdateClientUseCase(client_repo, user_repository, SQLAlchemyAuditRepository(ctx.obj["session"]))
 
     # verification ressource existe
     client = client_repo.find_by_id(client_id)
@@ -135,7 +139,8 @@ def update(ctx: typer.Context, client_id: int):
         email=email,
         telephone=telephone,
         company_name=company_name,
-        authorization=policy
+        authorization=policy,
+        version=client.version
     )
     response = use_case.execute(request)
 
@@ -181,24 +186,91 @@ def list(
             None, "--filter", "-f",
             help="Filter clients (mine)",
         ),
+        limit: Optional[int] = typer.Option(
+            None, "--limit", "-n", min=1,
+            help="Nombre de clients par page"
+        ),
+        after_id: Optional[int] = typer.Option(
+            None, "--after",
+            help="ID du dernier client de la page précédente"
+        ),
+        pager: bool = typer.Option(
+            False, "--pager",
+            help="Afficher une page à la fois: n suivante, p précédente, numéro de page, q quitter"
+        ),
 ):
     """
     Command for list clients
     :param list_filter: filter list
+    :param limit: page size, the terminal height with --pager
+    :param after_id: last client of the previous page
+    :param pager: interactive pager
     :param ctx: typer Context
     :return: None
     """
 
-    request = ListClientRequest(
-        user_id=ctx.obj["current_user"]["user_current_id"],
-        list_filter=list_filter
+    output = output_format(ctx)
+    pager = pager and output is OutputFormat.TABLE
+    if pager:
+        limit = page_size(limit)
+
+    def fetch(session, after):
+        request = ListClientRequest(
+            user_id=ctx.obj["current_user"]["user_current_id"],
+            list_filter=list_filter,
+            after_id=after,
+            limit=limit,
+            stream=output is not OutputFormat.TABLE
+        )
+        repo = SQLAlchemyClientRepository(session)
+        use_case = ListClientUseCase(repo)
+        return use_case.execute(request)
+
+    response = fetch(ctx.obj["session"], after_id)
+
+    if response.success and output is not OutputFormat.TABLE:
+        write_rows(response.clients, output)
+    elif response.success and pager:
+        KeysetPager(
+            response, fetch, "clients", lambda clients: _display_data_list(clients, list_filter), ctx.obj["session"]
+        ).run()
+    elif response.success:
+        _display_data_list(response.clients, list_filter)
+        if response.next_after_id:
+            console.print(f"Page suivante: [dim]--after {response.next_after_id}[/dim]")
+    else:
+        error_display(response.error, response.msg)
+
+
+@client_app.command()
+def search(
+        ctx: typer.Context,
+        query: str,
+        page: int = typer.Option(1, "--page", "-p", min=1, help="Numéro de page"),
+        page_size: int = typer.Option(20, "--size", "-s", min=1, max=100, help="Résultats par page"),
+):
+    """
+    Command for search clients by name, company or email (typo tolerant)
+    :param ctx: typer Context
+    :param query: text searched
+    :param page: page number
+    :param page_size: results per page
+    :return: None
+    """
+    request = SearchClientRequest(
+        query=query,
+        page=page,
+        page_size=page_size
     )
     repo = SQLAlchemyClientRepository(ctx.obj["session"])
-    use_case = ListClientUseCase(repo)
+    use_case = SearchClientUseCase(repo)
     response = use_case.execute(request)
 
-    if response.success:
-        _display_data_list(response.clients, list_filter)
+    output = output_format(ctx)
+    if response.success and output is not OutputFormat.TABLE:
+        write_rows(response.clients, output)
+    elif response.success:
+        _display_data_list(response.clients, None, title=f"Recherche: {query} - page {page}")
     else:
         error_display(response.error, response.msg)
 
@@ -212,7 +284,7 @@ def delete(ctx: typer.Context, client_id: int, ):
     :return: None
     """
     repo = SQLAlchemyClientRepository(ctx.obj["session"])
-    use_case = DeleteClientUseCase(repo)
+    use_case = DeleteClientUseCase(repo, SQLAlchemyAuditRepository(ctx.obj["session"]))
 
     # verification ressource existe
     if not repo.exist(client_id):
@@ -278,13 +350,14 @@ def _display_data(client: Client, user: User):
     console.print(panel)
 
 
-def _display_data_list(clients: List[Client], filtre: ClientFilter):
+def _display_data_list(clients: List[ClientRow], filtre: Optional[ClientFilter], title: Optional[str] = None):
     """
     Display clients table
     """
     filtre = filtre.name if filtre else None
+    title = title or f"Liste des Clients - filtre: {filtre}"
     table = Table(
-        title=f"[bold magenta] Liste des Clients - filtre: {filtre}[/bold magenta]",
+        title=f"[bold magenta] {title}[/bold magenta]",
         box=box.ROUNDED,
         show_header=True,
         header_style="bold cyan",
@@ -302,8 +375,8 @@ def _display_data_list(clients: List[Client], filtre: ClientFilter):
         table.add_row(
             str(client.id),
             client.fullname,
-            str(client.email),
-            str(client.telephone),
+            client.email,
+            client.telephone,
             client.company_name,
             str(client.commercial_contact_id),
         )
@@ -1,3 +1,4 @@
+from pathlib import Path
 from typing import Optional, List
 
 import typer
@@ -7,17 +8,22 @@ from rich.panel import Panel
 from rich.table import Table
 from rich.text import Text
 
-from helpers.helper_cli import error_display
-from helpers.helpers import normalize
+from helpers.helper_cli import error_display, bulk_results_display
+from helpers.helpers import normalize, parse_ids, read_ids, read_payments
 from src.domain.entities.entities import Contrat, Client
+from src.domain.entities.exceptions import InvalidAmountError
+from src.domain.entities.read_models import ContratRow
 from src.domain.entities.value_objects import Money
 from src.domain.policies.user_policy import RequestPolicy, UserPolicy
 from src.infrastructures.repositories.SQLAchemy_repository import SQLAlchemyContratRepository, \
-    SQLAlchemyClientRepository, SQLAlchemyUserRepository
+    SQLAlchemyClientRepository, SQLAlchemyUserRepository, SQLAlchemyAuditRepository
+from src.presentation.cli.output import OutputFormat, output_format, write_rows
+from src.presentation.cli.pager import KeysetPager, page_size
 from src.use_cases.contrat_use_cases import CreateContratRequest, CreateContratUseCase, UpdateContratRequest, \
     UpdateContratUseCase, GetContratRequest, GetContratUseCase, ListContratUseCase, SignContratRequest, \
     SignContratUseCase, RecordPaymentContratRequest, RecordPaymentContratUseCase, ContratFilter, ListContratRequest, \
-    DeleteContratUseCase, DeleteContratRequest
+    DeleteContratUseCase, DeleteContratRequest, BulkSignContratUseCase, BulkSignContratRequest, \
+    BulkRecordPaymentContratUseCase, BulkRecordPaymentContratRequest
 
 contrat_app = typer.Typer()
 console = Console()
@@ -48,7 +54,7 @@ def create(
         ctx: typer.Context,
         client_id : int = typer.Option(..., prompt="ID client"),
         commercial_contact_id: int = typer.Option(..., prompt="ID du contact commercial"),
-        contrat_amount: int = typer.Option(..., prompt="Montant du contrat"),
+        contrat_amount: str = typer.Option(..., prompt="Montant du contrat", help="Montant en euros, ex: 1200.50"),
 ):
     """
     Command for creation client
@@ -62,7 +68,7 @@ def create(
     client_repo = SQLAlchemyClientRepository(ctx.obj["session"])
     user_repo = SQLAlchemyUserRepository(ctx.obj["session"])
 
-    use_case = CreateContratUseCase(contrat_repo, client_repo, user_repo)
+    use_case = CreateContratUseCase(contrat_repo, client_repo, user_repo, SQLAlchemyAuditRepository(ctx.obj["session"]))
 
     policy = RequestPolicy(
         user=ctx.obj["current_user"],
@@ -73,7 +79,7 @@ def create(
     request = CreateContratRequest(
         client_id= client_id,
         commercial_contact_id= commercial_contact_id,
-        contrat_amount =  Money(contrat_amount),
+        contrat_amount = _parse_amount(contrat_amount),
         authorization=policy
     )
     response = use_case.execute(request)
@@ -95,7 +101,7 @@ def update(ctx: typer.Context, contrat_id: int):
     """
     contrat_repo = SQLAlchemyContratRepository(ctx.obj["session"])
     client_repo = SQLAlchemyClientRepository(ctx.obj["session"])
-    use_case = UpdateContratUseCase(contrat_repo, client_repo)
+    use_case = UpdateContratUseCase(contrat_repo, client_repo, SQLAlchemyAuditRepository(ctx.obj["session"]))
 
     #verification ressource existe
     contrat = contrat_repo.find_by_id(contrat_id)
@@ -113,14 +119,15 @@ def update(ctx: typer.Context, contrat_id: int):
         action="update"
     )
 
-    contrat_amount = typer.prompt("Montant du contrat", default=0, show_default=False)
+    contrat_amount = typer.prompt("Montant du contrat", default="", show_default=False)
 
     contrat_amount = normalize(contrat_amount)
 
     request = UpdateContratRequest(
         contrat_id=contrat_id,
-        contrat_amount = Money(contrat_amount),
-        authorization=policy
+        contrat_amount = _parse_amount(contrat_amount) if contrat_amount is not None else None,
+        authorization=policy,
+        version=contrat.version
     )
     response = use_case.execute(request)
 
@@ -163,37 +170,106 @@ def list(
         list_filter: Optional[ContratFilter] = typer.Option(
             None, "--filter", "-f",
         help="Filter contrat",
-        )
+        ),
+        limit: Optional[int] = typer.Option(
+            None, "--limit", "-n", min=1,
+            help="Nombre de contrats par page"
+        ),
+        after_id: Optional[int] = typer.Option(
+            None, "--after",
+            help="ID du dernier contrat de la page précédente"
+        ),
+        pager: bool = typer.Option(
+            False, "--pager",
+            help="Afficher une page à la fois: n suivante, p précédente, numéro de page, q quitter"
+        ),
 ):
     """
     Command for list contrats
     :param list_filter: filter contrat
+    :param limit: page size, the terminal height with --pager
+    :param after_id: last contrat of the previous page
+    :param pager: interactive pager
     :param ctx: typer Context
     :return: None
     """
-    request = ListContratRequest(
-        commercial_contact_id = ctx.obj["current_user"]["user_current_id"],
-        list_filter = list_filter
-    )
-    repo = SQLAlchemyContratRepository(ctx.obj["session"])
-    use_case = ListContratUseCase(repo)
-    response = use_case.execute(request)
-
-    if response.success:
+    output = output_format(ctx)
+    pager = pager and output is OutputFormat.TABLE
+    if pager:
+        limit = page_size(limit)
+
+    def fetch(session, after):
+        request = ListContratRequest(
+            commercial_contact_id = ctx.obj["current_user"]["user_current_id"],
+            list_filter = list_filter,
+            after_id = after,
+            limit = limit,
+            stream = output is not OutputFormat.TABLE
+        )
+        repo = SQLAlchemyContratRepository(session)
+        use_case = ListContratUseCase(repo)
+        return use_case.execute(request)
+
+    response = fetch(ctx.obj["session"], after_id)
+
+    if response.success and output is not OutputFormat.TABLE:
+        write_rows(response.contrats, output)
+    elif response.success and pager:
+        KeysetPager(
+            response, fetch, "contrats", lambda contrats: _display_data_list(contrats, list_filter), ctx.obj["session"]
+        ).run()
+    elif response.success:
             _display_data_list(response.contrats, list_filter)
+            if response.next_after_id:
+                console.print(f"Page suivante: [dim]--after {response.next_after_id}[/dim]")
     else:
         error_display(response.error, response.msg)
 
-@contrat_app.command(help="Signer un contrat")
-def sign(ctx: typer.Context ,contrat_id: int):
+@contrat_app.command(help="Signer un ou plusieurs contrats")
+def sign(
+        ctx: typer.Context,
+        contrat_id: Optional[int] = typer.Argument(None),
+        ids: Optional[str] = typer.Option(None, "--ids", help="IDs des contrats séparés par des virgules"),
+        from_file: Optional[Path] = typer.Option(
+            None, "--from-file", exists=True, dir_okay=False,
+            help="Fichier avec un ID de contrat par ligne"
+        ),
+):
     """
-    Command for sign contrat
+    Command for sign contrat, or many contrats with --ids / --from-file
     :param ctx: typer Context
     :param contrat_id: ID contrat
+    :param ids: comma separated IDs
+    :param from_file: file with one ID per line
     :return: None
     """
     repo = SQLAlchemyContratRepository(ctx.obj["session"])
-    use_case = SignContratUseCase(repo)
+
+    if ids or from_file:
+        try:
+            contrat_ids = parse_ids(ids) if ids else read_ids(from_file)
+        except ValueError as e:
+            error_display("Paramètre", str(e))
+            raise typer.Exit(1)
+        policy = RequestPolicy(
+            user=ctx.obj["current_user"],
+            ressource=ctx.obj["ressource"],
+            action="sign"
+        )
+        response = BulkSignContratUseCase(repo, SQLAlchemyAuditRepository(ctx.obj["session"])).execute(
+            BulkSignContratRequest(contrat_ids=contrat_ids, authorization=policy)
+        )
+        if response.success:
+            bulk_results_display("Signature des contrats", response.results)
+        else:
+            error_display(response.error, response.msg)
+        return
+
+    if contrat_id is None:
+        error_display("Paramètre", "Indiquez un ID de contrat, --ids ou --from-file")
+        raise typer.Exit(1)
+
+    use_case = SignContratUseCase(repo, SQLAlchemyAuditRepository(ctx.obj["session"]))
 
     if not repo.exist(contrat_id):
         error_display("Ressource", "Contrat non trouvé")
@@ -216,16 +292,58 @@ def sign(ctx: typer.Context ,contrat_id: int):
     else:
         error_display(response.error, response.msg)
 
-@contrat_app.command(help="Effectuer un paiement")
-def pay(ctx : typer.Context, contrat_id: int):
+@contrat_app.command(help="Effectuer un ou plusieurs paiements")
+def pay(
+        ctx: typer.Context,
+        contrat_id: Optional[int] = typer.Argument(None),
+        csv_file: Optional[Path] = typer.Option(
+            None, "--csv", exists=True, dir_okay=False,
+            help="Fichier CSV de paiements, colonnes: contrat_id,amount"
+        ),
+        amount: Optional[str] = typer.Option(
+            None, "--amount", "-a", help="Montant du paiement en euros, ex: 10.50, sans invite"
+        ),
+        idempotency_key: Optional[str] = typer.Option(
+            None, "--idempotency-key", "-k",
+            help="Clé unique du paiement, une nouvelle tentative avec la même clé ne paie pas deux fois"
+        ),
+):
     """
-    Command for pay contrat
+    Command for pay contrat, or many contrats with --csv
     :param ctx: typer Context
     :param contrat_id: ID contrat
+    :param csv_file: csv file of payments
+    :param amount: payment amount, prompted if missing
+    :param idempotency_key: key of the payment, a retry with the same key returns the first result
     :return: None
     """
     repo = SQLAlchemyContratRepository(ctx.obj["session"])
-    use_case = RecordPaymentContratUseCase(repo)
+
+    if csv_file:
+        try:
+            payments = read_payments(csv_file)
+        except ValueError as e:
+            error_display("Fichier", str(e))
+            raise typer.Exit(1)
+        policy = RequestPolicy(
+            user=ctx.obj["current_user"],
+            ressource=ctx.obj["ressource"],
+            action="pay"
+        )
+        response = BulkRecordPaymentContratUseCase(repo, SQLAlchemyAuditRepository(ctx.obj["session"])).execute(
+            BulkRecordPaymentContratRequest(payments=payments, authorization=policy)
+        )
+        if response.success:
+            bulk_results_display("Paiements", response.results)
+        else:
+            error_display(response.error, response.msg)
+        return
+
+    if contrat_id is None:
+        error_display("Paramètre", "Indiquez un ID de contrat ou --csv")
+        raise typer.Exit(1)
+
+    use_case = RecordPaymentContratUseCase(repo, SQLAlchemyAuditRepository(ctx.obj["session"]))
 
     contrat = repo.find_by_id(contrat_id)
     if not contrat:
@@ -242,16 +360,21 @@ def pay(ctx : typer.Context, contrat_id: int):
         action="pay"
     )
 
-    payment: int = typer.prompt("montant du paiement", default=0, show_default=False)
+    payment: str = amount
+    if payment is None:
+        payment = typer.prompt("montant du paiement")
 
     request = RecordPaymentContratRequest(
         contrat_id=contrat_id,
         payment = payment,
-        authorization=policy
+        authorization=policy,
+        idempotency_key=idempotency_key
     )
     response = use_case.execute(request)
 
     if response.success:
+        if response.replayed:
+            console.print("[yellow]Paiement déjà enregistré avec cette clé, il n'a pas été rejoué[/yellow]")
         console.print(f"Contrat #{response.contrat.id} ")
         console.print(f"Montant du paiement: {payment}")
         console.print(f"Montant restant: {response.contrat.balance_due.amount}")
@@ -268,7 +391,7 @@ def delete(ctx: typer.Context, contrat_id: int):
     :return: None
     """
     repo = SQLAlchemyContratRepository(ctx.obj["session"])
-    use_case = DeleteContratUseCase(repo)
+    use_case = DeleteContratUseCase(repo, SQLAlchemyAuditRepository(ctx.obj["session"]))
 
     #verification ressource existe
     if not repo.exist(contrat_id):
@@ -296,6 +419,16 @@ def delete(ctx: typer.Context, contrat_id: int):
     else:
         error_display(response.error, response.msg)
 
+
+def _parse_amount(value: str) -> Money:
+    """Amount typed in euros, cents after a dot ("10.50") as in the --csv payments"""
+    try:
+        return Money(value)
+    except InvalidAmountError as e:
+        error_display("Erreur Métier", str(e))
+        raise typer.Exit(1)
+
+
 def _display_data(contrat: Contrat, client: Client):
     """ Display data of Contrat """
 
@@ -332,7 +465,7 @@ def _display_data(contrat: Contrat, client: Client):
 
     console.print(panel)
 
-def _display_data_list(contrats: List[Contrat], list_filter: ContratFilter):
+def _display_data_list(contrats: List[ContratRow], list_filter: ContratFilter):
     """
     Display contrats table
     """
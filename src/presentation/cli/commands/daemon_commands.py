@@ -0,0 +1,99 @@
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+import typer
+from rich.console import Console
+
+from helpers.helper_cli import error_display
+from src.presentation.daemon.client import control
+from src.presentation.daemon.protocol import SOCKET_PATH
+
+daemon_app = typer.Typer()
+console = Console()
+
+PROJECT_ROOT = Path(__file__).resolve().parents[4]
+START_TIMEOUT_SECONDS = 10
+
+
+@daemon_app.command(help="Démarrer le démon qui exécute les commandes sans recharger la CLI")
+def start(
+        foreground: bool = typer.Option(False, "--foreground", help="Rester au premier plan, jusqu'à Ctrl+C"),
+):
+    """
+    Command for starting the daemon, main.py sends it the commands while it is running
+    :param foreground: serve in this process instead of a detached one
+    :return: None
+    """
+    if control("status") is not None:
+        error_display("Démon", "Le démon est déjà démarré")
+        raise typer.Exit(1)
+
+    if foreground:
+        from src.infrastructures.database.changes import ChangeListener
+        from src.infrastructures.database.session import get_engine
+        from src.presentation.cli.cli_main import app
+        from src.presentation.daemon.server import CommandDaemon
+
+        daemon = CommandDaemon(app)
+        console.print(f"[bold cyan]Démon démarré[/bold cyan] sur {SOCKET_PATH}")
+        try:
+            with ChangeListener(get_engine(), daemon.invalidate):
+                daemon.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        console.print("[bold]Démon arrêté[/bold]")
+        return
+
+    # colors are detected when the consoles are created, before any client is connected
+    env = {name: value for name, value in os.environ.items() if name != "COLUMNS"}
+    env["FORCE_COLOR"] = "1"
+    subprocess.Popen(
+        [sys.executable, "main.py", "daemon", "start", "--foreground"],
+        cwd=PROJECT_ROOT,
+        env=env,
+        start_new_session=True,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + START_TIMEOUT_SECONDS
+    while control("status") is None:
+        if time.monotonic() > deadline:
+            error_display("Démon", "Le démon n'a pas démarré, essayez `daemon start --foreground`")
+            raise typer.Exit(1)
+        time.sleep(0.05)
+    console.print(f"[bold green]Démon démarré[/bold green] sur {SOCKET_PATH}")
+
+
+@daemon_app.command(help="Arrêter le démon")
+def stop():
+    """
+    Command for stopping the daemon, after the command it is running
+    :return: None
+    """
+    status = control("stop")
+    if status is None:
+        error_display("Démon", "Le démon n'est pas démarré")
+        raise typer.Exit(1)
+    console.print(f"[bold]Démon arrêté[/bold] après {status['commands']} commande(s)")
+
+
+@daemon_app.command(help="Afficher l'état du démon")
+def status():
+    """
+    Command for the state of the daemon
+    :return: None
+    """
+    status = control("status")
+    if status is None:
+        console.print("Démon [bold]arrêté[/bold], les commandes s'exécutent sans démon")
+        return
+    started_at = datetime.fromtimestamp(status["started_at"]).strftime("%d/%m/%Y %H:%M")
+    console.print(
+        f"Démon [bold green]démarré[/bold green] (pid {status['pid']}) depuis le {started_at}, "
+        f"{status['commands']} commande(s) exécutée(s)"
+    )
@@ -0,0 +1,213 @@
+from typing import List
+
+import typer
+from rich import box
+from rich.console import Console
+from rich.table import Table
+
+from helpers.helper_cli import error_display
+from src.domain.entities.read_models import CommercialReportRow, SupportSummaryRow, SummaryDiff
+from src.domain.policies.user_policy import RequestPolicy, UserPolicy
+from src.infrastructures.repositories.SQLAchemy_repository import SQLAlchemyDashboardRepository, \
+    SQLAlchemyPaymentRepository
+from src.use_cases.dashboard_use_cases import GetDashboardUseCase, GetDashboardRequest, CheckDashboardUseCase, \
+    CheckDashboardRequest, CheckLedgerUseCase, CheckLedgerRequest
+
+dashboard_app = typer.Typer()
+console = Console()
+
+
+@dashboard_app.callback()
+def permission(ctx: typer.Context):
+    """Callback - verify user role """
+    ctx.obj["ressource"] = "DASHBOARD"
+
+    request = RequestPolicy(
+        user=ctx.obj["current_user"],
+        ressource=ctx.obj["ressource"],
+        action=ctx.invoked_subcommand,
+        context=None
+    )
+
+    policy = UserPolicy(request)
+    if not policy.is_allowed():
+        error_display("Permission", "Vous êtes pas authorisé à utiliser cette commande")
+        raise typer.Exit(1)
+
+
+@dashboard_app.command(help="Afficher le tableau de bord")
+def show(ctx: typer.Context):
+    """
+    Command for show dashboard summaries
+    :param ctx: typer Context
+    :return: None
+    """
+    policy = RequestPolicy(
+        user=ctx.obj["current_user"],
+        ressource=ctx.obj["ressource"],
+        action="show"
+    )
+    request = GetDashboardRequest(authorization=policy)
+    repo = SQLAlchemyDashboardRepository(ctx.obj["session"])
+    use_case = GetDashboardUseCase(repo)
+    response = use_case.execute(request)
+
+    if response.success:
+        _display_commercials(response.commercials)
+        _display_supports(response.supports)
+    else:
+        error_display(response.error, response.msg)
+
+
+@dashboard_app.command(help="Vérifier (et réparer) les tables du tableau de bord")
+def check(
+        ctx: typer.Context,
+        repair: bool = typer.Option(False, "--repair", help="Reconstruire les tables en cas d'écart"),
+):
+    """
+    Command for check dashboard summaries against source tables
+    :param ctx: typer Context
+    :param repair: rebuild summaries if differences are found
+    :return: None
+    """
+    policy = RequestPolicy(
+        user=ctx.obj["current_user"],
+        ressource=ctx.obj["ressource"],
+        action="check"
+    )
+    request = CheckDashboardRequest(repair=repair, authorization=policy)
+    repo = SQLAlchemyDashboardRepository(ctx.obj["session"])
+    use_case = CheckDashboardUseCase(repo)
+    response = use_case.execute(request)
+
+    if not response.success:
+        error_display(response.error, response.msg)
+        return
+
+    if not response.diffs:
+        console.print("[green]Tableau de bord cohérent[/green]")
+        return
+
+    _display_diffs(response.diffs)
+    if response.repaired:
+        console.print("[green]Tableau de bord reconstruit[/green]")
+    else:
+        error_display("Incohérence", f"{len(response.diffs)} écart(s), relancez avec --repair")
+        raise typer.Exit(1)
+
+
+@dashboard_app.command(help="Vérifier (et reconstruire) les soldes des contrats à partir des paiements")
+def ledger(
+        ctx: typer.Context,
+        repair: bool = typer.Option(False, "--repair", help="Recalculer les soldes en cas d'écart"),
+        workers: int = typer.Option(4, "--workers", "-w", min=1, help="Plages de contrats recalculées en parallèle"),
+):
+    """
+    Command for check contrat balances due against the payments ledger
+    :param ctx: typer Context
+    :param repair: rebuild balances from the ledger if differences are found
+    :param workers: id ranges rebuilt in parallel
+    :return: None
+    """
+    policy = RequestPolicy(
+        user=ctx.obj["current_user"],
+        ressource=ctx.obj["ressource"],
+        action="ledger"
+    )
+    request = CheckLedgerRequest(repair=repair, authorization=policy, workers=workers)
+    repo = SQLAlchemyPaymentRepository(ctx.obj["session"])
+    use_case = CheckLedgerUseCase(repo)
+    response = use_case.execute(request)
+
+    if not response.success:
+        error_display(response.error, response.msg)
+        return
+
+    if not response.diffs:
+        console.print("[green]Soldes cohérents avec les paiements[/green]")
+        return
+
+    _display_diffs(response.diffs)
+    if response.repaired:
+        console.print("[green]Soldes recalculés[/green]")
+    else:
+        error_display("Incohérence", f"{len(response.diffs)} écart(s), relancez avec --repair")
+        raise typer.Exit(1)
+
+
+def _display_commercials(rows: List[CommercialReportRow]):
+    """
+    Display commercials summary table
+    """
+    table = Table(
+        title="[bold magenta] Tableau de bord - Commerciaux[/bold magenta]",
+        box=box.ROUNDED,
+        show_header=True,
+        header_style="bold cyan",
+        border_style="white"
+    )
+
+    table.add_column("ID", style="dim", width=6, justify="right")
+    table.add_column("Commercial", style="bold", min_width=20)
+    table.add_column("Contrats", justify="right")
+    table.add_column("Signés", justify="right")
+    table.add_column("Montant total", justify="right")
+    table.add_column("Reste à payer", justify="right")
+
+    for row in rows:
+        table.add_row(
+            str(row.commercial_contact_id),
+            row.fullname or "-",
+            str(row.contrat_count),
+            str(row.signed_count),
+            str(row.total_amount),
+            str(row.balance_due),
+        )
+    console.print(table)
+
+
+def _display_supports(rows: List[SupportSummaryRow]):
+    """
+    Display supports summary table
+    """
+    table = Table(
+        title="[bold magenta] Tableau de bord - Support[/bold magenta]",
+        box=box.ROUNDED,
+        show_header=True,
+        header_style="bold cyan",
+        border_style="white"
+    )
+
+    table.add_column("ID", style="dim", width=6, justify="right")
+    table.add_column("Support", style="bold", min_width=20)
+    table.add_column("Évènements à venir", justify="right")
+
+    for row in rows:
+        table.add_row(
+            str(row.support_contact_id),
+            row.fullname or "-",
+            str(row.upcoming_event_count),
+        )
+    console.print(table)
+
+
+def _display_diffs(diffs: List[SummaryDiff]):
+    """
+    Display summary differences table
+    """
+    table = Table(
+        title="[bold magenta] Écarts du tableau de bord[/bold magenta]",
+        box=box.ROUNDED,
+        show_header=True,
+        header_style="bold cyan",
+        border_style="white"
+    )
+
+    table.add_column("Table", style="bold")
+    table.add_column("Clé")
+    table.add_column("Attendu", justify="right")
+    table.add_column("Stocké", justify="right")
+
+    for diff in diffs:
+        table.add_row(diff.table, diff.key, str(diff.expected), str(diff.actual))
+    console.print(table)
@@ -1,3 +1,4 @@
+from collections import Counter
 from datetime import datetime
 from typing import Optional, List
 
@@ -8,15 +9,19 @@ from rich.panel import Panel
 from rich.table import Table
 from rich.text import Text
 
-from helpers.helper_cli import error_display
-from helpers.helpers import normalize
-from src.domain.entities.entities import Event, Client
+from helpers.helper_cli import error_display, bulk_results_display
+from helpers.helpers import normalize, parse_ids
+from src.domain.entities.entities import Event, Client, User
+from src.domain.entities.read_models import EventRow
 from src.domain.policies.user_policy import RequestPolicy, UserPolicy
 from src.infrastructures.repositories.SQLAchemy_repository import SQLAlchemyEventRepository, SQLAlchemyUserRepository, \
-    SQLAlchemyContratRepository, SQLAlchemyClientRepository
+    SQLAlchemyContratRepository, SQLAlchemyClientRepository, SQLAlchemyAuditRepository
+from src.presentation.cli.output import OutputFormat, output_format, write_rows
+from src.presentation.cli.pager import KeysetPager, page_size
 from src.use_cases.event_use_cases import ListEventUseCase, GetEventUseCase, GetEventRequest, UpdateEventUseCase, \
     UpdateEventRequest, CreateEventUseCase, CreateEventRequest, AssignSupportEventRequest, AssignSupportEventUseCase, \
-    EventFilter, ListEventRequest, DeleteEventRequest, DeleteEventUseCase
+    EventFilter, ListEventRequest, DeleteEventRequest, DeleteEventUseCase, AutoAssignSupportEventUseCase, \
+    AutoAssignSupportEventRequest, BulkAssignSupportEventUseCase, BulkAssignSupportEventRequest
 
 event_app = typer.Typer()
 console = Console()
@@ -85,7 +90,7 @@ def create(
     event_repo = SQLAlchemyEventRepository(ctx.obj["session"])
     contrat_repo = SQLAlchemyContratRepository(ctx.obj["session"])
     client_repo = SQLAlchemyClientRepository(ctx.obj["session"])
-    use_case = CreateEventUseCase(event_repo, contrat_repo, client_repo)
+    use_case = CreateEventUseCase(event_repo, contrat_repo, client_repo, SQLAlchemyAuditRepository(ctx.obj["session"]))
     response = use_case.execute(request)
 
     if response.success:
@@ -105,7 +110,7 @@ def update(ctx: typer.Context, event_id: int):
     """
     event_repo = SQLAlchemyEventRepository(ctx.obj["session"])
     client_repo = SQLAlchemyClientRepository(ctx.obj["session"])
-    use_case = UpdateEventUseCase(event_repo, client_repo)
+    use_case = UpdateEventUseCase(event_repo, client_repo, SQLAlchemyAuditRepository(ctx.obj["session"]))
 
     event = event_repo.find_by_id(event_id)
     if not event:
@@ -142,7 +147,8 @@ def update(ctx: typer.Context, event_id: int):
         location=location,
         attendees=int(attendees) if attendees is not None else None,
         notes=notes,
-        authorization=policy
+        authorization=policy,
+        version=event.version
     )
     response = use_case.execute(request)
 
@@ -182,40 +188,117 @@ def list(
         list_filter: Optional[EventFilter] = typer.Option(
             None, "--filter", "-f",
             help="Filter events"
-        )
+        ),
+        date_from: Optional[datetime] = typer.Option(
+            None, "--from",
+            help="Évènements se terminant après cette date"
+        ),
+        date_to: Optional[datetime] = typer.Option(
+            None, "--to",
+            help="Évènements commençant avant cette date"
+        ),
+        limit: Optional[int] = typer.Option(
+            None, "--limit", "-n", min=1,
+            help="Nombre d'évènements par page"
+        ),
+        after_id: Optional[int] = typer.Option(
+            None, "--after",
+            help="ID du dernier évènement de la page précédente"
+        ),
+        pager: bool = typer.Option(
+            False, "--pager",
+            help="Afficher une page à la fois: n suivante, p précédente, numéro de page, q quitter"
+        ),
 ):
     """
     Command for list Event
     :param list_filter: filter event
+    :param date_from: start of the period
+    :param date_to: end of the period (excluded)
+    :param limit: page size, the terminal height with --pager
+    :param after_id: last event of the previous page
+    :param pager: interactive pager
     :param ctx: typer.Context
     :return: None
     """
-    request = ListEventRequest(
-        support_contact_id=ctx.obj["current_user"]["user_current_id"],
-        list_filter=list_filter,
-    )
-    repo = SQLAlchemyEventRepository(ctx.obj["session"])
-    use_case = ListEventUseCase(repo)
-    response = use_case.execute(request)
-
-    if response.success:
+    output = output_format(ctx)
+    pager = pager and output is OutputFormat.TABLE
+    if pager:
+        limit = page_size(limit)
+
+    def fetch(session, after):
+        request = ListEventRequest(
+            support_contact_id=ctx.obj["current_user"]["user_current_id"],
+            list_filter=list_filter,
+            date_from=date_from,
+            date_to=date_to,
+            after_id=after,
+            limit=limit,
+            stream=output is not OutputFormat.TABLE,
+        )
+        repo = SQLAlchemyEventRepository(session)
+        use_case = ListEventUseCase(repo)
+        return use_case.execute(request)
+
+    response = fetch(ctx.obj["session"], after_id)
+
+    if response.success and output is not OutputFormat.TABLE:
+        write_rows(response.events, output)
+    elif response.success and pager:
+        KeysetPager(
+            response, fetch, "events", lambda events: _display_data_list(events, list_filter), ctx.obj["session"]
+        ).run()
+    elif response.success:
         _display_data_list(response.events, list_filter)
+        if response.next_after_id:
+            console.print(f"Page suivante: [dim]--after {response.next_after_id}[/dim]")
     else:
         error_display(response.error, response.msg)
 
 
-@event_app.command(help="Assigner un Utilisateur Support a l'évènement")
-def assign(ctx: typer.Context, event_id: int):
+@event_app.command(help="Assigner un Utilisateur Support a un ou plusieurs évènements")
+def assign(
+        ctx: typer.Context,
+        event_id: Optional[int] = typer.Argument(None),
+        ids: Optional[str] = typer.Option(None, "--ids", help="IDs des évènements séparés par des virgules"),
+):
     """
-    Command for assign user support to event
+    Command for assign user support to event, or to many events with --ids
     :param ctx: typer Context
     :param event_id: ID of the event
+    :param ids: comma separated IDs
     :return: None
     """
     session = ctx.obj["session"]
     repo = SQLAlchemyEventRepository(session)
     user_repo = SQLAlchemyUserRepository(session)
 
+    if ids:
+        try:
+            event_ids = parse_ids(ids)
+        except ValueError as e:
+            error_display("Paramètre", str(e))
+            raise typer.Exit(1)
+        policy = RequestPolicy(
+            user=ctx.obj["current_user"],
+            ressource=ctx.obj["ressource"],
+            action="assign"
+        )
+        support_user_id = typer.prompt("Id utilisateur Support: ", type=int)
+        use_case = BulkAssignSupportEventUseCase(repo, user_repo, SQLAlchemyAuditRepository(ctx.obj["session"]))
+        response = use_case.execute(
+            BulkAssignSupportEventRequest(event_ids=event_ids, support_user_id=support_user_id, authorization=policy)
+        )
+        if response.success:
+            bulk_results_display(f"Assignation à User #{support_user_id}", response.results)
+        else:
+            error_display(response.error, response.msg)
+        return
+
+    if event_id is None:
+        error_display("Paramètre", "Indiquez un ID d'évènement ou --ids")
+        raise typer.Exit(1)
+
     if not repo.exist(event_id):
         error_display("Ressource", "Client non trouvé")
         raise typer.Exit()
@@ -233,7 +316,7 @@ def assign(ctx: typer.Context, event_id: int):
         support_user_id=int(support_user_id),
         authorization=policy
     )
-    use_case = AssignSupportEventUseCase(repo, user_repo)
+    use_case = AssignSupportEventUseCase(repo, user_repo, SQLAlchemyAuditRepository(ctx.obj["session"]))
     response = use_case.execute(request)
 
     if response.success:
@@ -242,6 +325,37 @@ def assign(ctx: typer.Context, event_id: int):
         error_display(response.error, response.msg)
 
 
+@event_app.command(help="Assigner automatiquement les évènements sans support")
+def auto_assign(ctx: typer.Context):
+    """
+    Command for assign every upcoming event without support to the least loaded free support user
+    :param ctx: typer Context
+    :return: None
+    """
+    session = ctx.obj["session"]
+    policy = RequestPolicy(
+        user=ctx.obj["current_user"],
+        ressource=ctx.obj["ressource"],
+        action="auto-assign"
+    )
+    request = AutoAssignSupportEventRequest(authorization=policy)
+    use_case = AutoAssignSupportEventUseCase(
+        SQLAlchemyEventRepository(session), SQLAlchemyUserRepository(session), SQLAlchemyAuditRepository(session)
+    )
+    response = use_case.execute(request)
+
+    if response.success:
+        _display_auto_assign_report(response.assignments, response.supports)
+        if response.unassigned:
+            error_display(
+                "Non assigné",
+                f"{len(response.unassigned)} évènement(s) sans support disponible sur leur créneau"
+            )
+            _display_data_list(response.unassigned, EventFilter.WITHOUT_SUPPORT)
+    else:
+        error_display(response.error, response.msg)
+
+
 @event_app.command(help="Supprimer un évènement")
 def delete(ctx: typer.Context, event_id: int):
     """
@@ -251,7 +365,7 @@ def delete(ctx: typer.Context, event_id: int):
     :return: None
     """
     repo = SQLAlchemyEventRepository(ctx.obj["session"])
-    use_case = DeleteEventUseCase(repo)
+    use_case = DeleteEventUseCase(repo, SQLAlchemyAuditRepository(ctx.obj["session"]))
 
     # verification ressource existe
     if not repo.exist(event_id):
@@ -328,7 +442,7 @@ def _display_data(event: Event, client: Client):
     console.print(panel)
 
 
-def _display_data_list(events: List[Event], list_filter: EventFilter):
+def _display_data_list(events: List[EventRow], list_filter: EventFilter):
     """
     Display events table
     """
@@ -367,3 +481,25 @@ def _display_data_list(events: List[Event], list_filter: EventFilter):
         )
     console.print(f"\nTotal: [dim]{len(events)} événement(s)[/dim]")
     console.print(table)
+
+
+def _display_auto_assign_report(assignments: dict[int, int], supports: List[User]):
+    """
+    Display events assigned per support user
+    """
+    table = Table(
+        title=f"[bold magenta] Assignation automatique - {len(assignments)} évènement(s)[/bold magenta]",
+        box=box.ROUNDED,
+        show_header=True,
+        header_style="bold cyan",
+        border_style="white"
+    )
+
+    table.add_column("ID", style="dim", width=6, justify="right")
+    table.add_column("Support", style="bold", min_width=20)
+    table.add_column("Évènements assignés", justify="right")
+
+    assigned_count = Counter(assignments.values())
+    for support in supports:
+        table.add_row(str(support.id), support.fullname, str(assigned_count[support.id]))
+    console.print(table)
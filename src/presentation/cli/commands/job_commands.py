@@ -0,0 +1,235 @@
+from typing import List, Optional
+
+import typer
+from rich import box
+from rich.console import Console
+from rich.panel import Panel
+from rich.table import Table
+from rich.text import Text
+
+from helpers.helper_cli import error_display
+from src.domain.entities.read_models import Job
+from src.domain.policies.user_policy import RequestPolicy
+from src.infrastructures.jobs.kinds import EXPORT, REPORT, EXPORT_FILTERS, ExportTarget
+from src.infrastructures.jobs.runner import spawn_runner
+from src.infrastructures.repositories.SQLAchemy_repository import SQLAlchemyJobRepository
+from src.presentation.cli.output import OutputFormat, output_format, write_rows
+from src.use_cases.job_use_cases import SubmitJobUseCase, SubmitJobRequest, GetJobUseCase, GetJobRequest, \
+    ListJobUseCase, ListJobRequest, CancelJobUseCase, CancelJobRequest
+from src.use_cases.report_use_cases import ReportType
+
+job_app = typer.Typer()
+submit_app = typer.Typer()
+job_app.add_typer(submit_app, name="submit", help="Lancer une commande longue en arrière-plan")
+console = Console()
+
+
+@job_app.callback()
+def permission(ctx: typer.Context):
+    """Callback - jobs are checked by their use cases: the command a job runs, and who may see it"""
+    ctx.obj["ressource"] = "JOB"
+
+
+def _submit(ctx: typer.Context, kind: str, params: dict, authorization: Optional[RequestPolicy] = None):
+    """Queue the job then start a detached runner for it"""
+    request = SubmitJobRequest(kind=kind, params=params, user=ctx.obj["current_user"], authorization=authorization)
+    use_case = SubmitJobUseCase(SQLAlchemyJobRepository(ctx.obj["session"]))
+    response = use_case.execute(request)
+
+    if response.success:
+        spawn_runner()
+        console.print(
+            f"[bold green]Tâche #{response.job.id} lancée[/bold green], "
+            f"suivez-la avec [bold]job status {response.job.id}[/bold]"
+        )
+    else:
+        error_display(response.error, response.msg)
+
+
+@submit_app.command(help="Exporter les clients, contrats ou évènements en CSV")
+def export(
+        ctx: typer.Context,
+        target: ExportTarget = typer.Argument(..., help="Éléments exportés"),
+        list_filter: Optional[str] = typer.Option(
+            None, "--filter", "-f",
+            help="Filtre de la commande list correspondante (ex: signed, mine, no-support)",
+        ),
+):
+    """
+    Command for exporting the rows of `client list`, `contrat list` or `event list` in the background
+    :param ctx: typer Context
+    :param target: clients, contrats or events
+    :param list_filter: filter of the list command
+    :return: None
+    """
+    if list_filter is not None:
+        try:
+            EXPORT_FILTERS[target](list_filter)
+        except ValueError:
+            choices = ", ".join(choice.value for choice in EXPORT_FILTERS[target])
+            error_display("Filtre", f"Filtre invalide pour {target.value}, choix possibles: {choices}")
+            raise typer.Exit(1)
+
+    _submit(ctx, EXPORT, {"target": target.value, "filter": list_filter})
+
+
+@submit_app.command(help="Calculer un rapport en CSV")
+def report(
+        ctx: typer.Context,
+        report_type: ReportType = typer.Argument(..., help="Type de rapport"),
+):
+    """
+    Command for computing a report in the background, same permission as the report command
+    :param ctx: typer Context
+    :param report_type: commercial, client or status
+    :return: None
+    """
+    policy = RequestPolicy(
+        user=ctx.obj["current_user"],
+        ressource="REPORT",
+        action=report_type.value
+    )
+    _submit(ctx, REPORT, {"report_type": report_type.value}, policy)
+
+
+@job_app.command(help="Afficher l'avancement d'une tâche")
+def status(ctx: typer.Context, job_id: int):
+    """
+    Command for the status, progress and result file of a job
+    :param ctx: typer Context
+    :param job_id: ID job
+    :return: None
+    """
+    request = GetJobRequest(job_id=job_id, user=ctx.obj["current_user"])
+    use_case = GetJobUseCase(SQLAlchemyJobRepository(ctx.obj["session"]))
+    response = use_case.execute(request)
+
+    if response.success:
+        _display_job(response.job)
+    else:
+        error_display(response.error, response.msg)
+
+
+@job_app.command(help="Afficher les dernières tâches")
+def list(
+        ctx: typer.Context,
+        all_users: bool = typer.Option(False, "--all", help="Tâches de tous les utilisateurs (admin)"),
+        limit: int = typer.Option(20, "--limit", "-l", help="Nombre de tâches affichées"),
+):
+    """
+    Command for listing the latest jobs
+    :param ctx: typer Context
+    :param all_users: jobs of every user, admin only
+    :param limit: maximum number of jobs
+    :return: None
+    """
+    request = ListJobRequest(user=ctx.obj["current_user"], all_users=all_users, limit=limit)
+    use_case = ListJobUseCase(SQLAlchemyJobRepository(ctx.obj["session"]))
+    response = use_case.execute(request)
+
+    output = output_format(ctx)
+    if response.success and output is not OutputFormat.TABLE:
+        write_rows(response.jobs, output)
+    elif response.success:
+        _display_job_list(response.jobs)
+    else:
+        error_display(response.error, response.msg)
+
+
+@job_app.command(help="Annuler une tâche en attente ou en cours")
+def cancel(ctx: typer.Context, job_id: int):
+    """
+    Command for cancelling a job, a running job stops at its next progress report
+    :param ctx: typer Context
+    :param job_id: ID job
+    :return: None
+    """
+    request = CancelJobRequest(job_id=job_id, user=ctx.obj["current_user"])
+    use_case = CancelJobUseCase(SQLAlchemyJobRepository(ctx.obj["session"]))
+    response = use_case.execute(request)
+
+    if response.success:
+        console.print(f"[bold green]Tâche #{job_id} annulée[/bold green]")
+    else:
+        error_display(response.error, response.msg)
+
+
+def _progress(job: Job) -> str:
+    if job.total is None:
+        return f"{job.progress}"
+    return f"{job.progress}/{job.total} ({job.progress * 100 // max(job.total, 1)} %)"
+
+
+def _description(job: Job) -> str:
+    return " ".join([job.kind, *(f"{value}" for value in job.params.values() if value)])
+
+
+def _display_job(job: Job):
+    """ Display data of Job """
+
+    content = Text()
+
+    content.append(f"\nCommande: ", style="bold cyan")
+    content.append(f"{_description(job)}\n")
+
+    content.append(f"Statut: ", style="bold cyan")
+    content.append(f"{job.status.value}\n")
+
+    content.append(f"Avancement: ", style="bold cyan")
+    content.append(f"{_progress(job)}\n")
+
+    content.append(f"Date de création: ", style="bold cyan")
+    content.append(f"{job.created_at.strftime('%d/%m/%Y %H:%M')}\n")
+
+    if job.finished_at is not None:
+        content.append(f"Date de fin: ", style="bold cyan")
+        content.append(f"{job.finished_at.strftime('%d/%m/%Y %H:%M')}\n")
+
+    if job.result_path is not None:
+        content.append(f"Résultat: ", style="bold cyan")
+        content.append(f"{job.result_path}\n")
+
+    if job.error is not None:
+        content.append(f"Erreur: ", style="bold red")
+        content.append(f"{job.error}\n")
+
+    panel = Panel(
+        content,
+        title=f"[bold magenta] Tâche #{job.id}[/bold magenta]",
+        border_style="white",
+        box=box.ROUNDED,
+        expand=False
+    )
+
+    console.print(panel)
+
+
+def _display_job_list(jobs: List[Job]):
+    """
+    Display jobs table
+    """
+    table = Table(
+        title="[bold magenta] Tâches[/bold magenta]",
+        box=box.ROUNDED,
+        show_header=True,
+        header_style="bold cyan",
+        border_style="white",
+    )
+
+    table.add_column("ID", justify="right", style="dim")
+    table.add_column("Commande", style="bold")
+    table.add_column("Statut")
+    table.add_column("Avancement", justify="right")
+    table.add_column("User", justify="right")
+    table.add_column("Date", style="dim")
+
+    for job in jobs:
+        table.add_row(
+            str(job.id),
+            _description(job),
+            job.status.value,
+            _progress(job),
+            str(job.created_by),
+            job.created_at.strftime("%d/%m/%Y %H:%M"),
+        )
+    console.print(table)
@@ -0,0 +1,243 @@
+from datetime import datetime
+from typing import List, Optional
+
+import typer
+from rich import box
+from rich.console import Console
+from rich.table import Table
+
+from helpers.helper_cli import error_display
+from src.domain.entities.read_models import CommercialReportRow, ClientReportRow, StatusReportRow, CashInRow
+from src.domain.entities.value_objects import sum_money
+from src.domain.policies.user_policy import RequestPolicy, UserPolicy
+from src.infrastructures.repositories.SQLAchemy_repository import SQLAlchemyContratRepository, \
+    SQLAlchemyPaymentRepository
+from src.use_cases.report_use_cases import GetReportUseCase, GetReportRequest, ReportType, GetCashInReportUseCase, \
+    GetCashInReportRequest
+
+report_app = typer.Typer()
+console = Console()
+
+
+@report_app.callback()
+def permission(ctx: typer.Context):
+    """Callback - verify user role """
+    ctx.obj["ressource"] = "REPORT"
+
+    request = RequestPolicy(
+        user=ctx.obj["current_user"],
+        ressource=ctx.obj["ressource"],
+        action=ctx.invoked_subcommand,
+        context=None
+    )
+
+    policy = UserPolicy(request)
+    if not policy.is_allowed():
+        error_display("Permission", "Vous êtes pas authorisé à utiliser cette commande")
+        raise typer.Exit(1)
+
+
+def _get_report(ctx: typer.Context, report_type: ReportType):
+    """Execute the report use case for the given report type"""
+    policy = RequestPolicy(
+        user=ctx.obj["current_user"],
+        ressource=ctx.obj["ressource"],
+        action=report_type.value
+    )
+    request = GetReportRequest(
+        report_type=report_type,
+        authorization=policy
+    )
+    repo = SQLAlchemyContratRepository(ctx.obj["session"])
+    use_case = GetReportUseCase(repo)
+    return use_case.execute(request)
+
+
+@report_app.command(help="Chiffre d'affaires et reste à payer par commercial")
+def commercial(ctx: typer.Context):
+    """
+    Command for report per commercial contact
+    :param ctx: typer Context
+    :return: None
+    """
+    response = _get_report(ctx, ReportType.COMMERCIAL)
+
+    if response.success:
+        _display_commercial_report(response.rows)
+    else:
+        error_display(response.error, response.msg)
+
+
+@report_app.command(help="Chiffre d'affaires et reste à payer par client")
+def client(ctx: typer.Context):
+    """
+    Command for report per client
+    :param ctx: typer Context
+    :return: None
+    """
+    response = _get_report(ctx, ReportType.CLIENT)
+
+    if response.success:
+        _display_client_report(response.rows)
+    else:
+        error_display(response.error, response.msg)
+
+
+@report_app.command(help="Montants signés / non signés")
+def status(ctx: typer.Context):
+    """
+    Command for report per contrat status
+    :param ctx: typer Context
+    :return: None
+    """
+    response = _get_report(ctx, ReportType.STATUS)
+
+    if response.success:
+        _display_status_report(response.rows)
+    else:
+        error_display(response.error, response.msg)
+
+
+@report_app.command(help="Encaissements par mois")
+def cash_in(
+        ctx: typer.Context,
+        date_from: Optional[datetime] = typer.Option(
+            None, "--from",
+            help="Paiements reçus à partir de cette date (défaut: début de l'année)"
+        ),
+        date_to: Optional[datetime] = typer.Option(
+            None, "--to",
+            help="Paiements reçus avant cette date (défaut: maintenant)"
+        ),
+        contrat_id: Optional[int] = typer.Option(None, "--contrat", "-c", help="Paiements d'un seul contrat"),
+):
+    """
+    Command for monthly cash-in report, from the payments ledger
+    :param ctx: typer Context
+    :param date_from: first date included
+    :param date_to: first date excluded
+    :param contrat_id: only the payments of this contrat
+    :return: None
+    """
+    now = datetime.now()
+    policy = RequestPolicy(
+        user=ctx.obj["current_user"],
+        ressource=ctx.obj["ressource"],
+        action="cash-in"
+    )
+    request = GetCashInReportRequest(
+        date_from=date_from or datetime(now.year, 1, 1),
+        date_to=date_to or now,
+        authorization=policy,
+        contrat_id=contrat_id,
+    )
+    repo = SQLAlchemyPaymentRepository(ctx.obj["session"])
+    use_case = GetCashInReportUseCase(repo)
+    response = use_case.execute(request)
+
+    if response.success:
+        _display_cash_in_report(response.rows)
+    else:
+        error_display(response.error, response.msg)
+
+
+def _report_table(title: str) -> Table:
+    """ Build an empty report table """
+    return Table(
+        title=f"[bold magenta] {title}[/bold magenta]",
+        box=box.ROUNDED,
+        show_header=True,
+        header_style="bold cyan",
+        border_style="white",
+        show_footer=True,
+    )
+
+
+def _display_commercial_report(rows: List[CommercialReportRow]):
+    """
+    Display report per commercial table
+    """
+    table = _report_table("Rapport par commercial")
+
+    table.add_column("ID", style="dim", width=6, justify="right", footer="Total")
+    table.add_column("Commercial", style="bold", min_width=20)
+    table.add_column("Contrats", justify="right", footer=str(sum(row.contrat_count for row in rows)))
+    table.add_column("Signés", justify="right", footer=str(sum(row.signed_count for row in rows)))
+    table.add_column("Montant total", justify="right", footer=str(sum_money(row.total_amount for row in rows)))
+    table.add_column("Reste à payer", justify="right", footer=str(sum_money(row.balance_due for row in rows)))
+
+    for row in rows:
+        table.add_row(
+            str(row.commercial_contact_id),
+            row.fullname or "-",
+            str(row.contrat_count),
+            str(row.signed_count),
+            str(row.total_amount),
+            str(row.balance_due),
+        )
+    console.print(table)
+
+
+def _display_client_report(rows: List[ClientReportRow]):
+    """
+    Display report per client table
+    """
+    table = _report_table("Rapport par client")
+
+    table.add_column("ID", style="dim", width=6, justify="right", footer="Total")
+    table.add_column("Client", style="bold", min_width=20)
+    table.add_column("Entreprise", min_width=15)
+    table.add_column("Contrats", justify="right", footer=str(sum(row.contrat_count for row in rows)))
+    table.add_column("Montant total", justify="right", footer=str(sum_money(row.total_amount for row in rows)))
+    table.add_column("Reste à payer", justify="right", footer=str(sum_money(row.balance_due for row in rows)))
+
+    for row in rows:
+        table.add_row(
+            str(row.client_id),
+            row.fullname or "-",
+            row.company_name or "-",
+            str(row.contrat_count),
+            str(row.total_amount),
+            str(row.balance_due),
+        )
+    console.print(table)
+
+
+def _display_status_report(rows: List[StatusReportRow]):
+    """
+    Display report per status table
+    """
+    table = _report_table("Rapport par statut")
+
+    table.add_column("Statut", style="bold", footer="Total")
+    table.add_column("Contrats", justify="right", footer=str(sum(row.contrat_count for row in rows)))
+    table.add_column("Montant total", justify="right", footer=str(sum_money(row.total_amount for row in rows)))
+    table.add_column("Reste à payer", justify="right", footer=str(sum_money(row.balance_due for row in rows)))
+
+    for row in rows:
+        table.add_row(
+            row.status.name,
+            str(row.contrat_count),
+            str(row.total_amount),
+            str(row.balance_due),
+        )
+    console.print(table)
+
+
+def _display_cash_in_report(rows: List[CashInRow]):
+    """
+    Display cash-in per month table
+    """
+    table = _report_table("Encaissements par mois")
+
+    table.add_column("Mois", style="bold", footer="Total")
+    table.add_column("Paiements", justify="right", footer=str(sum(row.payment_count for row in rows)))
+    table.add_column("Montant encaissé", justify="right", footer=str(sum_money(row.amount for row in rows)))
+
+    for row in rows:
+        table.add_row(
+            row.month.strftime("%m/%Y"),
+            str(row.payment_count),
+            str(row.amount),
+        )
+    console.print(table)
@@ -1,3 +1,6 @@
+import shlex
+from pathlib import Path
+
 import typer
 from rich import box
 from rich.align import Align
@@ -6,34 +9,82 @@ from rich.panel import Panel
 from rich.text import Text
 
 from helpers.helper_cli import error_display
+from src.infrastructures.database.changes import ChangeListener, LISTEN
+from src.infrastructures.database.session import get_session
+from src.infrastructures.repositories.SQLAchemy_repository import (
+    SQLAlchemyAuditRepository,
+    SQLAlchemyLabelRepository,
+)
 from src.infrastructures.security.security import TokenStore
+from src.presentation.cli.completion import CompletionIndex, ShellCompleter, install, save_history
 
 shell_app =typer.Typer()
 console = Console()
 
+PROMPT = ">>> "
+HISTORY_FILE = Path.home() / ".epic_events_history"
+HISTORY_LENGTH = 1000
+
 @shell_app.command(name="start")
 def shell():
     from src.presentation.cli.cli_main import app
     TokenStore.delete_token()
     header()
-    while True:
-        try:
-            console.rule(style="white")
-            cmd = input("\n>>> ")
-
-            if cmd.strip() in ["exit", "quit"]:
-                break
 
-            parts = cmd.strip().split()
-            if not parts:
-                continue
+    # the index is loaded after login, then refreshed between two commands, never while typing
+    session = get_session()
+    index = CompletionIndex(SQLAlchemyLabelRepository(session), SQLAlchemyAuditRepository(session))
+    install(ShellCompleter(typer.main.get_command(app), index, PROMPT), HISTORY_FILE, HISTORY_LENGTH)
+    # PostgreSQL notifies the changes of every process, even while typing, SQLite is polled after each command
+    listener = ChangeListener(session.get_bind(), index.invalidate)
+    if listener.mode == LISTEN:
+        listener.start()
+    try:
+        while True:
             try:
-                app(args=parts)
-            except SystemExit: pass
+                console.rule(style="white")
+                _update_index(index, session, poll=listener.mode != LISTEN)
+                cmd = input("\n" + PROMPT)
+
+                if cmd.strip() in ["exit", "quit"]:
+                    break
+
+                parts = shlex.split(cmd)
+                if not parts:
+                    continue
+                try:
+                    app(args=parts)
+                except SystemExit: pass
+
+            except EOFError:
+                break
+            except Exception as e:
+                error_display("Erreur", e)
+    finally:
+        if listener.mode == LISTEN:
+            listener.stop()
+        save_history(HISTORY_FILE)
+        session.close()
 
-        except Exception as e:
-            error_display("Erreur", e)
 
+def _update_index(index: CompletionIndex, session, poll: bool):
+    """
+    Loads the index after login, refreshes it after each command, empties it after logout
+    A failure only disables the completion of ids, the prompt is still shown
+    """
+    try:
+        if not TokenStore.has_token():
+            index.clear()
+        elif index.loaded:
+            index.refresh(poll)
+        else:
+            index.load()
+    except Exception as e:
+        index.clear()
+        error_display("Complétion", e)
+    finally:
+        # no transaction left open while waiting for the user
+        session.close()
 
 
 def header():
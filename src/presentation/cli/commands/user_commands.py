@@ -14,6 +14,7 @@ from src.domain.entities.enums import Role
 from src.domain.policies.user_policy import RequestPolicy, UserPolicy
 from src.infrastructures.repositories.SQLAchemy_repository import SQLAlchemyUserRepository
 from src.infrastructures.security.security import BcryptPasswordHasher
+from src.presentation.cli.output import OutputFormat, output_format, write_rows
 from src.use_cases.user_use_cases import CreateUserRequest, CreateUserUseCase, UpdateUserRequest, UpdateUserUseCase, \
     GetUserRequest, GetUserUseCase, ListUserUseCase, DeleteUserUseCase, DeleteUserRequest, ListUserRequest, UserFilter
 
@@ -100,7 +101,8 @@ def update(ctx: typer.Context, user_id: int):
     repo = SQLAlchemyUserRepository(ctx.obj["session"])
     use_case = UpdateUserUseCase(repo)
 
-    if not repo.exist(user_id):
+    user = repo.find_by_id(user_id)
+    if not user:
         error_display("Ressource", "Utilisateur non trouvé")
         raise typer.Exit()
 
@@ -120,7 +122,8 @@ def update(ctx: typer.Context, user_id: int):
         user_id=user_id,
         fullname=fullname,
         email=email,
-        authorization=policy
+        authorization=policy,
+        version=user.version
     )
     response = use_case.execute(request)
 
@@ -177,7 +180,10 @@ def list(
     use_case = ListUserUseCase(repo)
     response = use_case.execute(request)
 
-    if response.success:
+    output = output_format(ctx)
+    if response.success and output is not OutputFormat.TABLE:
+        write_rows(response.users, output)
+    elif response.success:
         _display_data_list(response.users, list_filter)
     else:
         error_display(response.error, response.msg)
@@ -0,0 +1,57 @@
+import signal
+
+import typer
+from rich.console import Console
+
+from helpers.helper_cli import error_display
+from src.domain.policies.user_policy import RequestPolicy, UserPolicy
+from src.infrastructures.outbox.handlers import default_handlers
+from src.infrastructures.outbox.worker import OutboxWorker
+from src.infrastructures.repositories.SQLAchemy_repository import SQLAlchemyOutboxRepository
+
+worker_app = typer.Typer()
+console = Console()
+
+
+@worker_app.callback()
+def permission(ctx: typer.Context):
+    """Callback - verify user role """
+    ctx.obj["ressource"] = "WORKER"
+
+    request = RequestPolicy(
+        user=ctx.obj["current_user"],
+        ressource=ctx.obj["ressource"],
+        action=ctx.invoked_subcommand,
+        context=None
+    )
+
+    policy = UserPolicy(request)
+    if not policy.is_allowed():
+        error_display("Permission", "Vous êtes pas authorisé à utiliser cette commande")
+        raise typer.Exit(1)
+
+
+@worker_app.command(help="Traiter les messages en attente (Sentry, rappels d'évènements sans support)")
+def run(
+        ctx: typer.Context,
+        batch_size: int = typer.Option(100, "--batch-size", "-b", help="Messages réservés par lot"),
+        poll_interval: float = typer.Option(1.0, "--poll-interval", "-p", help="Secondes entre deux lectures à vide"),
+        once: bool = typer.Option(False, "--once", help="S'arrêter quand il n'y a plus de message disponible"),
+):
+    """
+    Command for draining the outbox, several workers can run at once
+    Stops after the current batch on Ctrl+C or SIGTERM
+    :param ctx: typer Context
+    :param batch_size: messages claimed per batch
+    :param poll_interval: seconds between two claims of an empty outbox
+    :param once: stop when no message is available
+    :return: None
+    """
+    session = ctx.obj["session"]
+    worker = OutboxWorker(SQLAlchemyOutboxRepository(session), default_handlers(session), batch_size)
+    signal.signal(signal.SIGTERM, lambda *_: worker.stop())
+    signal.signal(signal.SIGINT, lambda *_: worker.stop())
+
+    console.print(f"[bold cyan]Worker démarré[/bold cyan] (lots de {batch_size})")
+    processed, failed = worker.run(poll_interval, stop_when_empty=once)
+    console.print(f"[bold]{processed} message(s) traité(s), {failed} échec(s)[/bold]")
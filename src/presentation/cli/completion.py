@@ -0,0 +1,256 @@
+"""
+Tab completion of the interactive shell: commands, options, choices and ids of clients, contrats, events and users
+Ids and their labels come from an in-memory index loaded once, then refreshed between two commands
+from the audit log, or as soon as another process commits a change on PostgreSQL: completing only queries
+the database to reload the ids changed since the last completion
+"""
+import bisect
+import shlex
+import threading
+from typing import Dict, List, Optional
+
+import click
+from rich.console import Console
+
+from src.domain.interfaces.repository import AuditRepository, LabelRepository
+from src.infrastructures.database.changes import Changes, merge_changes
+
+try:
+    import readline
+except ImportError:  # Windows
+    readline = None
+
+console = Console()
+
+INDEXED_ENTITIES = ("client", "contrat", "event", "user")
+# parameters taking the id of an entity
+ENTITY_PARAMS = {
+    "client_id": "client",
+    "contrat_id": "contrat",
+    "event_id": "event",
+    "user_id": "user",
+    "commercial_contact_id": "user",
+}
+# parameters taking ids of the entity of their command group, ex: client list --after
+GROUP_PARAMS = {"after_id", "ids"}
+MAX_MATCHES = 100
+# matches listed with their label under the prompt
+MAX_DISPLAYED = 20
+
+
+class CompletionIndex:
+    """
+    Ids and labels per entity, the ids are also kept sorted as text for prefix search
+    Changes reach the index by `refresh`, polling the audit log, or by `invalidate` from a ChangeListener thread;
+    invalidated ids are reloaded by the main thread, at the next refresh or completion
+    """
+
+    def __init__(self, label_repository: LabelRepository, audit_repository: AuditRepository):
+        self.label_repository = label_repository
+        self.audit_repository = audit_repository
+        self.labels: Dict[str, Dict[int, str]] = {}
+        self._ids: Dict[str, List[str]] = {}
+        self._audit_id = 0
+        self._users_version = None
+        self._pending: Changes = {}
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return bool(self.labels)
+
+    def load(self) -> None:
+        """One query per entity, the changes made while loading are applied again by the next refresh"""
+        with self._lock:
+            self._pending = {}
+        self._audit_id = self.audit_repository.last_id()
+        self._users_version = self.label_repository.users_version()
+        for entity in INDEXED_ENTITIES:
+            self._reload(entity)
+
+    def clear(self) -> None:
+        self.labels, self._ids = {}, {}
+
+    def invalidate(self, changes: Changes) -> None:
+        """Marks ids to reload, called from any thread"""
+        with self._lock:
+            merge_changes(self._pending, changes)
+
+    def refresh(self, poll: bool = True) -> None:
+        """
+        Reloads the invalidated ids and, when `poll`, the clients, contrats and events in the audit log
+        since the last refresh, and the users when their number or latest update changes
+        Deleted ids are dropped
+        """
+        with self._lock:
+            changes, self._pending = self._pending, {}
+        if poll:
+            self._audit_id, changed = self.audit_repository.find_changed(self._audit_id)
+            merge_changes(changes, {entity.value: ids for entity, ids in changed.items()})
+            users_version = self.label_repository.users_version()
+            if users_version != self._users_version:
+                self._users_version = users_version
+                merge_changes(changes, {"user": None})
+
+        for entity, ids in changes.items():
+            if entity not in self.labels:
+                continue
+            if ids is None:
+                self._reload(entity)
+                continue
+            found = self.label_repository.find_labels(entity, ids)
+            for entity_id in ids:
+                self._set(entity, entity_id, found.get(entity_id))
+
+    def _reload(self, entity: str) -> None:
+        labels = self.label_repository.find_labels(entity)
+        self.labels[entity] = labels
+        self._ids[entity] = sorted(str(entity_id) for entity_id in labels)
+
+    def _set(self, entity: str, entity_id: int, label: Optional[str]) -> None:
+        """Adds, updates or (label None) removes one id"""
+        labels, ids, key = self.labels[entity], self._ids[entity], str(entity_id)
+        position = bisect.bisect_left(ids, key)
+        present = position < len(ids) and ids[position] == key
+        if label is None:
+            labels.pop(entity_id, None)
+            if present:
+                del ids[position]
+        else:
+            labels[entity_id] = label
+            if not present:
+                ids.insert(position, key)
+
+    def match(self, entity: str, text: str) -> List[str]:
+        """Ids starting with the digits typed, or ids whose label contains the text typed"""
+        if not self.loaded:
+            return []
+        if self._pending:
+            self.refresh(poll=False)
+        if not text or text.isdigit():
+            ids = self._ids[entity]
+            # ":" follows "9", every id starting with `text` sorts before text + ":"
+            start, end = bisect.bisect_left(ids, text), bisect.bisect_left(ids, text + ":")
+            return ids[start:min(end, start + MAX_MATCHES)]
+        text = text.lower()
+        found = (str(entity_id) for entity_id, label in self.labels[entity].items() if text in label.lower())
+        return [entity_id for entity_id, _ in zip(found, range(MAX_MATCHES))]
+
+    def label(self, entity: str, entity_id: str) -> str:
+        return self.labels.get(entity, {}).get(int(entity_id), "") if entity_id.isdigit() else ""
+
+
+class ShellCompleter:
+    """readline completer walking the click commands of the Typer app"""
+
+    def __init__(self, root: click.Group, index: CompletionIndex, prompt: str = ">>> "):
+        self.root = root
+        self.index = index
+        self.prompt = prompt
+        self.matches: List[str] = []
+        # entity of the ids in `matches`, to list them with their label
+        self.entity: Optional[str] = None
+
+    def complete(self, text: str, state: int) -> Optional[str]:
+        """readline completer: `state`-th match of the word under the cursor"""
+        if state == 0:
+            self.matches = self.candidates(readline.get_line_buffer()[:readline.get_endidx()])
+        return self.matches[state] if state < len(self.matches) else None
+
+    def display(self, substitution: str, matches: List[str], longest_match_length: int) -> None:
+        """readline display hook: ids with their label, then the prompt and the line again"""
+        print()
+        for match in matches[:MAX_DISPLAYED]:
+            entity_id = match.rsplit(",", 1)[-1]
+            label = self.index.label(self.entity, entity_id) if self.entity else ""
+            console.print(f"  {match}" + (f"  [dim]{label}[/dim]" if label else ""), highlight=False)
+        if len(matches) > MAX_DISPLAYED:
+            console.print(f"  [dim]... {len(matches) - MAX_DISPLAYED} autres[/dim]")
+        print(self.prompt + readline.get_line_buffer(), end="", flush=True)
+
+    def candidates(self, line: str) -> List[str]:
+        """Matches of the last word of the line, the empty word after a space"""
+        try:
+            words = shlex.split(line)
+        except ValueError:
+            words = line.split()
+        text = "" if not words or line[-1:].isspace() else words.pop()
+        self.entity = None
+
+        command, group, pending, position = self.root, None, None, 0
+        for word in words:
+            if pending is not None:
+                pending = None
+            elif word.startswith("-"):
+                option = _find_option(command, word)
+                if option is not None and not option.is_flag and "=" not in word:
+                    pending = option
+            elif isinstance(command, click.Group) and word in command.commands:
+                group = word if command is self.root else group
+                command, position = command.commands[word], 0
+            else:
+                position += 1
+
+        if pending is not None:
+            return self._values(pending, text, group)
+        if text.startswith("-"):
+            return sorted(
+                opt for param in command.params if isinstance(param, click.Option)
+                for opt in param.opts + param.secondary_opts if opt.startswith(text)
+            )
+        if isinstance(command, click.Group):
+            return sorted(name for name in command.commands if name.startswith(text))
+        arguments = [param for param in command.params if isinstance(param, click.Argument)]
+        if position < len(arguments):
+            return self._values(arguments[position], text, group)
+        return []
+
+    def _values(self, param: click.Parameter, text: str, group: Optional[str]) -> List[str]:
+        if isinstance(param.type, click.Choice):
+            return [choice for choice in param.type.choices if choice.startswith(text)]
+
+        entity = ENTITY_PARAMS.get(param.name)
+        if entity is None and param.name in GROUP_PARAMS and group in INDEXED_ENTITIES:
+            entity = group
+        if entity is None:
+            return []
+        self.entity = entity
+        # --ids 12,15,1<tab> completes the last id of the list
+        head, comma, last = text.rpartition(",")
+        return [head + comma + match for match in self.index.match(entity, last)]
+
+
+def _find_option(command: click.Command, word: str) -> Optional[click.Option]:
+    name = word.split("=", 1)[0]
+    for param in command.params:
+        if isinstance(param, click.Option) and name in param.opts + param.secondary_opts:
+            return param
+    return None
+
+
+def install(completer: ShellCompleter, history_file, history_length: int) -> bool:
+    """Sets the completer and loads the history, False when readline is not available"""
+    if readline is None:
+        return False
+    readline.set_completer(completer.complete)
+    readline.set_completer_delims(" \t\n")
+    readline.set_completion_display_matches_hook(completer.display)
+    if "libedit" in (readline.__doc__ or ""):
+        readline.parse_and_bind("bind ^I rl_complete")
+    else:
+        readline.parse_and_bind("tab: complete")
+    readline.set_history_length(history_length)
+    try:
+        readline.read_history_file(history_file)
+    except OSError:
+        pass
+    return True
+
+
+def save_history(history_file) -> None:
+    if readline is None:
+        return
+    try:
+        readline.write_history_file(history_file)
+    except OSError:
+        pass
@@ -0,0 +1,68 @@
+"""
+Machine-readable outputs of the list commands, selected with `main.py --output json|ndjson|csv`
+Rows are written as they are iterated, without building a rich table
+"""
+import csv
+import json
+import sys
+from enum import Enum
+from typing import Iterable, TextIO, Optional
+
+import typer
+
+from src.presentation.serializers import to_json
+
+
+class OutputFormat(Enum):
+    TABLE = "table"
+    JSON = "json"
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+
+def output_format(ctx: typer.Context) -> OutputFormat:
+    """Format chosen with --output, table when the command is run without the main callback"""
+    return ctx.obj.get("output", OutputFormat.TABLE)
+
+
+def _csv_value(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False)
+    return str(value)
+
+
+def write_rows(rows: Iterable, output: OutputFormat, file: Optional[TextIO] = None) -> int:
+    """
+    Writes read models, entities or named tuples one at a time
+    - json : one array, written item by item
+    - ndjson : one object per line
+    - csv : header from the fields of the first row, nothing for no row
+    :param file: stdout by default
+    :return: number of rows written
+    """
+    file = file or sys.stdout
+    count = 0
+    if output is OutputFormat.CSV:
+        writer = csv.writer(file)
+        for row in rows:
+            record = to_json(row)
+            if not count:
+                writer.writerow(record.keys())
+            writer.writerow([_csv_value(value) for value in record.values()])
+            count += 1
+        return count
+
+    if output is OutputFormat.JSON:
+        file.write("[")
+    for row in rows:
+        line = json.dumps(to_json(row), ensure_ascii=False)
+        if output is OutputFormat.JSON:
+            file.write(("," if count else "") + "\n" + line)
+        else:
+            file.write(line + "\n")
+        count += 1
+    if output is OutputFormat.JSON:
+        file.write("\n]\n" if count else "]\n")
+    return count
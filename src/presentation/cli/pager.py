@@ -0,0 +1,107 @@
+"""
+Interactive pager of the list commands (`--pager`): one keyset page on screen at a time,
+the next page is fetched in the background while the current one is read
+"""
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, List, Optional
+
+from rich.console import Console
+from sqlalchemy.orm import Session
+
+console = Console()
+
+# lines of the terminal used by the table borders, title and the pager prompt
+RESERVED_LINES = 10
+MIN_PAGE_SIZE = 5
+
+
+def page_size(limit: Optional[int]) -> int:
+    """--limit, or the rows fitting in the terminal"""
+    return limit or max(console.height - RESERVED_LINES, MIN_PAGE_SIZE)
+
+
+class KeysetPager:
+    """
+    Pages already seen are kept to go back, pages are fetched in order and never skipped:
+    keyset pagination has no offset, jumping forward fetches the pages in between
+    The fetches run in one worker thread with its own session, the session of the command stays in the main thread
+    """
+
+    def __init__(
+            self,
+            first_response: Any,
+            fetch_page: Callable[[Session, int], Any],
+            rows_field: str,
+            render: Callable[[List], None],
+            session: Session,
+    ):
+        """
+        :param first_response: successful list response of the command, with next_after_id
+        :param fetch_page: runs the list use case for the page after an id, with the given session
+        :param rows_field: field of the response with the rows, ex: clients
+        :param render: prints the rows of a page
+        :param session: session of the command, the worker session uses the same engine
+        """
+        self.pages: List[List] = [getattr(first_response, rows_field)]
+        self.next_after: Optional[int] = first_response.next_after_id
+        self.fetch_page = fetch_page
+        self.rows_field = rows_field
+        self.render = render
+        self._session = Session(bind=session.get_bind())
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._pending: Optional[Future] = None
+
+    def run(self) -> None:
+        index = 0
+        try:
+            while True:
+                if console.is_terminal:
+                    console.clear()
+                self.render(self.pages[index])
+                self._prefetch()
+
+                choice = console.input(self._prompt(index)).strip().lower()
+                if choice in ("q", "quit", "exit"):
+                    return
+                if choice in ("", "n"):
+                    index = index + 1 if self._load(index + 1) else index
+                elif choice == "p":
+                    index = max(index - 1, 0)
+                elif choice.isdigit() and int(choice) >= 1:
+                    # the last page when the list is shorter
+                    index = int(choice) - 1 if self._load(int(choice) - 1) else len(self.pages) - 1
+        except (EOFError, KeyboardInterrupt):
+            return
+        finally:
+            self._executor.shutdown(cancel_futures=True)
+            self._session.close()
+
+    def _prompt(self, index: int) -> str:
+        total = f"{len(self.pages)}" if self.next_after is None else f"{len(self.pages)}+"
+        return (
+            f"[dim]Page {index + 1}/{total} - [bold]n[/bold] suivante, [bold]p[/bold] précédente, "
+            f"[bold]numéro[/bold] aller à la page, [bold]q[/bold] quitter[/dim] "
+        )
+
+    def _prefetch(self) -> None:
+        """Starts fetching the page after the last one fetched"""
+        if self._pending is None and self.next_after is not None:
+            self._pending = self._executor.submit(self._fetch, self.next_after)
+
+    def _fetch(self, after_id: int):
+        """Runs in the worker thread, a failed response (no row after this id) ends the list"""
+        response = self.fetch_page(self._session, after_id)
+        if not response.success:
+            return [], None
+        return getattr(response, self.rows_field), response.next_after_id
+
+    def _load(self, index: int) -> bool:
+        """Fetches pages until `index`, False if the list has fewer pages"""
+        while len(self.pages) <= index and self.next_after is not None:
+            self._prefetch()
+            rows, next_after = self._pending.result()
+            self._pending = None
+            self.next_after = next_after
+            if rows:
+                self.pages.append(rows)
+        return index < len(self.pages)
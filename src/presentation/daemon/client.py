@@ -0,0 +1,94 @@
+"""
+Thin client of `daemon start`: forwards argv to the daemon and streams back its output
+Imports only the standard library, the daemon already has the CLI, the engine and the caches loaded
+"""
+import json
+import os
+import re
+import socket
+import sys
+from typing import Optional
+
+from src.presentation.daemon.protocol import SOCKET_PATH, REQUEST, OUTPUT, EXIT, LOCAL, send_frame, read_frames
+
+# always run in the client process: they use the terminal, the token file or run until stopped
+LOCAL_COMMANDS = {"auth", "shell", "daemon", "api", "worker"}
+# options reading the terminal from the start of the command
+LOCAL_OPTIONS = {"--pager"}
+# options of the root command taking a value, before the subcommand
+ROOT_VALUE_OPTIONS = {"-o", "--output"}
+ANSI_ESCAPE = re.compile(rb"\x1b\[[0-9;?]*[A-Za-z]")
+
+
+def connect(socket_path: str = SOCKET_PATH) -> Optional[socket.socket]:
+    """Connection to the daemon, None when no daemon is running"""
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(socket_path)
+    except OSError:
+        sock.close()
+        return None
+    return sock
+
+
+def subcommand(argv: list) -> Optional[str]:
+    """First argument after the root options, ex: `-o json worker run` -> worker"""
+    arguments = iter(argv)
+    for argument in arguments:
+        if argument in ROOT_VALUE_OPTIONS:
+            next(arguments, None)
+        elif not argument.startswith("-"):
+            return argument
+    return None
+
+
+def forward(argv: list, socket_path: str = SOCKET_PATH) -> Optional[int]:
+    """
+    Runs the command in the daemon
+    :return: exit code, None when the command must run in this process (no daemon, or it needs the terminal)
+    """
+    if not argv or subcommand(argv) in LOCAL_COMMANDS or LOCAL_OPTIONS & set(argv) \
+            or os.environ.get("DAEMON_DISABLED"):
+        return None
+    sock = connect(socket_path)
+    if sock is None:
+        return None
+
+    tty = sys.stdout.isatty()
+    try:
+        columns = os.get_terminal_size(sys.stdout.fileno()).columns
+    except (OSError, ValueError):
+        columns = 80
+
+    with sock:
+        send_frame(sock, REQUEST, json.dumps({
+            "argv": argv, "cwd": os.getcwd(), "tty": tty, "columns": columns,
+        }).encode())
+        out = sys.stdout.buffer
+        try:
+            for kind, data in read_frames(sock):
+                if kind == OUTPUT:
+                    out.write(data if tty else ANSI_ESCAPE.sub(b"", data))
+                    out.flush()
+                elif kind == EXIT:
+                    return int(data)
+                elif kind == LOCAL:
+                    return None
+        except BrokenPipeError:
+            # output piped to a command that stopped reading (| head)
+            os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+            return 1
+
+    sys.stderr.write("Le démon s'est arrêté pendant la commande, relancez-la\n")
+    return 1
+
+
+def control(command: str, socket_path: str = SOCKET_PATH) -> Optional[dict]:
+    """Sends `status` or `stop` to the daemon, None when no daemon is running"""
+    sock = connect(socket_path)
+    if sock is None:
+        return None
+    with sock:
+        send_frame(sock, REQUEST, json.dumps({"control": command}).encode())
+        replies = [data for kind, data in read_frames(sock) if kind == OUTPUT]
+    return json.loads(b"".join(replies) or b"{}")
@@ -0,0 +1,33 @@
+"""
+Messages exchanged over the daemon socket, kept to the standard library:
+the client side runs before anything else is imported
+Each frame is one type byte, a 4 bytes length and the data
+"""
+import os
+import struct
+from typing import Iterator, Tuple
+
+SOCKET_PATH = os.environ.get("DAEMON_SOCKET") or os.path.join(
+    os.environ.get("TMPDIR", "/tmp"), f"epic-events-{os.getuid()}.sock"
+)
+
+REQUEST = b"r"  # client -> daemon: JSON, {"argv", "cwd", "tty", "columns"} or {"control"}
+OUTPUT = b"o"   # daemon -> client: rendered output
+EXIT = b"x"     # daemon -> client: exit code, last frame
+LOCAL = b"l"    # daemon -> client: the command needs the terminal, run it in the client process
+
+HEADER = struct.Struct("!cI")
+
+
+def send_frame(sock, kind: bytes, data: bytes = b"") -> None:
+    sock.sendall(HEADER.pack(kind, len(data)) + data)
+
+
+def read_frames(sock) -> Iterator[Tuple[bytes, bytes]]:
+    """Frames until the connection is closed"""
+    with sock.makefile("rb") as stream:
+        while header := stream.read(HEADER.size):
+            if len(header) < HEADER.size:
+                return
+            kind, length = HEADER.unpack(header)
+            yield kind, stream.read(length)
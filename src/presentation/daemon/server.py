@@ -0,0 +1,184 @@
+"""
+Resident process of `daemon start`: runs the commands sent by the thin client of main.py
+with the CLI imported once, a pooled engine, the permission cache and a cache of the logged-in user
+Commands run one at a time, in the order they are received
+"""
+import io
+import json
+import os
+import socket
+import sys
+import time
+import traceback
+from contextlib import redirect_stdout, redirect_stderr, contextmanager
+from typing import Dict, Optional, Tuple
+
+import click.termui
+
+from helpers.helpers import get_current_user
+from src.infrastructures.database.changes import Changes
+from src.infrastructures.security.security import TokenStore
+from src.presentation.daemon.protocol import SOCKET_PATH, REQUEST, OUTPUT, EXIT, LOCAL, send_frame, read_frames
+
+# a logout or an expired token is seen by the daemon after at most this delay,
+# a role change as soon as its ChangeListener sees it
+USER_CACHE_SECONDS = 30
+
+
+class InteractiveInput(Exception):
+    """The command prompts the user, it is run again by the client in its terminal"""
+
+
+class _NoInput(io.TextIOBase):
+    """stdin of the commands run by the daemon"""
+
+    def readline(self, size=-1):
+        raise InteractiveInput()
+
+    def read(self, size=-1):
+        raise InteractiveInput()
+
+
+def _no_prompt(*args, **kwargs):
+    raise InteractiveInput()
+
+
+class _FrameWriter(io.TextIOBase):
+    """stdout and stderr of the commands, sent line by line: an unfinished prompt line is never sent"""
+
+    def __init__(self, sock: socket.socket, tty: bool):
+        self.sock = sock
+        self.tty = tty
+        self.pending = ""
+
+    def isatty(self) -> bool:
+        return self.tty
+
+    def write(self, text: str) -> int:
+        self.pending += text
+        lines, newline, self.pending = self.pending.rpartition("\n")
+        if newline:
+            send_frame(self.sock, OUTPUT, (lines + newline).encode())
+        return len(text)
+
+    def flush(self) -> None:
+        pass
+
+    def close_output(self) -> None:
+        if self.pending:
+            send_frame(self.sock, OUTPUT, self.pending.encode())
+            self.pending = ""
+
+
+class CommandDaemon:
+    """Serves the Typer app on a Unix socket readable by the current OS user only"""
+
+    def __init__(self, app, socket_path: str = SOCKET_PATH):
+        self.app = app
+        self.socket_path = socket_path
+        self.started_at = time.time()
+        self.commands = 0
+        self.stopped = False
+        self._users: Dict[str, Tuple[float, Optional[dict]]] = {}
+
+    def serve_forever(self) -> None:
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as server:
+            server.bind(self.socket_path)
+            os.chmod(self.socket_path, 0o600)
+            server.listen(16)
+            try:
+                while not self.stopped:
+                    conn, _ = server.accept()
+                    with conn:
+                        try:
+                            self._handle(conn)
+                        except (BrokenPipeError, ConnectionResetError):
+                            # the client was interrupted, its command already ran
+                            pass
+            finally:
+                os.unlink(self.socket_path)
+
+    def _handle(self, conn: socket.socket) -> None:
+        kind, data = next(read_frames(conn), (None, b""))
+        if kind != REQUEST:
+            return
+        request = json.loads(data)
+
+        match request.get("control"):
+            case "status":
+                self._reply(conn, self.status())
+            case "stop":
+                self.stopped = True
+                self._reply(conn, self.status())
+            case _:
+                self.commands += 1
+                self.run(conn, request["argv"], request["cwd"], request["tty"], request["columns"])
+
+    def _reply(self, conn: socket.socket, reply: dict) -> None:
+        send_frame(conn, OUTPUT, json.dumps(reply).encode())
+        send_frame(conn, EXIT, b"0")
+
+    def status(self) -> dict:
+        return {"pid": os.getpid(), "started_at": self.started_at, "commands": self.commands}
+
+    def current_user(self) -> Optional[dict]:
+        """get_current_user, cached per token"""
+        token = TokenStore.get_token()
+        if token is None:
+            return None
+        cached = self._users.get(token)
+        if cached is not None and cached[0] > time.monotonic():
+            return cached[1]
+        user = get_current_user()
+        self._users = {token: (time.monotonic() + USER_CACHE_SECONDS, user)}
+        return user
+
+    def invalidate(self, changes: Changes) -> None:
+        """Drops the cached user if changed by any process, called from the ChangeListener thread"""
+        if "user" not in changes:
+            return
+        user_ids = changes["user"]
+        self._users = {
+            token: cached for token, cached in self._users.items()
+            if user_ids is not None and (cached[1] or {}).get("user_current_id") not in user_ids
+        }
+
+    def run(self, conn: socket.socket, argv: list, cwd: str, tty: bool, columns: int) -> None:
+        """Runs one command with the working directory, terminal width and colors of the client"""
+        output = _FrameWriter(conn, tty)
+        os.chdir(cwd)
+        os.environ["COLUMNS"] = str(columns)
+        if tty:
+            os.environ["FORCE_COLOR"] = "1"
+        else:
+            os.environ.pop("FORCE_COLOR", None)
+
+        with redirect_stdout(output), redirect_stderr(output), _without_terminal():
+            try:
+                self.app(args=argv, prog_name="main.py", obj={"current_user": self.current_user()})
+                code = 0
+            except SystemExit as e:
+                code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+                if isinstance(e.code, str):
+                    print(e.code, file=sys.stderr)
+            except InteractiveInput:
+                send_frame(conn, LOCAL)
+                return
+            except Exception:
+                traceback.print_exc()
+                code = 1
+        output.close_output()
+        send_frame(conn, EXIT, str(code).encode())
+
+
+@contextmanager
+def _without_terminal():
+    """Prompts raise InteractiveInput instead of reading the terminal of the daemon"""
+    stdin, hidden, visible = sys.stdin, click.termui.hidden_prompt_func, click.termui.visible_prompt_func
+    sys.stdin, click.termui.hidden_prompt_func, click.termui.visible_prompt_func = _NoInput(), _no_prompt, _no_prompt
+    try:
+        yield
+    finally:
+        sys.stdin, click.termui.hidden_prompt_func, click.termui.visible_prompt_func = stdin, hidden, visible
@@ -0,0 +1,33 @@
+"""
+Conversion of entities, read models and value objects to JSON types, shared by the API and the CLI outputs
+"""
+from dataclasses import fields, is_dataclass
+from datetime import date, datetime
+from enum import Enum
+
+from src.domain.entities.value_objects import Email, Telephone, Money
+
+# fields never written out
+HIDDEN_FIELDS = {"password"}
+
+
+def to_json(value):
+    """Converts entities, read models and value objects to JSON types"""
+    if isinstance(value, (Email, Telephone, Money)):
+        return str(value)
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, tuple) and hasattr(value, "_asdict"):
+        return {name: to_json(item) for name, item in value._asdict().items() if name not in HIDDEN_FIELDS}
+    if is_dataclass(value):
+        return {
+            field.name: to_json(getattr(value, field.name)) for field in fields(value)
+            if field.name not in HIDDEN_FIELDS
+        }
+    if isinstance(value, dict):
+        return {str(key): to_json(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_json(item) for item in value]
+    return value
@@ -0,0 +1,51 @@
+from dataclasses import dataclass
+from typing import Optional, List
+
+from src.domain.entities.enums import AuditedEntity
+from src.domain.entities.read_models import AuditEntry
+from src.domain.interfaces.repository import AuditRepository
+from src.domain.policies.user_policy import UserPolicy, RequestPolicy
+
+
+##############################################################################
+@dataclass
+class GetAuditLogRequest:
+    entity: AuditedEntity
+    entity_id: int
+    authorization: RequestPolicy
+    limit: int = 50
+
+
+@dataclass
+class GetAuditLogResponse:
+    success: bool
+    entries: List[AuditEntry] = None
+    error: Optional[str] = None
+    msg: Optional[str] = None
+
+
+class GetAuditLogUseCase:
+    """Use case for reading the change history of a client, contrat or event"""
+
+    def __init__(self, audit_repository: AuditRepository):
+        self.repository = audit_repository
+
+    def execute(self, request: GetAuditLogRequest) -> GetAuditLogResponse:
+
+        policy = UserPolicy(request.authorization)
+        if not policy.is_allowed():
+            return GetAuditLogResponse(
+                success=False,
+                error="Permission",
+                msg="Seuls les membres gestion peuvent consulter l'historique des modifications"
+            )
+
+        entries = self.repository.find_by_entity(request.entity, request.entity_id, request.limit)
+        if not entries:
+            return GetAuditLogResponse(
+                success=False,
+                error="Ressource",
+                msg="Aucune modification enregistrée"
+            )
+
+        return GetAuditLogResponse(success=True, entries=entries)
@@ -10,11 +10,14 @@ from src.infrastructures.security.security import TokenStore
 class AuthenticateRequest:
     email: str
     password: str
+    # the CLI keeps the token for the next commands, API clients send it themselves
+    store_token: bool = True
 
 
 @dataclass
 class AuthenticateResponse:
     success: bool
+    token: Optional[str] = None
     error: Optional[str] = None
     msg: Optional[str] = None
 
@@ -47,8 +50,10 @@ class AuthenticateUseCase:
             )
 
         token = self.token_manager.create_token(user.id)
-        TokenStore.save_token(token)
+        if request.store_token:
+            TokenStore.save_token(token)
 
         return AuthenticateResponse(
-            success=True
+            success=True,
+            token=token
         )
@@ -1,12 +1,16 @@
 from dataclasses import dataclass
 from enum import Enum
-from typing import Optional, List
+from typing import Optional, List, Iterable
 
 from src.domain.entities.entities import Client, User
-from src.domain.entities.exceptions import ValidationError, InvalidEmailError, InvalidPhoneError
+from src.domain.entities.enums import AuditedEntity
+from src.domain.entities.read_models import ClientRow
+from src.domain.entities.exceptions import ValidationError, InvalidEmailError, InvalidPhoneError, \
+    ConcurrentModificationError
 from src.domain.entities.value_objects import Email, Telephone
-from src.domain.interfaces.repository import ClientRepository, UserRepository
+from src.domain.interfaces.repository import ClientRepository, UserRepository, AuditRepository
 from src.domain.policies.user_policy import UserPolicy, RequestPolicy
+from src.domain.services.audit import audit_entry, audit_fields, record_with
 
 
 ################################################################################################
@@ -33,9 +37,13 @@ class CreateClientResponse:
 class CreateClientUseCase:
     """Use case for creating a new client"""
 
-    def __init__(self, client_repository: ClientRepository, user_repository: UserRepository):
+    def __init__(self,
+                 client_repository: ClientRepository,
+                 user_repository: UserRepository,
+                 audit_repository: Optional[AuditRepository] = None):
         self.repository = client_repository
         self.user_repository = user_repository
+        self.audit_repository = audit_repository
 
     def execute(self, request: CreateClientRequest) -> CreateClientResponse:
 
@@ -66,7 +74,11 @@ class CreateClientUseCase:
             company_name=request.company_name,
             commercial_contact_id=request.authorization.user["user_current_id"])
 
-        saved_client = self.repository.save(client)
+        saved_client = self.repository.save(client, before_commit=record_with(
+            self.audit_repository, lambda saved: [audit_entry(
+                request.authorization, AuditedEntity.CLIENT, saved.id, "create", after=audit_fields(saved)
+            )]
+        ))
         user = self.user_repository.find_by_id(saved_client.commercial_contact_id)
 
         return CreateClientResponse(success=True, client=saved_client, user=user)
@@ -81,6 +93,7 @@ class UpdateClientRequest:
     telephone: Optional[str]
     company_name: Optional[str]
     authorization: RequestPolicy
+    version: Optional[int] = None
 
 
 @dataclass
@@ -97,9 +110,13 @@ class UpdateClientUseCase:
     Use case for updating associated client.
     """
 
-    def __init__(self, client_repository: ClientRepository, user_repository: UserRepository):
+    def __init__(self,
+                 client_repository: ClientRepository,
+                 user_repository: UserRepository,
+                 audit_repository: Optional[AuditRepository] = None):
         self.repository = client_repository
         self.user_repository = user_repository
+        self.audit_repository = audit_repository
 
     def execute(self, request: UpdateClientRequest):
         # Permission liée au role
@@ -149,6 +166,14 @@ class UpdateClientUseCase:
         if request.company_name is not None:
             company_name = request.company_name
 
+        # the version the operator read, the update is refused if the client changed since
+        if request.version is not None and request.version != client.version:
+            return UpdateClientResponse(
+                success=False,
+                error="Conflit",
+                msg="Le client a été modifié par un autre utilisateur, rechargez-le puis recommencez"
+            )
+        before = audit_fields(client)
         client.update_info(
             fullname=fullname,
             email=email,
@@ -156,7 +181,19 @@ class UpdateClientUseCase:
             company_name=company_name
         )
 
-        updated_client = self.repository.save(client)
+        try:
+            updated_client = self.repository.save(client, before_commit=record_with(
+                self.audit_repository, lambda saved: [audit_entry(
+                    request.authorization, AuditedEntity.CLIENT, saved.id, "update",
+                    before=before, after=audit_fields(saved)
+                )]
+            ))
+        except ConcurrentModificationError:
+            return UpdateClientResponse(
+                success=False,
+                error="Conflit",
+                msg="Le client a été modifié par un autre utilisateur, rechargez-le puis recommencez"
+            )
         user = self.user_repository.find_by_id(updated_client.commercial_contact_id)
 
         return UpdateClientResponse(success=True, client=updated_client, user=user)
@@ -171,12 +208,17 @@ class ClientFilter(Enum):
 class ListClientRequest:
     user_id: int
     list_filter: Optional[ClientFilter]
+    after_id: Optional[int] = None
+    limit: Optional[int] = None
+    # rows iterated as they are fetched without next_after_id, an empty list is not an error
+    stream: bool = False
 
 
 @dataclass
 class ListClientResponse:
     success: bool
-    clients: List[Client] = None
+    clients: Iterable[ClientRow] = None
+    next_after_id: Optional[int] = None
     error: Optional[str] = None
     msg: Optional[str] = None
 
@@ -192,15 +234,72 @@ class ListClientUseCase:
         match request.list_filter:
             case ClientFilter.MINE:
                 criteres["commercial_contact_id"] = request.user_id
+        criteres["after"] = request.after_id
+        criteres["limit"] = request.limit
+
+        if request.stream:
+            return ListClientResponse(success=True, clients=self.repository.iter_all_rows(criteres))
 
-        all_clients = self.repository.find_all(criteres)
+        all_clients = self.repository.find_all_rows(criteres)
         if not all_clients:
             return ListClientResponse(
                 success=False,
                 error="Ressource",
                 msg="Aucun client trouvé"
             )
-        return ListClientResponse(success=True, clients=all_clients)
+        next_after_id = all_clients[-1].id if request.limit and len(all_clients) == request.limit else None
+        return ListClientResponse(success=True, clients=all_clients, next_after_id=next_after_id)
+
+
+#############################################################################
+@dataclass
+class SearchClientRequest:
+    query: str
+    page: int = 1
+    page_size: int = 20
+
+
+@dataclass
+class SearchClientResponse:
+    success: bool
+    clients: List[ClientRow] = None
+    error: Optional[str] = None
+    msg: Optional[str] = None
+
+
+class SearchClientUseCase:
+    """Use case for fuzzy searching clients by name, company or email"""
+
+    def __init__(self, client_repository: ClientRepository):
+        self.repository = client_repository
+
+    def execute(self, request: SearchClientRequest) -> SearchClientResponse:
+        query = request.query.strip()
+        if not query:
+            return SearchClientResponse(
+                success=False,
+                error="Recherche",
+                msg="Le texte recherché est vide"
+            )
+        if request.page < 1 or request.page_size < 1:
+            return SearchClientResponse(
+                success=False,
+                error="Recherche",
+                msg="La page et la taille de page doivent être positives"
+            )
+
+        clients = self.repository.search(
+            query,
+            limit=request.page_size,
+            offset=(request.page - 1) * request.page_size
+        )
+        if not clients:
+            return SearchClientResponse(
+                success=False,
+                error="Ressource",
+                msg="Aucun client trouvé"
+            )
+        return SearchClientResponse(success=True, clients=clients)
 
 
 #############################################################################
@@ -251,8 +350,9 @@ class DeleteClientResponse:
 
 
 class DeleteClientUseCase:
-    def __init__(self, client_repository: ClientRepository):
+    def __init__(self, client_repository: ClientRepository, audit_repository: Optional[AuditRepository] = None):
         self.repository = client_repository
+        self.audit_repository = audit_repository
 
     def execute(self, request: DeleteClientRequest):
 
@@ -272,5 +372,9 @@ class DeleteClientUseCase:
                 msg=f"Client non trouvé"
             )
 
-        self.repository.delete(client.id)
+        self.repository.delete(client.id, before_commit=record_with(
+            self.audit_repository, lambda: [audit_entry(
+                request.authorization, AuditedEntity.CLIENT, client.id, "delete", before=audit_fields(client)
+            )]
+        ))
         return DeleteClientResponse(success=True)
@@ -1,13 +1,16 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from enum import Enum
-from typing import Optional, List
+from typing import Optional, List, Iterable
 
 from src.domain.entities.entities import Contrat, Client
-from src.domain.entities.enums import ContractStatus
-from src.domain.entities.exceptions import BusinessRuleViolation
+from src.domain.entities.read_models import ContratRow, BulkResult, PaymentReceipt
+from src.domain.entities.enums import ContractStatus, AuditedEntity
+from src.domain.entities.exceptions import BusinessRuleViolation, InvalidAmountError, DuplicateRequestError, \
+    ConcurrentModificationError
 from src.domain.entities.value_objects import Money
-from src.domain.interfaces.repository import ContratRepository, ClientRepository, UserRepository
+from src.domain.interfaces.repository import ContratRepository, ClientRepository, UserRepository, AuditRepository
 from src.domain.policies.user_policy import UserPolicy, RequestPolicy
+from src.domain.services.audit import audit_entry, audit_fields, record_with
 
 
 @dataclass
@@ -33,10 +36,12 @@ class CreateContratUseCase:
     def __init__(self,
                  contrat_repository: ContratRepository,
                  client_repository: ClientRepository,
-                 user_repository: UserRepository):
+                 user_repository: UserRepository,
+                 audit_repository: Optional[AuditRepository] = None):
         self.repository = contrat_repository
         self.client_repository = client_repository
         self.user_repository = user_repository
+        self.audit_repository = audit_repository
 
     def execute(self, request: CreateContratRequest) -> CreateContratResponse:
 
@@ -93,7 +98,11 @@ class CreateContratUseCase:
             status=ContractStatus.UNSIGNED,
         )
 
-        saved_contrat = self.repository.save(contrat)
+        saved_contrat = self.repository.save(contrat, before_commit=record_with(
+            self.audit_repository, lambda saved: [audit_entry(
+                request.authorization, AuditedEntity.CONTRAT, saved.id, "create", after=audit_fields(saved)
+            )]
+        ))
         client = self.client_repository.find_by_id(saved_contrat.client_id)
         return CreateContratResponse(success=True, contrat=saved_contrat, client=client)
 
@@ -104,6 +113,7 @@ class UpdateContratRequest:
     contrat_id: int
     contrat_amount: Optional[Money]
     authorization: RequestPolicy
+    version: Optional[int] = None
 
 
 @dataclass
@@ -118,9 +128,13 @@ class UpdateContratResponse:
 class UpdateContratUseCase:
     """Use case for updating a contrat"""
 
-    def __init__(self, contrat_repository: ContratRepository, client_repository: ClientRepository):
+    def __init__(self,
+                 contrat_repository: ContratRepository,
+                 client_repository: ClientRepository,
+                 audit_repository: Optional[AuditRepository] = None):
         self.repository = contrat_repository
         self.client_repository = client_repository
+        self.audit_repository = audit_repository
 
     def execute(self, request: UpdateContratRequest) -> UpdateContratResponse:
 
@@ -147,11 +161,30 @@ class UpdateContratUseCase:
                 error="Permission",
                 msg="Seuls les membres gestion ou commerciaux associé\n au contrat peuvent le modifier"
             )
+        if request.version is not None and request.version != contrat.version:
+            return UpdateContratResponse(
+                success=False,
+                error="Conflit",
+                msg="Le contrat a été modifié par un autre utilisateur, rechargez-le puis recommencez"
+            )
+        before = audit_fields(contrat)
         contrat.update_info(
             amount=request.contrat_amount,
         )
 
-        updated_contrat = self.repository.save(contrat)
+        try:
+            updated_contrat = self.repository.save(contrat, before_commit=record_with(
+                self.audit_repository, lambda saved: [audit_entry(
+                    request.authorization, AuditedEntity.CONTRAT, saved.id, "update",
+                    before=before, after=audit_fields(saved)
+                )]
+            ))
+        except ConcurrentModificationError:
+            return UpdateContratResponse(
+                success=False,
+                error="Conflit",
+                msg="Le contrat a été modifié par un autre utilisateur, rechargez-le puis recommencez"
+            )
         client = self.client_repository.find_by_id(updated_contrat.client_id)
         return UpdateContratResponse(success=True, contrat=updated_contrat, client=client)
 
@@ -169,12 +202,17 @@ class ContratFilter(Enum):
 class ListContratRequest:
     commercial_contact_id: int
     list_filter: Optional[ContratFilter]
+    after_id: Optional[int] = None
+    limit: Optional[int] = None
+    # rows iterated as they are fetched without next_after_id, an empty list is not an error
+    stream: bool = False
 
 
 @dataclass
 class ListContratResponse:
     success: bool
-    contrats: List[Contrat] = None
+    contrats: Iterable[ContratRow] = None
+    next_after_id: Optional[int] = None
     error: Optional[str] = None
     msg: Optional[str] = None
 
@@ -198,8 +236,13 @@ class ListContratUseCase:
                 criteres["fully_paid"] = True
             case ContratFilter.NOT_FULLY_PAID:
                 criteres["fully_paid"] = False
+        criteres["after"] = request.after_id
+        criteres["limit"] = request.limit
+
+        if request.stream:
+            return ListContratResponse(success=True, contrats=self.repository.iter_all_rows(criteres))
 
-        contrats = self.repository.find_all(criteres)
+        contrats = self.repository.find_all_rows(criteres)
         if not contrats:
             return ListContratResponse(
                 success=False,
@@ -207,7 +250,8 @@ class ListContratUseCase:
                 msg="Aucun contrat trouvé"
             )
 
-        return ListContratResponse(success=True, contrats=contrats)
+        next_after_id = contrats[-1].id if request.limit and len(contrats) == request.limit else None
+        return ListContratResponse(success=True, contrats=contrats, next_after_id=next_after_id)
 
 
 ##############################################################################
@@ -261,8 +305,9 @@ class DeleteContratResponse:
 class DeleteContratUseCase:
     """Use case for deleting a contrat"""
 
-    def __init__(self, contrat_repository: ContratRepository):
+    def __init__(self, contrat_repository: ContratRepository, audit_repository: Optional[AuditRepository] = None):
         self.repository = contrat_repository
+        self.audit_repository = audit_repository
 
     def execute(self, request: DeleteContratRequest) -> DeleteContratResponse:
 
@@ -282,7 +327,11 @@ class DeleteContratUseCase:
                 msg="Contrat non trouvé"
             )
 
-        self.repository.delete(contrat.id)
+        self.repository.delete(contrat.id, before_commit=record_with(
+            self.audit_repository, lambda: [audit_entry(
+                request.authorization, AuditedEntity.CONTRAT, contrat.id, "delete", before=audit_fields(contrat)
+            )]
+        ))
         return DeleteContratResponse(success=True)
 
 
@@ -305,8 +354,9 @@ class SignContratResponse:
 class SignContratUseCase:
     """Use case for sign a contrat"""
 
-    def __init__(self, contrat_repository: ContratRepository):
+    def __init__(self, contrat_repository: ContratRepository, audit_repository: Optional[AuditRepository] = None):
         self.repository = contrat_repository
+        self.audit_repository = audit_repository
 
     def execute(self, request: SignContratRequest) -> SignContratResponse:
 
@@ -327,6 +377,7 @@ class SignContratUseCase:
                 msg="Seuls les membres commercials peuvent signer des contrats"
             )
 
+        before = audit_fields(contrat)
         try:
             contrat.sign()
         except BusinessRuleViolation as e:
@@ -336,7 +387,19 @@ class SignContratUseCase:
                 msg=str(e)
             )
 
-        self.repository.save(contrat)
+        try:
+            self.repository.save(contrat, before_commit=record_with(
+                self.audit_repository, lambda saved: [audit_entry(
+                    request.authorization, AuditedEntity.CONTRAT, saved.id, "sign",
+                    before=before, after=audit_fields(saved)
+                )]
+            ))
+        except ConcurrentModificationError:
+            return SignContratResponse(
+                success=False,
+                error="Conflit",
+                msg="Le contrat a été modifié par un autre utilisateur, recommencez"
+            )
         return SignContratResponse(success=True, contrat=contrat)
 
 
@@ -344,8 +407,9 @@ class SignContratUseCase:
 @dataclass
 class RecordPaymentContratRequest:
     contrat_id: int
-    payment: int
+    payment: str
     authorization: RequestPolicy
+    idempotency_key: Optional[str] = None
 
 
 @dataclass
@@ -354,13 +418,18 @@ class RecordPaymentContratResponse:
     contrat: Optional[Contrat] = None
     error: Optional[str] = None
     msg: Optional[str] = None
+    replayed: bool = False
 
 
 class RecordPaymentContratUseCase:
-    """Use case for retrieving a contrat"""
+    """
+    Use case for recording a payment on a contrat
+    A retry with the same idempotency key returns the original result without paying twice
+    """
 
-    def __init__(self, contrat_repository: ContratRepository):
+    def __init__(self, contrat_repository: ContratRepository, audit_repository: Optional[AuditRepository] = None):
         self.repository = contrat_repository
+        self.audit_repository = audit_repository
 
     def execute(self, request: RecordPaymentContratRequest) -> RecordPaymentContratResponse:
 
@@ -382,6 +451,27 @@ class RecordPaymentContratUseCase:
                 msg="Seuls les membres commerciaux peuvent effectuer des paiements"
             )
 
+        try:
+            payment = Money(request.payment)
+        except InvalidAmountError as e:
+            return RecordPaymentContratResponse(
+                success=False,
+                error="Erreur Métier",
+                msg=str(e)
+            )
+
+        if request.idempotency_key is not None:
+            receipt = self.repository.find_payment_receipt(request.idempotency_key)
+            if receipt is not None:
+                return self._replay(contrat, payment, receipt)
+
+        if not contrat.has_sign():
+            return RecordPaymentContratResponse(
+                success=False,
+                error="Erreur Métier",
+                msg="La signature du contrat est nécessaire"
+            )
+
         if contrat.is_fully_paid():
             return RecordPaymentContratResponse(
                 success=False,
@@ -389,15 +479,176 @@ class RecordPaymentContratUseCase:
                 msg="Le contrat a été entièrement réglé"
             )
 
-        try:
-            payment = Money(request.payment)
-            contrat.record_payment(payment)
-        except BusinessRuleViolation as e:
+        # the balance is checked again by the conditional update, it may have changed since it was read
+        paid_contrat = None
+        if payment <= contrat.balance_due:
+            try:
+                paid_contrat = self.repository.record_payment(
+                    request.contrat_id, payment.cents, request.idempotency_key,
+                    before_commit=record_with(self.audit_repository, lambda paid: [audit_entry(
+                        request.authorization, AuditedEntity.CONTRAT, paid.id, "pay", after={"payment": str(payment)}
+                    )])
+                )
+            except DuplicateRequestError:
+                # a concurrent retry recorded the payment first
+                receipt = self.repository.find_payment_receipt(request.idempotency_key)
+                return self._replay(contrat, payment, receipt)
+        if paid_contrat is None:
             return RecordPaymentContratResponse(
                 success=False,
                 error="Erreur Métier",
-                msg=str(e)
+                msg="Le montant du paiement est plus grand que le reste à payer"
             )
+        return RecordPaymentContratResponse(success=True, contrat=paid_contrat)
 
-        self.repository.save(contrat)
-        return RecordPaymentContratResponse(success=True, contrat=contrat)
+    @staticmethod
+    def _replay(contrat: Contrat, payment: Money, receipt: PaymentReceipt) -> RecordPaymentContratResponse:
+        """Response of the payment already recorded with the idempotency key"""
+        if receipt.contrat_id != contrat.id or receipt.amount != payment:
+            return RecordPaymentContratResponse(
+                success=False,
+                error="Erreur Métier",
+                msg="Clé d'idempotence déjà utilisée pour un autre paiement"
+            )
+        return RecordPaymentContratResponse(
+            success=True,
+            contrat=replace(contrat, balance_due=receipt.balance_due, updated_at=receipt.paid_at),
+            replayed=True,
+        )
+
+
+##############################################################################
+@dataclass
+class BulkSignContratRequest:
+    contrat_ids: List[int]
+    authorization: RequestPolicy
+
+
+@dataclass
+class BulkContratResponse:
+    success: bool
+    results: List[BulkResult] = None
+    error: Optional[str] = None
+    msg: Optional[str] = None
+
+
+def _authorized_rows(repository: ContratRepository, contrat_ids: List[int], authorization: RequestPolicy,
+                     denied_msg: str) -> tuple[dict[int, ContratRow], dict[int, BulkResult]]:
+    """
+    Loads contrats in one query and evaluates the policy on each of them
+    :return: authorized rows by id, failures by id
+    """
+    rows = {row.id: row for row in repository.find_all_rows({"ids": contrat_ids})}
+    policy = UserPolicy(authorization)
+    authorized, failures = {}, {}
+    for contrat_id in contrat_ids:
+        row = rows.get(contrat_id)
+        if row is None:
+            failures[contrat_id] = BulkResult(contrat_id, False, "Contrat non trouvé")
+            continue
+        authorization.context = row
+        if not policy.is_allowed():
+            failures[contrat_id] = BulkResult(contrat_id, False, denied_msg)
+            continue
+        authorized[contrat_id] = row
+    return authorized, failures
+
+
+class BulkSignContratUseCase:
+    """Use case for signing many contrats at once"""
+
+    def __init__(self, contrat_repository: ContratRepository, audit_repository: Optional[AuditRepository] = None):
+        self.repository = contrat_repository
+        self.audit_repository = audit_repository
+
+    def execute(self, request: BulkSignContratRequest) -> BulkContratResponse:
+        contrat_ids = list(dict.fromkeys(request.contrat_ids))
+        if not contrat_ids:
+            return BulkContratResponse(success=False, error="Ressource", msg="Aucun contrat à signer")
+
+        authorized, failures = _authorized_rows(
+            self.repository, contrat_ids, request.authorization,
+            "Seuls les membres commercials peuvent signer des contrats"
+        )
+        for contrat_id, row in authorized.items():
+            if row.status == ContractStatus.SIGNED:
+                failures[contrat_id] = BulkResult(contrat_id, False, "Contrat déjà signé")
+
+        signed = set(self.repository.sign_many(
+            [i for i in authorized if i not in failures],
+            before_commit=record_with(self.audit_repository, lambda signed_ids: [
+                audit_entry(
+                    request.authorization, AuditedEntity.CONTRAT, contrat_id, "sign",
+                    before={"status": ContractStatus.UNSIGNED.value}, after={"status": ContractStatus.SIGNED.value}
+                )
+                for contrat_id in sorted(signed_ids)
+            ])
+        ))
+        results = [
+            failures.get(contrat_id)
+            or BulkResult(contrat_id, contrat_id in signed, None if contrat_id in signed else "Contrat déjà signé")
+            for contrat_id in contrat_ids
+        ]
+        return BulkContratResponse(success=True, results=results)
+
+
+##############################################################################
+@dataclass
+class BulkRecordPaymentContratRequest:
+    payments: dict[int, str]
+    authorization: RequestPolicy
+
+
+class BulkRecordPaymentContratUseCase:
+    """Use case for recording payments on many contrats at once"""
+
+    def __init__(self, contrat_repository: ContratRepository, audit_repository: Optional[AuditRepository] = None):
+        self.repository = contrat_repository
+        self.audit_repository = audit_repository
+
+    def execute(self, request: BulkRecordPaymentContratRequest) -> BulkContratResponse:
+        contrat_ids = list(request.payments)
+        if not contrat_ids:
+            return BulkContratResponse(success=False, error="Ressource", msg="Aucun paiement à enregistrer")
+
+        authorized, failures = _authorized_rows(
+            self.repository, contrat_ids, request.authorization,
+            "Seuls les membres commerciaux peuvent effectuer des paiements"
+        )
+        payments = {}
+        for contrat_id, row in authorized.items():
+            try:
+                payment = Money(request.payments[contrat_id])
+            except InvalidAmountError as e:
+                failures[contrat_id] = BulkResult(contrat_id, False, str(e))
+                continue
+            if row.status != ContractStatus.SIGNED:
+                failures[contrat_id] = BulkResult(contrat_id, False, "La signature du contrat est nécessaire")
+            elif row.balance_due.cents == 0:
+                failures[contrat_id] = BulkResult(contrat_id, False, "Le contrat a été entièrement réglé")
+            elif payment > row.balance_due:
+                failures[contrat_id] = BulkResult(
+                    contrat_id, False, "Le montant du paiement est plus grand que le reste à payer"
+                )
+            else:
+                payments[contrat_id] = payment.cents
+
+        paid = set(self.repository.record_payments(
+            payments,
+            before_commit=record_with(self.audit_repository, lambda paid_ids: [
+                audit_entry(
+                    request.authorization, AuditedEntity.CONTRAT, contrat_id, "pay",
+                    after={"payment": str(Money.from_cents(payments[contrat_id]))}
+                )
+                for contrat_id in sorted(paid_ids)
+            ])
+        ))
+        results = [
+            failures.get(contrat_id)
+            or BulkResult(
+                contrat_id, contrat_id in paid,
+                None if contrat_id in paid else "Le montant du paiement est plus grand que le reste à payer"
+            )
+            for contrat_id in contrat_ids
+        ]
+        return BulkContratResponse(success=True, results=results)
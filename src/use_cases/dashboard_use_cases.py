@@ -0,0 +1,117 @@
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Optional, List
+
+from src.domain.entities.read_models import CommercialReportRow, SupportSummaryRow, SummaryDiff
+from src.domain.interfaces.repository import DashboardRepository, PaymentRepository
+from src.domain.policies.user_policy import UserPolicy, RequestPolicy
+
+
+##############################################################################
+@dataclass
+class GetDashboardRequest:
+    authorization: RequestPolicy
+    today: date = field(default_factory=date.today)
+
+
+@dataclass
+class GetDashboardResponse:
+    success: bool
+    commercials: List[CommercialReportRow] = None
+    supports: List[SupportSummaryRow] = None
+    error: Optional[str] = None
+    msg: Optional[str] = None
+
+
+class GetDashboardUseCase:
+    """Use case for reading the dashboard summary tables"""
+
+    def __init__(self, dashboard_repository: DashboardRepository):
+        self.repository = dashboard_repository
+
+    def execute(self, request: GetDashboardRequest) -> GetDashboardResponse:
+
+        policy = UserPolicy(request.authorization)
+        if not policy.is_allowed():
+            return GetDashboardResponse(
+                success=False,
+                error="Permission",
+                msg="Seuls les membres gestion peuvent consulter le tableau de bord"
+            )
+
+        return GetDashboardResponse(
+            success=True,
+            commercials=self.repository.commercial_summaries(),
+            supports=self.repository.support_summaries(request.today),
+        )
+
+
+##############################################################################
+@dataclass
+class CheckDashboardRequest:
+    repair: bool
+    authorization: RequestPolicy
+
+
+@dataclass
+class CheckDashboardResponse:
+    success: bool
+    diffs: List[SummaryDiff] = None
+    repaired: bool = False
+    error: Optional[str] = None
+    msg: Optional[str] = None
+
+
+class CheckDashboardUseCase:
+    """Use case for checking the dashboard summary tables against the source tables"""
+
+    def __init__(self, dashboard_repository: DashboardRepository):
+        self.repository = dashboard_repository
+
+    def execute(self, request: CheckDashboardRequest) -> CheckDashboardResponse:
+
+        policy = UserPolicy(request.authorization)
+        if not policy.is_allowed():
+            return CheckDashboardResponse(
+                success=False,
+                error="Permission",
+                msg="Seuls les membres administrateur peuvent vérifier le tableau de bord"
+            )
+
+        diffs = self.repository.check()
+        if diffs and request.repair:
+            self.repository.rebuild()
+            return CheckDashboardResponse(success=True, diffs=diffs, repaired=True)
+
+        return CheckDashboardResponse(success=True, diffs=diffs)
+
+
+##############################################################################
+@dataclass
+class CheckLedgerRequest:
+    repair: bool
+    authorization: RequestPolicy
+    workers: int = 4
+
+
+class CheckLedgerUseCase:
+    """Use case for checking contrat balances due against the payments ledger"""
+
+    def __init__(self, payment_repository: PaymentRepository):
+        self.repository = payment_repository
+
+    def execute(self, request: CheckLedgerRequest) -> CheckDashboardResponse:
+
+        policy = UserPolicy(request.authorization)
+        if not policy.is_allowed():
+            return CheckDashboardResponse(
+                success=False,
+                error="Permission",
+                msg="Seuls les membres administrateur peuvent vérifier les soldes"
+            )
+
+        if request.repair:
+            diffs = self.repository.rebuild_balances(request.workers)
+            return CheckDashboardResponse(success=True, diffs=diffs, repaired=bool(diffs))
+
+        return CheckDashboardResponse(success=True, diffs=self.repository.check_balances())
@@ -1,12 +1,18 @@
 ##############################################################################
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
-from typing import Optional, List
-
-from src.domain.entities.entities import Event, Client
-from src.domain.interfaces.repository import EventRepository, UserRepository, ContratRepository, ClientRepository
+from typing import Optional, List, Iterable
+
+from src.domain.entities.entities import Event, Client, User
+from src.domain.entities.enums import Role, AuditedEntity
+from src.domain.entities.exceptions import BusinessRuleViolation, ConcurrentModificationError
+from src.domain.entities.read_models import EventRow, BulkResult, AuditEntry
+from src.domain.interfaces.repository import EventRepository, UserRepository, ContratRepository, ClientRepository, \
+    AuditRepository
 from src.domain.policies.user_policy import UserPolicy, RequestPolicy
+from src.domain.services.audit import audit_entry, audit_fields, record_with
+from src.domain.services.support_scheduler import plan_assignments
 
 
 @dataclass
@@ -37,10 +43,12 @@ class CreateEventUseCase:
             self, event_repository: EventRepository,
             contrat_repository: ContratRepository,
             client_repository: ClientRepository,
+            audit_repository: Optional[AuditRepository] = None,
     ):
         self.event_repository = event_repository
         self.contrat_repository = contrat_repository
         self.client_repository = client_repository
+        self.audit_repository = audit_repository
 
     def execute(self, request: CreateEventRequest) -> CreateEventResponse:
 
@@ -109,7 +117,11 @@ class CreateEventUseCase:
             notes=request.notes,
         )
 
-        saved_event = self.event_repository.save(event)
+        saved_event = self.event_repository.save(event, before_commit=record_with(
+            self.audit_repository, lambda saved: [audit_entry(
+                request.authorization, AuditedEntity.EVENT, saved.id, "create", after=audit_fields(saved)
+            )]
+        ))
         client = self.client_repository.find_by_id(client_id)
         return CreateEventResponse(success=True, event=saved_event, client=client)
 
@@ -125,6 +137,7 @@ class UpdateEventRequest:
     attendees: Optional[int]
     notes: Optional[str]
     authorization: RequestPolicy
+    version: Optional[int] = None
 
 
 @dataclass
@@ -139,9 +152,13 @@ class UpdateEventResponse:
 class UpdateEventUseCase:
     """Use case for updating a contrat"""
 
-    def __init__(self, event_repository: EventRepository, client_repository: ClientRepository):
+    def __init__(self,
+                 event_repository: EventRepository,
+                 client_repository: ClientRepository,
+                 audit_repository: Optional[AuditRepository] = None):
         self.repository = event_repository
         self.client_repository = client_repository
+        self.audit_repository = audit_repository
 
     def execute(self, request: UpdateEventRequest) -> UpdateEventResponse:
 
@@ -162,6 +179,13 @@ class UpdateEventUseCase:
                 msg="Seuls les membres support peuvent créer des évènements"
             )
 
+        if request.version is not None and request.version != event.version:
+            return UpdateEventResponse(
+                success=False,
+                error="Conflit",
+                msg="L'évènement a été modifié par un autre utilisateur, rechargez-le puis recommencez"
+            )
+        before = audit_fields(event)
         event.update_info(
             request.name,
             request.start_date,
@@ -171,7 +195,25 @@ class UpdateEventUseCase:
             request.notes,
         )
 
-        updated_event = self.repository.save(event)
+        try:
+            updated_event = self.repository.save(event, before_commit=record_with(
+                self.audit_repository, lambda saved: [audit_entry(
+                    request.authorization, AuditedEntity.EVENT, saved.id, "update",
+                    before=before, after=audit_fields(saved)
+                )]
+            ))
+        except BusinessRuleViolation as e:
+            return UpdateEventResponse(
+                success=False,
+                error="Erreur Métier",
+                msg=str(e)
+            )
+        except ConcurrentModificationError:
+            return UpdateEventResponse(
+                success=False,
+                error="Conflit",
+                msg="L'évènement a été modifié par un autre utilisateur, rechargez-le puis recommencez"
+            )
         client = self.client_repository.find_by_id(event.client_id)
         return UpdateEventResponse(success=True, event=updated_event, client=client)
 
@@ -186,12 +228,19 @@ class EventFilter(Enum):
 class ListEventRequest:
     support_contact_id: int
     list_filter: Optional[EventFilter]
+    date_from: Optional[datetime] = None
+    date_to: Optional[datetime] = None
+    after_id: Optional[int] = None
+    limit: Optional[int] = None
+    # rows iterated as they are fetched without next_after_id, an empty list is not an error
+    stream: bool = False
 
 
 @dataclass
 class ListEventResponse:
     success: bool
-    events: List[Event] = None
+    events: Iterable[EventRow] = None
+    next_after_id: Optional[int] = None
     error: Optional[str] = None
     msg: Optional[str] = None
 
@@ -210,7 +259,30 @@ class ListEventUseCase:
             case EventFilter.WITHOUT_SUPPORT:
                 criteres["support_contact"] = False
 
-        events = self.repository.find_all(criteres)
+        if request.date_from and request.date_to and request.date_to <= request.date_from:
+            return ListEventResponse(
+                success=False,
+                error="Période",
+                msg="La date de fin doit être après la date de début"
+            )
+        criteres["date_from"] = request.date_from
+        criteres["date_to"] = request.date_to
+        criteres["limit"] = request.limit
+
+        if request.after_id is not None:
+            last_event = self.repository.find_by_id(request.after_id)
+            if not last_event:
+                return ListEventResponse(
+                    success=False,
+                    error="Ressource",
+                    msg="Évènement de reprise non trouvé"
+                )
+            criteres["after"] = (last_event.start_date, last_event.id)
+
+        if request.stream:
+            return ListEventResponse(success=True, events=self.repository.iter_all_rows(criteres))
+
+        events = self.repository.find_all_rows(criteres)
         if not events:
             return ListEventResponse(
                 success=False,
@@ -218,7 +290,8 @@ class ListEventUseCase:
                 msg="Aucun évènement trouvé"
             )
 
-        return ListEventResponse(success=True, events=events)
+        next_after_id = events[-1].id if request.limit and len(events) == request.limit else None
+        return ListEventResponse(success=True, events=events, next_after_id=next_after_id)
 
 
 ##############################################################################
@@ -272,8 +345,9 @@ class DeleteEventResponse:
 class DeleteEventUseCase:
     """Use case for deleting a contrat"""
 
-    def __init__(self, event_repository: EventRepository):
+    def __init__(self, event_repository: EventRepository, audit_repository: Optional[AuditRepository] = None):
         self.repository = event_repository
+        self.audit_repository = audit_repository
 
     def execute(self, request: DeleteEventRequest) -> DeleteEventResponse:
 
@@ -293,7 +367,11 @@ class DeleteEventUseCase:
                 msg="Seuls les membres administrateur peuvent supprimer des évènements"
             )
 
-        self.repository.delete(event.id)
+        self.repository.delete(event.id, before_commit=record_with(
+            self.audit_repository, lambda: [audit_entry(
+                request.authorization, AuditedEntity.EVENT, event.id, "delete", before=audit_fields(event)
+            )]
+        ))
         return DeleteEventResponse(success=True)
 
 
@@ -316,9 +394,13 @@ class AssignSupportEventResponse:
 class AssignSupportEventUseCase:
     """Use case for assigning support events"""
 
-    def __init__(self, event_repository: EventRepository, user_repository: UserRepository):
+    def __init__(self,
+                 event_repository: EventRepository,
+                 user_repository: UserRepository,
+                 audit_repository: Optional[AuditRepository] = None):
         self.repository = event_repository
         self.user_repository = user_repository
+        self.audit_repository = audit_repository
 
     def execute(self, request: AssignSupportEventRequest) -> AssignSupportEventResponse:
 
@@ -352,6 +434,7 @@ class AssignSupportEventUseCase:
                 error="Ressource",
                 msg="Utilisateur non trouvé"
             )
+        before = audit_fields(event)
         try:
             event.assign_support(user)
         except PermissionError as e:
@@ -361,5 +444,210 @@ class AssignSupportEventUseCase:
                 msg=str(e)
             )
 
-        self.repository.save(event)
+        try:
+            self.repository.save(event, before_commit=record_with(
+                self.audit_repository, lambda saved: [audit_entry(
+                    request.authorization, AuditedEntity.EVENT, saved.id, "assign",
+                    before=before, after=audit_fields(saved)
+                )]
+            ))
+        except BusinessRuleViolation as e:
+            return AssignSupportEventResponse(
+                success=False,
+                error="Erreur Métier",
+                msg=str(e)
+            )
+        except ConcurrentModificationError:
+            return AssignSupportEventResponse(
+                success=False,
+                error="Conflit",
+                msg="L'évènement a été modifié par un autre utilisateur, recommencez"
+            )
         return AssignSupportEventResponse(success=True)
+
+
+##############################################################################
+@dataclass
+class AutoAssignSupportEventRequest:
+    authorization: RequestPolicy
+    date_from: datetime = field(default_factory=datetime.now)
+
+
+@dataclass
+class AutoAssignSupportEventResponse:
+    success: bool
+    assignments: dict[int, int] = None
+    unassigned: List[EventRow] = None
+    supports: List[User] = None
+    error: Optional[str] = None
+    msg: Optional[str] = None
+
+
+def _assignment_entries(authorization: RequestPolicy, action: str, assignments: dict[int, int]) -> List[AuditEntry]:
+    """Audit entries of events assigned without support contact"""
+    return [
+        audit_entry(
+            authorization, AuditedEntity.EVENT, event_id, action,
+            before={"support_contact_id": None}, after={"support_contact_id": support_id}
+        )
+        for event_id, support_id in sorted(assignments.items())
+    ]
+
+
+class AutoAssignSupportEventUseCase:
+    """Use case for assigning every upcoming event without support to the least loaded free support user"""
+
+    def __init__(self,
+                 event_repository: EventRepository,
+                 user_repository: UserRepository,
+                 audit_repository: Optional[AuditRepository] = None):
+        self.repository = event_repository
+        self.user_repository = user_repository
+        self.audit_repository = audit_repository
+
+    def execute(self, request: AutoAssignSupportEventRequest) -> AutoAssignSupportEventResponse:
+
+        policy = UserPolicy(request.authorization)
+        if not policy.is_allowed():
+            return AutoAssignSupportEventResponse(
+                success=False,
+                error="Permission",
+                msg="Seuls les membres gestion peuvent assigner les évènements"
+            )
+
+        events = self.repository.find_all_rows({"support_contact": False, "date_from": request.date_from})
+        if not events:
+            return AutoAssignSupportEventResponse(
+                success=False,
+                error="Ressource",
+                msg="Aucun évènement sans support à venir"
+            )
+
+        supports = self.user_repository.find_all({"role": Role.SUPPORT})
+        if not supports:
+            return AutoAssignSupportEventResponse(
+                success=False,
+                error="Ressource",
+                msg="Aucun utilisateur support"
+            )
+
+        busy = self.repository.find_all_rows({
+            "support_contact": True,
+            "date_from": min(event.start_date for event in events),
+            "date_to": max(event.end_date for event in events),
+        })
+        planned, _ = plan_assignments(
+            ((event.id, event.start_date, event.end_date) for event in events),
+            (support.id for support in supports),
+            ((event.support_contact_id, event.start_date, event.end_date) for event in busy),
+        )
+
+        try:
+            assignments = self.repository.assign_supports(planned, before_commit=record_with(
+                self.audit_repository, lambda applied: _assignment_entries(request.authorization, "auto-assign", applied)
+            ))
+        except BusinessRuleViolation as e:
+            return AutoAssignSupportEventResponse(
+                success=False,
+                error="Erreur Métier",
+                msg=str(e)
+            )
+        unassigned = [event for event in events if event.id not in assignments]
+        return AutoAssignSupportEventResponse(
+            success=True,
+            assignments=assignments,
+            unassigned=unassigned,
+            supports=supports
+        )
+
+
+##############################################################################
+@dataclass
+class BulkAssignSupportEventRequest:
+    event_ids: List[int]
+    support_user_id: int
+    authorization: RequestPolicy
+
+
+@dataclass
+class BulkAssignSupportEventResponse:
+    success: bool
+    results: List[BulkResult] = None
+    error: Optional[str] = None
+    msg: Optional[str] = None
+
+
+class BulkAssignSupportEventUseCase:
+    """Use case for assigning one support user to many events at once"""
+
+    def __init__(self,
+                 event_repository: EventRepository,
+                 user_repository: UserRepository,
+                 audit_repository: Optional[AuditRepository] = None):
+        self.repository = event_repository
+        self.user_repository = user_repository
+        self.audit_repository = audit_repository
+
+    def execute(self, request: BulkAssignSupportEventRequest) -> BulkAssignSupportEventResponse:
+
+        policy = UserPolicy(request.authorization)
+        if not policy.is_allowed():
+            return BulkAssignSupportEventResponse(
+                success=False,
+                error="Permission",
+                msg="Seuls les membres gestion peuvent assigner les évènements"
+            )
+
+        user = self.user_repository.find_by_id(request.support_user_id)
+        if not user:
+            return BulkAssignSupportEventResponse(success=False, error="Ressource", msg="Utilisateur non trouvé")
+        if not user.is_support():
+            return BulkAssignSupportEventResponse(
+                success=False,
+                error="Permission",
+                msg="Seul les membre du support peut être assigné à un évènement"
+            )
+
+        event_ids = list(dict.fromkeys(request.event_ids))
+        rows = {row.id: row for row in self.repository.find_all_rows({"ids": event_ids})}
+        failures, candidates = {}, []
+        for event_id in event_ids:
+            row = rows.get(event_id)
+            if row is None:
+                failures[event_id] = BulkResult(event_id, False, "Evenement non trouvé")
+            elif row.support_contact_id is not None:
+                failures[event_id] = BulkResult(event_id, False, "L'évènement a déjà un contact support")
+            else:
+                candidates.append(row)
+
+        planned = {}
+        if candidates:
+            busy = self.repository.find_all_rows({
+                "support_contact_id": user.id,
+                "date_from": min(row.start_date for row in candidates),
+                "date_to": max(row.end_date for row in candidates),
+            })
+            planned, _ = plan_assignments(
+                ((row.id, row.start_date, row.end_date) for row in candidates),
+                [user.id],
+                ((user.id, row.start_date, row.end_date) for row in busy),
+            )
+
+        try:
+            assigned = self.repository.assign_supports(planned, before_commit=record_with(
+                self.audit_repository, lambda applied: _assignment_entries(request.authorization, "assign", applied)
+            ))
+        except BusinessRuleViolation as e:
+            return BulkAssignSupportEventResponse(success=False, error="Erreur Métier", msg=str(e))
+
+        results = []
+        for event_id in event_ids:
+            if event_id in failures:
+                results.append(failures[event_id])
+            elif event_id in assigned:
+                results.append(BulkResult(event_id, True))
+            elif event_id in planned:
+                results.append(BulkResult(event_id, False, "L'évènement a déjà un contact support"))
+            else:
+                results.append(BulkResult(event_id, False, "Le contact support a déjà un évènement sur ce créneau"))
+        return BulkAssignSupportEventResponse(success=True, results=results)
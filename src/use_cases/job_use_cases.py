@@ -0,0 +1,167 @@
+from dataclasses import dataclass
+from typing import Optional, List
+
+from src.domain.entities.enums import Role
+from src.domain.entities.read_models import Job
+from src.domain.interfaces.repository import JobRepository
+from src.domain.policies.user_policy import UserPolicy, RequestPolicy
+
+
+def _can_see(user: dict, job: Job) -> bool:
+    """A job is visible to the user who submitted it and to admins"""
+    return job.created_by == user["user_current_id"] or user["user_current_role"] == Role.ADMIN
+
+
+##############################################################################
+@dataclass
+class SubmitJobRequest:
+    kind: str
+    params: dict
+    user: dict
+    # permission of the command run by the job, None when the command is open to every user
+    authorization: Optional[RequestPolicy] = None
+
+
+@dataclass
+class SubmitJobResponse:
+    success: bool
+    job: Optional[Job] = None
+    error: Optional[str] = None
+    msg: Optional[str] = None
+
+
+class SubmitJobUseCase:
+    """Use case for queuing a long-running command, run later by a job worker"""
+
+    def __init__(self, job_repository: JobRepository):
+        self.repository = job_repository
+
+    def execute(self, request: SubmitJobRequest) -> SubmitJobResponse:
+
+        if request.authorization is not None and not UserPolicy(request.authorization).is_allowed():
+            return SubmitJobResponse(
+                success=False,
+                error="Permission",
+                msg="Vous êtes pas authorisé à lancer cette commande"
+            )
+
+        job = self.repository.create(request.kind, request.params, request.user["user_current_id"])
+        return SubmitJobResponse(success=True, job=job)
+
+
+##############################################################################
+@dataclass
+class GetJobRequest:
+    job_id: int
+    user: dict
+
+
+@dataclass
+class GetJobResponse:
+    success: bool
+    job: Optional[Job] = None
+    error: Optional[str] = None
+    msg: Optional[str] = None
+
+
+class GetJobUseCase:
+    """Use case for reading the status and progress of a job"""
+
+    def __init__(self, job_repository: JobRepository):
+        self.repository = job_repository
+
+    def execute(self, request: GetJobRequest) -> GetJobResponse:
+
+        job = self.repository.find_by_id(request.job_id)
+        if job is None or not _can_see(request.user, job):
+            return GetJobResponse(
+                success=False,
+                error="Ressource",
+                msg="Tâche non trouvée"
+            )
+
+        return GetJobResponse(success=True, job=job)
+
+
+##############################################################################
+@dataclass
+class ListJobRequest:
+    user: dict
+    all_users: bool = False
+    limit: int = 20
+
+
+@dataclass
+class ListJobResponse:
+    success: bool
+    jobs: List[Job] = None
+    error: Optional[str] = None
+    msg: Optional[str] = None
+
+
+class ListJobUseCase:
+    """Use case for listing the latest jobs of the user, or of every user for admins"""
+
+    def __init__(self, job_repository: JobRepository):
+        self.repository = job_repository
+
+    def execute(self, request: ListJobRequest) -> ListJobResponse:
+
+        if request.all_users and request.user["user_current_role"] != Role.ADMIN:
+            return ListJobResponse(
+                success=False,
+                error="Permission",
+                msg="Seuls les administrateurs peuvent voir les tâches de tous les utilisateurs"
+            )
+
+        created_by = None if request.all_users else request.user["user_current_id"]
+        jobs = self.repository.find_all(created_by, request.limit)
+        if not jobs:
+            return ListJobResponse(
+                success=False,
+                error="Ressource",
+                msg="Aucune tâche trouvée"
+            )
+
+        return ListJobResponse(success=True, jobs=jobs)
+
+
+##############################################################################
+@dataclass
+class CancelJobRequest:
+    job_id: int
+    user: dict
+
+
+@dataclass
+class CancelJobResponse:
+    success: bool
+    job: Optional[Job] = None
+    error: Optional[str] = None
+    msg: Optional[str] = None
+
+
+class CancelJobUseCase:
+    """Use case for cancelling a pending or running job, a running job stops at its next progress report"""
+
+    def __init__(self, job_repository: JobRepository):
+        self.repository = job_repository
+
+    def execute(self, request: CancelJobRequest) -> CancelJobResponse:
+
+        job = self.repository.find_by_id(request.job_id)
+        if job is None or not _can_see(request.user, job):
+            return CancelJobResponse(
+                success=False,
+                error="Ressource",
+                msg="Tâche non trouvée"
+            )
+
+        if not self.repository.cancel(job.id):
+            return CancelJobResponse(
+                success=False,
+                error="Statut",
+                msg=f"La tâche est déjà terminée ({self.repository.find_by_id(job.id).status.value})"
+            )
+
+        return CancelJobResponse(success=True, job=self.repository.find_by_id(job.id))
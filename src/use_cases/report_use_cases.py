@@ -0,0 +1,116 @@
+from dataclasses import dataclass
+from datetime import datetime
+from enum import Enum
+from typing import Optional, List, Union
+
+from src.domain.entities.read_models import CommercialReportRow, ClientReportRow, StatusReportRow, CashInRow
+from src.domain.interfaces.repository import ContratRepository, PaymentRepository
+from src.domain.policies.user_policy import UserPolicy, RequestPolicy
+
+
+##############################################################################
+class ReportType(Enum):
+    COMMERCIAL = "commercial"
+    CLIENT = "client"
+    STATUS = "status"
+
+
+@dataclass
+class GetReportRequest:
+    report_type: ReportType
+    authorization: RequestPolicy
+
+
+@dataclass
+class GetReportResponse:
+    success: bool
+    rows: List[Union[CommercialReportRow, ClientReportRow, StatusReportRow]] = None
+    error: Optional[str] = None
+    msg: Optional[str] = None
+
+
+class GetReportUseCase:
+    """Use case for aggregated revenue and receivables reports"""
+
+    def __init__(self, contrat_repository: ContratRepository):
+        self.repository = contrat_repository
+
+    def execute(self, request: GetReportRequest) -> GetReportResponse:
+
+        policy = UserPolicy(request.authorization)
+        if not policy.is_allowed():
+            return GetReportResponse(
+                success=False,
+                error="Permission",
+                msg="Seuls les membres gestion peuvent consulter les rapports"
+            )
+
+        match request.report_type:
+            case ReportType.COMMERCIAL:
+                rows = self.repository.report_by_commercial()
+            case ReportType.CLIENT:
+                rows = self.repository.report_by_client()
+            case ReportType.STATUS:
+                rows = self.repository.report_by_status()
+            case _:
+                rows = []
+
+        if not rows:
+            return GetReportResponse(
+                success=False,
+                error="Ressource",
+                msg="Aucun contrat trouvé"
+            )
+
+        return GetReportResponse(success=True, rows=rows)
+
+
+##############################################################################
+@dataclass
+class GetCashInReportRequest:
+    date_from: datetime
+    date_to: datetime
+    authorization: RequestPolicy
+    contrat_id: Optional[int] = None
+
+
+@dataclass
+class GetCashInReportResponse:
+    success: bool
+    rows: List[CashInRow] = None
+    error: Optional[str] = None
+    msg: Optional[str] = None
+
+
+class GetCashInReportUseCase:
+    """Use case for monthly cash-in report, read from the payments ledger"""
+
+    def __init__(self, payment_repository: PaymentRepository):
+        self.repository = payment_repository
+
+    def execute(self, request: GetCashInReportRequest) -> GetCashInReportResponse:
+
+        policy = UserPolicy(request.authorization)
+        if not policy.is_allowed():
+            return GetCashInReportResponse(
+                success=False,
+                error="Permission",
+                msg="Seuls les membres gestion peuvent consulter les rapports"
+            )
+
+        if request.date_to <= request.date_from:
+            return GetCashInReportResponse(
+                success=False,
+                error="Erreur Métier",
+                msg="La date de fin doit être après la date de début"
+            )
+
+        rows = self.repository.cash_in_by_month(request.date_from, request.date_to, request.contrat_id)
+        if not rows:
+            return GetCashInReportResponse(
+                success=False,
+                error="Ressource",
+                msg="Aucun paiement trouvé sur la période"
+            )
+
+        return GetCashInReportResponse(success=True, rows=rows)
@@ -4,7 +4,7 @@ from typing import Optional, List
 
 from src.domain.entities.entities import User
 from src.domain.entities.enums import Role
-from src.domain.entities.exceptions import InvalidEmailError, ValidationError
+from src.domain.entities.exceptions import InvalidEmailError, ValidationError, ConcurrentModificationError
 from src.domain.entities.value_objects import Email
 from src.domain.interfaces.auth import PasswordHasherInterface
 from src.domain.interfaces.repository import UserRepository
@@ -78,6 +78,7 @@ class UpdateUserRequest:
     fullname: Optional[str]
     email: Optional[str]
     authorization: RequestPolicy
+    version: Optional[int] = None
 
 
 @dataclass
@@ -129,12 +130,25 @@ class UpdateUserUseCase:
         if request.fullname is not None:
             fullname = request.fullname
 
+        if request.version is not None and request.version != user.version:
+            return UpdateUserResponse(
+                success=False,
+                error="Conflit",
+                msg="L'utilisateur a été modifié par un autre utilisateur, rechargez-le puis recommencez"
+            )
         user.update_info(
             fullname=fullname,
             email=email,
         )
 
-        updated_user = self.repository.save(user)
+        try:
+            updated_user = self.repository.save(user)
+        except ConcurrentModificationError:
+            return UpdateUserResponse(
+                success=False,
+                error="Conflit",
+                msg="L'utilisateur a été modifié par un autre utilisateur, rechargez-le puis recommencez"
+            )
 
         return UpdateUserResponse(success=True, user=updated_user)
 
@@ -38,3 +38,7 @@ def test_contrat_is_not_fully_paid(contrat):
     contrat.record_payment(Money(10))
     assert contrat.is_fully_paid() is False
 
+
+def test_contrat_is_slotted(contrat):
+    assert not hasattr(contrat, "__dict__")
+    assert not hasattr(contrat.balance_due, "__dict__")
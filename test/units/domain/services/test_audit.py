@@ -0,0 +1,49 @@
+from src.domain.entities.enums import AuditedEntity, Role
+from src.domain.entities.value_objects import Money
+from src.domain.policies.user_policy import RequestPolicy
+from src.domain.services.audit import audit_fields, field_changes, audit_entry
+
+
+def test_audit_fields_are_json_values(contrat):
+    """Snapshots hold plain values and skip bookkeeping fields"""
+    fields = audit_fields(contrat)
+
+    assert fields == {
+        "client_id": 3,
+        "commercial_contact_id": 4,
+        "contrat_amount": "100.00",
+        "balance_due": "100.00",
+        "status": "SIGNED",
+    }
+
+
+def test_field_changes_keeps_changed_fields(contrat):
+    """Only the fields whose value changed are kept, as [old, new]"""
+    before = audit_fields(contrat)
+    contrat.update_info(amount=Money(250))
+
+    assert field_changes(before, audit_fields(contrat)) == {
+        "contrat_amount": ["100.00", "250.00"],
+        "balance_due": ["100.00", "250.00"],
+    }
+
+
+def test_field_changes_creation_and_deletion():
+    """A creation has no old values, a deletion no new values"""
+    assert field_changes(None, {"name": "Salon"}) == {"name": [None, "Salon"]}
+    assert field_changes({"name": "Salon"}, None) == {"name": ["Salon", None]}
+
+
+def test_audit_entry_actor_is_current_user():
+    """The actor of an entry is the current user of the request"""
+    authorization = RequestPolicy(
+        user={"user_current_id": 7, "user_current_role": Role.GESTION},
+        ressource="CONTRAT",
+        action="sign",
+    )
+
+    entry = audit_entry(authorization, AuditedEntity.CONTRAT, 42, "sign", {"status": "UNSIGNED"}, {"status": "SIGNED"})
+
+    assert entry.actor_id == 7
+    assert entry.entity == AuditedEntity.CONTRAT
+    assert entry.changes == {"status": ["UNSIGNED", "SIGNED"]}
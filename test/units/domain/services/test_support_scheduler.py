@@ -0,0 +1,40 @@
+from datetime import datetime
+
+from src.domain.services.support_scheduler import SupportSchedule, plan_assignments
+
+
+def test_schedule_merges_overlapping_periods():
+    """Busy periods overlapping each other are merged"""
+    schedule = SupportSchedule()
+    schedule.add(datetime(2026, 5, 1, 10), datetime(2026, 5, 1, 12))
+    schedule.add(datetime(2026, 5, 1, 14), datetime(2026, 5, 1, 16))
+    schedule.add(datetime(2026, 5, 1, 11), datetime(2026, 5, 1, 15))
+
+    assert schedule.starts == [datetime(2026, 5, 1, 10)]
+    assert schedule.ends == [datetime(2026, 5, 1, 16)]
+
+
+def test_schedule_is_free():
+    """A period is free if it only touches busy periods"""
+    schedule = SupportSchedule()
+    schedule.add(datetime(2026, 5, 1, 10), datetime(2026, 5, 1, 12))
+
+    assert schedule.is_free(datetime(2026, 5, 1, 12), datetime(2026, 5, 1, 13)) is True
+    assert schedule.is_free(datetime(2026, 5, 1, 8), datetime(2026, 5, 1, 10)) is True
+    assert schedule.is_free(datetime(2026, 5, 1, 11), datetime(2026, 5, 1, 13)) is False
+
+
+def test_plan_assignments_balances_load():
+    """Events go to the least loaded support user who is free"""
+    events = [
+        (1, datetime(2026, 5, 1, 10), datetime(2026, 5, 1, 12)),
+        (2, datetime(2026, 5, 1, 10), datetime(2026, 5, 1, 12)),
+        (3, datetime(2026, 5, 1, 11), datetime(2026, 5, 1, 13)),
+        (4, datetime(2026, 5, 2, 10), datetime(2026, 5, 2, 12)),
+    ]
+    busy = [(20, datetime(2026, 4, 1), datetime(2026, 4, 2))]
+
+    assignments, unassigned = plan_assignments(events, [10, 20], busy)
+
+    assert assignments == {1: 10, 2: 20, 4: 10}
+    assert unassigned == [3]
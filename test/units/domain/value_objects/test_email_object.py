@@ -28,4 +28,8 @@ def test_valid_mail():
 
     for email in valid_emails:
         email = Email(email)
-        assert isinstance(email, Email)
\ No newline at end of file
+        assert isinstance(email, Email)
+
+def test_trusted_mail():
+    email = Email.trusted("test@test.fr")
+    assert email == Email("test@test.fr")
@@ -1,7 +1,7 @@
 import pytest
 
 from src.domain.entities.exceptions import InvalidAmountError
-from src.domain.entities.value_objects import Money
+from src.domain.entities.value_objects import Money, sum_money, subtract_money
 
 
 def test_valid_money():
@@ -24,4 +24,27 @@ def test_invalid_amount():
     ]
     for amount in invalid_amounts:
         with pytest.raises(InvalidAmountError):
-            Money(amount)
\ No newline at end of file
+            Money(amount)
+
+def test_money_from_cents():
+    money = Money.from_cents(12545)
+    assert money == Money("125.45")
+    assert str(money) == "125.45"
+
+
+def test_money_cents_rounding():
+    assert Money("448.456").cents == 44846
+    assert Money(12.2).cents == 1220
+
+
+def test_sum_money():
+    assert sum_money([Money("1.10"), Money("2.20"), Money(3)]) == Money("6.30")
+
+
+def test_subtract_money():
+    result = subtract_money([Money(10), Money(5)], [Money("2.50"), Money(5)])
+    assert result == [Money("7.50"), Money(0)]
+
+def test_subtract_money_negative():
+    with pytest.raises(InvalidAmountError):
+        subtract_money([Money(1)], [Money(2)])
@@ -31,4 +31,8 @@ def test_valid_telephone():
 
     for number in valid_numbers:
         telephone = Telephone(number)
-        assert isinstance(telephone, Telephone)
\ No newline at end of file
+        assert isinstance(telephone, Telephone)
+
+def test_trusted_telephone():
+    telephone = Telephone.trusted("0645789845")
+    assert telephone == Telephone("0645789845")
@@ -0,0 +1,121 @@
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+from sqlalchemy import create_engine, insert, update
+from sqlalchemy.orm import sessionmaker
+
+from src.domain.entities.enums import AuditedEntity, Role
+from src.domain.entities.read_models import AuditEntry
+from src.infrastructures.database.changes import ChangeListener, LISTEN, POLL, merge_changes, parse_payloads
+from src.infrastructures.database.models import Base, ClientModel, UserModel
+from src.infrastructures.repositories.SQLAchemy_repository import SQLAlchemyAuditRepository
+
+PROJECT_ROOT = Path(__file__).resolve().parents[4]
+TIMEOUT_SECONDS = 5
+
+# another process saving a commercial and one of its clients through the repositories, prints their ids
+WRITER = """
+import sys, uuid
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from src.domain.entities.entities import User, Client
+from src.domain.entities.enums import Role
+from src.domain.entities.value_objects import Email, Telephone
+from src.infrastructures.repositories.SQLAchemy_repository import SQLAlchemyUserRepository, SQLAlchemyClientRepository
+
+with Session(create_engine(sys.argv[1])) as session:
+    tag = uuid.uuid4().hex[:8]
+    user = SQLAlchemyUserRepository(session).save(User(
+        id=None, fullname="notify", email=Email(f"notify{tag}@test.fr"), password="x", role=Role.COMMERCIAL
+    ))
+    client = SQLAlchemyClientRepository(session).save(Client(
+        id=None, fullname="notify", email=Email(f"notify{tag}@test.fr"), telephone=Telephone("0645789845"),
+        company_name="company_test", commercial_contact_id=user.id
+    ))
+    print(user.id, client.id)
+"""
+
+
+class Received:
+    """Changes received by a listener, merged"""
+
+    def __init__(self):
+        self.changes = {}
+        self.event = threading.Event()
+
+    def __call__(self, changes: dict) -> None:
+        merge_changes(self.changes, changes)
+        self.event.set()
+
+    def wait_for(self, entity: str, entity_id: int) -> bool:
+        deadline = time.monotonic() + TIMEOUT_SECONDS
+        while time.monotonic() < deadline:
+            ids = self.changes.get(entity, set())
+            if ids is None or entity_id in ids:
+                return True
+            self.event.wait(0.05)
+            self.event.clear()
+        return False
+
+
+def test_parse_payloads():
+    """test ids are grouped per entity, * means any id """
+    assert parse_payloads(["client:1", "client:2", "contrat:*", "contrat:4"]) == {"client": {1, 2}, "contrat": None}
+
+
+def test_listen_changes_of_another_process(engine):
+    """test a commit of another process is notified to the listener, per entity and id """
+    received = Received()
+    with ChangeListener(engine, received) as listener:
+        assert listener.mode == LISTEN
+        writer = subprocess.run(
+            [sys.executable, "-c", WRITER, engine.url.render_as_string(hide_password=False)],
+            cwd=PROJECT_ROOT, capture_output=True, text=True, check=True,
+        )
+        user_id, client_id = map(int, writer.stdout.split())
+
+        assert received.wait_for("user", user_id)
+        assert received.wait_for("client", client_id)
+
+
+def test_rolled_back_changes_not_notified(engine, session):
+    """test NOTIFY is sent on commit only """
+    received = Received()
+    with ChangeListener(engine, received):
+        session.execute(update(ClientModel).where(ClientModel.id == -1).values(fullname="none"))
+        session.add(UserModel(
+            fullname="rollback", email=f"rollback{uuid.uuid4().hex[:8]}@test.fr", password="x",
+            role=Role.SUPPORT, created_at=datetime.now(), updated_at=datetime.now(),
+        ))
+        session.flush()
+        session.rollback()
+
+        assert not received.event.wait(0.5)
+
+
+def test_poll_changes_on_sqlite(tmp_path):
+    """test SQLite falls back to polling the audit log and the users version """
+    engine = create_engine(f"sqlite:///{tmp_path / 'changes.db'}")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    received = Received()
+
+    with ChangeListener(engine, received, poll_seconds=0.05) as listener:
+        assert listener.mode == POLL
+        now = datetime.now()
+        session.execute(insert(UserModel).values(
+            id=1, fullname="admin", email="admin@test.fr", password="x", role=Role.ADMIN, created_at=now, updated_at=now
+        ))
+        SQLAlchemyAuditRepository(session).record([AuditEntry(AuditedEntity.CLIENT, 7, "update", 1, {}, now)])
+        session.commit()
+
+        assert received.wait_for("client", 7)
+        assert received.wait_for("user", 1)
+
+    session.close()
+    engine.dispose()
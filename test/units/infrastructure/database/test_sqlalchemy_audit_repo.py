@@ -0,0 +1,49 @@
+from datetime import datetime
+
+from sqlalchemy.orm import Session
+
+from src.domain.entities.enums import AuditedEntity
+from src.domain.entities.read_models import AuditEntry
+from src.infrastructures.repositories.SQLAchemy_repository import SQLAlchemyAuditRepository
+
+
+def _entry(contrat_id: int, action: str) -> AuditEntry:
+    return AuditEntry(AuditedEntity.CONTRAT, contrat_id, action, 1, {"status": ["UNSIGNED", "SIGNED"]}, datetime.now())
+
+
+def test_entries_committed_with_their_write(contrat_SQLAlchemy_repository, contrat, session):
+    """test entries recorded from the before_commit hook are committed by the save they describe """
+    audit_repository = SQLAlchemyAuditRepository(session)
+    saved_contrat = contrat_SQLAlchemy_repository.save(
+        contrat, before_commit=lambda saved: audit_repository.record([_entry(saved.id, "create")])
+    )
+
+    with Session(session.get_bind()) as other_session:
+        [entry] = SQLAlchemyAuditRepository(other_session).find_by_entity(AuditedEntity.CONTRAT, saved_contrat.id)
+    assert entry.action == "create"
+    assert entry.changes == {"status": ["UNSIGNED", "SIGNED"]}
+    assert audit_repository.flush() == 0
+
+
+def test_entries_dropped_on_rollback(contrat_SQLAlchemy_repository, contrat, session):
+    """test entries of a rolled back transaction are not written by the next commit """
+    audit_repository = SQLAlchemyAuditRepository(session)
+    saved_contrat = contrat_SQLAlchemy_repository.save(contrat)
+    audit_repository.record([_entry(saved_contrat.id, "sign")])
+    session.rollback()
+
+    contrat_SQLAlchemy_repository.record_payment(saved_contrat.id, 100)
+
+    assert audit_repository.find_by_entity(AuditedEntity.CONTRAT, saved_contrat.id) == []
+
+
+def test_flush_latest_first(contrat_SQLAlchemy_repository, contrat, session):
+    """test flush writes the buffered entries, read back latest first """
+    audit_repository = SQLAlchemyAuditRepository(session)
+    saved_contrat = contrat_SQLAlchemy_repository.save(contrat)
+    audit_repository.record([_entry(saved_contrat.id, "create"), _entry(saved_contrat.id, "sign")])
+
+    assert audit_repository.flush() == 2
+
+    entries = audit_repository.find_by_entity(AuditedEntity.CONTRAT, saved_contrat.id)
+    assert [entry.action for entry in entries] == ["sign", "create"]
@@ -5,6 +5,7 @@ from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
 
 from src.domain.entities.entities import Client
+from src.domain.entities.read_models import ClientRow
 from src.infrastructures.database.models import ClientModel
 
 
@@ -49,6 +50,22 @@ def test_find_all(client_SQLAlchemy_repository, session):
     actual_count_client = session.query(ClientModel).count()
     assert len(all_clients) == actual_count_client
 
+def test_find_all_rows(client_SQLAlchemy_repository, session):
+    """test find all rows method """
+    all_rows = client_SQLAlchemy_repository.find_all_rows(dict())
+
+    assert all(isinstance(row, ClientRow) for row in all_rows)
+    actual_count = session.query(ClientModel).count()
+    assert len(all_rows) == actual_count
+
+def test_search(client_SQLAlchemy_repository, session, client):
+    """test fuzzy search method """
+    saved = client_SQLAlchemy_repository.save(client)
+    results = client_SQLAlchemy_repository.search(client.fullname[:-1], limit=50, offset=0)
+
+    assert all(isinstance(row, ClientRow) for row in results)
+    assert saved.id in [row.id for row in results]
+
 def test_delete(client_SQLAlchemy_repository, session, client):
     """test delete method """
     init_count_client = session.query(ClientModel).count()
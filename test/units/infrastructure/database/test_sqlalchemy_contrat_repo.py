@@ -1,10 +1,21 @@
+import os
+import uuid
+from concurrent.futures import ProcessPoolExecutor
 from typing import List
 
-from sqlalchemy import select
+import pytest
+from sqlalchemy import select, create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 
 from src.domain.entities.entities import Contrat
+from src.domain.entities.enums import ContractStatus
+from src.domain.entities.exceptions import DuplicateRequestError, ConcurrentModificationError
 from src.domain.entities.value_objects import Money
+from src.domain.entities.read_models import ContratRow
 from src.infrastructures.database.models import ContratModel
+from src.infrastructures.repositories.SQLAchemy_repository import SQLAlchemyDashboardRepository, \
+    SQLAlchemyContratRepository, SQLAlchemyPaymentRepository
 
 
 def test_save_contrat_create(contrat_SQLAlchemy_repository, contrat, session):
@@ -50,6 +61,14 @@ def test_find_all(contrat_SQLAlchemy_repository, session):
 
 
 
+def test_find_all_rows(contrat_SQLAlchemy_repository, session):
+    """test find all rows method """
+    all_rows = contrat_SQLAlchemy_repository.find_all_rows(dict())
+
+    assert all(isinstance(row, ContratRow) for row in all_rows)
+    actual_count = session.query(ContratModel).count()
+    assert len(all_rows) == actual_count
+
 def test_delete(contrat_SQLAlchemy_repository, session, contrat):
     """test delete method """
     init_count_contrat = session.query(ContratModel).count()
@@ -60,4 +79,100 @@ def test_delete(contrat_SQLAlchemy_repository, session, contrat):
 
     assert delete_contrat is None
     actual_count_contrat = session.query(ContratModel).count()
-    assert actual_count_contrat == init_count_contrat
\ No newline at end of file
+    assert actual_count_contrat == init_count_contrat
+
+def test_report_by_status(contrat_SQLAlchemy_repository, session):
+    """test report by status method """
+    rows = contrat_SQLAlchemy_repository.report_by_status()
+
+    actual_count_contrat = session.query(ContratModel).count()
+    assert sum(row.contrat_count for row in rows) == actual_count_contrat
+
+def test_save_keeps_dashboard_consistent(contrat_SQLAlchemy_repository, contrat, session):
+    """test commercial summaries are updated in the same transaction as save """
+    dashboard = SQLAlchemyDashboardRepository(session)
+    dashboard.rebuild()
+
+    saved_contrat = contrat_SQLAlchemy_repository.save(contrat)
+    saved_contrat.record_payment(Money(10))
+    contrat_SQLAlchemy_repository.save(saved_contrat)
+
+    assert dashboard.check() == []
+
+def _pay_concurrently(contrat_id: int, payment_cents: int, payments: int) -> int:
+    """Worker process: records payments with its own connection, returns how many were applied"""
+    engine = create_engine(os.getenv("DATABASE_URL"), poolclass=NullPool)
+    with sessionmaker(bind=engine)() as session:
+        repo = SQLAlchemyContratRepository(session)
+        applied = sum(1 for _ in range(payments) if repo.record_payment(contrat_id, payment_cents))
+    engine.dispose()
+    return applied
+
+def test_record_payment_concurrent(contrat_SQLAlchemy_repository, contrat, session):
+    """test payments from concurrent processes are all applied once and never overdraw the contrat """
+    dashboard = SQLAlchemyDashboardRepository(session)
+    dashboard.rebuild()
+    saved_contrat = contrat_SQLAlchemy_repository.save(contrat)
+    balance = saved_contrat.balance_due.cents
+    workers, payments, payment_cents = 8, 25, 75
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        applied = sum(executor.map(
+            _pay_concurrently, [saved_contrat.id] * workers, [payment_cents] * workers, [payments] * workers
+        ))
+
+    session.expire_all()
+    paid_contrat = contrat_SQLAlchemy_repository.find_by_id(saved_contrat.id)
+    assert applied == min(workers * payments, balance // payment_cents)
+    assert paid_contrat.balance_due.cents == balance - applied * payment_cents
+    assert dashboard.check() == []
+
+def test_record_payment_appends_ledger(contrat_SQLAlchemy_repository, contrat, session):
+    """test a payment is appended to the ledger and balances can be rebuilt from it """
+    payment_repository = SQLAlchemyPaymentRepository(session)
+    saved_contrat = contrat_SQLAlchemy_repository.save(contrat)
+
+    contrat_SQLAlchemy_repository.record_payment(saved_contrat.id, 1500)
+    contrat_SQLAlchemy_repository.record_payments({saved_contrat.id: 500})
+
+    payments = payment_repository.find_by_contrat(saved_contrat.id)
+    assert [payment.amount.cents for payment in payments] == [1500, 500]
+    assert str(saved_contrat.id) not in {diff.key for diff in payment_repository.check_balances()}
+
+def test_record_payment_unsigned(contrat_SQLAlchemy_repository, contrat, session):
+    """test the conditional update pays signed contrats only, as record_payments """
+    contrat.status = ContractStatus.UNSIGNED
+    saved_contrat = contrat_SQLAlchemy_repository.save(contrat)
+
+    assert contrat_SQLAlchemy_repository.record_payment(saved_contrat.id, 1000) is None
+    assert contrat_SQLAlchemy_repository.record_payments({saved_contrat.id: 1000}) == []
+    assert contrat_SQLAlchemy_repository.find_by_id(saved_contrat.id).balance_due == saved_contrat.balance_due
+
+def test_record_payment_duplicate_idempotency_key(contrat_SQLAlchemy_repository, contrat, session):
+    """test a second payment with the same idempotency key is rolled back """
+    saved_contrat = contrat_SQLAlchemy_repository.save(contrat)
+    key = f"test-{uuid.uuid4()}"
+    contrat_SQLAlchemy_repository.record_payment(saved_contrat.id, 1500, key)
+
+    with pytest.raises(DuplicateRequestError):
+        contrat_SQLAlchemy_repository.record_payment(saved_contrat.id, 1500, key)
+
+    receipt = contrat_SQLAlchemy_repository.find_payment_receipt(key)
+    assert receipt.balance_due.cents == saved_contrat.balance_due.cents - 1500
+    assert contrat_SQLAlchemy_repository.find_by_id(saved_contrat.id).balance_due == receipt.balance_due
+
+def test_save_outdated_version(contrat_SQLAlchemy_repository, contrat, session):
+    """test saving a contrat read before a concurrent payment is refused """
+    saved_contrat = contrat_SQLAlchemy_repository.save(contrat)
+    outdated = contrat_SQLAlchemy_repository.find_by_id(saved_contrat.id)
+    version = outdated.version
+
+    contrat_SQLAlchemy_repository.record_payment(saved_contrat.id, 1500)
+    outdated.contrat_amount = Money(5000)
+
+    with pytest.raises(ConcurrentModificationError):
+        contrat_SQLAlchemy_repository.save(outdated)
+
+    current = contrat_SQLAlchemy_repository.find_by_id(saved_contrat.id)
+    assert current.version == version + 1
+    assert current.balance_due.cents == saved_contrat.balance_due.cents - 1500
@@ -1,9 +1,15 @@
+from datetime import datetime
 from typing import List
 
-from sqlalchemy import select
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
 
 from src.domain.entities.entities import Event
-from src.infrastructures.database.models import EventModel
+from src.domain.entities.exceptions import BusinessRuleViolation
+from src.domain.entities.read_models import EventRow
+from src.infrastructures.database.models import Base, EventModel
+from src.infrastructures.repositories.SQLAchemy_repository import SQLAlchemyEventRepository
 
 
 
@@ -49,6 +55,64 @@ def test_find_all(event_SQLAlchemy_repository, session):
     actual_count_events = session.query(EventModel).count()
     assert len(all_events) == actual_count_events
 
+def test_find_all_rows(event_SQLAlchemy_repository, session):
+    """test find all rows method """
+    all_rows = event_SQLAlchemy_repository.find_all_rows(dict())
+
+    assert all(isinstance(row, EventRow) for row in all_rows)
+    actual_count = session.query(EventModel).count()
+    assert len(all_rows) == actual_count
+
+def test_find_all_rows_period_keyset(event_SQLAlchemy_repository, session):
+    """test find all rows with overlap period and keyset pagination """
+    criteres = {"date_from": datetime(2026, 5, 19), "date_to": datetime(2026, 5, 26), "limit": 1}
+    first_page = event_SQLAlchemy_repository.find_all_rows(criteres)
+
+    assert len(first_page) <= 1
+    for row in first_page:
+        assert row.end_date > criteres["date_from"] and row.start_date < criteres["date_to"]
+        next_page = event_SQLAlchemy_repository.find_all_rows(
+            {**criteres, "after": (row.start_date, row.id)}
+        )
+        assert all((next_row.start_date, next_row.id) > (row.start_date, row.id) for next_row in next_page)
+
+def test_save_overlapping_support(event_SQLAlchemy_repository, session, event):
+    """test a support contact can not be booked on two overlapping events """
+    first = event_SQLAlchemy_repository.save(event)
+    overlapping = Event(
+        id=None, name="overlapping", contrat_id=first.contrat_id, client_id=first.client_id,
+        support_contact_id=first.support_contact_id,
+        start_date=first.start_date, end_date=first.end_date,
+        location="2 rue des test, Nantes", attendees=10, notes=""
+    )
+
+    with pytest.raises(BusinessRuleViolation):
+        event_SQLAlchemy_repository.save(overlapping)
+
+def test_assign_supports_overlapping_on_sqlite(tmp_path):
+    """test assigned supports are checked for overlaps without the PostgreSQL exclusion constraint """
+    engine = create_engine(f"sqlite:///{tmp_path / 'events.db'}")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        repository = SQLAlchemyEventRepository(session)
+        booked, free, other = [
+            repository.save(Event(
+                id=None, name=name, contrat_id=1, client_id=1, support_contact_id=support_contact_id,
+                start_date=datetime(2026, 6, 1, 9), end_date=datetime(2026, 6, 1, 18),
+                location="2 rue des test, Nantes", attendees=10, notes=""
+            ))
+            for name, support_contact_id in (("booked", 5), ("free", None), ("other", None))
+        ]
+
+        with pytest.raises(BusinessRuleViolation):
+            repository.assign_supports({free.id: 5})
+        with pytest.raises(BusinessRuleViolation):
+            repository.assign_supports({free.id: 6, other.id: 6})
+        assert repository.find_by_id(free.id).support_contact_id is None
+
+        assert repository.assign_supports({free.id: 6, other.id: 7}) == {free.id: 6, other.id: 7}
+    engine.dispose()
+
 def test_delete(event_SQLAlchemy_repository, session, event):
     """test delete method """
     init_count_event = session.query(EventModel).count()
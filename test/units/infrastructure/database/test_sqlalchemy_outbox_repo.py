@@ -0,0 +1,48 @@
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import select
+
+from src.infrastructures.database.models import OutboxModel
+from src.infrastructures.outbox.topics import EVENT_WITHOUT_SUPPORT
+from src.infrastructures.repositories.SQLAchemy_repository import SQLAlchemyOutboxRepository
+
+
+def _claim(repository: SQLAlchemyOutboxRepository, topic: str) -> list:
+    return [message for message in repository.claim(10_000) if message.topic == topic]
+
+
+def test_event_without_support_publishes_reminder(event_SQLAlchemy_repository, event, session):
+    """test saving an event without support publishes its reminder once, in the save transaction """
+    event.support_contact_id = None
+    event.start_date = datetime.now().replace(microsecond=0) + timedelta(days=30)
+    event.end_date = event.start_date + timedelta(hours=4)
+    saved_event = event_SQLAlchemy_repository.save(event)
+    saved_event.attendees = 10
+    event_SQLAlchemy_repository.save(saved_event)
+
+    reminders = [
+        row for row in session.scalars(select(OutboxModel).where(OutboxModel.topic == EVENT_WITHOUT_SUPPORT))
+        if row.payload == {"event_id": saved_event.id}
+    ]
+    assert [row.available_at for row in reminders] == [event.start_date - timedelta(days=7)]
+
+
+def test_claim_leases_messages(session):
+    """test claimed messages are not claimed again until completed or released """
+    repository = SQLAlchemyOutboxRepository(session)
+    topic = f"test-{uuid.uuid4()}"
+    repository.publish(topic, {"n": 1})
+    repository.publish(topic, {"n": 2})
+    session.commit()
+
+    claimed = _claim(repository, topic)
+    assert [(message.payload, message.attempts) for message in claimed] == [({"n": 1}, 1), ({"n": 2}, 1)]
+    assert _claim(repository, topic) == []
+
+    repository.complete([claimed[1].id])
+    repository.retry({claimed[0].id: (datetime.now() - timedelta(seconds=1), "ValueError()")})
+
+    [retried] = _claim(repository, topic)
+    assert (retried.id, retried.attempts) == (claimed[0].id, 2)
+    assert session.get(OutboxModel, claimed[0].id).last_error == "ValueError()"
@@ -0,0 +1,83 @@
+import csv
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session
+
+from src.domain.entities.enums import Role, JobStatus
+from src.infrastructures.database.models import Base, UserModel, ClientModel
+from src.infrastructures.jobs import runner
+from src.infrastructures.jobs.runner import run_job, drain
+from src.infrastructures.repositories.SQLAchemy_repository import SQLAlchemyJobRepository
+
+
+@pytest.fixture
+def database_url(tmp_path):
+    """SQLite file shared by the job processes, with one commercial user and 3 clients"""
+    url = f"sqlite:///{tmp_path / 'jobs.db'}"
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    now = datetime.now()
+    with Session(engine) as session:
+        session.execute(insert(UserModel), [{
+            "id": 1, "fullname": "user", "email": "user@test.fr", "password": "x",
+            "role": Role.COMMERCIAL, "created_at": now, "updated_at": now,
+        }])
+        session.execute(insert(ClientModel), [
+            {
+                "id": i, "fullname": f"client {i}", "email": f"client{i}@test.fr", "telephone": "0645789845",
+                "company_name": "company", "commercial_contact_id": 1, "created_at": now, "updated_at": now,
+            }
+            for i in range(1, 4)
+        ])
+        session.commit()
+    engine.dispose()
+    return url
+
+
+def _submit(database_url: str, kind: str, params: dict) -> int:
+    engine = create_engine(database_url)
+    with Session(engine) as session:
+        job_id = SQLAlchemyJobRepository(session).create(kind, params, created_by=1).id
+    engine.dispose()
+    return job_id
+
+
+def _job(database_url: str, job_id: int):
+    engine = create_engine(database_url)
+    with Session(engine) as session:
+        job = SQLAlchemyJobRepository(session).find_by_id(job_id)
+    engine.dispose()
+    return job
+
+
+def test_run_export_job(database_url, tmp_path, monkeypatch):
+    """Test an export job writes the rows of the list command, reporting its progress"""
+    monkeypatch.setattr(runner, "PROGRESS_EVERY", 2)
+    job_id = _submit(database_url, "export", {"target": "clients", "filter": "mine"})
+
+    assert run_job(database_url, job_id, tmp_path) == JobStatus.DONE
+    assert run_job(database_url, job_id, tmp_path) is None
+
+    job = _job(database_url, job_id)
+    assert (job.progress, job.total) == (3, 3)
+    with open(job.result_path, newline="") as file:
+        rows = list(csv.DictReader(file))
+    assert [row["fullname"] for row in rows] == ["client 1", "client 2", "client 3"]
+
+def test_run_job_not_allowed(database_url, tmp_path):
+    """Test a job fails with the message of its use case, without result file"""
+    job_id = _submit(database_url, "report", {"report_type": "commercial"})
+
+    assert run_job(database_url, job_id, tmp_path) == JobStatus.FAILED
+    assert _job(database_url, job_id).error == "Seuls les membres gestion peuvent consulter les rapports"
+    assert list(tmp_path.glob("*.csv")) == []
+
+def test_drain_runs_pending_jobs_in_processes(database_url, tmp_path):
+    """Test the process pool runs every pending job once"""
+    job_ids = [_submit(database_url, "export", {"target": "clients"}) for _ in range(4)]
+
+    assert drain(2, database_url, tmp_path) == 4
+    assert [_job(database_url, job_id).status for job_id in job_ids] == [JobStatus.DONE] * 4
+    assert len(list(tmp_path.glob("job-*-export-clients.csv"))) == 4
@@ -0,0 +1,50 @@
+from datetime import datetime, timedelta
+
+from src.infrastructures.outbox.worker import OutboxWorker, retry_delay
+from src.infrastructures.repositories.fake_repository import FakeOutboxRepository
+
+
+def test_worker_processes_messages_in_batches():
+    """Messages are handled once each, in batches"""
+    repository = FakeOutboxRepository()
+    for n in range(5):
+        repository.publish("test", {"n": n})
+    handled = []
+    worker = OutboxWorker(repository, {"test": lambda payload: handled.append(payload["n"])}, batch_size=2)
+
+    assert worker.run(stop_when_empty=True) == (5, 0)
+    assert handled == [0, 1, 2, 3, 4]
+    assert all(message["processed"] for message in repository.messages.values())
+
+
+def test_worker_retries_failed_messages_later():
+    """A failed message is released with a backoff and keeps its error"""
+    repository = FakeOutboxRepository()
+    repository.publish("test", {})
+
+    def fail(payload):
+        raise ConnectionError("Sentry indisponible")
+
+    worker = OutboxWorker(repository, {"test": fail})
+
+    assert worker.run_once() == (0, 1)
+    message = repository.messages[1]
+    assert message["processed"] is False
+    assert message["available_at"] > datetime.now() + timedelta(seconds=4)
+    assert "Sentry indisponible" in message["last_error"]
+    assert worker.run_once() == (0, 0)
+
+
+def test_worker_unknown_topic_fails():
+    """A message without handler is not lost, it fails until a handler exists"""
+    repository = FakeOutboxRepository()
+    repository.publish("inconnu", {})
+
+    assert OutboxWorker(repository, {}).run_once() == (0, 1)
+    assert "inconnu" in repository.messages[1]["last_error"]
+
+
+def test_retry_delay_is_exponential_and_capped():
+    """Delays double on each attempt up to one hour"""
+    assert [retry_delay(attempts).seconds for attempts in (1, 2, 3)] == [5, 10, 20]
+    assert retry_delay(30) == timedelta(hours=1)
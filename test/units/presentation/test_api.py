@@ -0,0 +1,120 @@
+import io
+import json
+from datetime import datetime
+from wsgiref.util import setup_testing_defaults
+
+import pytest
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker, scoped_session
+
+from src.domain.entities.enums import Role, ContractStatus
+from src.infrastructures.database.models import Base, UserModel, ClientModel, ContratModel
+from src.infrastructures.security.security import JWTTokenManager, BcryptPasswordHasher
+from src.presentation.api.server import create_app
+
+
+@pytest.fixture
+def api(tmp_path, monkeypatch):
+    """API on a SQLite file with a commercial (id 1), a support (id 2) and one signed contrat"""
+    monkeypatch.setenv("JWT_EXPIRATION_HOURS", "1")
+    monkeypatch.setenv("JWT_ALGORITHM", "HS256")
+    monkeypatch.setenv("JWT_SECRET_KEY", "test-secret")
+    engine = create_engine(f"sqlite:///{tmp_path / 'api.db'}")
+    Base.metadata.create_all(engine)
+    now = datetime.now()
+    password = BcryptPasswordHasher().hash_password("secret")
+    with engine.begin() as conn:
+        conn.execute(insert(UserModel), [
+            {"id": 1, "fullname": "commercial", "email": "commercial@test.fr", "password": password,
+             "role": Role.COMMERCIAL, "created_at": now, "updated_at": now},
+            {"id": 2, "fullname": "support", "email": "support@test.fr", "password": password,
+             "role": Role.SUPPORT, "created_at": now, "updated_at": now},
+        ])
+        conn.execute(insert(ClientModel), [{
+            "id": 1, "fullname": "client", "email": "client@test.fr", "telephone": "0645789845",
+            "company_name": "company", "commercial_contact_id": 1, "created_at": now, "updated_at": now,
+        }])
+        conn.execute(insert(ContratModel), [{
+            "id": 1, "client_id": 1, "commercial_contact_id": 1, "contrat_amount_cents": 100_000,
+            "balance_due_cents": 100_000, "status": ContractStatus.SIGNED, "created_at": now, "updated_at": now,
+        }])
+    sessions = scoped_session(sessionmaker(bind=engine))
+    yield create_app(sessions)
+    sessions.remove()
+    engine.dispose()
+
+
+def _call(app, method: str, path: str, body: dict = None, token: str = None, headers: dict = None):
+    path, _, query = path.partition("?")
+    payload = b"" if body is None else json.dumps(body).encode()
+    environ = {
+        "REQUEST_METHOD": method, "PATH_INFO": path, "QUERY_STRING": query,
+        "CONTENT_LENGTH": str(len(payload)), "wsgi.input": io.BytesIO(payload),
+    }
+    if token is not None:
+        environ["HTTP_AUTHORIZATION"] = f"Bearer {token}"
+    for name, value in (headers or {}).items():
+        environ["HTTP_" + name.upper().replace("-", "_")] = value
+    setup_testing_defaults(environ)
+    status = []
+    [response] = app(environ, lambda line, _: status.append(int(line.split()[0])))
+    return status[0], json.loads(response)
+
+
+def _token(user_id: int) -> str:
+    return JWTTokenManager().create_token(user_id)
+
+
+def test_token_then_list(api):
+    """Test a token from /auth/token authenticates the next requests"""
+    status, body = _call(api, "POST", "/auth/token", {"email": "commercial@test.fr", "password": "secret"})
+    assert status == 201
+
+    status, body = _call(api, "GET", "/contrats?filter=mine", token=body["token"])
+    assert status == 200
+    assert body["contrats"] == [{
+        "id": 1, "client_id": 1, "commercial_contact_id": 1, "contrat_amount": "1000.00",
+        "balance_due": "1000.00", "status": "SIGNED",
+    }]
+
+def test_requests_without_valid_token(api):
+    """Test requests are refused without a valid bearer token"""
+    assert _call(api, "GET", "/contrats")[0] == 401
+    assert _call(api, "GET", "/contrats", token="invalid")[0] == 401
+    assert _call(api, "POST", "/auth/token", {"email": "commercial@test.fr", "password": "faux"})[0] == 401
+
+def test_show_client_hides_password(api):
+    """Test entities are serialized without the user password"""
+    status, body = _call(api, "GET", "/clients/1", token=_token(2))
+
+    assert status == 200
+    assert body["client"]["email"] == "client@test.fr"
+    assert body["user"]["fullname"] == "commercial"
+    assert "password" not in body["user"]
+
+def test_use_case_errors_status(api):
+    """Test use case errors are mapped to HTTP statuses"""
+    assert _call(api, "GET", "/contrats/999", token=_token(1))[0] == 404
+    assert _call(api, "GET", "/reports/commercial", token=_token(1))[0] == 403
+    assert _call(api, "GET", "/contrats?filter=unknown", token=_token(1))[0] == 400
+    assert _call(api, "DELETE", "/contrats/1", token=_token(1))[0] == 405
+
+def test_pay_with_idempotency_key(api):
+    """Test a payment retried with the same key is applied once"""
+    headers = {"Idempotency-Key": "payment-1"}
+
+    first = _call(api, "POST", "/contrats/1/payments", {"amount": 200}, _token(1), headers)
+    retry = _call(api, "POST", "/contrats/1/payments", {"amount": 200}, _token(1), headers)
+
+    assert (first[0], retry[0]) == (201, 200)
+    assert retry[1]["replayed"] is True
+    assert _call(api, "GET", "/contrats/1", token=_token(1))[1]["contrat"]["balance_due"] == "800.00"
+
+def test_pay_decimal_amount(api):
+    """Test an amount with cents is paid to the cent, a non amount is refused"""
+    status, body = _call(api, "POST", "/contrats/1/payments", {"amount": "10.50"}, _token(1))
+
+    assert status == 201
+    assert body["contrat"]["balance_due"] == "989.50"
+    assert _call(api, "POST", "/contrats/1/payments", {"amount": "dix"}, _token(1))[0] == 422
+    assert _call(api, "POST", "/contrats/1/payments", {"amount": [10]}, _token(1))[0] == 400
@@ -0,0 +1,91 @@
+from datetime import datetime
+from functools import partial
+
+import pytest
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import sessionmaker
+from typer.testing import CliRunner
+
+from src.domain.entities.enums import Role, ContractStatus
+from src.infrastructures.database.models import Base, UserModel, ClientModel, ContratModel
+from src.infrastructures.database.session import get_atomic_session
+from src.presentation.cli.cli_main import app
+from src.presentation.cli.commands import batch_command
+from src.presentation.cli.commands.batch_command import parse_script
+
+runner = CliRunner()
+
+SCRIPT = """
+# contrat 1 signé puis payé, le second paiement dépasse le reste à payer
+contrat sign 1
+contrat pay 1 --amount 400
+contrat pay 1 --amount 1000
+"""
+
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    """SQLite file with an admin (id 1) and one unsigned contrat of 1000, batch --atomic uses it"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'batch.db'}")
+    Base.metadata.create_all(engine)
+    now = datetime.now()
+    with engine.begin() as conn:
+        conn.execute(insert(UserModel), [{
+            "id": 1, "fullname": "admin", "email": "admin@test.fr", "password": "x",
+            "role": Role.ADMIN, "created_at": now, "updated_at": now,
+        }])
+        conn.execute(insert(ClientModel), [{
+            "id": 1, "fullname": "client", "email": "client@test.fr", "telephone": "0645789845",
+            "company_name": "company", "commercial_contact_id": 1, "created_at": now, "updated_at": now,
+        }])
+        conn.execute(insert(ContratModel), [{
+            "id": 1, "client_id": 1, "commercial_contact_id": 1, "contrat_amount_cents": 100_000,
+            "balance_due_cents": 100_000, "status": ContractStatus.UNSIGNED, "created_at": now, "updated_at": now,
+        }])
+    monkeypatch.setattr(batch_command, "get_atomic_session", partial(get_atomic_session, engine))
+    yield engine
+    engine.dispose()
+
+
+def _invoke(engine, *options: str):
+    session = sessionmaker(bind=engine)()
+    obj = {"session": session, "current_user": {"user_current_id": 1, "user_current_role": Role.ADMIN}}
+    result = runner.invoke(app, ["batch", *options, "-"], input=SCRIPT, obj=obj)
+    with engine.connect() as conn:
+        contrat = conn.execute(select(ContratModel.status, ContratModel.balance_due_cents)).one()
+    return result, contrat
+
+
+def test_parse_script():
+    """Test comments and blank lines are skipped, quoted arguments kept"""
+    lines = parse_script("# commentaire\n\nclient search 'Jean Dupont'  # fin\ncontrat sign 3\n")
+
+    assert [(line.number, line.argv) for line in lines] == [
+        (3, ["client", "search", "Jean Dupont"]),
+        (4, ["contrat", "sign", "3"]),
+    ]
+
+def test_parse_script_invalid():
+    """Test the whole script is rejected on an excluded command or an unclosed quote"""
+    with pytest.raises(ValueError, match="Ligne 2"):
+        parse_script("client list\nauth logout\n")
+    with pytest.raises(ValueError, match="Ligne 1"):
+        parse_script("client search 'Jean\n")
+    with pytest.raises(ValueError, match="Ligne 1: la commande worker"):
+        parse_script("-o json worker run\n")
+
+def test_batch_per_command(engine):
+    """Test each successful command keeps its changes when a later one fails"""
+    result, contrat = _invoke(engine)
+
+    assert result.exit_code == 1
+    assert "2/3 réussie(s)" in result.output
+    assert contrat == (ContractStatus.SIGNED, 60_000)
+
+def test_batch_atomic(engine):
+    """Test a failure rolls back the changes of every command of the batch"""
+    result, contrat = _invoke(engine, "--atomic")
+
+    assert result.exit_code == 1
+    assert "Transaction annulée" in result.output
+    assert contrat == (ContractStatus.UNSIGNED, 100_000)
@@ -1,9 +1,13 @@
 import re
+from datetime import datetime
 
 import pytest
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import sessionmaker
 from typer.testing import CliRunner
 
-from src.domain.entities.enums import Role
+from src.domain.entities.enums import Role, ContractStatus
+from src.infrastructures.database.models import Base, UserModel, ClientModel, ContratModel
 from src.presentation.cli.cli_main import app
 
 runner = CliRunner()
@@ -92,7 +96,7 @@ def test_contrat_update_invalid(make_context):
     )
 
     assert result.exit_code == 1
-    assert "is not a valid integer" in result.output
+    assert "Montant invalide" in result.output
 
 def test_contrat_show(make_context):
     result = runner.invoke(app, ['contrat', "show", "1"],obj=make_context)
@@ -163,3 +167,38 @@ def test_contrat_delete_valid(make_context):
 
     assert f"Contrat #{client_id} supprimé" in delete_result.stdout
     assert delete_result.exit_code == 0
+
+
+@pytest.fixture
+def sqlite_engine(tmp_path):
+    """SQLite file with an admin (id 1) and one signed contrat of 1000"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'contrat.db'}")
+    Base.metadata.create_all(engine)
+    now = datetime.now()
+    with engine.begin() as conn:
+        conn.execute(insert(UserModel), [{
+            "id": 1, "fullname": "admin", "email": "admin@test.fr", "password": "x",
+            "role": Role.ADMIN, "created_at": now, "updated_at": now,
+        }])
+        conn.execute(insert(ClientModel), [{
+            "id": 1, "fullname": "client", "email": "client@test.fr", "telephone": "0645789845",
+            "company_name": "company", "commercial_contact_id": 1, "created_at": now, "updated_at": now,
+        }])
+        conn.execute(insert(ContratModel), [{
+            "id": 1, "client_id": 1, "commercial_contact_id": 1, "contrat_amount_cents": 100_000,
+            "balance_due_cents": 100_000, "status": ContractStatus.SIGNED, "created_at": now, "updated_at": now,
+        }])
+    yield engine
+    engine.dispose()
+
+def test_contrat_pay_decimal_amount(sqlite_engine):
+    """Test an amount with cents is paid to the cent, as in the --csv payments"""
+    obj = {
+        "session": sessionmaker(bind=sqlite_engine)(),
+        "current_user": {"user_current_id": 1, "user_current_role": Role.ADMIN},
+    }
+    result = runner.invoke(app, ['contrat', 'pay', '1', '--amount', '10.50'], obj=obj)
+
+    assert result.exit_code == 0
+    with sqlite_engine.connect() as conn:
+        assert conn.execute(select(ContratModel.balance_due_cents)).scalar() == 100_000 - 1050
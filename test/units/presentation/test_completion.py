@@ -0,0 +1,145 @@
+from datetime import datetime
+
+import pytest
+import typer
+from sqlalchemy import create_engine, delete, insert, update
+from sqlalchemy.orm import sessionmaker
+
+from src.domain.entities.enums import AuditedEntity, Role
+from src.domain.entities.read_models import AuditEntry
+from src.infrastructures.database.models import Base, ClientModel, UserModel
+from src.infrastructures.repositories.SQLAchemy_repository import (
+    SQLAlchemyAuditRepository,
+    SQLAlchemyLabelRepository,
+)
+from src.infrastructures.repositories.fake_repository import FakeAuditRepository, FakeLabelRepository
+from src.presentation.cli.cli_main import app
+from src.presentation.cli.completion import CompletionIndex, ShellCompleter
+
+
+def _entry(entity: AuditedEntity, entity_id: int, action: str) -> AuditEntry:
+    return AuditEntry(entity, entity_id, action, 1, {}, datetime.now())
+
+
+@pytest.fixture
+def fakes():
+    labels, audit = FakeLabelRepository(), FakeAuditRepository()
+    labels.labels["client"] = {1: "Jean Dupont (Acme)", 2: "Marie Curie (Radium)", 12: "Paul Martin (Acme)"}
+    labels.labels["user"] = {1: "admin (admin)"}
+    return labels, audit
+
+
+@pytest.fixture
+def completer(fakes):
+    index = CompletionIndex(*fakes)
+    index.load()
+    return ShellCompleter(typer.main.get_command(app), index)
+
+
+def test_index_refresh_only_changed_ids(fakes):
+    """Test the refresh reloads the ids of the audit log, adds, updates and drops them"""
+    labels, audit = fakes
+    index = CompletionIndex(labels, audit)
+    index.load()
+    queries = labels.queries
+
+    index.refresh()
+    assert labels.queries == queries
+
+    labels.labels["client"][2] = "Marie Curie (Institut)"
+    labels.labels["client"][5] = "Nouveau (Client)"
+    del labels.labels["client"][12]
+    audit.record([
+        _entry(AuditedEntity.CLIENT, 2, "update"),
+        _entry(AuditedEntity.CLIENT, 5, "create"),
+        _entry(AuditedEntity.CLIENT, 12, "delete"),
+    ])
+    index.refresh()
+
+    assert labels.queries == queries + 1
+    assert index.match("client", "") == ["1", "2", "5"]
+    assert index.label("client", "2") == "Marie Curie (Institut)"
+
+
+def test_index_reloads_users_on_new_version(fakes):
+    """Test users, not in the audit log, are reloaded when their version changes"""
+    labels, audit = fakes
+    index = CompletionIndex(labels, audit)
+    index.load()
+
+    labels.labels["user"][7] = "gestion (gestion)"
+    index.refresh()
+
+    assert index.match("user", "7") == ["7"]
+
+
+def test_index_match_prefix_and_label(completer):
+    """Test ids are matched by prefix, text by a case-insensitive part of the label"""
+    index = completer.index
+
+    assert index.match("client", "1") == ["1", "12"]
+    assert index.match("client", "acme") == ["1", "12"]
+    assert index.match("client", "3") == []
+
+
+def test_completer_commands_and_options(completer):
+    """Test completion of groups, subcommands and options"""
+    assert completer.candidates("cl") == ["client"]
+    assert "list" in completer.candidates("client ")
+    assert "--pager" in completer.candidates("client list --")
+
+
+def test_completer_entity_ids(completer):
+    """Test ids of arguments, options and comma separated lists"""
+    assert completer.candidates("client delete 1") == ["1", "12"]
+    assert completer.entity == "client"
+    assert completer.candidates("client list --after 1") == ["1", "12"]
+    assert completer.candidates("client delete marie") == ["2"]
+
+
+def test_index_with_sqlalchemy_repositories(tmp_path):
+    """Test the index against SQLite: one query per entity to load, the audit log to refresh"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'completion.db'}")
+    Base.metadata.create_all(engine)
+    now = datetime.now()
+    with engine.begin() as conn:
+        conn.execute(insert(UserModel), [{
+            "id": 1, "fullname": "admin", "email": "admin@test.fr", "password": "x",
+            "role": Role.ADMIN, "created_at": now, "updated_at": now,
+        }])
+        conn.execute(insert(ClientModel), [
+            {"id": i, "fullname": f"client {i}", "email": f"c{i}@test.fr", "telephone": "0645789845",
+             "company_name": "company", "commercial_contact_id": 1, "created_at": now, "updated_at": now}
+            for i in range(1, 4)
+        ])
+    session = sessionmaker(bind=engine)()
+    audit = SQLAlchemyAuditRepository(session)
+    index = CompletionIndex(SQLAlchemyLabelRepository(session), audit)
+    index.load()
+
+    assert index.label("client", "1") == "client 1 (company)"
+    assert index.label("user", "1") == "admin (ADMIN)"
+
+    session.execute(update(ClientModel).where(ClientModel.id == 1).values(fullname="renamed"))
+    session.execute(delete(ClientModel).where(ClientModel.id == 3))
+    audit.record([_entry(AuditedEntity.CLIENT, 1, "update"), _entry(AuditedEntity.CLIENT, 3, "delete")])
+    session.commit()
+    index.refresh()
+
+    assert index.label("client", "1") == "renamed (company)"
+    assert index.match("client", "") == ["1", "2"]
+    session.close()
+    engine.dispose()
+
+
+def test_index_applies_invalidated_ids_on_completion(fakes):
+    """Test ids invalidated by a listener thread are reloaded at the next completion, without polling"""
+    labels, audit = fakes
+    index = CompletionIndex(labels, audit)
+    index.load()
+
+    labels.labels["client"][3] = "Notifié (Acme)"
+    index.invalidate({"client": {3}})
+
+    assert index.match("client", "notifié") == ["3"]
+    assert index.match("client", "") == ["1", "12", "2", "3"]
@@ -0,0 +1,81 @@
+import json
+import socket
+import threading
+
+import pytest
+import typer
+
+from src.presentation.daemon.client import forward, control, subcommand
+from src.presentation.daemon.protocol import REQUEST, OUTPUT, EXIT, LOCAL, send_frame, read_frames
+from src.presentation.daemon.server import CommandDaemon
+
+app = typer.Typer()
+
+
+@app.command()
+def hello(name: str):
+    print(f"Bonjour {name}")
+
+
+@app.command()
+def ask():
+    name = typer.prompt("Nom")
+    print(f"Bonjour {name}")
+
+
+@pytest.fixture
+def daemon(tmp_path):
+    socket_path = str(tmp_path / "daemon.sock")
+    daemon = CommandDaemon(app, socket_path)
+    thread = threading.Thread(target=daemon.serve_forever)
+    thread.start()
+    while control("status", socket_path) is None:
+        pass
+    yield socket_path
+    control("stop", socket_path)
+    thread.join()
+
+
+def _run(socket_path: str, argv: list, tmp_path) -> list:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(socket_path)
+        send_frame(sock, REQUEST, json.dumps({
+            "argv": argv, "cwd": str(tmp_path), "tty": False, "columns": 80,
+        }).encode())
+        return list(read_frames(sock))
+
+
+def test_daemon_runs_command(daemon, tmp_path):
+    """Test the output and exit code of the command are sent back"""
+    frames = _run(daemon, ["hello", "Jean"], tmp_path)
+
+    assert frames == [(OUTPUT, "Bonjour Jean\n".encode()), (EXIT, b"0")]
+    assert control("status", daemon)["commands"] == 1
+
+def test_daemon_usage_error_exit_code(daemon, tmp_path):
+    """Test a usage error keeps the exit code of the CLI"""
+    frames = _run(daemon, ["inconnu"], tmp_path)
+
+    assert frames[-1] == (EXIT, b"2")
+    assert b"inconnu" in b"".join(data for kind, data in frames if kind == OUTPUT)
+
+def test_daemon_prompt_runs_in_client(daemon, tmp_path):
+    """Test a command prompting the user is sent back to the client, without its prompt"""
+    assert _run(daemon, ["ask"], tmp_path) == [(LOCAL, b"")]
+
+def test_forward_without_daemon(tmp_path):
+    """Test commands run in process when no daemon is running, or when they need the terminal"""
+    assert forward(["client", "list"], str(tmp_path / "absent.sock")) is None
+    assert forward(["auth", "login"], str(tmp_path / "absent.sock")) is None
+
+def test_subcommand_after_root_options():
+    """Test the root options and their value are skipped to find the subcommand"""
+    assert subcommand(["-o", "json", "worker", "run"]) == "worker"
+    assert subcommand(["--output=csv", "api", "serve"]) == "api"
+    assert subcommand(["--output", "ndjson", "client", "list"]) == "client"
+    assert subcommand(["--help"]) is None
+
+def test_local_command_after_root_options_not_forwarded(daemon):
+    """Test a local command is run in process even when root options come first"""
+    assert forward(["-o", "json", "worker", "run"], daemon) is None
+    assert control("status", daemon)["commands"] == 0
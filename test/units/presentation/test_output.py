@@ -0,0 +1,105 @@
+import io
+import json
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+from typer.testing import CliRunner
+
+from src.domain.entities.enums import Role, ContractStatus
+from src.domain.entities.read_models import ContratRow
+from src.domain.entities.value_objects import Money
+from src.infrastructures.database.models import Base, UserModel, ClientModel
+from src.presentation.cli.cli_main import app
+from src.presentation.cli.output import OutputFormat, write_rows
+
+runner = CliRunner()
+
+ROWS = [
+    ContratRow(1, 1, 2, Money(1000), Money(250), ContractStatus.SIGNED),
+    ContratRow(2, 3, 2, Money(500), Money(500), ContractStatus.UNSIGNED),
+]
+
+
+@pytest.fixture
+def make_context(tmp_path):
+    """SQLite file with an admin (id 1) and two clients"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'output.db'}")
+    Base.metadata.create_all(engine)
+    now = datetime.now()
+    with engine.begin() as conn:
+        conn.execute(insert(UserModel), [{
+            "id": 1, "fullname": "admin", "email": "admin@test.fr", "password": "x",
+            "role": Role.ADMIN, "created_at": now, "updated_at": now,
+        }])
+        conn.execute(insert(ClientModel), [
+            {"id": i, "fullname": f"client {i}", "email": f"client{i}@test.fr", "telephone": "0645789845",
+             "company_name": "company, inc", "commercial_contact_id": 1, "created_at": now, "updated_at": now}
+            for i in (1, 2)
+        ])
+    session = sessionmaker(bind=engine)()
+    yield {"session": session, "current_user": {"user_current_id": 1, "user_current_role": Role.ADMIN}}
+    session.close()
+    engine.dispose()
+
+
+@pytest.mark.parametrize("output, expected", [
+    (OutputFormat.JSON, '[\n{"id": 1, "balance_due": "250.00"},\n{"id": 2, "balance_due": "500.00"}\n]\n'),
+    (OutputFormat.NDJSON, '{"id": 1, "balance_due": "250.00"}\n{"id": 2, "balance_due": "500.00"}\n'),
+])
+def test_write_rows_json(output, expected):
+    """Test json and ndjson items are written with the JSON types of the API"""
+    file = io.StringIO()
+
+    count = write_rows(({"id": row.id, "balance_due": row.balance_due} for row in ROWS), output, file)
+
+    assert count == 2
+    assert file.getvalue() == expected
+
+def test_write_rows_csv():
+    """Test csv has a header from the row fields, enums and money written as their value"""
+    file = io.StringIO()
+
+    write_rows(iter(ROWS), OutputFormat.CSV, file)
+
+    assert file.getvalue().splitlines() == [
+        "id,client_id,commercial_contact_id,contrat_amount,balance_due,status",
+        "1,1,2,1000.00,250.00,SIGNED",
+        "2,3,2,500.00,500.00,UNSIGNED",
+    ]
+
+def test_write_rows_empty():
+    """Test no row is an empty json array, and nothing in csv"""
+    json_file, csv_file = io.StringIO(), io.StringIO()
+
+    write_rows(iter([]), OutputFormat.JSON, json_file)
+    write_rows(iter([]), OutputFormat.CSV, csv_file)
+
+    assert json.loads(json_file.getvalue()) == []
+    assert csv_file.getvalue() == ""
+
+def test_list_ndjson(make_context):
+    """Test list commands write one object per row, without the rich table"""
+    result = runner.invoke(app, ["--output", "ndjson", "client", "list"], obj=make_context)
+
+    assert result.exit_code == 0
+    assert [json.loads(line)["id"] for line in result.stdout.splitlines()] == [1, 2]
+
+def test_list_csv_quotes(make_context):
+    """Test csv values containing a comma are quoted"""
+    result = runner.invoke(app, ["-o", "csv", "client", "list"], obj=make_context)
+
+    assert result.stdout.splitlines()[1] == '1,client 1,client1@test.fr,0645789845,"company, inc",1'
+
+def test_machine_output_errors_on_stderr(make_context):
+    """Test errors are kept out of stdout when it carries machine output"""
+    result = runner.invoke(app, ["-o", "json", "contrat", "list"], obj=make_context)
+
+    assert result.exit_code == 0
+    assert json.loads(result.stdout) == []
+
+    result = runner.invoke(app, ["-o", "json", "client", "show", "42"], obj=make_context)
+
+    assert result.stdout == ""
+    assert "Client non trouvé" in result.stderr
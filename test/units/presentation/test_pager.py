@@ -0,0 +1,72 @@
+import re
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+from typer.testing import CliRunner
+
+from src.domain.entities.enums import Role
+from src.infrastructures.database.models import Base, UserModel, ClientModel
+from src.presentation.cli.cli_main import app
+
+runner = CliRunner()
+
+
+@pytest.fixture
+def make_context(tmp_path):
+    """SQLite file with an admin (id 1) and 12 clients, the pager fetches pages with its own session"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'pager.db'}")
+    Base.metadata.create_all(engine)
+    now = datetime.now()
+    with engine.begin() as conn:
+        conn.execute(insert(UserModel), [{
+            "id": 1, "fullname": "admin", "email": "admin@test.fr", "password": "x",
+            "role": Role.ADMIN, "created_at": now, "updated_at": now,
+        }])
+        conn.execute(insert(ClientModel), [
+            {"id": i, "fullname": f"client {i}", "email": f"c{i}@test.fr", "telephone": "0645789845",
+             "company_name": "company", "commercial_contact_id": 1, "created_at": now, "updated_at": now}
+            for i in range(1, 13)
+        ])
+    session = sessionmaker(bind=engine)()
+    yield {"session": session, "current_user": {"user_current_id": 1, "user_current_role": Role.ADMIN}}
+    session.close()
+    engine.dispose()
+
+
+def _pages(output: str) -> list:
+    """(page prompt, ids of the table displayed before it)"""
+    pages, ids = [], []
+    for line in output.splitlines():
+        found = re.match(r"│\s+(\d+) │", line)
+        if found:
+            ids.append(int(found.group(1)))
+        elif line.startswith("Page "):
+            pages.append((line.split(" - ")[0], ids))
+            ids = []
+    return pages
+
+
+def test_pager_next_previous_jump(make_context):
+    """Test n, p and a page number, the page count is known once the last page is fetched"""
+    result = runner.invoke(
+        app, ["client", "list", "--pager", "-n", "5"], input="n\np\n3\nq\n", obj=make_context
+    )
+
+    assert result.exit_code == 0
+    assert _pages(result.output) == [
+        ("Page 1/1+", [1, 2, 3, 4, 5]),
+        ("Page 2/2+", [6, 7, 8, 9, 10]),
+        ("Page 1/2+", [1, 2, 3, 4, 5]),
+        ("Page 3/3", [11, 12]),
+    ]
+
+def test_pager_stays_on_last_page(make_context):
+    """Test next and a page past the end keep the last page, when the list ends on a full page"""
+    result = runner.invoke(
+        app, ["client", "list", "--pager", "-n", "6", "--after", "0"], input="2\nn\n9\n", obj=make_context
+    )
+
+    assert result.exit_code == 0
+    assert [prompt for prompt, _ in _pages(result.output)] == ["Page 1/1+", "Page 2/2+", "Page 2/2", "Page 2/2"]
@@ -0,0 +1,116 @@
+from src.domain.entities.enums import AuditedEntity, Role
+from src.domain.entities.value_objects import Money
+from src.domain.policies.user_policy import RequestPolicy
+from src.infrastructures.repositories.fake_repository import FakeAuditRepository
+from src.use_cases.audit_use_cases import GetAuditLogUseCase, GetAuditLogRequest, GetAuditLogResponse
+from src.use_cases.contrat_use_cases import UpdateContratUseCase, UpdateContratRequest, BulkSignContratUseCase, \
+    BulkSignContratRequest, RecordPaymentContratUseCase, RecordPaymentContratRequest
+
+
+def _authorization(role: Role, ressource: str, action: str) -> RequestPolicy:
+    return RequestPolicy(
+        user={"user_current_id": 1, "user_current_role": role},
+        ressource=ressource,
+        action=action,
+    )
+
+######################################################################
+#                            Audit entries                           #
+######################################################################
+def test_update_contrat_records_changes(contrat_repository, client_repository):
+    """Test an update records the changed fields and the user who made it"""
+    audit = FakeAuditRepository()
+    uc = UpdateContratUseCase(contrat_repository, client_repository, audit)
+    request = UpdateContratRequest(
+        contrat_id=2,
+        contrat_amount=Money(2000),
+        authorization=_authorization(Role.GESTION, "CONTRAT", "update"),
+    )
+
+    response = uc.execute(request)
+
+    assert response.success is True
+    [entry] = audit.entries
+    assert (entry.entity, entry.entity_id, entry.action, entry.actor_id) == (AuditedEntity.CONTRAT, 2, "update", 1)
+    assert entry.changes["contrat_amount"][1] == "2000.00"
+
+def test_failed_write_records_nothing(contrat_repository):
+    """Test a refused payment is not recorded"""
+    audit = FakeAuditRepository()
+    uc = RecordPaymentContratUseCase(contrat_repository, audit)
+    request = RecordPaymentContratRequest(
+        contrat_id=1,
+        payment=1_000_000,
+        authorization=_authorization(Role.ADMIN, "CONTRAT", "pay"),
+    )
+
+    response = uc.execute(request)
+
+    assert response.success is False
+    assert audit.entries == []
+
+def test_bulk_sign_records_one_entry_per_contrat(contrat_repository):
+    """Test a bulk command records an entry for each contrat it changed"""
+    audit = FakeAuditRepository()
+    uc = BulkSignContratUseCase(contrat_repository, audit)
+    request = BulkSignContratRequest(contrat_ids=[1, 2, 999], authorization=_authorization(Role.ADMIN, "CONTRAT", "sign"))
+
+    response = uc.execute(request)
+
+    signed = [result.id for result in response.results if result.success]
+    assert [entry.entity_id for entry in audit.entries] == signed
+    assert all(entry.changes == {"status": ["UNSIGNED", "SIGNED"]} for entry in audit.entries)
+
+######################################################################
+#                            Get Audit Log Use Case                  #
+######################################################################
+def test_get_audit_log(contrat_repository, client_repository):
+    """Test reading the history of a contrat, latest change first"""
+    audit = FakeAuditRepository()
+    update = UpdateContratUseCase(contrat_repository, client_repository, audit)
+    for amount in (2000, 3000):
+        update.execute(UpdateContratRequest(
+            contrat_id=2,
+            contrat_amount=Money(amount),
+            authorization=_authorization(Role.GESTION, "CONTRAT", "update"),
+        ))
+    uc = GetAuditLogUseCase(audit)
+    request = GetAuditLogRequest(
+        entity=AuditedEntity.CONTRAT,
+        entity_id=2,
+        authorization=_authorization(Role.GESTION, "AUDIT", "show"),
+    )
+
+    response = uc.execute(request)
+
+    assert isinstance(response, GetAuditLogResponse)
+    assert response.success is True
+    assert [entry.changes["contrat_amount"][1] for entry in response.entries] == ["3000.00", "2000.00"]
+
+def test_get_audit_log_empty():
+    """Test reading the history of an entity never changed"""
+    uc = GetAuditLogUseCase(FakeAuditRepository())
+    request = GetAuditLogRequest(
+        entity=AuditedEntity.EVENT,
+        entity_id=1,
+        authorization=_authorization(Role.ADMIN, "AUDIT", "show"),
+    )
+
+    response = uc.execute(request)
+
+    assert response.success is False
+    assert response.error == "Ressource"
+
+def test_get_audit_log_no_permission():
+    """Test reading the history without gestion or admin role"""
+    uc = GetAuditLogUseCase(FakeAuditRepository())
+    request = GetAuditLogRequest(
+        entity=AuditedEntity.CLIENT,
+        entity_id=1,
+        authorization=_authorization(Role.COMMERCIAL, "AUDIT", "show"),
+    )
+
+    response = uc.execute(request)
+
+    assert response.success is False
+    assert response.error == "Permission"
@@ -4,7 +4,7 @@ from src.domain.policies.user_policy import RequestPolicy
 from src.use_cases.client_use_cases import CreateClientUseCase, CreateClientRequest, CreateClientResponse, \
     GetClientUseCase, UpdateClientUseCase, UpdateClientRequest, UpdateClientResponse, ListClientUseCase, \
     ListClientResponse, GetClientRequest, GetClientResponse, DeleteClientUseCase, DeleteClientRequest, \
-    DeleteClientResponse, ListClientRequest
+    DeleteClientResponse, ListClientRequest, SearchClientUseCase, SearchClientRequest, SearchClientResponse
 
 
 ######################################################################
@@ -197,6 +197,56 @@ def test_get_list_client(user_commercial, client_repository):
     assert response.success is True
     assert isinstance(response.clients, list)
 
+def test_list_client_keyset_pagination(client_repository):
+    """Test listing clients page by page"""
+    uc = ListClientUseCase(client_repository)
+
+    first_page = uc.execute(ListClientRequest(user_id=3, list_filter=None, limit=1))
+    assert len(first_page.clients) == 1
+    assert first_page.next_after_id == first_page.clients[0].id
+
+    second_page = uc.execute(ListClientRequest(
+        user_id=3, list_filter=None, limit=1, after_id=first_page.next_after_id
+    ))
+    assert second_page.clients[0].id > first_page.clients[0].id
+
+######################################################################
+#                            Search Client Use Case                  #
+######################################################################
+
+def test_search_client_with_typo(client_repository):
+    """Test fuzzy client search via use case, best match first"""
+    request = SearchClientRequest(query="compagny_test2")
+
+    search_client_UC = SearchClientUseCase(client_repository)
+    response = search_client_UC.execute(request)
+
+    assert isinstance(response, SearchClientResponse)
+    assert response.success is True
+    assert response.clients[0].company_name == "company_test2"
+
+
+def test_search_client_paginated(client_repository):
+    """Test client search second page"""
+    request = SearchClientRequest(query="test", page=2, page_size=1)
+
+    search_client_UC = SearchClientUseCase(client_repository)
+    response = search_client_UC.execute(request)
+
+    assert response.success is True
+    assert len(response.clients) == 1
+
+
+def test_search_client_empty_query(client_repository):
+    """Test client search with an empty text"""
+    request = SearchClientRequest(query="  ")
+
+    search_client_UC = SearchClientUseCase(client_repository)
+    response = search_client_UC.execute(request)
+
+    assert response.success is False
+    assert response.error == "Recherche"
+
 ######################################################################
 #                            Get by id Client Use Case                  #
 ######################################################################
@@ -1,4 +1,8 @@
+from dataclasses import replace
+from typing import Optional
+
 from src.domain.entities.entities import Contrat
+from src.domain.entities.read_models import ContratRow
 from src.domain.entities.enums import Role, ContractStatus
 from src.domain.entities.value_objects import Money
 from src.domain.policies.user_policy import RequestPolicy
@@ -30,6 +34,12 @@ from src.use_cases.contrat_use_cases import (
     RecordPaymentContratRequest,
     RecordPaymentContratResponse,
 )
+from src.use_cases.contrat_use_cases import (
+    BulkSignContratUseCase,
+    BulkSignContratRequest,
+    BulkRecordPaymentContratUseCase,
+    BulkRecordPaymentContratRequest,
+)
 
 ######################################################################
 #                            Create Contrat Use Case                 #
@@ -133,6 +143,30 @@ def test_update_contrat_not_found(contrat_repository, client_repository):
     assert isinstance(response, UpdateContratResponse)
     assert response.success is False
 
+def test_update_contrat_outdated_version(contrat_repository, client_repository):
+    """Test updating a contrat modified since it was read"""
+    repo = contrat_repository
+    uc = UpdateContratUseCase(repo, client_repository)
+    version = repo.find_by_id(2).version
+    repo.save(replace(repo.find_by_id(2), contrat_amount=Money(150)))
+
+    request = UpdateContratRequest(
+        contrat_id=2,
+        contrat_amount=Money(2000),
+        version=version,
+        authorization=RequestPolicy(
+            user={"user_current_id": 1, "user_current_role": Role.GESTION},
+            ressource="CONTRAT",
+            action="update",
+        )
+    )
+
+    response = uc.execute(request)
+
+    assert response.success is False
+    assert response.error == "Conflit"
+    assert repo.find_by_id(2).contrat_amount.amount != 2000
+
 def test_update_contrat_no_permission(contrat_repository, client_repository):
     """Test updating a contrat without permission"""
     repo = contrat_repository
@@ -172,6 +206,7 @@ def test_list_contrat(contrat_repository):
     assert isinstance(response, ListContratResponse)
     assert response.success is True
     assert isinstance(response.contrats, list)
+    assert all(isinstance(row, ContratRow) for row in response.contrats)
 
 ######################################################################
 #                            Get Contrat Use Case                   #
@@ -358,6 +393,138 @@ def test_record_payment_success(contrat_repository):
     assert response.success is True
     assert response.contrat.balance_due.amount < response.contrat.contrat_amount.amount
 
+def test_record_payment_applied_once(contrat_repository):
+    """Test the payment is subtracted once from the stored balance"""
+    repo = contrat_repository
+    contrat_db = repo.find_by_id(1)
+    contrat_db.commercial_contact_id = 1
+    balance_before = contrat_db.balance_due.cents
+    uc = RecordPaymentContratUseCase(repo)
+
+    request = RecordPaymentContratRequest(
+        contrat_id=1,
+        payment=5,
+        authorization=RequestPolicy(
+            user={"user_current_id": 1, "user_current_role": Role.COMMERCIAL},
+            ressource="CONTRAT",
+            action="pay",
+        )
+    )
+
+    response = uc.execute(request)
+
+    assert response.success is True
+    assert repo.find_by_id(1).balance_due.cents == balance_before - 500
+
+def test_record_payment_greater_than_balance(contrat_repository):
+    """Test a payment greater than the balance due is refused"""
+    repo = contrat_repository
+    contrat_db = repo.find_by_id(1)
+    contrat_db.commercial_contact_id = 1
+    balance_before = contrat_db.balance_due.cents
+    uc = RecordPaymentContratUseCase(repo)
+
+    request = RecordPaymentContratRequest(
+        contrat_id=1,
+        payment=balance_before,
+        authorization=RequestPolicy(
+            user={"user_current_id": 1, "user_current_role": Role.COMMERCIAL},
+            ressource="CONTRAT",
+            action="pay",
+        )
+    )
+
+    response = uc.execute(request)
+
+    assert response.success is False
+    assert response.error == "Erreur Métier"
+    assert repo.find_by_id(1).balance_due.cents == balance_before
+
+def test_record_payment_unsigned(contrat_repository):
+    """Test a payment on an unsigned contrat is refused, as by the bulk payments"""
+    repo = contrat_repository
+    contrat_db = repo.find_by_id(1)
+    contrat_db.commercial_contact_id = 1
+    contrat_db.status = ContractStatus.UNSIGNED
+    balance_before = contrat_db.balance_due.cents
+
+    response = RecordPaymentContratUseCase(repo).execute(_payment_request(5, None))
+    bulk_response = BulkRecordPaymentContratUseCase(repo).execute(BulkRecordPaymentContratRequest(
+        payments={1: "5"},
+        authorization=RequestPolicy(
+            user={"user_current_id": 1, "user_current_role": Role.COMMERCIAL},
+            ressource="CONTRAT",
+            action="pay",
+        ),
+    ))
+
+    assert response.success is False
+    assert response.msg == "La signature du contrat est nécessaire"
+    assert bulk_response.results[0].msg == response.msg
+    assert repo.find_by_id(1).balance_due.cents == balance_before
+    assert repo.record_payment(1, 500) is None
+
+def _payment_request(payment: int, idempotency_key: Optional[str]) -> RecordPaymentContratRequest:
+    return RecordPaymentContratRequest(
+        contrat_id=1,
+        payment=payment,
+        authorization=RequestPolicy(
+            user={"user_current_id": 1, "user_current_role": Role.COMMERCIAL},
+            ressource="CONTRAT",
+            action="pay",
+        ),
+        idempotency_key=idempotency_key,
+    )
+
+def test_record_payment_idempotency_key_replay(contrat_repository):
+    """Test a retry with the same idempotency key returns the first result without paying twice"""
+    repo = contrat_repository
+    repo.find_by_id(1).commercial_contact_id = 1
+    uc = RecordPaymentContratUseCase(repo)
+
+    first = uc.execute(_payment_request(5, "pay-1"))
+    uc.execute(_payment_request(10, "pay-2"))
+    retry = uc.execute(_payment_request(5, "pay-1"))
+
+    assert first.success is True and first.replayed is False
+    assert retry.success is True and retry.replayed is True
+    assert retry.contrat.balance_due.cents == 10000 - 500
+    assert repo.find_by_id(1).balance_due.cents == 10000 - 1500
+    assert len(repo.payments) == 2
+
+def test_record_payment_idempotency_key_other_payment(contrat_repository):
+    """Test an idempotency key reused for another amount is refused"""
+    repo = contrat_repository
+    repo.find_by_id(1).commercial_contact_id = 1
+    uc = RecordPaymentContratUseCase(repo)
+    uc.execute(_payment_request(5, "pay-1"))
+
+    response = uc.execute(_payment_request(6, "pay-1"))
+
+    assert response.success is False
+    assert response.error == "Erreur Métier"
+    assert repo.find_by_id(1).balance_due.cents == 10000 - 500
+
+def test_record_payment_idempotency_key_concurrent_retry(contrat_repository):
+    """Test a retry losing the race on the idempotency key replays the winner's result"""
+    repo = contrat_repository
+    repo.find_by_id(1).commercial_contact_id = 1
+    find_payment_receipt = repo.find_payment_receipt
+    # the key is not stored yet when the retry looks it up, the winner records it just before the retry pays
+    receipts = iter([None])
+    def racing_lookup(key):
+        receipt = next(receipts, "stored")
+        if receipt is None:
+            repo.record_payment(1, 500, key)
+            return None
+        return find_payment_receipt(key)
+    repo.find_payment_receipt = racing_lookup
+
+    response = RecordPaymentContratUseCase(repo).execute(_payment_request(5, "pay-1"))
+
+    assert response.success is True and response.replayed is True
+    assert repo.find_by_id(1).balance_due.cents == 10000 - 500
+
 def test_record_payment_contrat_not_found(contrat_repository):
     """Test recording payment on non-existing contrat"""
     repo = contrat_repository
@@ -443,3 +610,44 @@ def test_record_payment_invalid_amount(contrat_repository):
     assert isinstance(response, RecordPaymentContratResponse)
     assert response.success is False
 
+
+######################################################################
+#                            Bulk Contrat Use Case                   #
+######################################################################
+def test_bulk_sign_contrat(contrat_repository):
+    """Test signing many contrats, with per id result"""
+    uc = BulkSignContratUseCase(contrat_repository)
+    request = BulkSignContratRequest(
+        contrat_ids=[1, 2, 456],
+        authorization=RequestPolicy(
+            user={"user_current_id": 5, "user_current_role": Role.COMMERCIAL},
+            ressource="CONTRAT",
+            action="sign",
+        )
+    )
+
+    response = uc.execute(request)
+
+    assert response.success is True
+    assert [(result.id, result.success) for result in response.results] == [(1, False), (2, True), (456, False)]
+    assert response.results[0].msg == "Seuls les membres commercials peuvent signer des contrats"
+    assert contrat_repository.find_by_id(2).status == ContractStatus.SIGNED
+
+
+def test_bulk_record_payment_contrat(contrat_repository):
+    """Test recording many payments, with per id result"""
+    uc = BulkRecordPaymentContratUseCase(contrat_repository)
+    request = BulkRecordPaymentContratRequest(
+        payments={1: "40.50", 2: "10"},
+        authorization=RequestPolicy(
+            user={"user_current_id": 1, "user_current_role": Role.ADMIN},
+            ressource="CONTRAT",
+            action="pay",
+        )
+    )
+
+    response = uc.execute(request)
+
+    assert [(result.id, result.success) for result in response.results] == [(1, True), (2, False)]
+    assert response.results[1].msg == "La signature du contrat est nécessaire"
+    assert contrat_repository.find_by_id(1).balance_due == Money("59.50")
@@ -0,0 +1,117 @@
+from datetime import date
+
+from src.domain.entities.enums import Role
+from src.domain.entities.read_models import SummaryDiff
+from src.domain.entities.value_objects import Money
+from src.domain.policies.user_policy import RequestPolicy
+from src.infrastructures.repositories.fake_repository import FakeDashboardRepository, FakePaymentRepository
+from src.use_cases.dashboard_use_cases import GetDashboardUseCase, GetDashboardRequest, GetDashboardResponse, \
+    CheckDashboardUseCase, CheckDashboardRequest, CheckDashboardResponse, CheckLedgerUseCase, CheckLedgerRequest
+
+
+def _authorization(role: Role, action: str) -> RequestPolicy:
+    return RequestPolicy(
+        user={"user_current_id": 1, "user_current_role": role},
+        ressource="DASHBOARD",
+        action=action,
+    )
+
+######################################################################
+#                            Get Dashboard Use Case                  #
+######################################################################
+def test_get_dashboard(contrat_repository, event_repository):
+    """Test reading dashboard summaries"""
+    repo = FakeDashboardRepository(contrat_repository, event_repository)
+    uc = GetDashboardUseCase(repo)
+    request = GetDashboardRequest(
+        authorization=_authorization(Role.GESTION, "show"),
+        today=date(2026, 1, 1),
+    )
+
+    response = uc.execute(request)
+
+    assert isinstance(response, GetDashboardResponse)
+    assert response.success is True
+    assert sum(row.contrat_count for row in response.commercials) == 2
+    assert [row.upcoming_event_count for row in response.supports] == [1]
+
+def test_get_dashboard_no_permission(contrat_repository, event_repository):
+    """Test reading dashboard without permission"""
+    repo = FakeDashboardRepository(contrat_repository, event_repository)
+    uc = GetDashboardUseCase(repo)
+    request = GetDashboardRequest(authorization=_authorization(Role.SUPPORT, "show"))
+
+    response = uc.execute(request)
+
+    assert response.success is False
+    assert response.error == "Permission"
+
+######################################################################
+#                            Check Dashboard Use Case                #
+######################################################################
+def test_check_dashboard_repair(contrat_repository, event_repository):
+    """Test checking and rebuilding inconsistent summaries"""
+    repo = FakeDashboardRepository(contrat_repository, event_repository)
+    repo.diffs = [SummaryDiff("commercial_summaries", "4", (1, 1, 10000, 10000), (0, 0, 0, 0))]
+    uc = CheckDashboardUseCase(repo)
+    request = CheckDashboardRequest(repair=True, authorization=_authorization(Role.ADMIN, "check"))
+
+    response = uc.execute(request)
+
+    assert isinstance(response, CheckDashboardResponse)
+    assert response.success is True
+    assert response.repaired is True
+    assert len(response.diffs) == 1
+    assert repo.rebuilt is True
+
+def test_check_dashboard_consistent(contrat_repository, event_repository):
+    """Test checking consistent summaries does not rebuild"""
+    repo = FakeDashboardRepository(contrat_repository, event_repository)
+    uc = CheckDashboardUseCase(repo)
+    request = CheckDashboardRequest(repair=True, authorization=_authorization(Role.ADMIN, "check"))
+
+    response = uc.execute(request)
+
+    assert response.success is True
+    assert response.diffs == []
+    assert repo.rebuilt is False
+
+######################################################################
+#                            Check Ledger Use Case                   #
+######################################################################
+def test_check_ledger_consistent(contrat_repository):
+    """Test balances maintained by payments match the ledger"""
+    contrat_repository.record_payment(1, 2500)
+    uc = CheckLedgerUseCase(FakePaymentRepository(contrat_repository))
+    request = CheckLedgerRequest(repair=False, authorization=_authorization(Role.ADMIN, "ledger"))
+
+    response = uc.execute(request)
+
+    assert response.success is True
+    assert response.diffs == []
+
+def test_check_ledger_repair(contrat_repository):
+    """Test balances overwritten outside the ledger are rebuilt from it"""
+    contrat_repository.record_payment(1, 2500)
+    contrat_repository.find_by_id(1).balance_due = Money(100)
+    repo = FakePaymentRepository(contrat_repository)
+    uc = CheckLedgerUseCase(repo)
+    request = CheckLedgerRequest(repair=True, authorization=_authorization(Role.ADMIN, "ledger"))
+
+    response = uc.execute(request)
+
+    assert response.success is True
+    assert response.repaired is True
+    assert response.diffs == [SummaryDiff("contrats", "1", (7500,), (10000,))]
+    assert contrat_repository.find_by_id(1).balance_due.cents == 7500
+    assert repo.check_balances() == []
+
+def test_check_ledger_no_permission(contrat_repository):
+    """Test checking balances without admin permission"""
+    uc = CheckLedgerUseCase(FakePaymentRepository(contrat_repository))
+    request = CheckLedgerRequest(repair=True, authorization=_authorization(Role.GESTION, "ledger"))
+
+    response = uc.execute(request)
+
+    assert response.success is False
+    assert response.error == "Permission"
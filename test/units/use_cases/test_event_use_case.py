@@ -6,7 +6,8 @@ from src.domain.policies.user_policy import RequestPolicy
 from src.use_cases.event_use_cases import CreateEventUseCase, CreateEventRequest, CreateEventResponse, \
     UpdateEventUseCase, UpdateEventRequest, UpdateEventResponse, GetEventUseCase, GetEventRequest, GetEventResponse, \
     DeleteEventUseCase, DeleteEventRequest, DeleteEventResponse, ListEventRequest, ListEventUseCase, ListEventResponse, \
-    AssignSupportEventUseCase, AssignSupportEventRequest, AssignSupportEventResponse
+    AssignSupportEventUseCase, AssignSupportEventRequest, AssignSupportEventResponse, AutoAssignSupportEventUseCase, \
+    AutoAssignSupportEventRequest, BulkAssignSupportEventUseCase, BulkAssignSupportEventRequest
 
 
 ######################################################################
@@ -174,6 +175,51 @@ def test_list_event(event_repository):
     assert response.success is True
     assert isinstance(response.events, list)
 
+
+def test_list_event_overlapping_period(event_repository):
+    """Test listing events overlapping a period"""
+    request = ListEventRequest(
+        support_contact_id=3,
+        list_filter=None,
+        date_from=datetime(2026, 5, 19),
+        date_to=datetime(2026, 5, 26),
+    )
+    response = ListEventUseCase(event_repository).execute(request)
+    assert response.success is True
+    assert len(response.events) == 2
+
+    request.date_from, request.date_to = datetime(2026, 5, 20), datetime(2026, 5, 27)
+    response = ListEventUseCase(event_repository).execute(request)
+    assert response.success is False
+
+
+def test_list_event_invalid_period(event_repository):
+    """Test listing events with end of period before its start"""
+    request = ListEventRequest(
+        support_contact_id=3,
+        list_filter=None,
+        date_from=datetime(2026, 5, 26),
+        date_to=datetime(2026, 5, 19),
+    )
+    response = ListEventUseCase(event_repository).execute(request)
+
+    assert response.success is False
+    assert response.error == "Période"
+
+
+def test_list_event_keyset_pagination(event_repository):
+    """Test listing events page by page"""
+    uc = ListEventUseCase(event_repository)
+
+    first_page = uc.execute(ListEventRequest(support_contact_id=3, list_filter=None, limit=1))
+    assert [event.id for event in first_page.events] == [1]
+    assert first_page.next_after_id == 1
+
+    second_page = uc.execute(ListEventRequest(
+        support_contact_id=3, list_filter=None, limit=1, after_id=first_page.next_after_id
+    ))
+    assert [event.id for event in second_page.events] == [2]
+
 ######################################################################
 #                            Get Contrat Use Case                   #
 ######################################################################
@@ -266,6 +312,26 @@ def test_assign_event(event_repository, user_repository):
     assert response.success is True
 
 
+def test_assign_event_overlapping_support(event_repository, user_repository):
+    """Test assigning a support user already booked on an overlapping event"""
+    event_repository.find_by_id(1).support_contact_id = 2
+    uc = AssignSupportEventUseCase(event_repository, user_repository)
+    request = AssignSupportEventRequest(
+        event_id=2,
+        support_user_id=2,
+        authorization=RequestPolicy(
+            user={"user_current_id": 1, "user_current_role": Role.GESTION},
+            ressource="EVENT",
+            action="assign",
+        )
+    )
+
+    response = uc.execute(request)
+
+    assert response.success is False
+    assert response.error == "Erreur Métier"
+
+
 def test_assign_no_event(event_repository, user_repository):
     """Test assigning a support user to event"""
     repo = event_repository
@@ -305,4 +371,74 @@ def test_assign_event_no_support_user(event_repository, user_repository):
     response = uc.execute(request)
 
     assert isinstance(response, AssignSupportEventResponse)
-    assert response.success is False
\ No newline at end of file
+    assert response.success is False
+
+
+######################################################################
+#                            Auto assign Event Use Case              #
+######################################################################
+def test_auto_assign_event(event_repository, user_repository):
+    """Test assigning every event without support, one is left when no support is free"""
+    overlapping = Event(
+        id=None, name="overlapping", contrat_id=4, client_id=3, support_contact_id=None,
+        start_date=datetime(2026, 5, 18), end_date=datetime(2026, 5, 22),
+        location="2 rue des test, Nantes", attendees=10, notes=""
+    )
+    event_repository.save(overlapping)
+    uc = AutoAssignSupportEventUseCase(event_repository, user_repository)
+    request = AutoAssignSupportEventRequest(
+        authorization=RequestPolicy(
+            user={"user_current_id": 1, "user_current_role": Role.GESTION},
+            ressource="EVENT",
+            action="auto-assign",
+        ),
+        date_from=datetime(2026, 1, 1),
+    )
+
+    response = uc.execute(request)
+
+    assert response.success is True
+    assert response.assignments == {2: 2}
+    assert [event.id for event in response.unassigned] == [overlapping.id]
+    assert event_repository.find_by_id(2).support_contact_id == 2
+
+
+def test_auto_assign_event_no_permission(event_repository, user_repository):
+    """Test auto assign by a commercial user"""
+    uc = AutoAssignSupportEventUseCase(event_repository, user_repository)
+    request = AutoAssignSupportEventRequest(
+        authorization=RequestPolicy(
+            user={"user_current_id": 1, "user_current_role": Role.COMMERCIAL},
+            ressource="EVENT",
+            action="auto-assign",
+        ),
+    )
+
+    response = uc.execute(request)
+
+    assert response.success is False
+    assert response.error == "Permission"
+
+
+######################################################################
+#                            Bulk assign Event Use Case              #
+######################################################################
+def test_bulk_assign_event(event_repository, user_repository):
+    """Test assigning a support user to many events, with per id result"""
+    uc = BulkAssignSupportEventUseCase(event_repository, user_repository)
+    request = BulkAssignSupportEventRequest(
+        event_ids=[1, 2, 456],
+        support_user_id=2,
+        authorization=RequestPolicy(
+            user={"user_current_id": 1, "user_current_role": Role.GESTION},
+            ressource="EVENT",
+            action="assign",
+        )
+    )
+
+    response = uc.execute(request)
+
+    assert response.success is True
+    assert [(result.id, result.success) for result in response.results] == [(1, False), (2, True), (456, False)]
+    assert response.results[0].msg == "L'évènement a déjà un contact support"
+    assert event_repository.find_by_id(2).support_contact_id == 2
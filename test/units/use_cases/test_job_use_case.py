@@ -0,0 +1,93 @@
+from src.domain.entities.enums import Role, JobStatus
+from src.domain.policies.user_policy import RequestPolicy
+from src.infrastructures.repositories.fake_repository import FakeJobRepository
+from src.use_cases.job_use_cases import SubmitJobUseCase, SubmitJobRequest, GetJobUseCase, GetJobRequest, \
+    ListJobUseCase, ListJobRequest, CancelJobUseCase, CancelJobRequest
+
+
+def _user(role: Role, user_id: int = 1) -> dict:
+    return {"user_current_id": user_id, "user_current_role": role}
+
+
+def _submit(repository: FakeJobRepository, user: dict, authorization: RequestPolicy = None):
+    request = SubmitJobRequest(kind="export", params={"target": "clients"}, user=user, authorization=authorization)
+    return SubmitJobUseCase(repository).execute(request)
+
+######################################################################
+#                            Submit                                  #
+######################################################################
+def test_submit_job():
+    """Test a submitted job is pending and owned by its user"""
+    repository = FakeJobRepository()
+
+    response = _submit(repository, _user(Role.COMMERCIAL, 4))
+
+    assert response.success is True
+    assert (response.job.status, response.job.created_by) == (JobStatus.PENDING, 4)
+
+def test_submit_job_not_allowed():
+    """Test a job is refused when its command is not allowed to the user"""
+    repository = FakeJobRepository()
+    user = _user(Role.SUPPORT)
+
+    response = _submit(repository, user, RequestPolicy(user=user, ressource="REPORT", action="commercial"))
+
+    assert response.success is False
+    assert response.error == "Permission"
+    assert repository.jobs == {}
+
+######################################################################
+#                            Status / list                           #
+######################################################################
+def test_get_job_of_another_user():
+    """Test a job is hidden to other users, but not to admins"""
+    repository = FakeJobRepository()
+    job = _submit(repository, _user(Role.COMMERCIAL, 4)).job
+
+    hidden = GetJobUseCase(repository).execute(GetJobRequest(job_id=job.id, user=_user(Role.GESTION, 5)))
+    shown = GetJobUseCase(repository).execute(GetJobRequest(job_id=job.id, user=_user(Role.ADMIN, 5)))
+
+    assert hidden.success is False
+    assert shown.job == job
+
+def test_list_jobs_of_all_users_admin_only():
+    """Test only admins list the jobs of every user"""
+    repository = FakeJobRepository()
+    _submit(repository, _user(Role.COMMERCIAL, 4))
+    _submit(repository, _user(Role.GESTION, 5))
+
+    mine = ListJobUseCase(repository).execute(ListJobRequest(user=_user(Role.GESTION, 5)))
+    refused = ListJobUseCase(repository).execute(ListJobRequest(user=_user(Role.GESTION, 5), all_users=True))
+    everyone = ListJobUseCase(repository).execute(ListJobRequest(user=_user(Role.ADMIN, 1), all_users=True))
+
+    assert [job.created_by for job in mine.jobs] == [5]
+    assert refused.error == "Permission"
+    assert [job.created_by for job in everyone.jobs] == [5, 4]
+
+######################################################################
+#                            Cancel                                  #
+######################################################################
+def test_cancel_running_job():
+    """Test a running job is cancelled and its next progress report is refused"""
+    repository = FakeJobRepository()
+    user = _user(Role.COMMERCIAL, 4)
+    job = _submit(repository, user).job
+    repository.start(job.id)
+
+    response = CancelJobUseCase(repository).execute(CancelJobRequest(job_id=job.id, user=user))
+
+    assert response.job.status == JobStatus.CANCELLED
+    assert repository.report_progress(job.id, 10, 100) is False
+
+def test_cancel_finished_job():
+    """Test a finished job can't be cancelled"""
+    repository = FakeJobRepository()
+    user = _user(Role.COMMERCIAL, 4)
+    job = _submit(repository, user).job
+    repository.start(job.id)
+    repository.finish(job.id, "jobs/job-1-export-clients.csv")
+
+    response = CancelJobUseCase(repository).execute(CancelJobRequest(job_id=job.id, user=user))
+
+    assert response.success is False
+    assert repository.find_by_id(job.id).status == JobStatus.DONE
@@ -0,0 +1,122 @@
+from datetime import datetime, timedelta
+
+from src.domain.entities.enums import Role, ContractStatus
+from src.domain.entities.read_models import CommercialReportRow, StatusReportRow
+from src.domain.entities.value_objects import Money
+from src.domain.policies.user_policy import RequestPolicy
+from src.infrastructures.repositories.fake_repository import FakePaymentRepository
+from src.use_cases.report_use_cases import GetReportUseCase, GetReportRequest, GetReportResponse, ReportType, \
+    GetCashInReportUseCase, GetCashInReportRequest, GetCashInReportResponse
+
+
+def _authorization(role: Role, action: str) -> RequestPolicy:
+    return RequestPolicy(
+        user={"user_current_id": 1, "user_current_role": role},
+        ressource="REPORT",
+        action=action,
+    )
+
+######################################################################
+#                            Report Use Case                         #
+######################################################################
+def test_report_by_commercial(contrat_repository):
+    """Test report aggregated per commercial contact"""
+    uc = GetReportUseCase(contrat_repository)
+    request = GetReportRequest(
+        report_type=ReportType.COMMERCIAL,
+        authorization=_authorization(Role.GESTION, "commercial"),
+    )
+
+    response = uc.execute(request)
+
+    assert isinstance(response, GetReportResponse)
+    assert response.success is True
+    assert all(isinstance(row, CommercialReportRow) for row in response.rows)
+    assert sum(row.contrat_count for row in response.rows) == 2
+
+def test_report_by_status(contrat_repository):
+    """Test report aggregated per status"""
+    uc = GetReportUseCase(contrat_repository)
+    request = GetReportRequest(
+        report_type=ReportType.STATUS,
+        authorization=_authorization(Role.ADMIN, "status"),
+    )
+
+    response = uc.execute(request)
+
+    assert response.success is True
+    signed = next(row for row in response.rows if row.status == ContractStatus.SIGNED)
+    assert isinstance(signed, StatusReportRow)
+    assert signed.contrat_count == 1
+    assert signed.total_amount == Money(100)
+
+def test_report_no_permission(contrat_repository):
+    """Test report without gestion permission"""
+    uc = GetReportUseCase(contrat_repository)
+    request = GetReportRequest(
+        report_type=ReportType.CLIENT,
+        authorization=_authorization(Role.SUPPORT, "client"),
+    )
+
+    response = uc.execute(request)
+
+    assert response.success is False
+    assert response.error == "Permission"
+
+######################################################################
+#                            Cash-in Report Use Case                 #
+######################################################################
+def test_report_cash_in(contrat_repository):
+    """Test monthly cash-in read from the payments ledger"""
+    contrat_repository.sign_many([2])
+    contrat_repository.record_payment(1, 2000)
+    contrat_repository.record_payment(1, 500)
+    contrat_repository.record_payment(2, 1000)
+    uc = GetCashInReportUseCase(FakePaymentRepository(contrat_repository))
+    now = datetime.now()
+    request = GetCashInReportRequest(
+        date_from=now - timedelta(days=1),
+        date_to=now + timedelta(days=1),
+        authorization=_authorization(Role.GESTION, "cash-in"),
+    )
+
+    response = uc.execute(request)
+
+    assert isinstance(response, GetCashInReportResponse)
+    assert response.success is True
+    assert sum(row.payment_count for row in response.rows) == 3
+    assert sum(row.amount.cents for row in response.rows) == 3500
+
+def test_report_cash_in_contrat(contrat_repository):
+    """Test cash-in restricted to one contrat"""
+    contrat_repository.sign_many([2])
+    contrat_repository.record_payment(1, 2000)
+    contrat_repository.record_payment(2, 1000)
+    uc = GetCashInReportUseCase(FakePaymentRepository(contrat_repository))
+    now = datetime.now()
+    request = GetCashInReportRequest(
+        date_from=now - timedelta(days=1),
+        date_to=now + timedelta(days=1),
+        authorization=_authorization(Role.ADMIN, "cash-in"),
+        contrat_id=2,
+    )
+
+    response = uc.execute(request)
+
+    assert response.success is True
+    assert [row.amount.cents for row in response.rows] == [1000]
+
+def test_report_cash_in_empty_period(contrat_repository):
+    """Test cash-in on a period without payments"""
+    contrat_repository.record_payment(1, 2000)
+    uc = GetCashInReportUseCase(FakePaymentRepository(contrat_repository))
+    request = GetCashInReportRequest(
+        date_from=datetime(2020, 1, 1),
+        date_to=datetime(2021, 1, 1),
+        authorization=_authorization(Role.GESTION, "cash-in"),
+    )
+
+    response = uc.execute(request)
+
+    assert response.success is False
+    assert response.error == "Ressource"